@@ -134,6 +134,12 @@ class ASRManifestProcessor:
         bos_id: Id of beginning of sequence symbol to append if not None.
         eos_id: Id of end of sequence symbol to append if not None.
         pad_id: Id of pad symbol. Defaults to 0.
+        columnar_collection: If True, stores the manifest in a compact `ASRColumnarAudioText` collection.
+        collection_cache_dir: Optional directory to cache the parsed and tokenized manifest in. Implies
+            columnar_collection.
+        manifest_parse_workers: Number of processes used to parse the manifest. Values of 0 and 1 parse it in the
+            main process.
+        manifest_fast_json: If True and `orjson` is installed, manifest lines are decoded with `orjson`.
     """
 
     def __init__(
@@ -148,10 +154,20 @@ class ASRManifestProcessor:
         pad_id: int = 0,
         index_by_file_id: bool = False,
         manifest_parse_func: Optional[Callable] = None,
+        columnar_collection: bool = False,
+        collection_cache_dir: Optional[str] = None,
+        manifest_parse_workers: int = 0,
+        manifest_fast_json: bool = False,
     ):
         self.parser = parser
 
-        self.collection = collections.ASRAudioText(
+        collection_kwargs = {}
+        if columnar_collection or collection_cache_dir is not None:
+            collection_cls = collections.ASRColumnarAudioText
+            collection_kwargs['cache_dir'] = collection_cache_dir
+        else:
+            collection_cls = collections.ASRAudioText
+        self.collection = collection_cls(
             manifests_files=manifest_filepath,
             parser=parser,
             min_duration=min_duration,
@@ -159,6 +175,9 @@ class ASRManifestProcessor:
             max_number=max_utts,
             index_by_file_id=index_by_file_id,
             parse_func=manifest_parse_func,
+            parse_workers=manifest_parse_workers,
+            fast_json=manifest_fast_json,
+            **collection_kwargs,
         )
 
         self.eos_id = eos_id
@@ -427,6 +446,11 @@ class _AudioTextDataset(Dataset):
         return_sample_id (bool): whether to return the sample_id as a part of each sample
         channel_selector (int | Iterable[int] | str): select a single channel or a subset of channels from multi-channel audio. If set to `'average'`, it performs averaging across channels. Disabled if set to `None`. Defaults to `None`. Uses zero-based indexing.
         manifest_parse_func: Optional function to parse manifest entries. Defaults to None.
+        columnar_collection: If True, stores the manifest in a compact columnar collection. Defaults to False.
+        collection_cache_dir: Optional directory to cache the parsed and tokenized manifest in. Defaults to None.
+        manifest_parse_workers: Number of processes used to parse the manifest. Defaults to 0.
+        manifest_fast_json: If True and `orjson` is installed, manifest lines are decoded with `orjson`.
+            Defaults to False.
     """
 
     @property
@@ -457,6 +481,10 @@ class _AudioTextDataset(Dataset):
         return_sample_id: bool = False,
         channel_selector: Optional[ChannelSelectorType] = None,
         manifest_parse_func: Optional[Callable] = None,
+        columnar_collection: bool = False,
+        collection_cache_dir: Optional[str] = None,
+        manifest_parse_workers: int = 0,
+        manifest_fast_json: bool = False,
     ):
         if type(manifest_filepath) == str:
             manifest_filepath = manifest_filepath.split(",")
@@ -474,6 +502,10 @@ class _AudioTextDataset(Dataset):
             eos_id=eos_id,
             pad_id=pad_id,
             manifest_parse_func=manifest_parse_func,
+            columnar_collection=columnar_collection,
+            collection_cache_dir=collection_cache_dir,
+            manifest_parse_workers=manifest_parse_workers,
+            manifest_fast_json=manifest_fast_json,
         )
         self.featurizer = WaveformFeaturizer(sample_rate=sample_rate, int_values=int_values, augmentor=augmentor)
         self.trim = trim
@@ -554,6 +586,11 @@ class AudioToCharDataset(_AudioTextDataset):
         return_sample_id (bool): whether to return the sample_id as a part of each sample
         channel_selector (int | Iterable[int] | str): select a single channel or a subset of channels from multi-channel audio. If set to `'average'`, it performs averaging across channels. Disabled if set to `None`. Defaults to `None`. Uses zero-based indexing.
         manifest_parse_func: Optional function to parse manifest entries. Defaults to None.
+        columnar_collection: If True, stores the manifest in a compact columnar collection. Defaults to False.
+        collection_cache_dir: Optional directory to cache the parsed and tokenized manifest in. Defaults to None.
+        manifest_parse_workers: Number of processes used to parse the manifest. Defaults to 0.
+        manifest_fast_json: If True and `orjson` is installed, manifest lines are decoded with `orjson`.
+            Defaults to False.
     """
 
     @property
@@ -588,6 +625,10 @@ class AudioToCharDataset(_AudioTextDataset):
         return_sample_id: bool = False,
         channel_selector: Optional[ChannelSelectorType] = None,
         manifest_parse_func: Optional[Callable] = None,
+        columnar_collection: bool = False,
+        collection_cache_dir: Optional[str] = None,
+        manifest_parse_workers: int = 0,
+        manifest_fast_json: bool = False,
     ):
         self.labels = labels
 
@@ -611,6 +652,10 @@ class AudioToCharDataset(_AudioTextDataset):
             return_sample_id=return_sample_id,
             channel_selector=channel_selector,
             manifest_parse_func=manifest_parse_func,
+            columnar_collection=columnar_collection,
+            collection_cache_dir=collection_cache_dir,
+            manifest_parse_workers=manifest_parse_workers,
+            manifest_fast_json=manifest_fast_json,
         )
 
 
@@ -650,6 +695,11 @@ class AudioToBPEDataset(_AudioTextDataset):
         return_sample_id (bool): whether to return the sample_id as a part of each sample
         channel_selector (int | Iterable[int] | str): select a single channel or a subset of channels from multi-channel audio. If set to `'average'`, it performs averaging across channels. Disabled if set to `None`. Defaults to `None`. Uses zero-based indexing.
         manifest_parse_func: Optional function to parse manifest entries. Defaults to None.
+        columnar_collection: If True, stores the manifest in a compact columnar collection. Defaults to False.
+        collection_cache_dir: Optional directory to cache the parsed and tokenized manifest in. Defaults to None.
+        manifest_parse_workers: Number of processes used to parse the manifest. Defaults to 0.
+        manifest_fast_json: If True and `orjson` is installed, manifest lines are decoded with `orjson`.
+            Defaults to False.
     """
 
     @property
@@ -678,6 +728,10 @@ class AudioToBPEDataset(_AudioTextDataset):
         return_sample_id: bool = False,
         channel_selector: Optional[ChannelSelectorType] = None,
         manifest_parse_func: Optional[Callable] = None,
+        columnar_collection: bool = False,
+        collection_cache_dir: Optional[str] = None,
+        manifest_parse_workers: int = 0,
+        manifest_fast_json: bool = False,
     ):
         if use_start_end_token and hasattr(tokenizer, "bos_id") and tokenizer.bos_id > 0:
             bos_id = tokenizer.bos_id
@@ -728,9 +782,51 @@ class AudioToBPEDataset(_AudioTextDataset):
             return_sample_id=return_sample_id,
             channel_selector=channel_selector,
             manifest_parse_func=manifest_parse_func,
+            columnar_collection=columnar_collection,
+            collection_cache_dir=collection_cache_dir,
+            manifest_parse_workers=manifest_parse_workers,
+            manifest_fast_json=manifest_fast_json,
         )
 
 
+class _TarredShardManifestCache:
+    """
+    Loads the manifest sidecar of a single tarred audio shard on demand.
+
+    Only the manifest of the shard that is currently being read is kept in memory: it is dropped as soon as
+    a sample from another shard is requested. Since WebDataset reads the shards assigned to a worker one at a time,
+    each manifest is loaded once per epoch, and only by the worker that reads the shard.
+
+    Args:
+        shard_manifest_filepaths: Mapping from the URL of each tarred audio shard to the path of its manifest.
+        **manifest_processor_kwargs: Keyword arguments for the ASRManifestProcessor of each shard.
+    """
+
+    def __init__(self, shard_manifest_filepaths: Dict[str, str], **manifest_processor_kwargs):
+        self.shard_manifest_filepaths = shard_manifest_filepaths
+        self.manifest_processor_kwargs = manifest_processor_kwargs
+        self.current_url = None
+        self.manifest_processor = None
+
+    def get(self, url: str) -> ASRManifestProcessor:
+        if url != self.current_url:
+            # Release the previous shard's manifest before parsing the next one
+            self.manifest_processor = None
+            self.manifest_processor = ASRManifestProcessor(
+                manifest_filepath=self.shard_manifest_filepaths[url],
+                index_by_file_id=True,  # Must set this so the manifest lines can be indexed by file ID
+                **self.manifest_processor_kwargs,
+            )
+            self.current_url = url
+        return self.manifest_processor
+
+
+def _count_manifest_lines(manifest_filepath: str) -> int:
+    """Counts the non-empty lines of a manifest without parsing them."""
+    with open(os.path.expanduser(DataStoreObject(manifest_filepath).get()), 'rb') as f:
+        return sum(1 for line in f if line.strip())
+
+
 @deprecated(
     explanation='Webdataset support will be removed in v2.1.0 versions, please use LhotseSpeechToTextBpeDataset class instead'
 )
@@ -821,6 +917,13 @@ class _TarredAudioToTextDataset(IterableDataset):
                     the entire dataset. For these reasons it is not advisable to use tarred datasets as validation
                     or test datasets.
         shard_manifests (bool): Whether or not to try / shard manifests. Defaults to False.
+        lazy_shard_manifests (bool): If True, `manifest_filepath` must expand (in the same way as
+            `audio_tar_filepaths`) to one manifest per tarred audio shard, in the same order as the shards.
+            Instead of building a collection over the whole manifest in every rank and dataloader worker,
+            each worker then parses the manifest of a shard only while it reads that shard.
+            The length of the dataset is the number of lines in the manifests of the shards of this rank
+            (summed over ranks when shards are scattered), before duration filtering.
+            Not supported with `return_sample_id`. Defaults to False.
         global_rank (int): Worker rank, used for partitioning shards. Defaults to 0.
         world_size (int): Total number of processes, used for partitioning shards. Defaults to 0.
         return_sample_id (bool): whether to return the sample_id as a part of each sample
@@ -844,27 +947,25 @@ class _TarredAudioToTextDataset(IterableDataset):
         pad_id: int = 0,
         shard_strategy: str = "scatter",
         shard_manifests: bool = False,
+        lazy_shard_manifests: bool = False,
         global_rank: int = 0,
         world_size: int = 0,
         return_sample_id: bool = False,
         manifest_parse_func: Optional[Callable] = None,
     ):
         self.shard_manifests = shard_manifests
+        self.lazy_shard_manifests = lazy_shard_manifests
+        self.shard_strategy = shard_strategy
+        self.world_size = world_size
 
-        # Shard manifests if necessary and possible and then expand the paths
-        manifest_filepath = shard_manifests_if_needed(
-            shard_manifests=shard_manifests,
-            shard_strategy=shard_strategy,
-            manifest_filepaths=manifest_filepath,
-            world_size=world_size,
-            global_rank=global_rank,
-        )
-
-        # If necessary, cache manifests from object store
-        cache_datastore_manifests(manifest_filepaths=manifest_filepath)
+        self.featurizer = WaveformFeaturizer(sample_rate=sample_rate, int_values=int_values, augmentor=augmentor)
+        self.trim = trim
+        self.eos_id = eos_id
+        self.bos_id = bos_id
+        self.pad_id = pad_id
+        self.return_sample_id = return_sample_id
 
-        self.manifest_processor = ASRManifestProcessor(
-            manifest_filepath=manifest_filepath,
+        manifest_processor_kwargs = dict(
             parser=parser,
             max_duration=max_duration,
             min_duration=min_duration,
@@ -872,25 +973,67 @@ class _TarredAudioToTextDataset(IterableDataset):
             bos_id=bos_id,
             eos_id=eos_id,
             pad_id=pad_id,
-            index_by_file_id=True,  # Must set this so the manifest lines can be indexed by file ID
             manifest_parse_func=manifest_parse_func,
         )
 
-        self.len = self._compute_len()
+        if lazy_shard_manifests:
+            if return_sample_id:
+                raise ValueError("`return_sample_id` is not supported with `lazy_shard_manifests`")
 
-        self.featurizer = WaveformFeaturizer(sample_rate=sample_rate, int_values=int_values, augmentor=augmentor)
-        self.trim = trim
-        self.eos_id = eos_id
-        self.bos_id = bos_id
-        self.pad_id = pad_id
-        self.return_sample_id = return_sample_id
+            # Pair every tarred audio shard with its manifest before the shards are partitioned across ranks
+            audio_tar_filepaths = expand_sharded_filepaths(
+                sharded_filepaths=audio_tar_filepaths, shard_strategy=shard_strategy, world_size=0, global_rank=0
+            )
+            shard_manifest_filepaths = expand_sharded_filepaths(
+                sharded_filepaths=manifest_filepath, shard_strategy=shard_strategy, world_size=0, global_rank=0
+            )
+            if len(shard_manifest_filepaths) != len(audio_tar_filepaths):
+                raise ValueError(
+                    f"`lazy_shard_manifests` requires one manifest per tarred audio shard, but got "
+                    f"{len(shard_manifest_filepaths)} manifests for {len(audio_tar_filepaths)} shards."
+                )
+            shard_manifest_filepaths = dict(zip(audio_tar_filepaths, shard_manifest_filepaths))
 
-        audio_tar_filepaths = expand_sharded_filepaths(
-            sharded_filepaths=audio_tar_filepaths,
-            shard_strategy=shard_strategy,
-            world_size=world_size,
-            global_rank=global_rank,
-        )
+            audio_tar_filepaths = expand_sharded_filepaths(
+                sharded_filepaths=audio_tar_filepaths,
+                shard_strategy=shard_strategy,
+                world_size=world_size,
+                global_rank=global_rank,
+            )
+            shard_manifest_filepaths = {url: shard_manifest_filepaths[url] for url in audio_tar_filepaths}
+
+            self.manifest_processor = None
+            self._shard_manifest_cache = _TarredShardManifestCache(
+                shard_manifest_filepaths, **manifest_processor_kwargs
+            )
+        else:
+            # Shard manifests if necessary and possible and then expand the paths
+            manifest_filepath = shard_manifests_if_needed(
+                shard_manifests=shard_manifests,
+                shard_strategy=shard_strategy,
+                manifest_filepaths=manifest_filepath,
+                world_size=world_size,
+                global_rank=global_rank,
+            )
+
+            # If necessary, cache manifests from object store
+            cache_datastore_manifests(manifest_filepaths=manifest_filepath)
+
+            self.manifest_processor = ASRManifestProcessor(
+                manifest_filepath=manifest_filepath,
+                index_by_file_id=True,  # Must set this so the manifest lines can be indexed by file ID
+                **manifest_processor_kwargs,
+            )
+            self._shard_manifest_cache = None
+
+            audio_tar_filepaths = expand_sharded_filepaths(
+                sharded_filepaths=audio_tar_filepaths,
+                shard_strategy=shard_strategy,
+                world_size=world_size,
+                global_rank=global_rank,
+            )
+
+        self.len = self._compute_len()
 
         # Put together WebDataset pipeline
         self._dataset = wds.DataPipeline(
@@ -899,12 +1042,18 @@ class _TarredAudioToTextDataset(IterableDataset):
             wds.shuffle(shuffle_n),
             wds.tarfile_to_samples(),
             wds.rename(audio=VALID_FILE_FORMATS, key='__key__'),
-            wds.to_tuple('audio', 'key'),
+            wds.to_tuple('audio', 'key', '__url__'),
             self._filter,
             self._loop_offsets,
             wds.map(self._build_sample),
         )
 
+    def _get_manifest_processor(self, url: str) -> ASRManifestProcessor:
+        """Returns the manifest processor that holds the manifest entries of the samples of the given shard."""
+        if self.lazy_shard_manifests:
+            return self._shard_manifest_cache.get(url)
+        return self.manifest_processor
+
     def _filter(self, iterator):
         """This function is used to remove samples that have been filtered out by ASRAudioText already.
         Otherwise, we would get a KeyError as _build_sample attempts to find the manifest entry for a sample
@@ -914,31 +1063,32 @@ class _TarredAudioToTextDataset(IterableDataset):
         """
 
         class TarredAudioFilter:
-            def __init__(self, collection):
+            def __init__(self, get_manifest_processor):
                 self.iterator = iterator
-                self.collection = collection
+                self.get_manifest_processor = get_manifest_processor
 
             def __iter__(self):
                 return self
 
             def __next__(self):
                 while True:
-                    audio_bytes, audio_filename = next(self.iterator)
+                    audio_bytes, audio_filename, url = next(self.iterator)
                     file_id, _ = os.path.splitext(os.path.basename(audio_filename))
-                    if file_id in self.collection.mapping:
-                        return audio_bytes, audio_filename
+                    if file_id in self.get_manifest_processor(url).collection.mapping:
+                        return audio_bytes, audio_filename, url
 
-        return TarredAudioFilter(self.manifest_processor.collection)
+        return TarredAudioFilter(self._get_manifest_processor)
 
     def _loop_offsets(self, iterator):
         """This function is used to iterate through utterances with different offsets for each file."""
 
         class TarredAudioLoopOffsets:
-            def __init__(self, collection):
+            def __init__(self, get_manifest_processor):
                 self.iterator = iterator
-                self.collection = collection
+                self.get_manifest_processor = get_manifest_processor
                 self.current_fn = None
                 self.current_bytes = None
+                self.current_url = None
                 self.offset_id = 0
 
             def __iter__(self):
@@ -946,32 +1096,34 @@ class _TarredAudioToTextDataset(IterableDataset):
 
             def __next__(self):
                 if self.current_fn is None:
-                    self.current_bytes, self.current_fn = next(self.iterator)
+                    self.current_bytes, self.current_fn, self.current_url = next(self.iterator)
                     self.offset_id = 0
                 else:
-                    offset_list = self.collection.mapping[self.current_fn]
+                    collection = self.get_manifest_processor(self.current_url).collection
+                    offset_list = collection.mapping[self.current_fn]
                     if len(offset_list) == self.offset_id + 1:
-                        self.current_bytes, self.current_fn = next(self.iterator)
+                        self.current_bytes, self.current_fn, self.current_url = next(self.iterator)
                         self.offset_id = 0
                     else:
                         self.offset_id += 1
 
-                return self.current_bytes, self.current_fn, self.offset_id
+                return self.current_bytes, self.current_fn, self.current_url, self.offset_id
 
-        return TarredAudioLoopOffsets(self.manifest_processor.collection)
+        return TarredAudioLoopOffsets(self._get_manifest_processor)
 
     def _collate_fn(self, batch):
         return _speech_collate_fn(batch, self.pad_id)
 
     def _build_sample(self, tup):
         """Builds the training sample by combining the data from the WebDataset with the manifest info."""
-        audio_bytes, audio_filename, offset_id = tup
+        audio_bytes, audio_filename, url, offset_id = tup
 
-        # Grab manifest entry from self.manifest_preprocessor.collection
+        # Grab manifest entry from the collection of the shard's manifest processor
         file_id, _ = os.path.splitext(os.path.basename(audio_filename))
 
-        manifest_idx = self.manifest_processor.collection.mapping[file_id][offset_id]
-        manifest_entry = self.manifest_processor.collection[manifest_idx]
+        manifest_processor = self._get_manifest_processor(url)
+        manifest_idx = manifest_processor.collection.mapping[file_id][offset_id]
+        manifest_entry = manifest_processor.collection[manifest_idx]
 
         offset = manifest_entry.offset
         if offset is None:
@@ -994,7 +1146,7 @@ class _TarredAudioToTextDataset(IterableDataset):
         # Text features
         t, tl = manifest_entry.text_tokens, len(manifest_entry.text_tokens)
 
-        self.manifest_processor.process_text_by_sample(sample=manifest_entry)
+        manifest_processor.process_text_by_sample(sample=manifest_entry)
 
         if self.bos_id is not None:
             t = [self.bos_id] + t
@@ -1009,13 +1161,30 @@ class _TarredAudioToTextDataset(IterableDataset):
             return f, fl, torch.tensor(t).long(), torch.tensor(tl).long()
 
     def get_manifest_sample(self, sample_id):
+        if self.lazy_shard_manifests:
+            raise RuntimeError("Manifest samples cannot be looked up by sample id with `lazy_shard_manifests`")
         return self.manifest_processor.collection[sample_id]
 
     def __iter__(self):
         return self._dataset.__iter__()
 
     def _compute_len(self):
-        if self.shard_manifests and torch.distributed.is_available() and torch.distributed.is_initialized():
+        if self.lazy_shard_manifests:
+            my_len = sum(
+                _count_manifest_lines(manifest_filepath)
+                for manifest_filepath in self._shard_manifest_cache.shard_manifest_filepaths.values()
+            )
+            if (
+                self.shard_strategy == 'scatter'
+                and self.world_size > 1
+                and torch.distributed.is_available()
+                and torch.distributed.is_initialized()
+            ):
+                my_len = torch.tensor(my_len, dtype=torch.int32).cuda()
+                torch.distributed.all_reduce(my_len)
+                my_len = my_len.int()
+                logging.info(f'Lazily loaded shard manifests: Total length: {my_len}')
+        elif self.shard_manifests and torch.distributed.is_available() and torch.distributed.is_initialized():
             my_len = torch.tensor(len(self.manifest_processor.collection), dtype=torch.int32).cuda()
             torch.distributed.all_reduce(my_len)
             my_len = my_len.int()
@@ -1114,6 +1283,9 @@ class TarredAudioToCharDataset(_TarredAudioToTextDataset):
                     the entire dataset. For these reasons it is not advisable to use tarred datasets as validation
                     or test datasets.
 
+        lazy_shard_manifests (bool): If True, `manifest_filepath` must expand to one manifest per tarred audio
+            shard, and each dataloader worker only loads the manifest of the shard it is reading.
+            Defaults to False.
         global_rank (int): Worker rank, used for partitioning shards. Defaults to 0.
         world_size (int): Total number of processes, used for partitioning shards. Defaults to 0.
         return_sample_id (bool): whether to return the sample_id as a part of each sample
@@ -1141,6 +1313,7 @@ class TarredAudioToCharDataset(_TarredAudioToTextDataset):
         pad_id: int = 0,
         shard_strategy: str = "scatter",
         shard_manifests: bool = False,
+        lazy_shard_manifests: bool = False,
         global_rank: int = 0,
         world_size: int = 0,
         return_sample_id: bool = False,
@@ -1168,6 +1341,7 @@ class TarredAudioToCharDataset(_TarredAudioToTextDataset):
             pad_id=pad_id,
             shard_strategy=shard_strategy,
             shard_manifests=shard_manifests,
+            lazy_shard_manifests=lazy_shard_manifests,
             global_rank=global_rank,
             world_size=world_size,
             return_sample_id=return_sample_id,
@@ -1250,6 +1424,9 @@ class TarredAudioToBPEDataset(_TarredAudioToTextDataset):
                     the entire dataset. For these reasons it is not advisable to use tarred datasets as validation
                     or test datasets.
 
+        lazy_shard_manifests (bool): If True, `manifest_filepath` must expand to one manifest per tarred audio
+            shard, and each dataloader worker only loads the manifest of the shard it is reading.
+            Defaults to False.
         global_rank (int): Worker rank, used for partitioning shards. Defaults to 0.
         world_size (int): Total number of processes, used for partitioning shards. Defaults to 0.
         return_sample_id (bool): whether to return the sample_id as a part of each sample
@@ -1271,6 +1448,7 @@ class TarredAudioToBPEDataset(_TarredAudioToTextDataset):
         use_start_end_token: bool = True,
         shard_strategy: str = "scatter",
         shard_manifests: bool = False,
+        lazy_shard_manifests: bool = False,
         global_rank: int = 0,
         world_size: int = 0,
         return_sample_id: bool = False,
@@ -1325,6 +1503,7 @@ class TarredAudioToBPEDataset(_TarredAudioToTextDataset):
             pad_id=pad_id,
             shard_strategy=shard_strategy,
             shard_manifests=shard_manifests,
+            lazy_shard_manifests=lazy_shard_manifests,
             global_rank=global_rank,
             world_size=world_size,
             return_sample_id=return_sample_id,
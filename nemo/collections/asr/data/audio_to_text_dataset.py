@@ -156,6 +156,10 @@ def get_char_dataset(config: dict, augmentor: Optional['AudioAugmentor'] = None)
         parser=config.get('parser', 'en'),
         return_sample_id=config.get('return_sample_id', False),
         channel_selector=config.get('channel_selector', None),
+        columnar_collection=config.get('columnar_collection', False),
+        collection_cache_dir=config.get('collection_cache_dir', None),
+        manifest_parse_workers=config.get('manifest_parse_workers', 0),
+        manifest_fast_json=config.get('manifest_fast_json', False),
     )
     return dataset
 
@@ -236,6 +240,10 @@ def get_bpe_dataset(
         use_start_end_token=config.get('use_start_end_token', True),
         return_sample_id=config.get('return_sample_id', False),
         channel_selector=config.get('channel_selector', None),
+        columnar_collection=config.get('columnar_collection', False),
+        collection_cache_dir=config.get('collection_cache_dir', None),
+        manifest_parse_workers=config.get('manifest_parse_workers', 0),
+        manifest_fast_json=config.get('manifest_fast_json', False),
     )
     return dataset
 
@@ -371,6 +379,7 @@ def get_tarred_dataset(
                 parser=config.get('parser', 'en'),
                 shard_strategy=config.get('tarred_shard_strategy', 'scatter'),
                 shard_manifests=config.get('shard_manifests', False),
+                lazy_shard_manifests=config.get('lazy_shard_manifests', False),
                 global_rank=global_rank,
                 world_size=world_size,
                 return_sample_id=config.get('return_sample_id', False),
@@ -390,6 +399,7 @@ def get_tarred_dataset(
                 use_start_end_token=config.get('use_start_end_token', True),
                 shard_strategy=config.get('tarred_shard_strategy', 'scatter'),
                 shard_manifests=config.get('shard_manifests', False),
+                lazy_shard_manifests=config.get('lazy_shard_manifests', False),
                 global_rank=global_rank,
                 world_size=world_size,
                 return_sample_id=config.get('return_sample_id', False),
@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List, Optional, Tuple, Union
+import multiprocessing as mp
+from typing import Iterator, List, Optional, Tuple, Union
 
 import editdistance
 import jiwer
+import numpy as np
 import torch
 from torchmetrics import Metric
 
@@ -24,7 +26,7 @@ from nemo.collections.asr.parts.submodules.multitask_decoding import AbstractMul
 from nemo.collections.asr.parts.submodules.rnnt_decoding import AbstractRNNTDecoding
 from nemo.utils import logging
 
-__all__ = ['word_error_rate', 'word_error_rate_detail', 'WER']
+__all__ = ['word_error_rate', 'word_error_rate_detail', 'edit_ops_iter', 'WER']
 
 
 def move_dimension_to_the_front(tensor, dim_index):
@@ -32,7 +34,141 @@ def move_dimension_to_the_front(tensor, dim_index):
     return tensor.permute(*([dim_index] + all_dims[:dim_index] + all_dims[dim_index + 1 :]))
 
 
-def word_error_rate(hypotheses: List[str], references: List[str], use_cer=False) -> float:
+def _edit_ops_batch(pairs: List[Tuple[List[str], List[str]]]) -> np.ndarray:
+    """
+    Computes Levenshtein alignments of a batch of (hypothesis, reference) token lists at once.
+
+    Tokens are mapped to integer ids and the dynamic programming tables of all pairs are filled one reference
+    position at a time, vectorized over pairs and hypothesis positions. Among the alignments with the minimal
+    number of errors, matches and substitutions are preferred over deletions and deletions over insertions.
+
+    Args:
+        pairs: list of (hypothesis tokens, reference tokens) tuples
+
+    Returns:
+        An int64 array of shape ``[len(pairs), 4]`` with the number of errors, insertions, deletions and
+        reference tokens of each pair.
+    """
+    batch_size = len(pairs)
+    hyp_lens = np.array([len(h) for h, _ in pairs], dtype=np.int64)
+    ref_lens = np.array([len(r) for _, r in pairs], dtype=np.int64)
+    if batch_size == 0:
+        return np.zeros((0, 4), dtype=np.int64)
+    max_hyp_len, max_ref_len = hyp_lens.max(), ref_lens.max()
+
+    # padding ids never match each other, padded positions are masked out below anyway
+    vocab = {}
+    hyp_ids = np.full((batch_size, max_hyp_len), -1, dtype=np.int64)
+    ref_ids = np.full((batch_size, max_ref_len), -2, dtype=np.int64)
+    for b, (h, r) in enumerate(pairs):
+        hyp_ids[b, : len(h)] = [vocab.setdefault(token, len(vocab)) for token in h]
+        ref_ids[b, : len(r)] = [vocab.setdefault(token, len(vocab)) for token in r]
+
+    rows = np.arange(batch_size)[:, None]
+    positions = np.arange(max_hyp_len + 1)
+    # aligning a hypothesis prefix of length j to an empty reference takes j insertions
+    cost = np.broadcast_to(positions, (batch_size, max_hyp_len + 1)).copy()
+    ins = cost.copy()
+    dels = np.zeros_like(cost)
+    for i in range(max_ref_len):
+        sub_cost = cost[:, :-1] + (hyp_ids != ref_ids[:, i : i + 1])
+        del_cost = cost[:, 1:] + 1
+        take_del = del_cost < sub_cost
+
+        new_cost = np.empty_like(cost)
+        new_ins = np.empty_like(ins)
+        new_dels = np.empty_like(dels)
+        new_cost[:, 0], new_ins[:, 0], new_dels[:, 0] = i + 1, 0, i + 1
+        new_cost[:, 1:] = np.where(take_del, del_cost, sub_cost)
+        new_ins[:, 1:] = np.where(take_del, ins[:, 1:], ins[:, :-1])
+        new_dels[:, 1:] = np.where(take_del, dels[:, 1:] + 1, dels[:, :-1])
+
+        # insertions: cost[j] = min_{k <= j} (cost[k] + j - k),
+        # taking the largest such k to insert as little as possible
+        shifted = new_cost - positions
+        running_min = np.minimum.accumulate(shifted, axis=1)
+        src = np.maximum.accumulate(np.where(shifted == running_min, positions, 0), axis=1)
+        new_cost = running_min + positions
+        new_ins = new_ins[rows, src] + positions - src
+        new_dels = new_dels[rows, src]
+
+        # pairs with shorter references keep their final row
+        active = (ref_lens > i)[:, None]
+        cost = np.where(active, new_cost, cost)
+        ins = np.where(active, new_ins, ins)
+        dels = np.where(active, new_dels, dels)
+
+    last = hyp_lens[:, None]
+    return np.stack(
+        [
+            np.take_along_axis(cost, last, axis=1)[:, 0],
+            np.take_along_axis(ins, last, axis=1)[:, 0],
+            np.take_along_axis(dels, last, axis=1)[:, 0],
+            ref_lens,
+        ],
+        axis=1,
+    )
+
+
+def _edit_ops_chunk(args: Tuple[List[str], List[str], bool, int]) -> np.ndarray:
+    """
+    Tokenizes a chunk of hypotheses and references and computes their edit operations in length-sorted batches,
+    so that pairs of similar lengths share a dynamic programming table.
+    """
+    hypotheses, references, use_cer, batch_size = args
+    if use_cer:
+        pairs = [(list(h), list(r)) for h, r in zip(hypotheses, references)]
+    else:
+        pairs = [(h.split(), r.split()) for h, r in zip(hypotheses, references)]
+    order = sorted(range(len(pairs)), key=lambda idx: (len(pairs[idx][1]), len(pairs[idx][0])))
+    ops = np.zeros((len(pairs), 4), dtype=np.int64)
+    for start in range(0, len(order), batch_size):
+        idx = order[start : start + batch_size]
+        ops[idx] = _edit_ops_batch([pairs[k] for k in idx])
+    return ops
+
+
+def edit_ops_iter(
+    hypotheses: List[str],
+    references: List[str],
+    use_cer: bool = False,
+    num_workers: int = 0,
+    chunk_size: int = 8192,
+    batch_size: int = 256,
+) -> Iterator[np.ndarray]:
+    """
+    Computes edit operations between hypotheses and references with a batched edit distance engine.
+
+    Pairs are split into chunks of ``chunk_size`` pairs, which are processed by a pool of ``num_workers``
+    processes (or in the current process if ``num_workers`` is 0). Results are yielded in order, one chunk
+    at a time, so that callers can aggregate them incrementally.
+
+    Args:
+        hypotheses (list): list of hypotheses
+        references(list) : list of references
+        use_cer (bool): set True to enable cer
+        num_workers (int): number of worker processes
+        chunk_size (int): number of pairs processed by a worker at once
+        batch_size (int): number of pairs whose dynamic programming tables are filled together
+
+    Yields:
+        int64 arrays of shape ``[chunk_size, 4]`` with the number of errors, insertions, deletions and
+        reference words (or characters) of each pair.
+    """
+    chunks = (
+        (hypotheses[start : start + chunk_size], references[start : start + chunk_size], use_cer, batch_size)
+        for start in range(0, len(references), chunk_size)
+    )
+    if num_workers > 0:
+        with mp.Pool(num_workers) as pool:
+            yield from pool.imap(_edit_ops_chunk, chunks)
+    else:
+        yield from map(_edit_ops_chunk, chunks)
+
+
+def word_error_rate(
+    hypotheses: List[str], references: List[str], use_cer=False, batched=False, num_workers=0
+) -> float:
     """
     Computes Average Word Error rate between two texts represented as
     corresponding lists of string.
@@ -43,6 +179,8 @@ def word_error_rate(hypotheses: List[str], references: List[str], use_cer=False)
         hypotheses (list): list of hypotheses
         references(list) : list of references
         use_cer (bool): set True to enable cer
+        batched (bool): set True to use the batched edit distance engine, see ``edit_ops_iter``
+        num_workers (int): number of worker processes of the batched engine
 
     Returns:
         wer (float): average word error rate
@@ -55,17 +193,23 @@ def word_error_rate(hypotheses: List[str], references: List[str], use_cer=False)
             " lists must have the same number of elements. But I got:"
             "{0} and {1} correspondingly".format(len(hypotheses), len(references))
         )
-    for h, r in zip(hypotheses, references):
-        if use_cer:
-            h_list = list(h)
-            r_list = list(r)
-        else:
-            h_list = h.split()
-            r_list = r.split()
-        words += len(r_list)
-        # May deprecate using editdistance in future release for here and rest of codebase
-        # once we confirm jiwer is reliable.
-        scores += editdistance.eval(h_list, r_list)
+    if batched:
+        for ops in edit_ops_iter(hypotheses, references, use_cer=use_cer, num_workers=num_workers):
+            scores += int(ops[:, 0].sum())
+            words += int(ops[:, 3].sum())
+    else:
+        for h, r in zip(hypotheses, references):
+            if use_cer:
+                h_list = list(h)
+                r_list = list(r)
+            else:
+                h_list = h.split()
+                r_list = r.split()
+            words += len(r_list)
+            # May deprecate using editdistance in future release for here and rest of codebase
+            # once we confirm jiwer is reliable.
+            scores += editdistance.eval(h_list, r_list)
+
     if words != 0:
         wer = 1.0 * scores / words
     else:
@@ -74,7 +218,7 @@ def word_error_rate(hypotheses: List[str], references: List[str], use_cer=False)
 
 
 def word_error_rate_detail(
-    hypotheses: List[str], references: List[str], use_cer=False
+    hypotheses: List[str], references: List[str], use_cer=False, batched=False, num_workers=0
 ) -> Tuple[float, int, float, float, float]:
     """
     Computes Average Word Error Rate with details (insertion rate, deletion rate, substitution rate)
@@ -86,6 +230,8 @@ def word_error_rate_detail(
         hypotheses (list): list of hypotheses
         references(list) : list of references
         use_cer (bool): set True to enable cer
+        batched (bool): set True to use the batched edit distance engine, see ``edit_ops_iter``
+        num_workers (int): number of worker processes of the batched engine
 
     Returns:
         wer (float): average word error rate
@@ -105,34 +251,42 @@ def word_error_rate_detail(
             "{0} and {1} correspondingly".format(len(hypotheses), len(references))
         )
 
-    for h, r in zip(hypotheses, references):
-        if use_cer:
-            h_list = list(h)
-            r_list = list(r)
-        else:
-            h_list = h.split()
-            r_list = r.split()
-
-        # To get rid of the issue that jiwer does not allow empty string
-        if len(r_list) == 0:
-            if len(h_list) != 0:
-                errors = len(h_list)
-                ops_count['insertions'] += errors
-            else:
-                errors = 0
-        else:
+    if batched:
+        for ops in edit_ops_iter(hypotheses, references, use_cer=use_cer, num_workers=num_workers):
+            scores += int(ops[:, 0].sum())
+            words += int(ops[:, 3].sum())
+            ops_count['insertions'] += int(ops[:, 1].sum())
+            ops_count['deletions'] += int(ops[:, 2].sum())
+            ops_count['substitutions'] += int((ops[:, 0] - ops[:, 1] - ops[:, 2]).sum())
+    else:
+        for h, r in zip(hypotheses, references):
             if use_cer:
-                measures = jiwer.cer(r, h, return_dict=True)
+                h_list = list(h)
+                r_list = list(r)
             else:
-                measures = jiwer.compute_measures(r, h)
+                h_list = h.split()
+                r_list = r.split()
+
+            # To get rid of the issue that jiwer does not allow empty string
+            if len(r_list) == 0:
+                if len(h_list) != 0:
+                    errors = len(h_list)
+                    ops_count['insertions'] += errors
+                else:
+                    errors = 0
+            else:
+                if use_cer:
+                    measures = jiwer.cer(r, h, return_dict=True)
+                else:
+                    measures = jiwer.compute_measures(r, h)
 
-            errors = measures['insertions'] + measures['deletions'] + measures['substitutions']
-            ops_count['insertions'] += measures['insertions']
-            ops_count['deletions'] += measures['deletions']
-            ops_count['substitutions'] += measures['substitutions']
+                errors = measures['insertions'] + measures['deletions'] + measures['substitutions']
+                ops_count['insertions'] += measures['insertions']
+                ops_count['deletions'] += measures['deletions']
+                ops_count['substitutions'] += measures['substitutions']
 
-        scores += errors
-        words += len(r_list)
+            scores += errors
+            words += len(r_list)
 
     if words != 0:
         wer = 1.0 * scores / words
@@ -145,7 +299,9 @@ def word_error_rate_detail(
     return wer, words, ins_rate, del_rate, sub_rate
 
 
-def word_error_rate_per_utt(hypotheses: List[str], references: List[str], use_cer=False) -> Tuple[List[float], float]:
+def word_error_rate_per_utt(
+    hypotheses: List[str], references: List[str], use_cer=False, batched=False, num_workers=0
+) -> Tuple[List[float], float]:
     """
     Computes Word Error Rate per utterance and the average WER
     between two texts represented as corresponding lists of string.
@@ -156,6 +312,8 @@ def word_error_rate_per_utt(hypotheses: List[str], references: List[str], use_ce
         hypotheses (list): list of hypotheses
         references(list) : list of references
         use_cer (bool): set True to enable cer
+        batched (bool): set True to use the batched edit distance engine, see ``edit_ops_iter``
+        num_workers (int): number of worker processes of the batched engine
 
     Returns:
         wer_per_utt (List[float]): word error rate per utterance
@@ -172,32 +330,42 @@ def word_error_rate_per_utt(hypotheses: List[str], references: List[str], use_ce
             "{0} and {1} correspondingly".format(len(hypotheses), len(references))
         )
 
-    for h, r in zip(hypotheses, references):
-        if use_cer:
-            h_list = list(h)
-            r_list = list(r)
-        else:
-            h_list = h.split()
-            r_list = r.split()
-
-        # To get rid of the issue that jiwer does not allow empty string
-        if len(r_list) == 0:
-            if len(h_list) != 0:
-                errors = len(h_list)
-                wer_per_utt.append(float('inf'))
-        else:
+    if batched:
+        for ops in edit_ops_iter(hypotheses, references, use_cer=use_cer, num_workers=num_workers):
+            for errors, _, _, ref_len in ops.tolist():
+                if ref_len == 0:
+                    wer_per_utt.append(float('inf') if errors != 0 else 0.0)
+                else:
+                    wer_per_utt.append(errors / ref_len)
+                scores += errors
+                words += ref_len
+    else:
+        for h, r in zip(hypotheses, references):
             if use_cer:
-                measures = jiwer.cer(r, h, return_dict=True)
-                er = measures['cer']
+                h_list = list(h)
+                r_list = list(r)
+            else:
+                h_list = h.split()
+                r_list = r.split()
+
+            # To get rid of the issue that jiwer does not allow empty string
+            if len(r_list) == 0:
+                if len(h_list) != 0:
+                    errors = len(h_list)
+                    wer_per_utt.append(float('inf'))
             else:
-                measures = jiwer.compute_measures(r, h)
-                er = measures['wer']
+                if use_cer:
+                    measures = jiwer.cer(r, h, return_dict=True)
+                    er = measures['cer']
+                else:
+                    measures = jiwer.compute_measures(r, h)
+                    er = measures['wer']
 
-            errors = measures['insertions'] + measures['deletions'] + measures['substitutions']
-            wer_per_utt.append(er)
+                errors = measures['insertions'] + measures['deletions'] + measures['substitutions']
+                wer_per_utt.append(er)
 
-        scores += errors
-        words += len(r_list)
+            scores += errors
+            words += len(r_list)
 
     if words != 0:
         avg_wer = 1.0 * scores / words
@@ -237,6 +405,7 @@ class WER(Metric):
         use_cer: Whether to use Character Error Rate instead of Word Error Rate.
         log_prediction: Whether to log a single decoded sample per call.
         batch_dim_index: Index corresponding to batch dimension. (For RNNT.)
+        batched: Whether to compute edit distances of a batch at once with the batched engine, see ``edit_ops_iter``.
         dist_dync_on_step: Whether to perform reduction on forward pass of metric.
 
     Returns:
@@ -255,6 +424,7 @@ class WER(Metric):
         batch_dim_index=0,
         dist_sync_on_step=False,
         sync_on_compute=True,
+        batched=False,
     ):
         super().__init__(dist_sync_on_step=dist_sync_on_step, sync_on_compute=sync_on_compute)
 
@@ -263,6 +433,7 @@ class WER(Metric):
         self.log_prediction = log_prediction
         self.fold_consecutive = fold_consecutive
         self.batch_dim_index = batch_dim_index
+        self.batched = batched
 
         self.decode = None
         if isinstance(self.decoding, AbstractRNNTDecoding):
@@ -330,16 +501,21 @@ class WER(Metric):
             logging.info(f"reference:{references[0]}")
             logging.info(f"predicted:{hypotheses[0]}")
 
-        for h, r in zip(hypotheses, references):
-            if self.use_cer:
-                h_list = list(h)
-                r_list = list(r)
-            else:
-                h_list = h.split()
-                r_list = r.split()
-            words += len(r_list)
-            # Compute Levenstein's distance
-            scores += editdistance.eval(h_list, r_list)
+        if self.batched:
+            for ops in edit_ops_iter(hypotheses, references, use_cer=self.use_cer):
+                scores += int(ops[:, 0].sum())
+                words += int(ops[:, 3].sum())
+        else:
+            for h, r in zip(hypotheses, references):
+                if self.use_cer:
+                    h_list = list(h)
+                    r_list = list(r)
+                else:
+                    h_list = h.split()
+                    r_list = r.split()
+                words += len(r_list)
+                # Compute Levenstein's distance
+                scores += editdistance.eval(h_list, r_list)
 
         self.scores = torch.tensor(scores, device=self.scores.device, dtype=self.scores.dtype)
         self.words = torch.tensor(words, device=self.words.device, dtype=self.words.dtype)
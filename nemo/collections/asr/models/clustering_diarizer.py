@@ -19,32 +19,41 @@ import shutil
 import tarfile
 import tempfile
 from copy import deepcopy
-from typing import Any, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 import torch
 from lightning.pytorch.utilities import rank_zero_only
 from omegaconf import DictConfig, OmegaConf
 from tqdm import tqdm
 
+from nemo.collections.asr.data.audio_to_label import repeat_signal
 from nemo.collections.asr.metrics.der import score_labels
 from nemo.collections.asr.models.classification_models import EncDecClassificationModel
 from nemo.collections.asr.models.label_models import EncDecSpeakerLabelModel
 from nemo.collections.asr.parts.mixins.mixins import DiarizationMixin
+from nemo.collections.asr.parts.preprocessing.segment import AudioSegment
 from nemo.collections.asr.parts.utils.speaker_utils import (
     audio_rttm_map,
     get_embs_and_timestamps,
+    get_multiscale_subsegments,
+    get_speech_segments,
     get_uniqname_from_filepath,
+    get_vad_out_from_rttm_line,
     parse_scale_configs,
     perform_clustering,
+    read_rttm_lines,
     segments_manifest_to_subsegments_manifest,
     validate_vad_manifest,
     write_rttm2manifest,
 )
 from nemo.collections.asr.parts.utils.vad_utils import (
     generate_overlap_vad_seq,
+    generate_overlap_vad_seq_from_tensors,
     generate_vad_segment_table,
+    generate_vad_segment_table_from_tensors,
     get_vad_stream_status,
     prepare_manifest,
+    write_vad_segment_table,
 )
 from nemo.core.classes import Model
 from nemo.utils import logging, model_utils
@@ -80,6 +89,7 @@ class ClusteringDiarizer(torch.nn.Module, Model, DiarizationMixin):
 
         # Diarizer set up
         self._diarizer_params = self._cfg.diarizer
+        self._in_memory = self._diarizer_params.get('in_memory', False)
 
         # init vad model
         self.has_vad_model = False
@@ -189,6 +199,8 @@ class ClusteringDiarizer(torch.nn.Module, Model, DiarizationMixin):
         Run voice activity detection.
         Get log probability of voice activity detection and smoothes using the post processing parameters.
         Using generated frame level predictions generated manifest file for later speaker embedding extraction.
+        With `diarizer.vad.in_memory`, frame level predictions are kept in memory as tensors and only
+        the speech segment tables are written to disk.
         input:
         manifest_file (str) : Manifest file containing path to audio file and label as infer
 
@@ -197,6 +209,9 @@ class ClusteringDiarizer(torch.nn.Module, Model, DiarizationMixin):
         shutil.rmtree(self._vad_dir, ignore_errors=True)
         os.makedirs(self._vad_dir)
 
+        in_memory = self._in_memory or self._diarizer_params.vad.get('in_memory', False)
+        frames = {}
+
         self._vad_model.eval()
 
         time_unit = int(self._vad_window_length_in_sec / self._vad_shift_length_in_sec)
@@ -226,14 +241,78 @@ class ClusteringDiarizer(torch.nn.Module, Model, DiarizationMixin):
                 else:
                     to_save = pred
                 all_len += len(to_save)
-                outpath = os.path.join(self._vad_dir, data[i] + ".frame")
-                with open(outpath, "a", encoding='utf-8') as fout:
-                    for f in range(len(to_save)):
-                        fout.write('{0:0.4f}\n'.format(to_save[f]))
+                if in_memory:
+                    frames.setdefault(data[i], []).append(to_save.float().cpu())
+                else:
+                    outpath = os.path.join(self._vad_dir, data[i] + ".frame")
+                    with open(outpath, "a", encoding='utf-8') as fout:
+                        for f in range(len(to_save)):
+                            fout.write('{0:0.4f}\n'.format(to_save[f]))
             del test_batch
             if status[i] == 'end' or status[i] == 'single':
                 all_len = 0
 
+        if in_memory:
+            frames = {name: torch.cat(chunks) for name, chunks in frames.items()}
+            table_out_dir = self._run_vad_postprocessing_in_memory(frames)
+        else:
+            table_out_dir = self._run_vad_postprocessing()
+
+        if self._in_memory:
+            # Speech segments are passed to the segmentation stage in memory, see `_get_speech_segments`
+            return
+
+        AUDIO_VAD_RTTM_MAP = {}
+        for key in self.AUDIO_RTTM_MAP:
+            if os.path.exists(os.path.join(table_out_dir, key + ".txt")):
+                AUDIO_VAD_RTTM_MAP[key] = deepcopy(self.AUDIO_RTTM_MAP[key])
+                AUDIO_VAD_RTTM_MAP[key]['rttm_filepath'] = os.path.join(table_out_dir, key + ".txt")
+            else:
+                logging.warning(f"no vad file found for {key} due to zero or negative duration")
+
+        write_rttm2manifest(AUDIO_VAD_RTTM_MAP, self._vad_out_file)
+        self._speaker_manifest_path = self._vad_out_file
+
+    def _run_vad_postprocessing_in_memory(self, frames):
+        """
+        Smooths frame level predictions kept in memory and writes the resulting speech segment tables.
+        input:
+        frames (dict) : Mapping from session name to its tensor of frame level predictions
+
+        returns:
+        table_out_dir (str) : Directory of the speech segment tables
+        """
+        if not self._vad_params.smoothing:
+            frame_length_in_sec = self._vad_shift_length_in_sec
+        else:
+            logging.info("Generating predictions with overlapping input segments")
+            frames = generate_overlap_vad_seq_from_tensors(
+                frames,
+                smoothing_method=self._vad_params.smoothing,
+                overlap=self._vad_params.overlap,
+                window_length_in_sec=self._vad_window_length_in_sec,
+                shift_length_in_sec=self._vad_shift_length_in_sec,
+            )
+            frame_length_in_sec = 0.01
+        self.vad_frame_preds = frames
+
+        logging.info("Converting frame level prediction to speech/no-speech segment in start and end times format.")
+
+        vad_params = self._vad_params if isinstance(self._vad_params, (DictConfig, dict)) else self._vad_params.dict()
+        self.vad_speech_segments = generate_vad_segment_table_from_tensors(
+            frames, postprocessing_params=vad_params, frame_length_in_sec=frame_length_in_sec
+        )
+        for name, segments in self.vad_speech_segments.items():
+            write_vad_segment_table(segments, name, self._vad_dir)
+        return self._vad_dir
+
+    def _run_vad_postprocessing(self):
+        """
+        Smooths frame level predictions written in `.frame` files and writes the resulting speech segment tables.
+
+        returns:
+        table_out_dir (str) : Directory of the speech segment tables
+        """
         if not self._vad_params.smoothing:
             # Shift the window by 10ms to generate the frame and use the prediction of the window to represent the label for the frame;
             self.vad_pred_dir = self._vad_dir
@@ -263,17 +342,7 @@ class ClusteringDiarizer(torch.nn.Module, Model, DiarizationMixin):
             num_workers=self._cfg.num_workers,
             out_dir=self._vad_dir,
         )
-
-        AUDIO_VAD_RTTM_MAP = {}
-        for key in self.AUDIO_RTTM_MAP:
-            if os.path.exists(os.path.join(table_out_dir, key + ".txt")):
-                AUDIO_VAD_RTTM_MAP[key] = deepcopy(self.AUDIO_RTTM_MAP[key])
-                AUDIO_VAD_RTTM_MAP[key]['rttm_filepath'] = os.path.join(table_out_dir, key + ".txt")
-            else:
-                logging.warning(f"no vad file found for {key} due to zero or negative duration")
-
-        write_rttm2manifest(AUDIO_VAD_RTTM_MAP, self._vad_out_file)
-        self._speaker_manifest_path = self._vad_out_file
+        return table_out_dir
 
     def _run_segmentation(self, window: float, shift: float, scale_tag: str = ''):
 
@@ -321,13 +390,58 @@ class ClusteringDiarizer(torch.nn.Module, Model, DiarizationMixin):
         elif self._diarizer_params.vad.external_vad_manifest is not None:
             self._speaker_manifest_path = self._diarizer_params.vad.external_vad_manifest
         elif self._diarizer_params.oracle_vad:
-            self._speaker_manifest_path = os.path.join(self._speaker_dir, 'oracle_vad_manifest.json')
-            self._speaker_manifest_path = write_rttm2manifest(self.AUDIO_RTTM_MAP, self._speaker_manifest_path)
+            if not self._in_memory:
+                self._speaker_manifest_path = os.path.join(self._speaker_dir, 'oracle_vad_manifest.json')
+                self._speaker_manifest_path = write_rttm2manifest(self.AUDIO_RTTM_MAP, self._speaker_manifest_path)
         else:
             raise ValueError(
                 "Only one of diarizer.oracle_vad, vad.model_path or vad.external_vad_manifest must be passed from config"
             )
-        validate_vad_manifest(self.AUDIO_RTTM_MAP, vad_manifest=self._speaker_manifest_path)
+
+        if self._in_memory:
+            self.speech_segments = self._get_speech_segments()
+            for uniq_id in set(self.AUDIO_RTTM_MAP.keys()) - set(self.speech_segments.keys()):
+                del self.AUDIO_RTTM_MAP[uniq_id]
+                logging.warning(
+                    f"{uniq_id} is ignored since the file does not contain any speech signal to be processed."
+                )
+            if len(self.AUDIO_RTTM_MAP) == 0:
+                raise ValueError("All files present in manifest contains silence, aborting next steps")
+        else:
+            validate_vad_manifest(self.AUDIO_RTTM_MAP, vad_manifest=self._speaker_manifest_path)
+
+    def _get_speech_segments(self) -> Dict[str, torch.Tensor]:
+        """
+        Collects the speech segments found by speech activity detection without going through a manifest file.
+
+        Returns:
+            speech_segments (dict): Dictionary containing a (num_segments, 2) tensor holding the offset and
+                duration of each speech segment, indexed by unique file id.
+        """
+        if not self.has_vad_model and self._diarizer_params.vad.external_vad_manifest is not None:
+            # External VAD manifest, which is used as is
+            speech_segments = {}
+            with open(self._speaker_manifest_path, 'r', encoding='utf-8') as manifest:
+                for line in manifest:
+                    dic = json.loads(line.strip())
+                    uniq_id = dic.get('uniq_id') or get_uniqname_from_filepath(dic['audio_filepath'])
+                    if uniq_id in self.AUDIO_RTTM_MAP and dic['duration'] > 0:
+                        speech_segments.setdefault(uniq_id, []).append([dic['offset'], dic['duration']])
+            return {uniq_id: torch.tensor(segs, dtype=torch.float64) for uniq_id, segs in speech_segments.items()}
+
+        vad_start_end_lists = {}
+        for uniq_id, meta in self.AUDIO_RTTM_MAP.items():
+            if self.has_vad_model:
+                if uniq_id not in self.vad_speech_segments:
+                    logging.warning(f"no vad file found for {uniq_id} due to zero or negative duration")
+                    continue
+                # Same precision as the speech segment tables written by the file based pipeline
+                segments = self.vad_speech_segments[uniq_id].tolist()
+                vad_out = [(round(segment[0], 4), round(segment[2], 4)) for segment in segments]
+            else:
+                vad_out = [get_vad_out_from_rttm_line(line) for line in read_rttm_lines(meta['rttm_filepath'])]
+            vad_start_end_lists[uniq_id] = [[start, start + dur] for start, dur in vad_out]
+        return get_speech_segments(self.AUDIO_RTTM_MAP, vad_start_end_lists)
 
     def _extract_embeddings(self, manifest_file: str, scale_idx: int, num_scales: int):
         """
@@ -382,6 +496,79 @@ class ClusteringDiarizer(torch.nn.Module, Model, DiarizationMixin):
             pkl.dump(self.embeddings, open(self._embeddings_file, 'wb'))
             logging.info("Saved embedding files to {}".format(embedding_dir))
 
+    def _extract_embeddings_in_memory(self, multiscale_subsegments: Dict[int, Dict[str, torch.Tensor]]):
+        """
+        In-memory version of `_extract_embeddings`, which extracts the embeddings of all scales in one pass over the
+        sessions. The audio of each session is read once and sliced into subsegments, which are batched per scale.
+        Embeddings are saved to disk only if `save_embeddings` is set.
+
+        Args:
+            multiscale_subsegments (dict): Start and duration of the subsegments of each session for each scale,
+                see `get_multiscale_subsegments`.
+        """
+        logging.info("Extracting embeddings for Diarization")
+        self._speaker_model.eval()
+        sample_rate = self._cfg.sample_rate
+        batch_size = self._cfg.get('batch_size') or 1
+        scale_ids = sorted(multiscale_subsegments.keys())
+        embeddings = {scale_idx: {} for scale_idx in scale_ids}
+        time_stamps = {scale_idx: {} for scale_idx in scale_ids}
+        batches = {scale_idx: [] for scale_idx in scale_ids}
+
+        def extract_batch(scale_idx):
+            uniq_ids, signals = zip(*batches[scale_idx])
+            batches[scale_idx] = []
+            # Same as `fixed_seq_collate_fn` of the speaker label datasets: short signals are repeated
+            fixed_length = max(signal.shape[0] for signal in signals)
+            audio_signal = torch.stack(
+                [repeat_signal(signal, signal.shape[0], fixed_length) for signal in signals]
+            ).to(self._speaker_model.device)
+            audio_signal_len = torch.full((len(signals),), fixed_length, device=self._speaker_model.device)
+            with torch.no_grad(), torch.amp.autocast(self._speaker_model.device.type):
+                _, embs = self._speaker_model.forward(input_signal=audio_signal, input_signal_length=audio_signal_len)
+            embs = embs.view(-1, embs.shape[-1]).float().cpu()
+            for uniq_id, emb in zip(uniq_ids, embs):
+                embeddings[scale_idx][uniq_id].append(emb)
+
+        uniq_ids = [
+            uniq_id
+            for uniq_id in self.AUDIO_RTTM_MAP
+            if any(uniq_id in multiscale_subsegments[scale_idx] for scale_idx in scale_ids)
+        ]
+        for uniq_id in tqdm(uniq_ids, desc='extract embeddings', leave=True, disable=not self.verbose):
+            audio_filepath = self.AUDIO_RTTM_MAP[uniq_id]['audio_filepath']
+            audio = torch.from_numpy(AudioSegment.from_file(audio_filepath, target_sr=sample_rate).samples)
+            for scale_idx in scale_ids:
+                embeddings[scale_idx][uniq_id] = []
+                time_stamps[scale_idx][uniq_id] = []
+                subsegments = multiscale_subsegments[scale_idx].get(uniq_id, torch.empty(0, 2))
+                for start, duration in subsegments.tolist():
+                    start_idx = int(start * sample_rate)
+                    signal = audio[start_idx : start_idx + int(duration * sample_rate)].clone()
+                    time_stamps[scale_idx][uniq_id].append([start, start + duration])
+                    batches[scale_idx].append((uniq_id, signal))
+                    if len(batches[scale_idx]) == batch_size:
+                        extract_batch(scale_idx)
+            del audio
+
+        for scale_idx in scale_ids:
+            if batches[scale_idx]:
+                extract_batch(scale_idx)
+            embeddings[scale_idx] = {
+                uniq_id: torch.stack(embs) for uniq_id, embs in embeddings[scale_idx].items() if len(embs) > 0
+            }
+            time_stamps[scale_idx] = {uniq_id: ts for uniq_id, ts in time_stamps[scale_idx].items() if len(ts) > 0}
+            self.multiscale_embeddings_and_timestamps[scale_idx] = [embeddings[scale_idx], time_stamps[scale_idx]]
+
+        if self._speaker_params.save_embeddings:
+            embedding_dir = os.path.join(self._speaker_dir, 'embeddings')
+            os.makedirs(embedding_dir, exist_ok=True)
+            for scale_idx in scale_ids:
+                self._embeddings_file = os.path.join(embedding_dir, f'subsegments_scale{scale_idx}_embeddings.pkl')
+                with open(self._embeddings_file, 'wb') as f:
+                    pkl.dump(embeddings[scale_idx], f)
+            logging.info("Saved embedding files to {}".format(embedding_dir))
+
     def diarize(self, paths2audio_files: List[str] = None, batch_size: int = 0):
         """
         Diarize files provided through paths2audio_files or manifest file
@@ -425,15 +612,22 @@ class ClusteringDiarizer(torch.nn.Module, Model, DiarizationMixin):
 
         # Segmentation
         scales = self.multiscale_args_dict['scale_dict'].items()
-        for scale_idx, (window, shift) in scales:
+        if self._in_memory:
+            # Segmentation and embedding extraction for all scales, without intermediate manifests
+            multiscale_subsegments = get_multiscale_subsegments(
+                self.speech_segments, self.multiscale_args_dict['scale_dict']
+            )
+            self._extract_embeddings_in_memory(multiscale_subsegments)
+        else:
+            for scale_idx, (window, shift) in scales:
 
-            # Segmentation for the current scale (scale_idx)
-            self._run_segmentation(window, shift, scale_tag=f'_scale{scale_idx}')
+                # Segmentation for the current scale (scale_idx)
+                self._run_segmentation(window, shift, scale_tag=f'_scale{scale_idx}')
 
-            # Embedding Extraction for the current scale (scale_idx)
-            self._extract_embeddings(self.subsegments_manifest_path, scale_idx, len(scales))
+                # Embedding Extraction for the current scale (scale_idx)
+                self._extract_embeddings(self.subsegments_manifest_path, scale_idx, len(scales))
 
-            self.multiscale_embeddings_and_timestamps[scale_idx] = [self.embeddings, self.time_stamps]
+                self.multiscale_embeddings_and_timestamps[scale_idx] = [self.embeddings, self.time_stamps]
 
         embs_and_timestamps = get_embs_and_timestamps(
             self.multiscale_embeddings_and_timestamps, self.multiscale_args_dict
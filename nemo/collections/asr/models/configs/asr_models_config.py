@@ -39,6 +39,7 @@ class ASRDatasetConfig(nemo.core.classes.dataset.DatasetConfig):
     tarred_audio_filepaths: Optional[Any] = None
     tarred_shard_strategy: str = "scatter"
     shard_manifests: bool = False
+    lazy_shard_manifests: bool = False
     shuffle_n: int = 0
 
     # lhotse support
@@ -102,6 +102,8 @@ class VADParams(DiarizerComponentConfig):
 class VADConfig(DiarizerComponentConfig):
     model_path: str = "vad_multilingual_marblenet"  # .nemo local model path or pretrained VAD model name
     external_vad_manifest: Optional[str] = None
+    # keep frame level VAD predictions in memory instead of writing one `.frame` file per session
+    in_memory: bool = False
     parameters: VADParams = field(default_factory=lambda: VADParams())
 
 
@@ -138,6 +140,10 @@ class ClusteringParams(DiarizerComponentConfig):
     sparse_search_volume: int = 30
     # If True, take a majority vote on multiple p-values to estimate the number of speakers.
     maj_vote_spk_count: bool = False
+    # Sessions with more base-scale segments than this use a sparse kNN graph and partial eigensolves. -1 disables it.
+    sparse_affinity_thres: int = -1
+    # Number of short sessions clustered together with batched NME analysis and eigendecomposition.
+    sessions_per_batch: int = 1
 
 
 @dataclass
@@ -176,6 +182,8 @@ class DiarizerConfig(DiarizerComponentConfig):
     oracle_vad: bool = False  # If True, uses RTTM files provided in the manifest file to get VAD timestamps
     collar: float = 0.25  # Collar value for scoring
     ignore_overlap: bool = True  # Consider or ignore overlap segments while scoring
+    # pass speech segments, subsegments and embeddings between stages in memory instead of through manifest files
+    in_memory: bool = False
     vad: VADConfig = field(default_factory=lambda: VADConfig())
     speaker_embeddings: SpeakerEmbeddingsConfig = field(default_factory=lambda: SpeakerEmbeddingsConfig())
     clustering: ClusteringConfig = field(default_factory=lambda: ClusteringConfig())
@@ -396,6 +396,11 @@ class StatelessTransducerDecoder(rnnt_abstract.AbstractRNNTDecoder, Exportable):
         """Replace states in dst_states with states from src_states"""
         dst_states[0].copy_(src_states[0])
 
+    @classmethod
+    def batch_gather_states(cls, states: list[torch.Tensor], indices: torch.Tensor) -> list[torch.Tensor]:
+        """Select states for the given batch indices"""
+        return [states[0][indices]]
+
     def batch_split_states(self, batch_states: list[torch.Tensor]) -> list[list[torch.Tensor]]:
         """
         Split states into a list of states.
@@ -1075,6 +1080,13 @@ class RNNTDecoder(rnnt_abstract.AbstractRNNTDecoder, Exportable, AdapterModuleMi
         dst_states[0].copy_(src_states[0])
         dst_states[1].copy_(src_states[1])
 
+    @classmethod
+    def batch_gather_states(
+        cls, states: Tuple[torch.Tensor, torch.Tensor], indices: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Select states for the given batch indices"""
+        return states[0][:, indices], states[1][:, indices]
+
     def batch_split_states(
         self, batch_states: Tuple[torch.Tensor, torch.Tensor]
     ) -> list[Tuple[torch.Tensor, torch.Tensor]]:
@@ -294,6 +294,14 @@ class AbstractRNNTDecoder(NeuralModule, ABC):
         """Replace states in dst_states with states from src_states"""
         raise NotImplementedError()
 
+    @classmethod
+    def batch_gather_states(cls, states: list[torch.Tensor], indices: torch.Tensor) -> list[torch.Tensor]:
+        """
+        Select states for the given batch indices (same as `states[indices]` for each of the state tensors).
+        Useful for reordering the states of the hypotheses in batched beam search.
+        """
+        raise NotImplementedError()
+
     def batch_split_states(self, batch_states: list[torch.Tensor]) -> list[list[torch.Tensor]]:
         """
         Split states into a list of states.
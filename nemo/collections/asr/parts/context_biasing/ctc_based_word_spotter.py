@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Union
 
 import numpy as np
 
@@ -56,6 +56,59 @@ class WSHyp:
     end_frame: int
 
 
+@dataclass
+class FlatContextGraphCTC:
+    """
+    Context-Biasing graph flattened to transition arrays for the batched word spotter.
+    Transitions are sorted by source state, so that transitions of state s are
+    trans_token[state_offsets[s]:state_offsets[s + 1]] and trans_next[state_offsets[s]:state_offsets[s + 1]].
+
+    Args:
+        state_offsets: offsets of the transitions of each state [num_states + 1]
+        trans_token: token id of each transition [num_transitions]
+        trans_next: next state of each transition [num_transitions]
+        is_end: whether each state is the end of a word [num_states]
+        is_last: whether each state is the last one of its branch, i.e. it has only a self-loop [num_states]
+        words: word of each end state (None for the other states)
+    """
+
+    state_offsets: np.ndarray
+    trans_token: np.ndarray
+    trans_next: np.ndarray
+    is_end: np.ndarray
+    is_last: np.ndarray
+    words: List[Optional[str]]
+
+    @classmethod
+    def from_context_graph(cls, context_graph: ContextGraphCTC) -> 'FlatContextGraphCTC':
+        """
+        Flattens the ContextGraphCTC. The root state is always state 0.
+        """
+        states = [context_graph.root]
+        state_ids = {id(context_graph.root): 0}
+        for state in states:
+            for next_state in state.next.values():
+                if id(next_state) not in state_ids:
+                    state_ids[id(next_state)] = len(states)
+                    states.append(next_state)
+
+        num_transitions = np.array([len(state.next) for state in states], dtype=np.int64)
+        state_offsets = np.zeros(len(states) + 1, dtype=np.int64)
+        np.cumsum(num_transitions, out=state_offsets[1:])
+        trans_token = np.array([int(token) for state in states for token in state.next], dtype=np.int64)
+        trans_next = np.array(
+            [state_ids[id(next_state)] for state in states for next_state in state.next.values()], dtype=np.int64
+        )
+        return cls(
+            state_offsets=state_offsets,
+            trans_token=trans_token,
+            trans_next=trans_next,
+            is_end=np.array([state.is_end for state in states], dtype=bool),
+            is_last=num_transitions == 1,
+            words=[state.word for state in states],
+        )
+
+
 def beam_pruning(next_tokens: List[Token], beam_threshold: float) -> List[Token]:
     """ 
     Prun all tokens whose score is worse than best_token.score - beam_threshold
@@ -74,6 +127,54 @@ def beam_pruning(next_tokens: List[Token], beam_threshold: float) -> List[Token]
     return next_tokens
 
 
+def running_beam_pruning(
+    token_file: np.ndarray, token_score: np.ndarray, is_reset: np.ndarray, beam_threshold: float
+) -> np.ndarray:
+    """
+    Array version of the running beam pruning of run_word_spotter for the new tokens of several files.
+    Each token is pruned if its score is worse than the running best score of the preceding tokens
+    of its file - beam_threshold. A token with is_reset (or a zero score) that becomes the running best
+    resets it, so that the next token of the file starts a new running best.
+
+    Args:
+        token_file: file index of each token, tokens of each file are in the order of their creation
+        token_score: score of each token
+        is_reset: whether each token resets the running best when it becomes it
+        beam_threshold: beam threshold
+
+    Returns:
+        mask of the tokens left after pruning
+    """
+    order = np.argsort(token_file, kind='stable')
+    file_ids = token_file[order]
+    # scores are replaced by their ranks to compute running maximums of all files at once exactly
+    scores, ranks = np.unique(token_score[order], return_inverse=True)
+    ranks = ranks.reshape(-1)
+    is_reset = is_reset[order] | (scores[ranks] == 0.0)
+    has_next = np.zeros(len(order), dtype=bool)
+    has_next[:-1] = file_ids[1:] == file_ids[:-1]
+    # the running best starts anew at the first token of each file and after each reset
+    is_start = np.ones(len(order), dtype=bool)
+    is_start[1:] = ~has_next[:-1]
+    while True:
+        offsets = np.cumsum(is_start) * len(scores)
+        running_best = np.maximum.accumulate(ranks + offsets) - offsets
+        is_best = is_start.copy()
+        is_best[1:] |= ranks[1:] > running_best[:-1]
+        # a reset can only make later running bests smaller, so resets are added until there are no new ones
+        new_start = np.zeros(len(order), dtype=bool)
+        new_start[1:] = (is_best & is_reset & has_next)[:-1] & ~is_start[1:]
+        if not new_start.any():
+            break
+        is_start |= new_start
+
+    keep = is_start.copy()
+    keep[1:] |= scores[ranks[1:]] >= scores[running_best[:-1]] - beam_threshold
+    mask = np.empty(len(order), dtype=bool)
+    mask[order] = keep
+    return mask
+
+
 def state_pruning(next_tokens: List[Token]) -> List[Token]:
     """
     If there are several tokens on the same state, then leave only the best of them according to score
@@ -363,3 +464,148 @@ def run_word_spotter(
     best_hyp_list = filter_wb_hyps(best_hyp_list, ctc_word_alignment)
 
     return best_hyp_list
+
+
+def run_word_spotter_batch(
+    logprobs: List[np.ndarray],
+    context_graph: Union[ContextGraphCTC, FlatContextGraphCTC],
+    asr_model,
+    blank_idx: int = 0,
+    beam_threshold: float = 5.0,
+    cb_weight: float = 3.0,
+    ctc_ali_token_weight: float = 0.5,
+    keyword_threshold: float = -5.0,
+    blank_threshold: float = 0.8,
+    non_blank_threshold: float = 0.001,
+) -> List[List[WSHyp]]:
+    """
+    Batched version of the CTC-based Word Spotter (see run_word_spotter) for a list of files.
+    The tokens of all files are stored in flat arrays, and the expansion of tokens along the graph transitions,
+    beam and state prunings are done with array operations at each frame for all files at once.
+    The running beam pruning follows the order of tokens of run_word_spotter, so results are the same.
+
+    Args:
+        logprobs: list of CTC logprobs for each file [Time, Vocab+blank]
+        context_graph: Context-Biasing graph, or its flattened version (to reuse it between calls)
+        asr_model: ASR model (ctc or hybrid-transducer-ctc)
+        blank_idx: blank index in ASR model
+        beam_threshold: threshold for beam pruning
+        cb_weight: context biasing weight
+        ctc_ali_token_weight: additional token weight for word-level ctc alignment
+        keyword_threshold: auxiliary weight for pruning final hypotheses
+        blank_threshold: blank threshold (probability) for preliminary hypotheses pruning
+        non_blank_threshold: non-blank threshold (probability) for preliminary hypotheses pruning
+
+    Returns:
+        final list of spotted hypotheses WSHyp for each file
+    """
+    if isinstance(context_graph, ContextGraphCTC):
+        context_graph = FlatContextGraphCTC.from_context_graph(context_graph)
+    graph = context_graph
+    if not logprobs:
+        return []
+
+    # move threshold probabilities to log space
+    blank_threshold = np.log(blank_threshold)
+    non_blank_threshold = np.log(non_blank_threshold)
+
+    num_files = len(logprobs)
+    lengths = np.array([logprob.shape[0] for logprob in logprobs], dtype=np.int64)
+    padded_logprobs = np.zeros((num_files, lengths.max(), logprobs[0].shape[1]), dtype=np.float64)
+    for idx, logprob in enumerate(logprobs):
+        padded_logprobs[idx, : logprob.shape[0]] = logprob
+
+    # active tokens of all files: file index, graph state, score and start frame
+    token_file = np.zeros(0, dtype=np.int64)
+    token_state = np.zeros(0, dtype=np.int64)
+    token_score = np.zeros(0, dtype=np.float64)
+    token_start = np.zeros(0, dtype=np.int64)
+    spotted_words = [[] for _ in range(num_files)]
+
+    for frame in range(lengths.max()):
+        frame_logprobs = padded_logprobs[:, frame]
+        # drop tokens of finished files
+        keep = lengths[token_file] > frame
+        token_file, token_state, token_score, token_start = (
+            token_file[keep],
+            token_state[keep],
+            token_score[keep],
+            token_start[keep],
+        )
+        # add an empty token (located in the graph root) at each new frame to start new word spotting,
+        # skipping it by the blank_threshold
+        root_files = np.flatnonzero((lengths > frame) & (frame_logprobs[:, blank_idx] <= blank_threshold))
+        token_file = np.concatenate([token_file, root_files])
+        token_state = np.concatenate([token_state, np.zeros_like(root_files)])
+        token_score = np.concatenate([token_score, np.zeros(len(root_files))])
+        token_start = np.concatenate([token_start, np.full_like(root_files, frame)])
+
+        # expand all tokens along all transitions of their states
+        num_trans = graph.state_offsets[token_state + 1] - graph.state_offsets[token_state]
+        src = np.repeat(np.arange(len(token_state)), num_trans)
+        first_trans = np.cumsum(num_trans) - num_trans
+        trans = graph.state_offsets[token_state][src] + np.arange(len(src)) - first_trans[src]
+        cand_file = token_file[src]
+        cand_state = graph.trans_next[trans]
+        cand_token = graph.trans_token[trans]
+        cand_logprob = frame_logprobs[cand_file, cand_token]
+        # add cb_weight only for non-blank tokens
+        cand_score = token_score[src] + cand_logprob + np.where(cand_token != blank_idx, cb_weight, 0.0)
+        cand_start = token_start[src]
+
+        # skip non-blank token by the non_blank_threshold if empty token
+        keep = (token_state[src] != 0) | (cand_logprob >= non_blank_threshold)
+        # running beam pruning, spotted tokens in the last state of the branch reset the running best
+        is_spotted = graph.is_end[cand_state] & (cand_score > keyword_threshold)
+        (keep_idx,) = np.nonzero(keep)
+        keep[keep_idx] = running_beam_pruning(
+            cand_file[keep_idx],
+            cand_score[keep_idx],
+            (is_spotted & graph.is_last[cand_state])[keep_idx],
+            beam_threshold,
+        )
+
+        # add a word as spotted if token reached the end of word state in context graph
+        spotted = keep & is_spotted
+        for idx in np.flatnonzero(spotted):
+            spotted_words[cand_file[idx]].append(
+                WSHyp(
+                    word=graph.words[cand_state[idx]],
+                    score=float(cand_score[idx]),
+                    start_frame=int(cand_start[idx]),
+                    end_frame=frame,
+                )
+            )
+        # spotted tokens in the last state of the branch (only one self-loop transition) are not needed anymore
+        keep &= ~(spotted & graph.is_last[cand_state])
+
+        # beam pruning
+        best_score = np.full(num_files, -np.inf)
+        np.maximum.at(best_score, cand_file[keep], cand_score[keep])
+        keep &= cand_score > best_score[cand_file] - beam_threshold
+
+        # state pruning: leave only the first best token of each state of each file
+        (keep_idx,) = np.nonzero(keep)
+        order = np.lexsort((keep_idx, -cand_score[keep_idx], cand_state[keep_idx], cand_file[keep_idx]))
+        keep_idx = keep_idx[order]
+        is_first = np.ones(len(keep_idx), dtype=bool)
+        is_first[1:] = (np.diff(cand_file[keep_idx]) != 0) | (np.diff(cand_state[keep_idx]) != 0)
+        keep_idx = np.sort(keep_idx[is_first])
+
+        token_file = cand_file[keep_idx]
+        token_state = cand_state[keep_idx]
+        token_score = cand_score[keep_idx]
+        token_start = cand_start[keep_idx]
+
+    best_hyp_lists = []
+    for logprob, file_spotted_words in zip(logprobs, spotted_words):
+        # find best hyps for spotted keywords (in case of hyps overlapping):
+        best_hyp_list = find_best_hyps(file_spotted_words)
+
+        # filter hyps according to word-level ctc alignment to avoid a high false accept rate
+        ctc_word_alignment = get_ctc_word_alignment(
+            logprob, asr_model, token_weight=ctc_ali_token_weight, blank_idx=blank_idx
+        )
+        best_hyp_lists.append(filter_wb_hyps(best_hyp_list, ctc_word_alignment))
+
+    return best_hyp_lists
@@ -12,18 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import contextlib
 import json
 import os
 import tempfile
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import partial
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
+import soundfile as sf
 import torch
 from omegaconf import DictConfig
-from torch.utils.data import DataLoader, Dataset
+from torch.utils.data import DataLoader, Dataset, IterableDataset
 from tqdm import tqdm
 
 from nemo.collections.asr.parts.preprocessing.perturb import process_augmentations
@@ -52,12 +56,21 @@ class InternalTranscribeConfig:
     temp_dir: Optional[str] = None
     manifest_filepath: Optional[str] = None
 
+    # Input indices in the order they are transcribed, if it differs from the input order
+    sample_order: Optional[List[int]] = None
+
 
 @dataclass
 class TranscribeConfig:
     batch_size: int = 4
+    # If set, batches are formed from inputs of similar durations instead of `batch_size` inputs,
+    # such that the padded duration of each batch stays under `batch_duration` seconds
+    batch_duration: Optional[float] = None
     return_hypotheses: bool = False
     num_workers: Optional[int] = None
+    # If > 0, model outputs are post-processed (decoded, detokenized) by this many threads while the model runs
+    # the forward pass of the next batch. With more than one thread, the model's decoding must be thread-safe.
+    decode_workers: int = 0
     channel_selector: ChannelSelectorType = None
     augmentor: Optional[DictConfig] = None
     timestamps: Optional[bool] = None  # returns timestamps for each word and segments if model supports punctuations
@@ -92,6 +105,53 @@ def get_value_from_transcription_config(trcfg, key, default):
         return default
 
 
+def get_duration_batches(durations: List[float], batch_duration: float) -> List[List[int]]:
+    """
+    Groups inputs of similar durations into batches, longest inputs first.
+
+    Args:
+        durations: The duration of every input, in seconds.
+        batch_duration: The maximum padded duration of a batch (number of inputs times the longest duration),
+            in seconds. Inputs longer than `batch_duration` are batched alone.
+
+    Returns:
+        A list of batches, each being a list of input indices.
+    """
+    batches, batch = [], []
+    for index in np.argsort(-np.asarray(durations, dtype=np.float64), kind='stable'):
+        # inputs are sorted by decreasing duration, so the first input of a batch is the longest
+        if len(batch) > 0 and (len(batch) + 1) * durations[batch[0]] > batch_duration:
+            batches.append(batch)
+            batch = []
+        batch.append(int(index))
+    if len(batch) > 0:
+        batches.append(batch)
+    return batches
+
+
+def restore_input_order(results: GenericTranscriptionType, sample_order: List[int]) -> GenericTranscriptionType:
+    """
+    Reorders transcription results collected in `sample_order` back to the input order.
+    Lists of results which don't hold one result per input are returned as is.
+    """
+
+    def reorder(values):
+        if not isinstance(values, list) or len(values) != len(sample_order):
+            return values
+        reordered = [None] * len(values)
+        for value, index in zip(values, sample_order):
+            reordered[index] = value
+        return reordered
+
+    if isinstance(results, dict):
+        return {key: reorder(values) for key, values in results.items()}
+    if isinstance(results, tuple):
+        return tuple(reorder(values) for values in results)
+    if isinstance(results, list) and len(results) > 0 and isinstance(results[0], list):
+        return [reorder(values) for values in results]
+    return reorder(results)
+
+
 class TranscriptionTensorDataset(Dataset):
     def __init__(self, config: Dict[str, Any]):
         super().__init__()
@@ -324,11 +384,18 @@ class TranscriptionMixin(ABC):
         except StopIteration:
             pass
 
+        # Batches formed by duration are transcribed out of order
+        if results is not None and transcribe_cfg._internal.sample_order is not None:
+            results = restore_input_order(results, transcribe_cfg._internal.sample_order)
+
         return results
 
     def transcribe_generator(self, audio, override_config: Optional[TranscribeConfig]):
         """
         A generator version of `transcribe` function.
+
+        With `batch_duration`, batches are yielded in order of decreasing duration, and
+        `override_config._internal.sample_order` holds the input indices in the order they are yielded.
         """
 
         if override_config is None:
@@ -352,6 +419,7 @@ class TranscriptionMixin(ABC):
                 )
 
         transcribe_cfg = override_config
+        transcribe_cfg._internal.sample_order = None
 
         try:
             # Initialize and assert the transcription environment
@@ -372,6 +440,11 @@ class TranscriptionMixin(ABC):
                 else:
                     verbose = True
 
+                decode_workers = get_value_from_transcription_config(transcribe_cfg, 'decode_workers', default=0)
+                if decode_workers:
+                    yield from self._transcribe_pipelined(dataloader, transcribe_cfg, decode_workers, verbose)
+                    return
+
                 for test_batch in tqdm(dataloader, desc="Transcribing", disable=not verbose):
                     # Move batch to device
                     test_batch = move_data_to_device(test_batch, transcribe_cfg._internal.device)
@@ -391,6 +464,50 @@ class TranscriptionMixin(ABC):
             # set mode back to its original value
             self._transcribe_on_end(transcribe_cfg)
 
+    def _transcribe_pipelined(self, dataloader: DataLoader, trcfg: TranscribeConfig, num_workers: int, verbose: bool):
+        """
+        Runs `_transcribe_output_processing` on a pool of `num_workers` threads, so that decoding of a batch
+        overlaps with the forward pass of the following batches. Outputs are yielded in the order of the batches.
+
+        Args:
+            dataloader: The DataLoader to transcribe.
+            trcfg: The transcription config dataclass.
+            num_workers: Number of decoding threads, which is also the number of batches decoded concurrently.
+            verbose: Whether to display a progress bar.
+        """
+        # Grad mode and the current CUDA device are thread-local, propagate them to the decoding threads
+        inference_mode = torch.is_inference_mode_enabled()
+        grad_enabled = torch.is_grad_enabled()
+        device = trcfg._internal.device
+
+        def output_processing(model_outputs):
+            device_context = torch.cuda.device(device) if device is not None and device.type == 'cuda' else None
+            with torch.inference_mode(inference_mode), torch.set_grad_enabled(grad_enabled):
+                with device_context or contextlib.nullcontext():
+                    return self._transcribe_output_processing(model_outputs, trcfg)
+
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            try:
+                for test_batch in tqdm(dataloader, desc="Transcribing", disable=not verbose):
+                    test_batch = move_data_to_device(test_batch, trcfg._internal.device)
+                    model_outputs = self._transcribe_forward(test_batch, trcfg)
+                    del test_batch
+
+                    pending.append(executor.submit(output_processing, model_outputs))
+                    del model_outputs
+
+                    # Bound the number of batches held in memory while waiting for decoding
+                    while len(pending) > num_workers:
+                        yield pending.popleft().result()
+
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                # The generator was closed early or an error was raised, drop batches not yet decoded
+                for future in pending:
+                    future.cancel()
+
     """
     Transcribe Execution Flow
     """
@@ -481,6 +598,9 @@ class TranscriptionMixin(ABC):
             ds_config = self._transcribe_input_manifest_processing(audio_files, tmp_dir, trcfg)
 
             temp_dataloader = self._setup_transcribe_dataloader(ds_config)
+            if get_value_from_transcription_config(trcfg, 'batch_duration', None) is not None:
+                durations = self._transcribe_audio_durations(audio_files, trcfg)
+                temp_dataloader = self._setup_transcribe_duration_batching(temp_dataloader, durations, trcfg)
             return temp_dataloader
 
         # Check if audio is a list of numpy or torch tensors
@@ -498,6 +618,9 @@ class TranscriptionMixin(ABC):
             ds_config = self._transcribe_input_tensor_processing(audio_tensors, tmp_dir, trcfg)
 
             temp_dataloader = self._setup_transcribe_tensor_dataloader(ds_config, trcfg)
+            if get_value_from_transcription_config(trcfg, 'batch_duration', None) is not None:
+                durations = [audio_tensor.shape[0] / ds_config['sample_rate'] for audio_tensor in audio_tensors]
+                temp_dataloader = self._setup_transcribe_duration_batching(temp_dataloader, durations, trcfg)
             return temp_dataloader
 
         else:
@@ -550,6 +673,79 @@ class TranscriptionMixin(ABC):
 
         return ds_config
 
+    def _transcribe_audio_durations(
+        self, audio_files: List[Union[str, Dict[str, Any]]], trcfg: TranscribeConfig
+    ) -> Optional[List[float]]:
+        """
+        Internal function to get the duration of the input audio files for duration-aware batching.
+        Durations are taken from the manifest entries when available, otherwise read from the audio file headers.
+
+        Args:
+            audio_files: A list of string filepaths for audio files, or of manifest entries.
+            trcfg: The transcription config dataclass. Subclasses can change this to a different dataclass if needed.
+
+        Returns:
+            The duration of every audio file in seconds, or None if some durations could not be determined.
+        """
+        manifest_dir = None
+        if trcfg._internal.manifest_filepath is not None:
+            manifest_dir = os.path.dirname(trcfg._internal.manifest_filepath)
+
+        def get_duration(audio_file):
+            if isinstance(audio_file, dict):
+                if audio_file.get('duration') is not None:
+                    return float(audio_file['duration'])
+                audio_file = audio_file['audio_filepath']
+            if manifest_dir is not None and not os.path.isabs(audio_file):
+                audio_file = os.path.join(manifest_dir, audio_file)
+            return sf.info(audio_file).duration
+
+        try:
+            # header reads are I/O bound, which threads overlap well on network file systems
+            with ThreadPoolExecutor(max_workers=min(len(audio_files), 16)) as executor:
+                return list(executor.map(get_duration, audio_files))
+        except (RuntimeError, OSError, KeyError, TypeError, ValueError) as e:
+            logging.warning(f"Could not determine the duration of the input audio files: {e}")
+            return None
+
+    def _setup_transcribe_duration_batching(
+        self, dataloader: DataLoader, durations: Optional[List[float]], trcfg: TranscribeConfig
+    ) -> DataLoader:
+        """
+        Internal function to replace the fixed size batches of a transcription dataloader by batches of inputs of
+        similar durations (see `get_duration_batches`), in order to reduce padding.
+        The transcription order is stored in `trcfg._internal.sample_order` to restore the input order of results.
+
+        Args:
+            dataloader: The dataloader returned by `_setup_transcribe_dataloader()` or
+                `_setup_transcribe_tensor_dataloader()`, over a map-style dataset with one item per input.
+            durations: The duration of every input in seconds.
+            trcfg: The transcription config dataclass. Subclasses can change this to a different dataclass if needed.
+
+        Returns:
+            A DataLoader object which batches the same dataset by duration, or `dataloader` if it can't be rebatched.
+        """
+        dataset = dataloader.dataset
+        if (
+            durations is None
+            or isinstance(dataset, IterableDataset)
+            or not hasattr(dataset, '__len__')
+            or len(dataset) != len(durations)
+        ):
+            logging.warning("Duration-aware batching is not supported for this input, using `batch_size` instead.")
+            return dataloader
+
+        batches = get_duration_batches(durations, get_value_from_transcription_config(trcfg, 'batch_duration', None))
+        trcfg._internal.sample_order = [index for batch in batches for index in batch]
+        return DataLoader(
+            dataset=dataset,
+            batch_sampler=batches,
+            num_workers=dataloader.num_workers,
+            collate_fn=dataloader.collate_fn,
+            pin_memory=dataloader.pin_memory,
+            worker_init_fn=dataloader.worker_init_fn,
+        )
+
     @abstractmethod
     def _transcribe_input_manifest_processing(
         self, audio_files: List[str], temp_dir: str, trcfg: TranscribeConfig
@@ -20,6 +20,7 @@ from typing import List, Optional, Tuple, Union
 import torch
 
 from nemo.collections.asr.parts.k2.classes import GraphIntersectDenseConfig
+from nemo.collections.asr.parts.submodules.ngram_lm import NGramLM
 from nemo.collections.asr.parts.submodules.wfst_decoder import RivaDecoderConfig
 from nemo.collections.asr.parts.utils import rnnt_utils
 from nemo.collections.common.tokenizers.tokenizer_spec import TokenizerSpec
@@ -250,10 +251,12 @@ class BeamCTCInfer(AbstractBeamCTCInfer):
             self.search_algorithm = self._pyctcdecode_beam_search
         elif search_type == "flashlight":
             self.search_algorithm = self.flashlight_beam_search
+        elif search_type == "batched":
+            self.search_algorithm = self.batched_beam_search
         else:
             raise NotImplementedError(
                 f"The search type ({search_type}) supplied is not supported!\n"
-                f"Please use one of : (default, nemo, pyctcdecode)"
+                f"Please use one of : (default, nemo, pyctcdecode, flashlight, batched)"
             )
 
         # Log the beam search algorithm
@@ -278,6 +281,7 @@ class BeamCTCInfer(AbstractBeamCTCInfer):
         self.default_beam_scorer = None
         self.pyctcdecode_beam_scorer = None
         self.flashlight_beam_scorer = None
+        self.batched_beam_lm = None
         self.token_offset = 0
 
     @typecheck()
@@ -597,6 +601,182 @@ class BeamCTCInfer(AbstractBeamCTCInfer):
 
         return nbest_hypotheses
 
+    @torch.no_grad()
+    def batched_beam_search(
+        self, x: torch.Tensor, out_len: torch.Tensor
+    ) -> List[Union[rnnt_utils.Hypothesis, rnnt_utils.NBestHypotheses]]:
+        """
+        Batched CTC prefix beam search with optional shallow fusion with the N-gram LM (see `NGramLM`).
+        All the hypotheses of all the utterances are expanded together on each frame, the LM scores for all
+        the expansions are computed in a single call.
+
+        Score of the hypothesis is: acoustic_score + beam_alpha * lm_score + beam_beta * num_tokens
+        (the LM score includes the end of sentence score).
+
+        Args:
+            x: Tensor of shape [B, T, V+1], where B is the batch size, T is the maximum sequence length,
+                and V is the vocabulary size. The tensor contains log-probabilities.
+            out_len: Tensor of shape [B], contains lengths of each sequence in the batch.
+
+        Returns:
+            A list of NBestHypotheses objects, one for each sequence in the batch.
+        """
+        if self.compute_timestamps:
+            raise ValueError(
+                f"Beam Search with strategy `{self.search_type}` does not support time stamp calculation!"
+            )
+
+        vocab_size = len(self.vocab)
+        if self.blank_id != vocab_size:
+            raise ValueError(f"Batched beam search requires blank_id == len(vocabulary), got {self.blank_id}")
+
+        if self.batched_beam_lm is None and self.kenlm_path is not None:
+            if not os.path.exists(self.kenlm_path):
+                raise FileNotFoundError(
+                    f"ARPA file not found at : {self.kenlm_path}. Please set a valid path in the decoding config."
+                )
+            # perform token offset for subword models
+            if self.decoding_type == 'subword':
+                vocab = [chr(idx + self.token_offset) for idx in range(vocab_size)]
+            else:
+                # char models
+                vocab = self.vocab
+            self.batched_beam_lm = NGramLM.from_arpa(self.kenlm_path, vocabulary=vocab)
+        lm = self.batched_beam_lm
+        if lm is not None:
+            lm.to(x.device)
+
+        batch_size, max_time, _ = x.shape
+        beam_size = self.beam_size
+        device = x.device
+        float_dtype = torch.float32
+        log_probs = x.to(float_dtype)
+        out_len = out_len.to(device)
+        batch_indices = torch.arange(batch_size, device=device).unsqueeze(1)
+        beam_indices = torch.arange(beam_size, device=device)
+
+        batched_hyps = rnnt_utils.BatchedBeamHyps(
+            batch_size=batch_size,
+            beam_size=beam_size,
+            init_length=max(max_time, 1),
+            blank_index=self.blank_id,
+            device=device,
+            float_dtype=float_dtype,
+        )
+        # log-probabilities of the prefixes ending with blank and with non-blank label
+        prefix_blank_scores = batched_hyps.scores.clone()
+        prefix_label_scores = torch.full_like(prefix_blank_scores, float("-inf"))
+        # weighted LM scores and length bonus of the prefixes
+        lm_scores = torch.zeros_like(prefix_blank_scores)
+        last_labels = torch.full((batch_size, beam_size), -1, dtype=torch.long, device=device)
+        if lm is not None:
+            lm_states = lm.get_init_states(batch_size * beam_size).view(batch_size, beam_size)
+
+        for t in range(max_time):
+            active = (t < out_len).unsqueeze(1)  # [B, 1]
+            frame_log_probs = log_probs[:, t]  # [B, V + 1]
+            blank_log_probs = frame_log_probs[:, self.blank_id].unsqueeze(1)  # [B, 1]
+            label_log_probs = frame_log_probs[:, :vocab_size].unsqueeze(1)  # [B, 1, V]
+            prefix_scores = torch.logaddexp(prefix_blank_scores, prefix_label_scores)
+
+            # the prefix is not changed: blank or repeated last label
+            same_blank_scores = torch.where(active, prefix_scores + blank_log_probs, prefix_blank_scores)
+            repeated_label_log_probs = torch.gather(frame_log_probs, dim=1, index=last_labels.clamp(min=0))
+            same_label_scores = torch.where(
+                active,
+                torch.where(last_labels >= 0, prefix_label_scores + repeated_label_log_probs, float("-inf")),
+                prefix_label_scores,
+            )
+
+            # the prefix is extended with a label; the repeated label requires blank in between
+            is_repeated_label = last_labels.unsqueeze(-1) == torch.arange(vocab_size, device=device)  # [B, beam, V]
+            extended_scores = torch.where(
+                active.unsqueeze(-1),
+                torch.where(is_repeated_label, prefix_blank_scores.unsqueeze(-1), prefix_scores.unsqueeze(-1))
+                + label_log_probs,
+                float("-inf"),
+            )
+            extension_lm_scores = torch.full_like(extended_scores, self.beam_beta)
+            if lm is not None:
+                step_lm_scores, lm_next_states = lm.advance(lm_states.view(-1))
+                extension_lm_scores += self.beam_alpha * step_lm_scores.view(batch_size, beam_size, vocab_size)
+
+            # select the best prefixes: [B, beam, 1 + V] candidates, the first one is the unchanged prefix
+            same_prefix_scores = torch.logaddexp(same_blank_scores, same_label_scores) + lm_scores
+            extended_prefix_scores = extended_scores + lm_scores.unsqueeze(-1) + extension_lm_scores
+            candidate_scores = torch.cat((same_prefix_scores.unsqueeze(-1), extended_prefix_scores), dim=-1).view(
+                batch_size, -1
+            )
+            next_scores, next_candidates = candidate_scores.topk(beam_size, dim=-1, largest=True, sorted=True)
+            next_indices = next_candidates // (vocab_size + 1)
+            is_extension = next_candidates % (vocab_size + 1) > 0
+            next_labels = (next_candidates % (vocab_size + 1) - 1).clamp(min=0)
+
+            prefix_blank_scores = torch.where(
+                is_extension, float("-inf"), torch.gather(same_blank_scores, dim=1, index=next_indices)
+            )
+            prefix_label_scores = torch.where(
+                is_extension,
+                extended_scores[batch_indices, next_indices, next_labels],
+                torch.gather(same_label_scores, dim=1, index=next_indices),
+            )
+            lm_scores = torch.gather(lm_scores, dim=1, index=next_indices) + torch.where(
+                is_extension, extension_lm_scores[batch_indices, next_indices, next_labels], 0.0
+            )
+            last_labels = torch.where(is_extension, next_labels, torch.gather(last_labels, dim=1, index=next_indices))
+            if lm is not None:
+                lm_states = torch.where(
+                    is_extension,
+                    lm_next_states.view(batch_size, beam_size, vocab_size)[batch_indices, next_indices, next_labels],
+                    torch.gather(lm_states, dim=1, index=next_indices),
+                )
+
+            batched_hyps.add_results_(
+                next_indices=next_indices,
+                next_labels=torch.where(
+                    is_extension, next_labels, torch.where(active, self.blank_id, batched_hyps.NON_EXISTENT_LABEL)
+                ),
+                next_hyps_scores=next_scores,
+                time_indices=torch.full_like(next_indices, t),
+            )
+
+            # merge equal prefixes: the scores are accumulated in the first (best) of them
+            same_prefixes = torch.logical_and(
+                batched_hyps.transcript_hash.unsqueeze(-1) == batched_hyps.transcript_hash.unsqueeze(-2),
+                batched_hyps.current_lengths_nb.unsqueeze(-1) == batched_hyps.current_lengths_nb.unsqueeze(-2),
+            )  # [B, beam, beam]
+            first_in_group = same_prefixes.int().argmax(dim=-1) == beam_indices
+            prefix_blank_scores = torch.where(
+                first_in_group,
+                torch.logsumexp(torch.where(same_prefixes, prefix_blank_scores.unsqueeze(-2), float("-inf")), dim=-1),
+                float("-inf"),
+            )
+            prefix_label_scores = torch.where(
+                first_in_group,
+                torch.logsumexp(torch.where(same_prefixes, prefix_label_scores.unsqueeze(-2), float("-inf")), dim=-1),
+                float("-inf"),
+            )
+            batched_hyps.scores = torch.logaddexp(prefix_blank_scores, prefix_label_scores) + lm_scores
+
+        if lm is not None:
+            batched_hyps.scores = batched_hyps.scores + self.beam_alpha * lm.get_final(lm_states)
+
+        nbest_hypotheses = []
+        for beams_idx, hyps in enumerate(batched_hyps.to_hyps_list(score_norm=False)):
+            for hypothesis in hyps:
+                hypothesis.y_sequence = hypothesis.y_sequence.tolist()
+                hypothesis.timestep = hypothesis.timestep.tolist()
+                hypothesis.token_duration = None
+
+                # If alignment must be preserved, we preserve a view of the output logprobs.
+                if self.preserve_alignments:
+                    hypothesis.alignments = x[beams_idx][: out_len[beams_idx]]
+
+            # Wrap the result in NBestHypothesis.
+            nbest_hypotheses.append(rnnt_utils.NBestHypotheses(hyps))
+
+        return nbest_hypotheses
+
     def set_decoding_type(self, decoding_type: str):
         super().set_decoding_type(decoding_type)
 
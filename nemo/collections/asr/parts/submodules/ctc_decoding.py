@@ -49,6 +49,8 @@ class AbstractCTCDecoding(ConfidenceMixin):
 
                     beam (for DeepSpeed KenLM based decoding).
 
+                    beam_batch (for batched beam search with optional N-gram LM fusion, requires ARPA LM).
+
             compute_timestamps:
                 A bool flag, which determines whether to compute the character/subword, or
                 word based timestamp mapping the output log-probabilities to discrite intervals of timestamps.
@@ -225,7 +227,7 @@ class AbstractCTCDecoding(ConfidenceMixin):
         self.segment_seperators = self.cfg.get('segment_seperators', ['.', '?', '!'])
         self.segment_gap_threshold = self.cfg.get('segment_gap_threshold', None)
 
-        possible_strategies = ['greedy', 'greedy_batch', 'beam', 'pyctcdecode', 'flashlight', 'wfst']
+        possible_strategies = ['greedy', 'greedy_batch', 'beam', 'beam_batch', 'pyctcdecode', 'flashlight', 'wfst']
         if self.cfg.strategy not in possible_strategies:
             raise ValueError(f"Decoding strategy must be one of {possible_strategies}. Given {self.cfg.strategy}")
 
@@ -240,7 +242,7 @@ class AbstractCTCDecoding(ConfidenceMixin):
         if self.compute_timestamps is None:
             if self.cfg.strategy in ['greedy', 'greedy_batch']:
                 self.compute_timestamps = self.cfg.greedy.get('compute_timestamps', False)
-            elif self.cfg.strategy in ['beam']:
+            elif self.cfg.strategy in ['beam', 'beam_batch']:
                 self.compute_timestamps = self.cfg.beam.get('compute_timestamps', False)
 
         # initialize confidence-related fields
@@ -292,6 +294,22 @@ class AbstractCTCDecoding(ConfidenceMixin):
 
             self.decoding.override_fold_consecutive_value = False
 
+        elif self.cfg.strategy == 'beam_batch':
+
+            self.decoding = ctc_beam_decoding.BeamCTCInfer(
+                blank_id=blank_id,
+                beam_size=self.cfg.beam.get('beam_size', 1),
+                search_type='batched',
+                return_best_hypothesis=self.cfg.beam.get('return_best_hypothesis', True),
+                preserve_alignments=self.preserve_alignments,
+                compute_timestamps=self.compute_timestamps,
+                beam_alpha=self.cfg.beam.get('beam_alpha', 1.0),
+                beam_beta=self.cfg.beam.get('beam_beta', 0.0),
+                kenlm_path=self.cfg.beam.get('kenlm_path', None),
+            )
+
+            self.decoding.override_fold_consecutive_value = False
+
         elif self.cfg.strategy == 'pyctcdecode':
 
             self.decoding = ctc_beam_decoding.BeamCTCInfer(
@@ -1039,6 +1057,8 @@ class CTCDecoding(AbstractCTCDecoding):
 
                     -   beam (for DeepSpeed KenLM based decoding).
 
+                    -   beam_batch (for batched beam search with optional N-gram LM fusion, requires ARPA LM).
+
             compute_timestamps:
                 A bool flag, which determines whether to compute the character/subword, or
                 word based timestamp mapping the output log-probabilities to discrite intervals of timestamps.
@@ -1262,6 +1282,8 @@ class CTCBPEDecoding(AbstractCTCDecoding):
 
                     -   beam (for DeepSpeed KenLM based decoding).
 
+                    -   beam_batch (for batched beam search with optional N-gram LM fusion, requires ARPA LM).
+
             compute_timestamps:
                 A bool flag, which determines whether to compute the character/subword, or
                 word based timestamp mapping the output log-probabilities to discrite intervals of timestamps.
@@ -0,0 +1,268 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+import re
+from typing import Dict, List, Tuple
+
+import torch
+from torch import nn
+
+from nemo.utils import logging
+
+# ARPA files store log10 probabilities, decoding uses natural logarithms
+_LOG_10 = math.log(10.0)
+# KenLM binary models start with this magic string
+_KENLM_BINARY_MAGIC = b"mmap lm "
+
+
+class NGramLM(nn.Module):
+    """
+    Backoff n-gram language model stored in tensors, for shallow fusion in batched beam search.
+
+    The model is a set of states (n-gram contexts) and arcs (explicit n-grams). Each state stores its backoff weight
+    and the state of its longest proper suffix. Arcs are stored in a sorted table indexed by the key
+    ``state * num_keys + token``, and are looked up for whole batches of ``(state, token)`` pairs with
+    ``torch.searchsorted``. If the n-gram is not present in the model, the lookup backs off to the shorter context,
+    as in KenLM, so that scores match ``kenlm.Model.BaseScore`` (converted to natural logarithm).
+
+    States are integers: the initial state is ``bos_state`` (the context ``<s>``), the state ``0`` is the
+    empty context (used after unknown tokens).
+
+    Args:
+        vocab_size: number of tokens of the model (labels without blank)
+        max_order: order of the language model
+        arc_keys: sorted keys ``state * (vocab_size + 2) + token`` of the explicit n-grams
+        arc_weights: log-probabilities of the explicit n-grams
+        arc_next_states: states after the explicit n-grams
+        backoff_weights: backoff weights of the states
+        backoff_states: states of the longest proper suffixes of the states
+        bos_state: state for the ``<s>`` context
+        unk_score: log-probability of the unknown token
+    """
+
+    def __init__(
+        self,
+        vocab_size: int,
+        max_order: int,
+        arc_keys: torch.Tensor,
+        arc_weights: torch.Tensor,
+        arc_next_states: torch.Tensor,
+        backoff_weights: torch.Tensor,
+        backoff_states: torch.Tensor,
+        bos_state: int,
+        unk_score: float,
+    ):
+        super().__init__()
+        self.vocab_size = vocab_size
+        self.max_order = max_order
+        # <s> and </s> are stored as extra tokens after the vocabulary
+        self.bos_id = vocab_size
+        self.eos_id = vocab_size + 1
+        self.num_keys = vocab_size + 2
+        self.bos_state = bos_state
+        self.unk_score = unk_score
+        self.register_buffer("arc_keys", arc_keys, persistent=False)
+        self.register_buffer("arc_weights", arc_weights, persistent=False)
+        self.register_buffer("arc_next_states", arc_next_states, persistent=False)
+        self.register_buffer("backoff_weights", backoff_weights, persistent=False)
+        self.register_buffer("backoff_states", backoff_states, persistent=False)
+
+    @property
+    def num_states(self) -> int:
+        return self.backoff_weights.shape[0]
+
+    @classmethod
+    def from_arpa(cls, lm_path: str, vocabulary: List[str]) -> "NGramLM":
+        """
+        Load the language model from the ARPA file.
+
+        Args:
+            lm_path: path to the ARPA file
+            vocabulary: ARPA word for each token of the model (the token id is the index in the list), e.g.
+                ``[chr(i + DEFAULT_TOKEN_OFFSET) for i in range(vocab_size)]`` for subword models
+
+        Returns:
+            NGramLM object
+        """
+        with open(lm_path, "rb") as f:
+            header = f.read(1024)
+        if header.startswith(_KENLM_BINARY_MAGIC) or b"\0" in header:
+            raise ValueError(
+                f"{lm_path} is a binary file, only ARPA files are supported. "
+                f"For KenLM binary models, please use the ARPA file the model was built from."
+            )
+
+        word_to_id = {word: i for i, word in enumerate(vocabulary)}
+        vocab_size = len(vocabulary)
+        word_to_id["<s>"] = vocab_size
+        word_to_id["</s>"] = vocab_size + 1
+
+        # n-gram (tuple of token ids) -> (log-probability, backoff weight)
+        ngrams: Dict[Tuple[int, ...], Tuple[float, float]] = {}
+        unk_score = None
+        num_skipped = 0
+        order = 0
+        with open(lm_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith("\\"):
+                    match = re.fullmatch(r"\\(\d+)-grams:", line)
+                    order = int(match.group(1)) if match else 0
+                    continue
+                if order == 0:
+                    # header (\data\ section)
+                    continue
+                fields = line.split()
+                logprob = float(fields[0]) * _LOG_10
+                words = fields[1 : 1 + order]
+                backoff = float(fields[1 + order]) * _LOG_10 if len(fields) > 1 + order else 0.0
+                if order == 1 and words[0] == "<unk>":
+                    unk_score = logprob
+                    continue
+                if any(word not in word_to_id for word in words):
+                    num_skipped += 1
+                    continue
+                ngrams[tuple(word_to_id[word] for word in words)] = (logprob, backoff)
+        if not ngrams:
+            raise ValueError(f"No n-grams found in ARPA file {lm_path}")
+        if num_skipped > 0:
+            logging.warning(f"{num_skipped} n-grams with words outside the vocabulary are skipped in {lm_path}")
+        if unk_score is None:
+            unk_score = -100.0 * _LOG_10  # KenLM default for a missing <unk>
+        max_order = max(len(ngram) for ngram in ngrams)
+
+        # states: all the contexts of the n-grams (with all their prefixes and suffixes), empty context is the root
+        contexts = set()
+        for ngram in ngrams:
+            for end in range(1, len(ngram)):
+                for start in range(end):
+                    contexts.add(ngram[start:end])
+        for ngram in ngrams:
+            if len(ngram) < max_order:
+                contexts.add(ngram)
+        state_ids = {(): 0}
+        for context in sorted(contexts, key=lambda context: (len(context), context)):
+            state_ids[context] = len(state_ids)
+
+        def _longest_suffix_state(ngram: Tuple[int, ...]) -> int:
+            for start in range(len(ngram) + 1):
+                if ngram[start:] in state_ids:
+                    return state_ids[ngram[start:]]
+            return 0
+
+        num_states = len(state_ids)
+        # state ids are assigned in the order of insertion, the root state has no backoff
+        backoff_weights = torch.tensor(
+            [ngrams.get(context, (0.0, 0.0))[1] if context else 0.0 for context in state_ids], dtype=torch.float32
+        )
+        backoff_states = torch.tensor(
+            [_longest_suffix_state(context[1:]) if context else 0 for context in state_ids], dtype=torch.long
+        )
+
+        num_keys = vocab_size + 2
+        arc_keys = torch.tensor([state_ids[ngram[:-1]] * num_keys + ngram[-1] for ngram in ngrams], dtype=torch.long)
+        arc_weights = torch.tensor([logprob for logprob, _ in ngrams.values()], dtype=torch.float32)
+        arc_next_states = torch.tensor([_longest_suffix_state(ngram) for ngram in ngrams], dtype=torch.long)
+        arc_keys, order_indices = arc_keys.sort()
+
+        logging.info(f"Loaded {max_order}-gram LM from {lm_path}: {num_states} states, {len(ngrams)} n-grams")
+        return cls(
+            vocab_size=vocab_size,
+            max_order=max_order,
+            arc_keys=arc_keys,
+            arc_weights=arc_weights[order_indices],
+            arc_next_states=arc_next_states[order_indices],
+            backoff_weights=backoff_weights,
+            backoff_states=backoff_states,
+            bos_state=state_ids.get((vocab_size,), 0),
+            unk_score=unk_score,
+        )
+
+    def get_init_states(self, batch_size: int, bos: bool = True) -> torch.Tensor:
+        """
+        Get initial states for the batch of hypotheses.
+
+        Args:
+            batch_size: number of hypotheses
+            bos: start from the ``<s>`` context (otherwise from the empty context)
+
+        Returns:
+            tensor [batch_size] with the states
+        """
+        return torch.full(
+            (batch_size,), self.bos_state if bos else 0, dtype=torch.long, device=self.backoff_states.device
+        )
+
+    def score_tokens(self, states: torch.Tensor, tokens: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Compute log-probabilities of the tokens after the states, and the next states.
+
+        Args:
+            states: tensor of states, any shape
+            tokens: tensor of tokens, broadcastable with states
+
+        Returns:
+            tuple of tensors (log-probabilities, next states) of the broadcasted shape
+        """
+        states, tokens = torch.broadcast_tensors(states, tokens)
+        scores = torch.zeros(states.shape, dtype=self.arc_weights.dtype, device=states.device)
+        next_states = torch.zeros_like(states)
+        found = torch.zeros(states.shape, dtype=torch.bool, device=states.device)
+        current_states = states
+        max_arc_index = self.arc_keys.shape[0] - 1
+        # look up the n-gram with the longest context, backing off to the shorter context if not found;
+        # the empty context is reached after at most (max_order - 1) backoffs
+        for _ in range(self.max_order):
+            keys = current_states * self.num_keys + tokens
+            arc_indices = torch.searchsorted(self.arc_keys, keys).clamp_(max=max_arc_index)
+            found_now = torch.logical_and(self.arc_keys[arc_indices] == keys, ~found)
+            scores += torch.where(
+                found_now,
+                self.arc_weights[arc_indices],
+                torch.where(found, 0.0, self.backoff_weights[current_states]),
+            )
+            next_states = torch.where(found_now, self.arc_next_states[arc_indices], next_states)
+            found = torch.logical_or(found, found_now)
+            current_states = torch.where(found, current_states, self.backoff_states[current_states])
+        # unknown tokens: the context is reset
+        scores = torch.where(found, scores, scores + self.unk_score)
+        return scores, next_states
+
+    def advance(self, states: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Compute log-probabilities of all the tokens of the vocabulary after the states, and the next states.
+
+        Args:
+            states: tensor [batch_size] of states
+
+        Returns:
+            tuple of tensors [batch_size, vocab_size] (log-probabilities, next states)
+        """
+        tokens = torch.arange(self.vocab_size, device=states.device)
+        return self.score_tokens(states.unsqueeze(-1), tokens)
+
+    def get_final(self, states: torch.Tensor) -> torch.Tensor:
+        """
+        Compute log-probabilities of the end of sentence ``</s>`` after the states.
+
+        Args:
+            states: tensor of states, any shape
+
+        Returns:
+            tensor of log-probabilities of the same shape
+        """
+        return self.score_tokens(states, torch.full_like(states, self.eos_id))[0]
@@ -35,6 +35,8 @@ import torch
 from tqdm import tqdm
 
 from nemo.collections.asr.modules import rnnt_abstract
+from nemo.collections.asr.parts.submodules.ngram_lm import NGramLM
+from nemo.collections.asr.parts.utils import rnnt_utils
 from nemo.collections.asr.parts.utils.rnnt_utils import (
     HATJointOutput,
     Hypothesis,
@@ -226,6 +228,9 @@ class BeamRNNTInfer(Typing):
             Alpha weight of N-gram LM
         tokens_type: str
             Tokenization type ['subword', 'char']
+
+        max_symbols_per_step: Unused int. Only used by the batched beam search (strategy `beam_batch`),
+            see `BeamBatchedRNNTInfer`.
     """
 
     @property
@@ -265,6 +270,7 @@ class BeamRNNTInfer(Typing):
         ngram_lm_alpha: float = 0.0,
         hat_subtract_ilm: bool = False,
         hat_ilm_weight: float = 0.0,
+        max_symbols_per_step: Optional[int] = None,
     ):
         self.decoder = decoder_model
         self.joint = joint_model
@@ -1497,6 +1503,340 @@ class BeamRNNTInfer(Typing):
             self.token_offset = DEFAULT_TOKEN_OFFSET
 
 
+class BeamBatchedRNNTInfer(Typing):
+    """
+    Fully batched beam search for RNNT and TDT models.
+
+    Unlike `BeamRNNTInfer`, which decodes every utterance separately, all hypotheses of all utterances in the batch
+    are stored in tensors of shape [batch_size, beam_size, ...] (see `rnnt_utils.BatchedBeamHyps`), and each decoding
+    step consists of a single (batched) call to the prediction and joint networks for all hypotheses,
+    followed by the vectorized top-k selection over all expansions of the hypotheses of each utterance.
+
+    The search is alignment-length synchronous: on each step, each hypothesis is extended by exactly one label
+    (non-blank or blank). For RNNT models the blank advances the time index by one frame, for TDT models the
+    time index is advanced by the predicted duration. Hypotheses with the same transcript and the same time index are
+    recombined after each step. Hypotheses that reached the end of the utterance are kept unchanged until
+    all the hypotheses in the batch are finished.
+
+    Args:
+        decoder_model: rnnt_utils.AbstractRNNTDecoder implementation. Only decoders with `blank_as_pad=True`
+            are supported.
+        joint_model: rnnt_utils.AbstractRNNTJoint implementation.
+        blank_index: int index of the blank token. Must be `len(vocabulary)` (the last index of the joint labels).
+        beam_size: number of hypotheses for each utterance. Must be a positive integer >= 1.
+        durations: list of durations for TDT models; None for RNNT models.
+        max_symbols_per_step: max number of non-blank labels (for TDT models - labels with zero duration)
+            emitted for the same frame, to avoid infinite looping. Defaults to 10.
+        score_norm: bool, whether to normalize the scores of the hypotheses by the number of labels
+            when selecting the best hypothesis.
+        return_best_hypothesis: bool. If True returns the best hypothesis for each utterance,
+            otherwise NBestHypotheses with all the hypotheses of the beam.
+        softmax_temperature: Scales the logits of the joint prior to computing log_softmax.
+        preserve_alignments: Not supported, must be False.
+        ngram_lm_model: path to the ARPA file of the N-gram LM for shallow fusion. The LM is loaded into tensors
+            (see `NGramLM`) and scores all the hypotheses in a single call on each decoding step.
+            The end of sentence score is added to the final hypotheses. KenLM binary models are not supported.
+        ngram_lm_alpha: weight of the N-gram LM scores.
+    """
+
+    @property
+    def input_types(self):
+        """Returns definitions of module input ports."""
+        return {
+            "encoder_output": NeuralType(('B', 'D', 'T'), AcousticEncodedRepresentation()),
+            "encoded_lengths": NeuralType(tuple('B'), LengthsType()),
+            "partial_hypotheses": [NeuralType(elements_type=HypothesisType(), optional=True)],  # must always be last
+        }
+
+    @property
+    def output_types(self):
+        """Returns definitions of module output ports."""
+        return {"predictions": [NeuralType(elements_type=HypothesisType())]}
+
+    def __init__(
+        self,
+        decoder_model: rnnt_abstract.AbstractRNNTDecoder,
+        joint_model: rnnt_abstract.AbstractRNNTJoint,
+        blank_index: int,
+        beam_size: int,
+        durations: Optional[List[int]] = None,
+        max_symbols_per_step: Optional[int] = 10,
+        score_norm: bool = True,
+        return_best_hypothesis: bool = True,
+        softmax_temperature: float = 1.0,
+        preserve_alignments: bool = False,
+        ngram_lm_model: Optional[str] = None,
+        ngram_lm_alpha: float = 0.0,
+    ):
+        if beam_size < 1:
+            raise ValueError("Beam search size cannot be less than 1!")
+        if preserve_alignments:
+            raise NotImplementedError("`preserve_alignments` is not supported by the batched beam search")
+        if not decoder_model.blank_as_pad:
+            raise ValueError("Batched beam search requires a decoder with `blank_as_pad=True`")
+
+        self.decoder = decoder_model
+        self.joint = joint_model
+        self._blank_index = blank_index
+        self.beam_size = beam_size
+        self.score_norm = score_norm
+        self.return_best_hypothesis = return_best_hypothesis
+        self.softmax_temperature = softmax_temperature
+        self.preserve_alignments = preserve_alignments
+
+        if max_symbols_per_step is None:
+            logging.warning("Max symbols per step is None, not allowed for batched beam search. Setting to `10`")
+            max_symbols_per_step = 10
+        self.max_symbols = max_symbols_per_step
+
+        self.durations = list(durations) if durations else None
+        if self.durations is not None:
+            if not any(duration > 0 for duration in self.durations):
+                raise ValueError(f"At least one of TDT durations must be non-zero, got {self.durations}")
+
+        # the LM is loaded on the first call, since the mapping of the tokens depends on the decoding type
+        self.ngram_lm_model = ngram_lm_model
+        self.ngram_lm_alpha = ngram_lm_alpha
+        self.ngram_lm = None
+        self.token_offset = 0
+
+    @typecheck()
+    def __call__(
+        self,
+        encoder_output: torch.Tensor,
+        encoded_lengths: torch.Tensor,
+        partial_hypotheses: Optional[List[Hypothesis]] = None,
+    ) -> Tuple[List[Union[Hypothesis, NBestHypotheses]]]:
+        """Perform batched beam search.
+
+        Args:
+            encoder_output: Encoded speech features (B, D_enc, T_max)
+            encoded_lengths: Lengths of the encoder outputs
+
+        Returns:
+            Either a list containing the best Hypothesis for each utterance (when `return_best_hypothesis=True`),
+            otherwise a list containing NBestHypotheses for each utterance. The hypotheses in NBestHypotheses are
+            sorted such that the best hypothesis is the first element.
+        """
+        if partial_hypotheses is not None:
+            raise NotImplementedError("`partial_hypotheses` are not supported by the batched beam search")
+
+        # Preserve decoder and joint training state
+        decoder_training_state = self.decoder.training
+        joint_training_state = self.joint.training
+
+        with torch.inference_mode():
+            # Apply optional preprocessing
+            encoder_output = encoder_output.transpose(1, 2)  # (B, T, D)
+            dtype = next(self.joint.parameters()).dtype
+            if encoder_output.dtype != dtype:
+                encoder_output = encoder_output.to(dtype=dtype)
+
+            self.decoder.eval()
+            self.joint.eval()
+
+            if self.ngram_lm_model is not None and self.ngram_lm is None:
+                # tokens are represented in the LM in the same way as for `BeamRNNTInfer.compute_ngram_score`
+                vocabulary = [
+                    chr(label + self.token_offset) if self.token_offset else str(label)
+                    for label in range(self._blank_index)
+                ]
+                self.ngram_lm = NGramLM.from_arpa(self.ngram_lm_model, vocabulary=vocabulary)
+            if self.ngram_lm is not None:
+                self.ngram_lm.to(encoder_output.device)
+
+            batched_hyps = self.batched_beam_search(encoder_output, encoded_lengths)
+            hyps_list = batched_hyps.to_hyps_list(score_norm=self.score_norm)
+
+            if self.return_best_hypothesis:
+                hypotheses = [hyps[0] for hyps in hyps_list]
+            else:
+                hypotheses = [NBestHypotheses(hyps) for hyps in hyps_list]
+
+        self.decoder.train(decoder_training_state)
+        self.joint.train(joint_training_state)
+
+        return (hypotheses,)
+
+    def set_decoding_type(self, decoding_type: str):
+        """
+        Sets decoding type. Please check train_kenlm.py in scripts/asr_language_modeling/ to find out why we need
+        Args:
+            decoding_type: decoding type
+        """
+        # TOKEN_OFFSET for BPE-based models
+        if decoding_type == 'subword':
+            from nemo.collections.asr.parts.submodules.ctc_beam_decoding import DEFAULT_TOKEN_OFFSET
+
+            self.token_offset = DEFAULT_TOKEN_OFFSET
+
+    def batched_beam_search(
+        self, encoder_output: torch.Tensor, encoder_output_length: torch.Tensor
+    ) -> rnnt_utils.BatchedBeamHyps:
+        """
+        Batched alignment-length synchronous beam search.
+
+        Args:
+            encoder_output: output from the encoder (B, T, D)
+            encoder_output_length: lengths of the utterances in `encoder_output`
+
+        Returns:
+            BatchedBeamHyps with the hypotheses for all the utterances in the batch
+        """
+        batch_size, max_time, _unused = encoder_output.shape
+        beam_size = self.beam_size
+        num_hyps = batch_size * beam_size
+        device = encoder_output.device
+
+        # do not recalculate joint projection, project only once
+        encoder_output_projected = self.joint.project_encoder(encoder_output)
+        float_dtype = encoder_output_projected.dtype
+
+        batched_hyps = rnnt_utils.BatchedBeamHyps(
+            batch_size=batch_size,
+            beam_size=beam_size,
+            init_length=max(max_time, 1) * (self.max_symbols + 1),
+            blank_index=self._blank_index,
+            device=device,
+            float_dtype=float_dtype,
+        )
+
+        batch_indices = torch.arange(batch_size, device=device).unsqueeze(1).expand(batch_size, beam_size)
+        # offsets of the hypotheses of each utterance in the flattened [batch_size * beam_size] decoder inputs
+        batch_offsets = torch.arange(batch_size, device=device).unsqueeze(1) * beam_size
+        lengths = encoder_output_length.to(device).unsqueeze(1).expand(batch_size, beam_size)
+        last_timesteps = (lengths - 1).clamp(min=0)
+        time_indices = torch.zeros((batch_size, beam_size), dtype=torch.long, device=device)
+
+        # expansions of each hypothesis: labels for RNNT, (label, duration) pairs for TDT
+        num_labels = self._blank_index + 1
+        if self.durations is None:
+            expansion_labels = torch.arange(num_labels, device=device)
+            # finished hypotheses are kept unchanged using a single (blank) expansion
+            noop_expansion = expansion_labels == self._blank_index
+            # non-blank labels are not allowed when the max number of symbols for the frame is reached
+            non_advancing_expansion = expansion_labels != self._blank_index
+            forbidden_expansion = torch.zeros_like(noop_expansion)
+        else:
+            num_durations = len(self.durations)
+            durations = torch.tensor(self.durations, dtype=torch.long, device=device)
+            expansion_labels = torch.arange(num_labels * num_durations, device=device) // num_durations
+            expansion_durations = durations.repeat(num_labels)
+            noop_expansion = torch.logical_and(
+                expansion_labels == self._blank_index, expansion_durations == durations.max()
+            )
+            non_advancing_expansion = expansion_durations == 0
+            # blank with zero duration would not advance the time index
+            forbidden_expansion = torch.logical_and(expansion_labels == self._blank_index, expansion_durations == 0)
+
+        # initial decoder state and output, <SOS> is represented by the blank label
+        labels = torch.full((num_hyps,), fill_value=self._blank_index, dtype=torch.long, device=device)
+        decoder_output, state, *_ = self.decoder.predict(labels.unsqueeze(1), None, add_sos=False, batch_size=num_hyps)
+        decoder_output = self.joint.project_prednet(decoder_output)  # do not recalculate joint projection
+
+        if self.ngram_lm is not None:
+            lm_states = self.ngram_lm.get_init_states(num_hyps).view(batch_size, beam_size)
+
+        active_mask = torch.logical_and(time_indices < lengths, batched_hyps.scores > float("-inf"))
+        while active_mask.any():
+            # stage 1: get log-probabilities of all the expansions of all the hypotheses
+            safe_time_indices = torch.minimum(time_indices, last_timesteps)
+            logits = (
+                self.joint.joint_after_projection(
+                    encoder_output_projected[batch_indices, safe_time_indices].view(num_hyps, 1, -1),
+                    decoder_output,
+                )
+                .squeeze(1)
+                .squeeze(1)
+                / self.softmax_temperature
+            )
+            # max number of labels emitted for the current frame is reached, only advancing time is allowed
+            force_advance_mask = torch.logical_and(
+                batched_hyps.last_timestep_lasts >= self.max_symbols, batched_hyps.last_timestep == time_indices
+            ).view(num_hyps, 1)
+            if self.durations is None:
+                label_log_probs = torch.log_softmax(logits, dim=-1)  # [B * beam, V + 1]
+            else:
+                label_log_probs = torch.log_softmax(logits[:, :-num_durations], dim=-1)  # [B * beam, V + 1]
+            if self.ngram_lm is not None:
+                # shallow fusion: LM scores for all the non-blank labels of all the hypotheses in a single call
+                lm_scores, lm_next_states = self.ngram_lm.advance(lm_states.view(-1))  # [B * beam, V]
+                label_log_probs[:, : self._blank_index] += self.ngram_lm_alpha * lm_scores.to(label_log_probs.dtype)
+            if self.durations is None:
+                log_probs = label_log_probs
+            else:
+                duration_log_probs = torch.log_softmax(logits[:, -num_durations:], dim=-1)  # [B * beam, D]
+                log_probs = (label_log_probs.unsqueeze(-1) + duration_log_probs.unsqueeze(-2)).view(num_hyps, -1)
+            log_probs = torch.where(
+                torch.logical_or(forbidden_expansion, torch.logical_and(force_advance_mask, non_advancing_expansion)),
+                float("-inf"),
+                log_probs,
+            )
+
+            # stage 2: select the best expansions for each utterance;
+            # finished hypotheses are kept unchanged with the single "blank" expansion with the same score
+            expansion_scores = torch.where(
+                active_mask.view(num_hyps, 1),
+                batched_hyps.scores.view(num_hyps, 1) + log_probs,
+                torch.where(noop_expansion, batched_hyps.scores.view(num_hyps, 1), float("-inf")),
+            ).view(batch_size, -1)
+            next_scores, next_expansions = expansion_scores.topk(beam_size, dim=-1, largest=True, sorted=True)
+            num_expansions = log_probs.shape[-1]
+            next_indices = next_expansions // num_expansions
+            next_labels = next_expansions % num_expansions
+            prev_time_indices = torch.gather(time_indices, dim=1, index=next_indices)
+            prev_active_mask = torch.gather(active_mask, dim=1, index=next_indices)
+            if self.durations is None:
+                next_durations = None
+                time_indices = prev_time_indices + (next_labels == self._blank_index)
+            else:
+                next_durations = durations[next_labels % num_durations]
+                next_labels = next_labels // num_durations
+                time_indices = torch.minimum(prev_time_indices + next_durations, lengths)
+            time_indices = torch.where(prev_active_mask, time_indices, prev_time_indices)
+            next_labels = torch.where(prev_active_mask, next_labels, batched_hyps.NON_EXISTENT_LABEL)
+
+            batched_hyps.add_results_(
+                next_indices=next_indices,
+                next_labels=next_labels,
+                next_hyps_scores=next_scores,
+                time_indices=prev_time_indices,
+                token_durations=next_durations,
+            )
+            batched_hyps.recombine_hyps_(time_indices)
+
+            # stage 3: reorder decoder (and LM) states according to the selected hypotheses,
+            # update the decoder output and state for the hypotheses extended with non-blank labels
+            flat_indices = (batch_offsets + next_indices).view(-1)
+            emitted_mask = torch.logical_and(next_labels >= 0, next_labels != self._blank_index).view(-1)
+            if self.ngram_lm is not None:
+                lm_states = torch.where(
+                    emitted_mask,
+                    lm_next_states[flat_indices, next_labels.view(-1).clamp(0, self._blank_index - 1)],
+                    lm_states.view(-1)[flat_indices],
+                ).view(batch_size, beam_size)
+            state = self.decoder.batch_gather_states(state, flat_indices)
+            decoder_output = decoder_output[flat_indices]
+            new_decoder_output, new_state, *_ = self.decoder.predict(
+                torch.where(emitted_mask, next_labels.view(-1), self._blank_index).unsqueeze(1),
+                state,
+                add_sos=False,
+                batch_size=num_hyps,
+            )
+            new_decoder_output = self.joint.project_prednet(new_decoder_output)
+            decoder_output = torch.where(emitted_mask.view(-1, 1, 1), new_decoder_output, decoder_output)
+            self.decoder.batch_replace_states_mask(src_states=new_state, dst_states=state, mask=emitted_mask)
+
+            active_mask = torch.logical_and(time_indices < lengths, batched_hyps.scores > float("-inf"))
+
+        if self.ngram_lm is not None:
+            # end of sentence score, as in the batched CTC beam search
+            final_lm_scores = self.ngram_lm.get_final(lm_states).to(batched_hyps.scores.dtype)
+            batched_hyps.scores = batched_hyps.scores + self.ngram_lm_alpha * final_lm_scores
+
+        return batched_hyps
+
+
 @dataclass
 class BeamRNNTInferConfig:
     """
@@ -1522,3 +1862,4 @@ class BeamRNNTInferConfig:
     ngram_lm_alpha: Optional[float] = 0.0
     hat_subtract_ilm: bool = False
     hat_ilm_weight: float = 0.0
+    max_symbols_per_step: Optional[int] = 10  # used only by the batched beam search (strategy "beam_batch")
@@ -41,6 +41,7 @@ class AbstractRNNTDecoding(ConfidenceMixin):
                 Possible values are :
                 -   greedy, greedy_batch (for greedy decoding).
                 -   beam, tsd, alsd (for beam search decoding).
+                -   beam_batch (for fully batched beam search decoding).
 
             compute_hypothesis_token_set: A bool flag, which determines whether to compute a list of decoded
                 tokens as well as the decoded string. Default is False in order to avoid double decoding
@@ -166,6 +167,9 @@ class AbstractRNNTDecoding(ConfidenceMixin):
                     per timestep of the acoustic model. Larger values will allow longer sentences to be decoded,
                     at increased cost to execution time.
 
+                max_symbols_per_step: optional int, max number of non-blank labels emitted for the same frame
+                    by the batched beam search (strategy `beam_batch`). Defaults to 10.
+
                 alsd_max_target_len: optional int or float, determines the potential maximum target sequence length.
                     If an integer is provided, it can decode sequences of that particular maximum length.
                     If a float is provided, it can decode sequences of int(alsd_max_target_len * seq_len),
@@ -234,9 +238,10 @@ class AbstractRNNTDecoding(ConfidenceMixin):
                 raise ValueError("blank_id must equal len(non_blank_vocabs) for TDT models")
             if self.big_blank_durations is not None and self.big_blank_durations != []:
                 raise ValueError("duration and big_blank_durations can't both be not None")
-            if self.cfg.strategy not in ['greedy', 'greedy_batch', 'beam', 'maes']:
+            if self.cfg.strategy not in ['greedy', 'greedy_batch', 'beam', 'beam_batch', 'maes']:
                 raise ValueError(
-                    "currently only greedy, greedy_batch, beam and maes inference is supported for TDT models"
+                    "currently only greedy, greedy_batch, beam, beam_batch and maes inference "
+                    "is supported for TDT models"
                 )
 
         if (
@@ -249,7 +254,7 @@ class AbstractRNNTDecoding(ConfidenceMixin):
                     "currently only greedy and greedy_batch inference is supported for multi-blank models"
                 )
 
-        possible_strategies = ['greedy', 'greedy_batch', 'beam', 'tsd', 'alsd', 'maes']
+        possible_strategies = ['greedy', 'greedy_batch', 'beam', 'beam_batch', 'tsd', 'alsd', 'maes']
         if self.cfg.strategy not in possible_strategies:
             raise ValueError(f"Decoding strategy must be one of {possible_strategies}")
 
@@ -258,7 +263,7 @@ class AbstractRNNTDecoding(ConfidenceMixin):
             if self.cfg.strategy in ['greedy', 'greedy_batch']:
                 self.preserve_alignments = self.cfg.greedy.get('preserve_alignments', False)
 
-            elif self.cfg.strategy in ['beam', 'tsd', 'alsd', 'maes']:
+            elif self.cfg.strategy in ['beam', 'beam_batch', 'tsd', 'alsd', 'maes']:
                 self.preserve_alignments = self.cfg.beam.get('preserve_alignments', False)
 
         # Update compute timestamps
@@ -266,9 +271,19 @@ class AbstractRNNTDecoding(ConfidenceMixin):
             if self.cfg.strategy in ['greedy', 'greedy_batch']:
                 self.compute_timestamps = self.cfg.greedy.get('compute_timestamps', False)
 
-            elif self.cfg.strategy in ['beam', 'tsd', 'alsd', 'maes']:
+            elif self.cfg.strategy in ['beam', 'beam_batch', 'tsd', 'alsd', 'maes']:
                 self.compute_timestamps = self.cfg.beam.get('compute_timestamps', False)
 
+        # Alignments (and so timestamps for RNNT models) are not supported by the batched beam search
+        if self.cfg.strategy == 'beam_batch':
+            if self.preserve_alignments:
+                raise ValueError("`preserve_alignments` is not supported with strategy `beam_batch`.")
+            if not self._is_tdt and self.compute_timestamps:
+                raise ValueError(
+                    "`compute_timestamps` requires `preserve_alignments` for RNNT models, which is not supported "
+                    "with strategy `beam_batch`. Please use strategy `beam` to compute timestamps."
+                )
+
         # Test if alignments are being preserved for RNNT
         if not self._is_tdt and self.compute_timestamps is True and self.preserve_alignments is False:
             raise ValueError("If `compute_timesteps` flag is set, then `preserve_alignments` flag must also be set.")
@@ -288,7 +303,7 @@ class AbstractRNNTDecoding(ConfidenceMixin):
         # Confidence estimation is not implemented for these strategies
         if (
             not self.preserve_frame_confidence
-            and self.cfg.strategy in ['beam', 'tsd', 'alsd', 'maes']
+            and self.cfg.strategy in ['beam', 'beam_batch', 'tsd', 'alsd', 'maes']
             and self.cfg.beam.get('preserve_frame_confidence', False)
         ):
             raise NotImplementedError(f"Confidence calculation is not supported for strategy `{self.cfg.strategy}`")
@@ -413,6 +428,22 @@ class AbstractRNNTDecoding(ConfidenceMixin):
                         preserve_alignments=self.preserve_alignments,
                     )
 
+        elif self.cfg.strategy == 'beam_batch':
+            self.decoding = rnnt_beam_decoding.BeamBatchedRNNTInfer(
+                decoder_model=decoder,
+                joint_model=joint,
+                blank_index=self.blank_id,
+                beam_size=self.cfg.beam.beam_size,
+                durations=self.durations if self._is_tdt else None,
+                max_symbols_per_step=self.cfg.beam.get('max_symbols_per_step', 10),
+                return_best_hypothesis=decoding_cfg.beam.get('return_best_hypothesis', True),
+                score_norm=self.cfg.beam.get('score_norm', True),
+                softmax_temperature=self.cfg.beam.get('softmax_temperature', 1.0),
+                preserve_alignments=self.preserve_alignments,
+                ngram_lm_model=self.cfg.beam.get('ngram_lm_model', None),
+                ngram_lm_alpha=self.cfg.beam.get('ngram_lm_alpha', 0.0),
+            )
+
         elif self.cfg.strategy == 'tsd':
             self.decoding = rnnt_beam_decoding.BeamRNNTInfer(
                 decoder_model=decoder,
@@ -1259,6 +1290,8 @@ class RNNTDecoding(AbstractRNNTDecoding):
 
                 -   beam, tsd, alsd (for beam search decoding).
 
+                -   beam_batch (for fully batched beam search decoding).
+
             compute_hypothesis_token_set: A bool flag, which determines whether to compute a list of decoded
                 tokens as well as the decoded string. Default is False in order to avoid double decoding
                 unless required.
@@ -1375,6 +1408,9 @@ class RNNTDecoding(AbstractRNNTDecoding):
                         per timestep of the acoustic model. Larger values will allow longer sentences to be decoded,
                         at increased cost to execution time.
 
+                    max_symbols_per_step: optional int, max number of non-blank labels emitted for the same frame
+                        by the batched beam search (strategy `beam_batch`). Defaults to 10.
+
                     alsd_max_target_len: optional int or float, determines the potential maximum target sequence
                         length. If an integer is provided, it can decode sequences of that particular maximum length.
                         If a float is provided, it can decode sequences of int(alsd_max_target_len * seq_len),
@@ -1439,8 +1475,13 @@ class RNNTDecoding(AbstractRNNTDecoding):
             supported_punctuation=supported_punctuation,
         )
 
-        if isinstance(self.decoding, rnnt_beam_decoding.BeamRNNTInfer) or isinstance(
-            self.decoding, tdt_beam_decoding.BeamTDTInfer
+        if isinstance(
+            self.decoding,
+            (
+                rnnt_beam_decoding.BeamRNNTInfer,
+                rnnt_beam_decoding.BeamBatchedRNNTInfer,
+                tdt_beam_decoding.BeamTDTInfer,
+            ),
         ):
             self.decoding.set_decoding_type('char')
 
@@ -1525,6 +1566,8 @@ class RNNTBPEDecoding(AbstractRNNTDecoding):
 
                 -   beam, tsd, alsd (for beam search decoding).
 
+                -   beam_batch (for fully batched beam search decoding).
+
             compute_hypothesis_token_set: A bool flag, which determines whether to compute a list of decoded
                 tokens as well as the decoded string. Default is False in order to avoid double decoding
                 unless required.
@@ -1660,6 +1703,9 @@ class RNNTBPEDecoding(AbstractRNNTDecoding):
                         per timestep of the acoustic model. Larger values will allow longer sentences to be decoded,
                         at increased cost to execution time.
 
+                    max_symbols_per_step: optional int, max number of non-blank labels emitted for the same frame
+                        by the batched beam search (strategy `beam_batch`). Defaults to 10.
+
                     alsd_max_target_len: optional int or float, determines the potential maximum target sequence
                         length.If an integer is provided, it can decode sequences of that particular maximum length.
                         If a float is provided, it can decode sequences of int(alsd_max_target_len * seq_len),
@@ -1716,8 +1762,13 @@ class RNNTBPEDecoding(AbstractRNNTDecoding):
             supported_punctuation=supported_punctuation,
         )
 
-        if isinstance(self.decoding, rnnt_beam_decoding.BeamRNNTInfer) or isinstance(
-            self.decoding, tdt_beam_decoding.BeamTDTInfer
+        if isinstance(
+            self.decoding,
+            (
+                rnnt_beam_decoding.BeamRNNTInfer,
+                rnnt_beam_decoding.BeamBatchedRNNTInfer,
+                tdt_beam_decoding.BeamTDTInfer,
+            ),
         ):
             self.decoding.set_decoding_type('subword')
 
@@ -31,7 +31,7 @@
 # https://arxiv.org/pdf/2003.02405.pdf and the implementation from
 # https://github.com/tango4j/Auto-Tuning-Spectral-Clustering.
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import torch
 from torch.linalg import eigh, eigvalsh
@@ -353,6 +353,32 @@ def getAffinityGraphMat(affinity_mat_raw: torch.Tensor, p_value: int) -> torch.T
     return symm_affinity_mat
 
 
+def getSparseAffinityGraphMat(knn_indices: torch.Tensor, p_value: int) -> torch.Tensor:
+    """
+    Sparse counterpart of `getAffinityGraphMat`. Build the binarized and symmetrized affinity graph from the
+    indices of the nearest neighbors of each node, without materializing the N x N affinity matrix.
+
+    Args:
+        knn_indices (Tensor):
+            Indices of the nearest neighbors of each node sorted by decreasing affinity.
+            Dimensions: (Number of nodes) x (Number of neighbors, at least p_value)
+        p_value (int):
+            The number of nearest neighbors that are connected to each node.
+
+    Returns:
+        symm_affinity_mat (Tensor):
+            A sparse COO matrix with values 1 for mutual neighbors and 0.5 for one-sided neighbors.
+    """
+    n_nodes = knn_indices.shape[0]
+    p_value = min(int(p_value), knn_indices.shape[1])
+    cols = knn_indices[:, :p_value].reshape(-1)
+    rows = torch.arange(n_nodes, device=knn_indices.device).repeat_interleave(p_value)
+    indices = torch.stack([torch.cat([rows, cols]), torch.cat([cols, rows])])
+    values = torch.full((indices.shape[1],), 0.5, dtype=torch.float64, device=knn_indices.device)
+    symm_affinity_mat = torch.sparse_coo_tensor(indices, values, (n_nodes, n_nodes)).coalesce()
+    return symm_affinity_mat
+
+
 def getMinimumConnection(
     mat: torch.Tensor, max_N: torch.Tensor, n_list: torch.Tensor, device: torch.device
 ) -> Tuple[torch.Tensor, torch.Tensor]:
@@ -371,6 +397,61 @@ def getMinimumConnection(
     return affinity_mat, p_value
 
 
+def getBatchedKneighborsRanks(mats: torch.Tensor, mat_sizes: torch.Tensor) -> torch.Tensor:
+    """
+    Rank the affinity values in each row of a batch of zero-padded affinity matrices. The ranks are computed
+    once per matrix, so the binarized graphs for any p-value are obtained by `getBatchedAffinityGraphMat`
+    without sorting again. Padded rows and columns get the rank `M` so that they are never selected.
+
+    Args:
+        mats (Tensor):
+            Zero-padded affinity matrices. Dimensions: (Number of matrices) x M x M
+        mat_sizes (Tensor):
+            The number of valid rows (and columns) in each matrix.
+
+    Returns:
+        ranks (Tensor):
+            The position of each value in its row when sorted in descending order.
+    """
+    max_size = mats.shape[1]
+    valid = torch.arange(max_size, device=mats.device).unsqueeze(0) < mat_sizes.to(mats.device).unsqueeze(1)
+    valid_pairs = valid.unsqueeze(2) & valid.unsqueeze(1)
+    sorted_idx = torch.argsort(mats.masked_fill(~valid_pairs, float('-inf')), dim=2, descending=True)
+    ranks = torch.argsort(sorted_idx, dim=2)
+    return ranks.masked_fill(~valid_pairs, max_size)
+
+
+def getBatchedAffinityGraphMat(ranks: torch.Tensor, p_values: torch.Tensor) -> torch.Tensor:
+    """
+    Batched counterpart of `getAffinityGraphMat`. Binarize the top-p values of each row using the ranks from
+    `getBatchedKneighborsRanks`, with a different p-value for each matrix, and symmetrize the binarized graphs.
+    """
+    X = (ranks < p_values.to(ranks.device).view(-1, 1, 1)).float()
+    symm_affinity_mat = 0.5 * (X + X.transpose(1, 2))
+    return symm_affinity_mat
+
+
+def isBatchedGraphFullyConnected(affinity_mats: torch.Tensor, mat_sizes: torch.Tensor) -> torch.Tensor:
+    """
+    Batched counterpart of `isGraphFullyConnected`. The nodes connected to the first node are expanded
+    with batched matrix-vector products until no more nodes are added.
+
+    Returns:
+        fully_connected (Tensor):
+            Boolean tensor indicating whether each of the graphs is fully connected.
+    """
+    adjacency = (affinity_mats != 0).float()
+    connected_nodes = torch.zeros(adjacency.shape[:2], dtype=torch.bool, device=adjacency.device)
+    connected_nodes[:, 0] = True
+    for _ in range(adjacency.shape[1]):
+        neighbors = torch.bmm(adjacency, connected_nodes.float().unsqueeze(2)).squeeze(2) > 0
+        new_connected_nodes = connected_nodes | neighbors
+        if torch.equal(new_connected_nodes, connected_nodes):
+            break
+        connected_nodes = new_connected_nodes
+    return connected_nodes.sum(dim=1) == mat_sizes.to(adjacency.device)
+
+
 def getRepeatedList(mapping_argmat: torch.Tensor, score_mat_size: torch.Tensor) -> torch.Tensor:
     """
     Count the numbers in the mapping dictionary and create lists that contain
@@ -414,6 +495,34 @@ def get_argmin_mat(timestamps_in_scales: List[torch.Tensor]) -> List[torch.Tenso
     return session_scale_mapping_list
 
 
+def get_argmin_mat_sorted(timestamps_in_scales: List[torch.Tensor]) -> List[torch.Tensor]:
+    """
+    Memory-efficient version of `get_argmin_mat` for timestamps sorted in time. Instead of building a
+    (Number of base segments) x (Number of segments) distance matrix for each scale, the closest segment
+    is found with a binary search, which keeps the mapping linear in the session length.
+
+    Args:
+        timestamps_in_scales (list):
+            List containing timestamp tensors for each scale.
+            Each tensor has dimensions of (Number of segments) x 2.
+
+    Returns:
+        session_scale_mapping_list (list):
+            List containing argmin arrays indexed by scale index.
+    """
+    base_scale_anchor = torch.mean(timestamps_in_scales[-1], dim=1).contiguous()
+    session_scale_mapping_list = []
+    for time_stamps_float in timestamps_in_scales:
+        curr_scale_anchor = torch.mean(time_stamps_float, dim=1).contiguous()
+        right = torch.searchsorted(curr_scale_anchor, base_scale_anchor).clamp(max=curr_scale_anchor.shape[0] - 1)
+        left = (right - 1).clamp(min=0)
+        left_dist = torch.abs(curr_scale_anchor[left] - base_scale_anchor)
+        right_dist = torch.abs(curr_scale_anchor[right] - base_scale_anchor)
+        # Ties are resolved to the earlier segment, as `torch.argmin` does in `get_argmin_mat`.
+        session_scale_mapping_list.append(torch.where(left_dist <= right_dist, left, right))
+    return session_scale_mapping_list
+
+
 def getCosAffinityMatrix(emb: torch.Tensor) -> torch.Tensor:
     """
     Calculate cosine similarity values among speaker embeddings then min-max normalize
@@ -529,6 +638,120 @@ def getMultiScaleCosAffinityMatrix(
     return fused_sim_d
 
 
+class ChunkedMultiScaleCosAffinity:
+    """
+    Compute blocks of the fused multi-scale affinity matrix of `getMultiScaleCosAffinityMatrix` on demand,
+    without materializing the N x N matrix for each scale. The min-max normalization statistics of each scale
+    are gathered in chunks of rows beforehand, so any block is identical to the corresponding block of the
+    dense fused matrix. This is used for building k-nearest-neighbor graphs of long sessions.
+    """
+
+    def __init__(
+        self,
+        multiscale_weights: torch.Tensor,
+        embeddings_in_scales: List[torch.Tensor],
+        timestamps_in_scales: List[torch.Tensor],
+        chunk_size: int = 1024,
+        device: torch.device = torch.device('cpu'),
+    ):
+        """
+        Args:
+            multiscale_weights (Tensor):
+                Tensor containing multiscale weights
+                Dimensions: (Number of scales) x 1
+            embeddings_in_scales (list):
+                List containing split embedding tensors by each scale
+            timestamps_in_scales (list):
+                List containing split timestamps tensors by each scale
+            chunk_size (int):
+                The number of rows of the affinity matrix that are computed at once.
+            device (torch.device):
+                Torch device variable
+        """
+        self.chunk_size = chunk_size
+        self.device = device
+        self.multiscale_weights = torch.squeeze(multiscale_weights, dim=0).to(device)
+        self.session_scale_mapping_list = [
+            mapping_argmat.to(device) for mapping_argmat in get_argmin_mat_sorted(timestamps_in_scales)
+        ]
+        self.num_nodes = self.session_scale_mapping_list[-1].shape[0]
+        self.norm_embs_in_scales: List[torch.Tensor] = []
+        self.sim_ranges: List[Optional[Tuple[torch.Tensor, torch.Tensor]]] = []
+        for emb in embeddings_in_scales:
+            # Same precision as `getMultiScaleCosAffinityMatrix`
+            emb = emb.half().float().to(device)
+            self.norm_embs_in_scales.append(emb / (torch.norm(emb, dim=1).unsqueeze(1) + 3.5e-4))
+            self.sim_ranges.append(self._get_sim_range(self.norm_embs_in_scales[-1]))
+
+    def _get_scale_rows(self, scale_idx: int, seg_index: torch.Tensor) -> torch.Tensor:
+        """
+        Calculate the min-max normalized cosine similarity between the given segments and all the segments of a scale.
+        """
+        norm_emb = self.norm_embs_in_scales[scale_idx]
+        if self.sim_ranges[scale_idx] is None:
+            return torch.ones(seg_index.shape[0], norm_emb.shape[0], device=self.device)
+        sim = torch.mm(norm_emb[seg_index], norm_emb.t())
+        sim[torch.arange(seg_index.shape[0], device=self.device), seg_index] = 1
+        v_min, v_max = self.sim_ranges[scale_idx]
+        return (sim - v_min) / (v_max - v_min)
+
+    def _get_sim_range(self, norm_emb: torch.Tensor) -> Optional[Tuple[torch.Tensor, torch.Tensor]]:
+        """
+        Calculate the min and max values of the cosine similarity matrix of a scale chunk by chunk.
+        """
+        if norm_emb.shape[0] == 1:
+            return None
+        v_min, v_max = torch.tensor(1.0, device=self.device), torch.tensor(1.0, device=self.device)
+        for start in range(0, norm_emb.shape[0], self.chunk_size):
+            seg_index = torch.arange(start, min(start + self.chunk_size, norm_emb.shape[0]), device=self.device)
+            sim = torch.mm(norm_emb[seg_index], norm_emb.t())
+            sim[torch.arange(seg_index.shape[0], device=self.device), seg_index] = 1
+            v_min, v_max = torch.minimum(v_min, sim.min()), torch.maximum(v_max, sim.max())
+        return v_min, v_max
+
+    def getBlock(self, row_index: torch.Tensor, col_index: torch.Tensor) -> torch.Tensor:
+        """
+        Calculate the block of the fused affinity matrix for the given base-scale row and column indices.
+
+        Args:
+            row_index (Tensor):
+                Base-scale segment indices of the rows.
+            col_index (Tensor):
+                Base-scale segment indices of the columns.
+
+        Returns:
+            fused_sim_d (Tensor):
+                The fused affinity values. Dimensions: len(row_index) x len(col_index)
+        """
+        row_index, col_index = row_index.to(self.device), col_index.to(self.device)
+        fused_sim_d = torch.zeros(row_index.shape[0], col_index.shape[0], device=self.device)
+        for scale_idx, mapping_argmat in enumerate(self.session_scale_mapping_list):
+            scale_rows = self._get_scale_rows(scale_idx, mapping_argmat[row_index])
+            fused_sim_d += self.multiscale_weights[scale_idx] * scale_rows[:, mapping_argmat[col_index]]
+        return fused_sim_d
+
+    def getKneighbors(self, p_value: int) -> torch.Tensor:
+        """
+        Find the `p_value` nodes with the highest fused affinity for each base-scale segment.
+
+        Args:
+            p_value (int):
+                The number of nearest neighbors to be found for each node.
+
+        Returns:
+            knn_indices (Tensor):
+                Indices of the nearest neighbors sorted by decreasing affinity.
+                Dimensions: (Number of base-scale segments) x p_value
+        """
+        p_value = min(int(p_value), self.num_nodes)
+        col_index = torch.arange(self.num_nodes, device=self.device)
+        knn_indices = []
+        for start in range(0, self.num_nodes, self.chunk_size):
+            row_index = col_index[start : start + self.chunk_size]
+            knn_indices.append(torch.topk(self.getBlock(row_index, col_index), k=p_value, dim=1).indices)
+        return torch.cat(knn_indices)
+
+
 def getLaplacian(X: torch.Tensor) -> torch.Tensor:
     """
     Calculate a laplacian matrix from an affinity matrix X.
@@ -540,6 +763,40 @@ def getLaplacian(X: torch.Tensor) -> torch.Tensor:
     return L
 
 
+def getSparseLaplacian(X: torch.Tensor) -> torch.Tensor:
+    """
+    Calculate a sparse laplacian matrix from a sparse affinity matrix X.
+    """
+    X = X.coalesce()
+    indices, values = X.indices(), X.values()
+    off_diagonal = indices[0] != indices[1]
+    indices, values = indices[:, off_diagonal], values[off_diagonal]
+    D = torch.zeros(X.shape[0], dtype=values.dtype, device=values.device).index_add_(0, indices[0], values.abs())
+    diag_indices = torch.arange(X.shape[0], device=values.device).repeat(2, 1)
+    L = torch.sparse_coo_tensor(
+        torch.cat([indices, diag_indices], dim=1), torch.cat([-values, D]), X.shape, dtype=values.dtype
+    )
+    return L.coalesce()
+
+
+def getBatchedLaplacian(X: torch.Tensor, mat_sizes: torch.Tensor) -> torch.Tensor:
+    """
+    Calculate laplacian matrices from a batch of zero-padded affinity matrices X. The diagonal of the padded
+    nodes is set to a value larger than any eigenvalue of the valid part, so the eigenvalues of each matrix
+    in ascending order start with the eigenvalues of its unpadded laplacian and the eigenvectors of those
+    are zero on the padded nodes.
+    """
+    max_size = X.shape[1]
+    X = X.clone()
+    X.diagonal(dim1=1, dim2=2).fill_(0)
+    D = torch.sum(torch.abs(X), dim=2)
+    # Eigenvalues of a laplacian are bounded by twice the maximum degree, which is below the matrix size.
+    padded = torch.arange(max_size, device=X.device).unsqueeze(0) >= mat_sizes.to(X.device).unsqueeze(1)
+    D = D + 2.0 * max_size * padded.float()
+    L = torch.diag_embed(D) - X
+    return L
+
+
 def eigDecompose(laplacian: torch.Tensor, cuda: bool, device: torch.device) -> Tuple[torch.Tensor, torch.Tensor]:
     """
     Calculate eigenvalues and eigenvectors from the Laplacian matrix.
@@ -568,6 +825,52 @@ def eigValueSh(laplacian: torch.Tensor, cuda: bool, device: torch.device) -> tor
     return lambdas
 
 
+def eigDecomposeSparse(
+    laplacian: torch.Tensor, n_eigs: int, random_state: int = 0, niter: int = 1000, tol: Optional[float] = None
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Calculate the `n_eigs` smallest eigenvalues and the corresponding eigenvectors of a sparse Laplacian matrix
+    with LOBPCG, a block Krylov (Lanczos-type) solver that only needs sparse matrix products. The matrix is never
+    densified, except for matrices too small for LOBPCG (fewer than 3 * n_eigs rows), which use `eigh`.
+
+    Args:
+        laplacian (Tensor):
+            Sparse COO Laplacian matrix.
+        n_eigs (int):
+            The number of eigenpairs to be calculated.
+        random_state (int):
+            Seed for the random initial guess of the eigenvectors.
+        niter (int):
+            The maximum number of LOBPCG iterations.
+        tol (float or None):
+            Residual tolerance for the convergence of LOBPCG. If None, the default of `torch.lobpcg` is used.
+
+    Returns:
+        lambdas (Tensor):
+            The `n_eigs` smallest eigenvalues in ascending order.
+        diffusion_map (Tensor):
+            The eigenvectors corresponding to `lambdas`. Dimensions: (Number of nodes) x n_eigs
+    """
+    n_nodes = laplacian.shape[0]
+    if n_nodes < 3 * n_eigs:
+        lambdas, diffusion_map = eigh(laplacian.to_dense())
+        return lambdas[:n_eigs], diffusion_map[:, :n_eigs]
+    generator = torch.Generator(device=laplacian.device).manual_seed(random_state)
+    init_vectors = torch.randn(n_nodes, n_eigs, generator=generator, dtype=laplacian.dtype, device=laplacian.device)
+    # Jacobi (inverse degree) preconditioner speeds up the convergence on graphs with uneven degrees.
+    diag_indices = torch.arange(n_nodes, device=laplacian.device).repeat(2, 1)
+    degree = torch.zeros(n_nodes, dtype=laplacian.dtype, device=laplacian.device)
+    laplacian_indices = laplacian.indices()
+    on_diagonal = laplacian_indices[0] == laplacian_indices[1]
+    degree[laplacian_indices[0, on_diagonal]] = laplacian.values()[on_diagonal]
+    preconditioner = torch.sparse_coo_tensor(diag_indices, 1.0 / degree.clamp(min=0.5), (n_nodes, n_nodes))
+    lambdas, diffusion_map = torch.lobpcg(
+        laplacian, X=init_vectors, iK=preconditioner, niter=niter, tol=tol, largest=False
+    )
+    sorted_idx = torch.argsort(lambdas)
+    return lambdas[sorted_idx], diffusion_map[:, sorted_idx]
+
+
 def getLamdaGaplist(lambdas: torch.Tensor) -> torch.Tensor:
     """
     Calculate the gaps between lambda values.
@@ -823,6 +1126,24 @@ class SpectralClustering:
 
         """
         spectral_emb = self.getSpectralEmbeddings(affinity, n_spks=self.n_clusters, cuda=cuda)
+        return self.kmeansMajorityVote(spectral_emb, device=device)
+
+    def kmeansMajorityVote(
+        self, spectral_emb: torch.Tensor, device: torch.device = torch.device('cpu')
+    ) -> torch.Tensor:
+        """
+        Run k-means clustering on the given spectral embeddings (self.n_random_trials) times and take a majority vote.
+
+        Args:
+            spectral_emb (Tensor):
+                Spectral embeddings. Dimensions: (Number of segments) x (self.n_clusters)
+            device (torch.device):
+                Torch device variable
+
+        Returns:
+            labels (Tensor):
+                clustering label output
+        """
         labels_set = []
 
         for random_state_seed in range(self.random_state, self.random_state + self.n_random_trials):
@@ -859,6 +1180,34 @@ class SpectralClustering:
         return embedding[:n_spks].T
 
 
+class SparseSpectralClustering(SpectralClustering):
+    """
+    Spectral clustering on a sparse affinity graph (see `getSparseAffinityGraphMat`). Only the `n_clusters`
+    eigenvectors of the Laplacian with the smallest eigenvalues are calculated with `eigDecomposeSparse`,
+    so the memory usage grows with the number of graph edges instead of N^2.
+    """
+
+    def getSpectralEmbeddings(self, affinity_mat: torch.Tensor, n_spks: int = 8, cuda: bool = False) -> torch.Tensor:
+        """
+        Calculate the leading eigenvectors of the sparse Laplacian matrix to extract spectral embeddings.
+
+        Args:
+            affinity_mat (Tensor):
+                Sparse COO affinity matrix input
+            n_spks (int):
+                The number of eigenvectors to be calculated.
+            cuda (torch.bool):
+                Unused, the eigenvectors are calculated on the device of `affinity_mat`.
+
+        Returns:
+            embedding (Tensor):
+                Spectral embeddings in the same (reversed) order as `SpectralClustering.getSpectralEmbeddings`.
+        """
+        laplacian = getSparseLaplacian(affinity_mat)
+        _, diffusion_map = eigDecomposeSparse(laplacian, n_eigs=n_spks, random_state=self.random_state)
+        return torch.flip(diffusion_map, dims=[1]).float()
+
+
 class NMESC:
     """
     Normalized Maximum Eigengap based Spectral Clustering (NME-SC)
@@ -1121,6 +1470,150 @@ class NMESC:
         return p_value_list
 
 
+class BatchNMESC:
+    """
+    Batched counterpart of `NMESC` that runs NME analysis on the affinity matrices of several sessions at once.
+    Each matrix is subsampled and given a p-value list exactly as in `NMESC`, then the matrices are zero-padded
+    into one tensor. The p-value sweep is evaluated for all the sessions together, one batched eigendecomposition
+    per p-value index, so the number of eigensolver calls does not grow with the number of sessions.
+
+    Args:
+        Please refer to `NMESC.__init__()`. `mats` and `max_num_speakers` are given for each session.
+    """
+
+    def __init__(
+        self,
+        mats: List[torch.Tensor],
+        max_num_speakers: List[int],
+        max_rp_threshold: float = 0.15,
+        sparse_search: bool = True,
+        sparse_search_volume: int = 30,
+        nme_mat_size: int = 512,
+        use_subsampling_for_nme: bool = True,
+        fixed_thres: float = -1.0,
+        maj_vote_spk_count: bool = False,
+        cuda: bool = False,
+        device: torch.device = torch.device('cpu'),
+    ):
+        self.nmesc_list = [
+            NMESC(
+                mat,
+                max_num_speakers=max_spks,
+                max_rp_threshold=max_rp_threshold,
+                sparse_search=sparse_search,
+                sparse_search_volume=sparse_search_volume,
+                nme_mat_size=nme_mat_size,
+                use_subsampling_for_nme=use_subsampling_for_nme,
+                fixed_thres=fixed_thres,
+                maj_vote_spk_count=maj_vote_spk_count,
+                parallelism=False,
+                cuda=cuda,
+                device=device,
+            )
+            for mat, max_spks in zip(mats, max_num_speakers)
+        ]
+        self.max_num_speakers = torch.tensor(max_num_speakers)
+        self.use_subsampling_for_nme = use_subsampling_for_nme
+        self.nme_mat_size = nme_mat_size
+        self.maj_vote_spk_count = maj_vote_spk_count
+        self.eps = 1e-10
+        self.cuda = cuda
+        self.device = device
+
+    def forward(self) -> Tuple[List[torch.Tensor], List[torch.Tensor]]:
+        """
+        Run NME analysis for all the sessions.
+
+        Returns:
+            est_num_of_spk_list (list):
+                Estimated number of speakers for each session
+            p_hat_value_list (list):
+                Estimated p-value for each session
+        """
+        subsample_ratios = []
+        for nmesc in self.nmesc_list:
+            if self.use_subsampling_for_nme:
+                subsample_ratios.append(nmesc.subsampleAffinityMat(self.nme_mat_size))
+            else:
+                subsample_ratios.append(torch.tensor(1))
+            nmesc.p_value_list = nmesc.getPvalueList()
+
+        mat_sizes = torch.tensor([nmesc.mat.shape[0] for nmesc in self.nmesc_list])
+        max_size = int(mat_sizes.max())
+        mats = torch.zeros(len(self.nmesc_list), max_size, max_size, device=self.device)
+        for idx, nmesc in enumerate(self.nmesc_list):
+            mats[idx, : mat_sizes[idx], : mat_sizes[idx]] = nmesc.mat.to(self.device)
+        ranks = getBatchedKneighborsRanks(mats, mat_sizes)
+        del mats
+
+        # Scans the p-value lists of all the sessions together, one p-value index at a time.
+        p_volumes = torch.tensor([nmesc.p_value_list.shape[0] for nmesc in self.nmesc_list])
+        eig_ratio_lists = [torch.zeros(int(p_volume)) for p_volume in p_volumes]
+        est_num_of_spk_lists = [torch.zeros(int(p_volume)) for p_volume in p_volumes]
+        for p_idx in range(int(p_volumes.max())):
+            session_idx = torch.nonzero(p_volumes > p_idx).squeeze(1)
+            p_values = torch.stack([self.nmesc_list[idx].p_value_list[p_idx] for idx in session_idx.tolist()])
+            g_p, est_num_of_spk = self.getEigRatio(ranks[session_idx], mat_sizes[session_idx], p_values, session_idx)
+            for k, idx in enumerate(session_idx.tolist()):
+                eig_ratio_lists[idx][p_idx] = g_p[k]
+                est_num_of_spk_lists[idx][p_idx] = est_num_of_spk[k]
+
+        rp_p_values = torch.stack(
+            [nmesc.p_value_list[torch.argmin(eig_ratio_lists[idx])] for idx, nmesc in enumerate(self.nmesc_list)]
+        )
+        # Checks whether the affinity graphs are fully connected.
+        # If not, add a minimum number of connections to make them fully connected as `NMESC` does.
+        fully_connected = isBatchedGraphFullyConnected(getBatchedAffinityGraphMat(ranks, rp_p_values), mat_sizes)
+        for idx in torch.nonzero(~fully_connected.cpu()).squeeze(1).tolist():
+            nmesc = self.nmesc_list[idx]
+            _, rp_p_values[idx] = getMinimumConnection(nmesc.mat, nmesc.max_N, nmesc.p_value_list, device=self.device)
+
+        est_num_of_spk_list, p_hat_value_list = [], []
+        for idx, nmesc in enumerate(self.nmesc_list):
+            p_hat_value_list.append((subsample_ratios[idx] * rp_p_values[idx]).type(torch.int))
+            if self.maj_vote_spk_count:
+                est_num_of_spk_list.append(torch.mode(est_num_of_spk_lists[idx])[0].int())
+            else:
+                rp_index = torch.nonzero(nmesc.p_value_list == rp_p_values[idx])[0, 0]
+                est_num_of_spk_list.append(est_num_of_spk_lists[idx][rp_index].int())
+        return est_num_of_spk_list, p_hat_value_list
+
+    def getEigRatio(
+        self, ranks: torch.Tensor, mat_sizes: torch.Tensor, p_values: torch.Tensor, session_idx: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Batched counterpart of `NMESC.getEigRatio`. Calculate g_p, the ratio between the p-value and the
+        maximum eigengap, and the estimated number of speakers for one p-value per session.
+
+        Args:
+            ranks (Tensor):
+                Affinity ranks of the sessions from `getBatchedKneighborsRanks`.
+            mat_sizes (Tensor):
+                The number of valid rows in each matrix.
+            p_values (Tensor):
+                The p-value for each session.
+            session_idx (Tensor):
+                Indices of the sessions in the batch.
+
+        Returns:
+            g_p (Tensor):
+                The ratio between the p-value and the maximum eigengap for each session.
+            est_num_of_spk (Tensor):
+                The estimated number of speakers for each session.
+        """
+        laplacian = getBatchedLaplacian(getBatchedAffinityGraphMat(ranks, p_values), mat_sizes)
+        lambdas = eigvalsh(laplacian.float()).cpu()
+        lambda_gap = lambdas[:, 1:] - lambdas[:, :-1]
+        # Only the eigengaps among the first `max_num_speakers` (unpadded) eigenvalues are considered.
+        gap_limit = torch.minimum(self.max_num_speakers[session_idx], mat_sizes - 1)
+        gap_mask = torch.arange(lambda_gap.shape[1]).unsqueeze(0) < gap_limit.unsqueeze(1)
+        max_key = torch.argmax(lambda_gap.masked_fill(~gap_mask, float('-inf')), dim=1)
+        max_lambdas = lambdas.gather(1, (mat_sizes - 1).unsqueeze(1)).squeeze(1)
+        max_eig_gap = lambda_gap.gather(1, max_key.unsqueeze(1)).squeeze(1) / (max_lambdas + self.eps)
+        g_p = (p_values / mat_sizes) / (max_eig_gap + self.eps)
+        return g_p, max_key + 1
+
+
 class SpeakerClustering(torch.nn.Module):
     def __init__(
         self,
@@ -1385,3 +1878,228 @@ class SpeakerClustering(torch.nn.Module):
             kmeans_random_trials=kmeans_random_trials,
             fixed_thres=fixed_thres,
         )
+
+    def forward_infer_batch(
+        self,
+        embeddings_in_scales: List[torch.Tensor],
+        timestamps_in_scales: List[torch.Tensor],
+        multiscale_segment_counts: List[torch.LongTensor],
+        multiscale_weights: List[torch.Tensor],
+        oracle_num_speakers: Optional[List[int]] = None,
+        max_num_speakers: int = 8,
+        max_rp_threshold: float = 0.15,
+        enhanced_count_thres: int = 40,
+        sparse_search_volume: int = 30,
+        fixed_thres: float = -1.0,
+        kmeans_random_trials: int = 1,
+    ) -> List[torch.LongTensor]:
+        """
+        Batched counterpart of `forward_infer` for many short sessions. The affinity matrices of the sessions are
+        zero-padded into one tensor, the NME p-value sweep is run with `BatchNMESC` and the spectral embeddings of
+        all the sessions are obtained with a single batched eigendecomposition. Only k-means runs per session.
+        Sessions with `min_samples_for_nmesc` segments or less are clustered with `forward_infer`.
+        This method is not part of the TorchScript module.
+
+        Args:
+            embeddings_in_scales (list):
+                List of concatenated multiscale embeddings, one tensor per session.
+            timestamps_in_scales (list):
+                List of concatenated multiscale timestamps, one tensor per session.
+            multiscale_segment_counts (list):
+                List of the number of segments for each scale, one tensor per session.
+            multiscale_weights (list):
+                List of multiscale weights, one tensor per session.
+            oracle_num_speakers (list or None):
+                The number of speakers in each session, or -1 if unknown. If None, the number of speakers is
+                estimated for all the sessions.
+            For the other arguments, please refer to `forward_infer`.
+
+        Returns:
+            (list): Speaker labels for the segments of each session.
+        """
+        num_sessions = len(embeddings_in_scales)
+        if oracle_num_speakers is None:
+            oracle_num_speakers = [-1] * num_sessions
+        labels_list: List[Optional[torch.LongTensor]] = [None] * num_sessions
+        batch_idx, mats, max_num_speakers_list, est_num_of_spk_enhanced_list = [], [], [], []
+        for idx, num_speakers in enumerate(oracle_num_speakers):
+            embs, timestamps = split_input_data(
+                embeddings_in_scales[idx], timestamps_in_scales[idx], multiscale_segment_counts[idx]
+            )
+            emb = embs[-1]
+            if emb.shape[0] <= self.min_samples_for_nmesc:
+                labels_list[idx] = self.forward_infer(
+                    embeddings_in_scales=embeddings_in_scales[idx],
+                    timestamps_in_scales=timestamps_in_scales[idx],
+                    multiscale_segment_counts=multiscale_segment_counts[idx],
+                    multiscale_weights=multiscale_weights[idx],
+                    oracle_num_speakers=num_speakers,
+                    max_num_speakers=max_num_speakers,
+                    max_rp_threshold=max_rp_threshold,
+                    enhanced_count_thres=enhanced_count_thres,
+                    sparse_search_volume=sparse_search_volume,
+                    fixed_thres=fixed_thres,
+                    kmeans_random_trials=kmeans_random_trials,
+                )
+                continue
+            elif emb.shape[0] <= enhanced_count_thres and num_speakers < 0:
+                est_num_of_spk_enhanced_list.append(getEnhancedSpeakerCount(emb=emb, cuda=self.cuda))
+            else:
+                est_num_of_spk_enhanced_list.append(torch.tensor(-1))
+            batch_idx.append(idx)
+            # As in `forward_infer`, the oracle number of speakers replaces `max_num_speakers`.
+            max_num_speakers_list.append(num_speakers if num_speakers > 0 else max_num_speakers)
+            mats.append(
+                getMultiScaleCosAffinityMatrix(
+                    multiscale_weights=multiscale_weights[idx],
+                    embeddings_in_scales=embs,
+                    timestamps_in_scales=timestamps,
+                    device=self.device,
+                )
+            )
+        if len(batch_idx) == 0:
+            return labels_list
+
+        nmesc = BatchNMESC(
+            mats,
+            max_num_speakers=max_num_speakers_list,
+            max_rp_threshold=max_rp_threshold,
+            sparse_search=self.sparse_search,
+            sparse_search_volume=sparse_search_volume,
+            nme_mat_size=self.nme_mat_size,
+            fixed_thres=fixed_thres,
+            maj_vote_spk_count=self.maj_vote_spk_count,
+            cuda=self.cuda,
+            device=self.device,
+        )
+        est_num_of_spk_list, p_hat_value_list = nmesc.forward()
+
+        mat_sizes = torch.tensor([mat.shape[0] for mat in mats])
+        max_size = int(mat_sizes.max())
+        padded_mats = torch.zeros(len(mats), max_size, max_size, device=self.device)
+        for k, mat in enumerate(mats):
+            padded_mats[k, : mat_sizes[k], : mat_sizes[k]] = mat
+        affinity_mats = getBatchedAffinityGraphMat(
+            getBatchedKneighborsRanks(padded_mats, mat_sizes), torch.stack(p_hat_value_list)
+        )
+        del padded_mats
+        _, diffusion_maps = eigh(getBatchedLaplacian(affinity_mats, mat_sizes).float())
+
+        for k, idx in enumerate(batch_idx):
+            # `n_clusters` is number of speakers estimated from spectral clustering.
+            if oracle_num_speakers[idx] > 0:
+                n_clusters = int(oracle_num_speakers[idx])
+            elif est_num_of_spk_enhanced_list[k] > 0:
+                n_clusters = int(est_num_of_spk_enhanced_list[k].item())
+            else:
+                n_clusters = int(est_num_of_spk_list[k].item())
+            spectral_model = SpectralClustering(
+                n_clusters=n_clusters, n_random_trials=kmeans_random_trials, cuda=self.cuda, device=self.device
+            )
+            # Same column order as `SpectralClustering.getSpectralEmbeddings`
+            spectral_emb = torch.flip(diffusion_maps[k, : mat_sizes[k], :n_clusters], dims=[1])
+            labels_list[idx] = spectral_model.kmeansMajorityVote(spectral_emb, device=self.device)
+        return labels_list
+
+
+class SparseSpeakerClustering:
+    """
+    Speaker clustering for long sessions that never builds N x N matrices. The p-value and the number of speakers
+    are estimated by NME analysis on the subsampled affinity matrix, exactly as `SpeakerClustering` does with
+    `nme_mat_size`, but the subsampled matrix is computed directly from the embeddings. The full-resolution graph
+    is then built from the top-p cosine neighbors of each segment and clustered with `SparseSpectralClustering`,
+    so multi-hour sessions can be clustered in one pass instead of being split by `LongFormSpeakerClustering`.
+    """
+
+    def __init__(
+        self,
+        nme_mat_size: int = 512,
+        sparse_search: bool = True,
+        maj_vote_spk_count: bool = False,
+        chunk_size: int = 1024,
+        cuda: bool = False,
+    ):
+        """
+        Args:
+            nme_mat_size (int):
+                The targeted matrix size for NME analysis.
+            sparse_search (bool):
+                Toggle sparse search mode. If True, limit the size of p_value_list to sparse_search_volume.
+            maj_vote_spk_count (bool):
+                If True, take a majority vote on all p-values in the given range to estimate the number of speakers.
+            chunk_size (int):
+                The number of affinity matrix rows computed at once while searching the nearest neighbors.
+            cuda (bool):
+                Boolean variable for toggling cuda availability.
+        """
+        self.nme_mat_size = nme_mat_size
+        self.sparse_search = sparse_search
+        self.maj_vote_spk_count = maj_vote_spk_count
+        self.chunk_size = chunk_size
+        self.cuda = cuda
+        self.embeddings_in_scales: List[torch.Tensor] = [torch.Tensor(0)]
+        self.timestamps_in_scales: List[torch.Tensor] = [torch.Tensor(0)]
+        self.device = torch.device("cuda") if self.cuda else torch.device("cpu")
+
+    def forward_infer(
+        self,
+        embeddings_in_scales: torch.Tensor,
+        timestamps_in_scales: torch.Tensor,
+        multiscale_segment_counts: torch.LongTensor,
+        multiscale_weights: torch.Tensor,
+        oracle_num_speakers: int = -1,
+        max_num_speakers: int = 8,
+        max_rp_threshold: float = 0.15,
+        sparse_search_volume: int = 30,
+        fixed_thres: float = -1.0,
+        kmeans_random_trials: int = 1,
+    ) -> torch.LongTensor:
+        """
+        Estimate the p-value and the number of speakers on the subsampled affinity matrix and perform sparse
+        spectral clustering on the k-nearest-neighbor graph of all the base-scale segments.
+        See `SpeakerClustering.forward_infer` for the description of the arguments.
+
+        Returns:
+            (LongTensor): Speaker labels for the segments in the provided input embeddings.
+        """
+        self.embeddings_in_scales, self.timestamps_in_scales = split_input_data(
+            embeddings_in_scales, timestamps_in_scales, multiscale_segment_counts
+        )
+        num_nodes = self.embeddings_in_scales[-1].shape[0]
+        if num_nodes == 1:
+            return torch.zeros((1,), dtype=torch.int64)
+
+        if oracle_num_speakers > 0:
+            max_num_speakers = oracle_num_speakers
+
+        affinity = ChunkedMultiScaleCosAffinity(
+            multiscale_weights=multiscale_weights,
+            embeddings_in_scales=self.embeddings_in_scales,
+            timestamps_in_scales=self.timestamps_in_scales,
+            chunk_size=self.chunk_size,
+            device=self.device,
+        )
+        subsample_ratio = max(1, int(num_nodes / self.nme_mat_size))
+        subsample_index = torch.arange(0, num_nodes, subsample_ratio)
+        nmesc = NMESC(
+            affinity.getBlock(subsample_index, subsample_index),
+            max_num_speakers=max_num_speakers,
+            max_rp_threshold=max_rp_threshold,
+            sparse_search=self.sparse_search,
+            sparse_search_volume=sparse_search_volume,
+            use_subsampling_for_nme=False,
+            fixed_thres=fixed_thres,
+            maj_vote_spk_count=self.maj_vote_spk_count,
+            parallelism=False,
+            cuda=self.cuda,
+            device=self.device,
+        )
+        est_num_of_spk, rp_p_value = nmesc.forward()
+        p_hat_value = min(subsample_ratio * int(rp_p_value.item()), num_nodes)
+
+        affinity_graph = getSparseAffinityGraphMat(affinity.getKneighbors(p_hat_value), p_hat_value)
+        n_clusters = int(oracle_num_speakers) if oracle_num_speakers > 0 else int(est_num_of_spk.item())
+        spectral_model = SparseSpectralClustering(
+            n_clusters=n_clusters, n_random_trials=kmeans_random_trials, cuda=self.cuda, device=self.device
+        )
+        return spectral_model.forward(affinity_graph)
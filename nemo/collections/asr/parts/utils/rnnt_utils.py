@@ -687,3 +687,217 @@ def batched_hyps_to_hypotheses(
                     )
                 start += timestep_cnt
     return hypotheses
+
+
+class BatchedBeamHyps:
+    """
+    Class to store the hypotheses of a batched beam search (labels, time indices, scores) for efficient RNNT/TDT
+    decoding. All hypotheses of all utterances are kept in tensors of shape [batch_size, beam_size, ...].
+
+    Every decoding step extends every hypothesis by one element (a label, a blank, or a placeholder for finished
+    hypotheses), so instead of copying transcripts when beams are reordered, each step stores the labels together with
+    the index of the hypothesis (in the previous step) they extend. Transcripts are reconstructed by following these
+    pointers back from the last step.
+    """
+
+    INACTIVE_SCORE = float("-inf")
+    # label stored for the steps in which a hypothesis was not extended (it has already reached the end of utterance)
+    NON_EXISTENT_LABEL = -1
+    # modulus and multiplier of the polynomial hash of the transcripts, used for recombination of hypotheses
+    _HASH_MODULUS = 2**31 - 1
+    _HASH_MULTIPLIER = 1000003
+
+    def __init__(
+        self,
+        batch_size: int,
+        beam_size: int,
+        init_length: int,
+        blank_index: int,
+        device: Optional[torch.device] = None,
+        float_dtype: Optional[torch.dtype] = None,
+    ):
+        """
+
+        Args:
+            batch_size: batch size for hypotheses
+            beam_size: number of hypotheses for each utterance in the batch
+            init_length: initial estimate for the number of decoding steps (if the real number is higher,
+                tensors will be reallocated)
+            blank_index: index of the blank label
+            device: device for storing hypotheses
+            float_dtype: float type for scores
+        """
+        if init_length <= 0:
+            raise ValueError(f"init_length must be > 0, got {init_length}")
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be > 0, got {batch_size}")
+        if beam_size <= 0:
+            raise ValueError(f"beam_size must be > 0, got {beam_size}")
+        self.batch_size = batch_size
+        self.beam_size = beam_size
+        self.blank_index = blank_index
+        self._max_length = init_length
+        # number of decoding steps stored so far (the same for all hypotheses)
+        self.current_length = 0
+
+        # accumulated scores for hypotheses; initially there is a single (empty) hypothesis for each utterance
+        self.scores = torch.full((batch_size, beam_size), self.INACTIVE_SCORE, device=device, dtype=float_dtype)
+        self.scores[:, 0] = 0.0
+        # labels (including blanks) for each decoding step
+        self.transcript_wb = torch.full(
+            (batch_size, beam_size, self._max_length), self.NON_EXISTENT_LABEL, device=device, dtype=torch.long
+        )
+        # index of the hypothesis (in the previous step) extended by the label of each decoding step
+        self.transcript_wb_prev_ptr = torch.full(
+            (batch_size, beam_size, self._max_length), -1, device=device, dtype=torch.long
+        )
+        # time index and predicted duration (for TDT models) for each decoding step
+        self.timesteps = torch.zeros((batch_size, beam_size, self._max_length), device=device, dtype=torch.long)
+        self.token_durations = torch.zeros((batch_size, beam_size, self._max_length), device=device, dtype=torch.long)
+
+        # number of non-blank labels in each hypothesis, and a hash of these labels
+        self.current_lengths_nb = torch.zeros((batch_size, beam_size), device=device, dtype=torch.long)
+        self.transcript_hash = torch.zeros((batch_size, beam_size), device=device, dtype=torch.long)
+        # last observed timestep (with label) for each hypothesis and the number of labels for this timestep,
+        # to restrict the number of symbols per frame
+        self.last_timestep = torch.full((batch_size, beam_size), -1, device=device, dtype=torch.long)
+        self.last_timestep_lasts = torch.zeros((batch_size, beam_size), device=device, dtype=torch.long)
+
+        self._beam_indices = torch.arange(beam_size, device=device)
+
+    def _allocate_more(self):
+        """
+        Allocate 2x space for tensors, similar to common C++ std::vector implementations
+        to maintain O(1) insertion time complexity
+        """
+        self.transcript_wb = torch.cat(
+            (self.transcript_wb, torch.full_like(self.transcript_wb, self.NON_EXISTENT_LABEL)), dim=-1
+        )
+        self.transcript_wb_prev_ptr = torch.cat(
+            (self.transcript_wb_prev_ptr, torch.full_like(self.transcript_wb_prev_ptr, -1)), dim=-1
+        )
+        self.timesteps = torch.cat((self.timesteps, torch.zeros_like(self.timesteps)), dim=-1)
+        self.token_durations = torch.cat((self.token_durations, torch.zeros_like(self.token_durations)), dim=-1)
+        self._max_length *= 2
+
+    def add_results_(
+        self,
+        next_indices: torch.Tensor,
+        next_labels: torch.Tensor,
+        next_hyps_scores: torch.Tensor,
+        time_indices: torch.Tensor,
+        token_durations: Optional[torch.Tensor] = None,
+    ):
+        """
+        Add results (inplace) from a decoding step to the batched hypotheses.
+        All tensors are of shape [batch_size, beam_size].
+        Args:
+            next_indices: indices of the hypotheses (in the previous step) that are extended
+            next_labels: labels extending the hypotheses (blank, non-blank or NON_EXISTENT_LABEL)
+            next_hyps_scores: scores of the extended hypotheses
+            time_indices: time index for each label
+            token_durations: predicted durations for each label by TDT head
+        """
+        if self.current_length >= self._max_length:
+            self._allocate_more()
+
+        self.transcript_wb[..., self.current_length] = next_labels
+        self.transcript_wb_prev_ptr[..., self.current_length] = next_indices
+        self.timesteps[..., self.current_length] = time_indices
+        if token_durations is not None:
+            self.token_durations[..., self.current_length] = token_durations
+        self.current_length += 1
+
+        self.scores = next_hyps_scores
+        is_label = torch.logical_and(next_labels >= 0, next_labels != self.blank_index)
+        prev_lengths_nb = torch.gather(self.current_lengths_nb, dim=1, index=next_indices)
+        prev_hash = torch.gather(self.transcript_hash, dim=1, index=next_indices)
+        prev_last_timestep = torch.gather(self.last_timestep, dim=1, index=next_indices)
+        prev_last_timestep_lasts = torch.gather(self.last_timestep_lasts, dim=1, index=next_indices)
+
+        self.current_lengths_nb = prev_lengths_nb + is_label
+        self.transcript_hash = torch.where(
+            is_label, (prev_hash * self._HASH_MULTIPLIER + next_labels + 1) % self._HASH_MODULUS, prev_hash
+        )
+        # store last observed timestep + number of observation for the current timestep
+        self.last_timestep_lasts = torch.where(
+            is_label,
+            torch.where(prev_last_timestep == time_indices, prev_last_timestep_lasts + 1, 1),
+            prev_last_timestep_lasts,
+        )
+        self.last_timestep = torch.where(is_label, time_indices, prev_last_timestep)
+
+    def recombine_hyps_(self, time_indices: torch.Tensor):
+        """
+        Merge (inplace) hypotheses of the same utterance with the same transcript and the same time index: the score of
+        the first of them (the best one, since hypotheses are sorted by score after top-k selection) becomes the
+        log-sum-exp of their scores, and the others become inactive.
+        Args:
+            time_indices: time index for each hypothesis, of shape [batch_size, beam_size]
+        """
+        same_hyps = (
+            (self.transcript_hash.unsqueeze(-1) == self.transcript_hash.unsqueeze(-2))
+            & (self.current_lengths_nb.unsqueeze(-1) == self.current_lengths_nb.unsqueeze(-2))
+            & (time_indices.unsqueeze(-1) == time_indices.unsqueeze(-2))
+        )  # [B, beam, beam]
+        # the first (best) hypothesis of each group of equal hypotheses keeps the merged score
+        first_in_group = same_hyps.int().argmax(dim=-1) == self._beam_indices
+        merged_scores = torch.logsumexp(
+            torch.where(same_hyps, self.scores.unsqueeze(-2), self.INACTIVE_SCORE), dim=-1
+        ).to(self.scores.dtype)
+        self.scores = torch.where(first_in_group, merged_scores, self.INACTIVE_SCORE)
+
+    def to_hyps_list(self, score_norm: bool = True) -> List[List[Hypothesis]]:
+        """
+        Convert batched hypotheses to lists of Hypothesis objects, sorted by (optionally normalized) score.
+        Inactive hypotheses are dropped.
+
+        Args:
+            score_norm: if True, hypotheses are sorted by score divided by the number of labels (plus one)
+
+        Returns:
+            list (of length batch_size) of lists of Hypothesis objects
+        """
+        transcript_wb = self.transcript_wb[..., : self.current_length].cpu()
+        prev_ptr = self.transcript_wb_prev_ptr[..., : self.current_length].cpu()
+        timesteps = self.timesteps[..., : self.current_length].cpu()
+        token_durations = self.token_durations[..., : self.current_length].cpu()
+        scores = self.scores.float().cpu()
+
+        # follow the pointers back from the last step, for all hypotheses at once
+        labels = torch.empty_like(transcript_wb)
+        label_timesteps = torch.empty_like(timesteps)
+        label_durations = torch.empty_like(token_durations)
+        ptr = self._beam_indices.cpu().unsqueeze(0).expand(self.batch_size, -1)
+        for step in range(self.current_length - 1, -1, -1):
+            labels[..., step] = torch.gather(transcript_wb[..., step], dim=1, index=ptr)
+            label_timesteps[..., step] = torch.gather(timesteps[..., step], dim=1, index=ptr)
+            label_durations[..., step] = torch.gather(token_durations[..., step], dim=1, index=ptr)
+            ptr = torch.gather(prev_ptr[..., step], dim=1, index=ptr)
+        is_label = torch.logical_and(labels >= 0, labels != self.blank_index)
+
+        hyps_list = []
+        for batch_idx in range(self.batch_size):
+            hyps = []
+            for beam_idx in range(self.beam_size):
+                score = scores[batch_idx, beam_idx].item()
+                if score == self.INACTIVE_SCORE:
+                    continue
+                mask = is_label[batch_idx, beam_idx]
+                durations = label_durations[batch_idx, beam_idx][mask]
+                hyps.append(
+                    Hypothesis(
+                        score=score,
+                        y_sequence=labels[batch_idx, beam_idx][mask],
+                        timestep=label_timesteps[batch_idx, beam_idx][mask],
+                        token_duration=durations if not torch.all(durations == 0) else [],
+                        alignments=None,
+                        dec_state=None,
+                    )
+                )
+            if score_norm:
+                hyps.sort(key=lambda hyp: hyp.score / (len(hyp.y_sequence) + 1), reverse=True)
+            else:
+                hyps.sort(key=lambda hyp: hyp.score, reverse=True)
+            hyps_list.append(hyps)
+        return hyps_list
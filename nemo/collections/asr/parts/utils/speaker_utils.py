@@ -29,7 +29,12 @@ from tqdm import tqdm
 
 from nemo.collections.asr.data.audio_to_label import repeat_signal
 from nemo.collections.asr.parts.utils.longform_clustering import LongFormSpeakerClustering
-from nemo.collections.asr.parts.utils.offline_clustering import get_argmin_mat, split_input_data
+from nemo.collections.asr.parts.utils.offline_clustering import (
+    SparseSpeakerClustering,
+    SpeakerClustering,
+    get_argmin_mat,
+    split_input_data,
+)
 from nemo.utils import logging
 
 
@@ -450,7 +455,9 @@ def perform_clustering(
         clustering_params (dict):
             Clustering parameters provided through config that contains max_num_speakers (int),
             oracle_num_speakers (bool), max_rp_threshold(float), sparse_search_volume(int)
-            and enhance_count_threshold (int).
+            and enhance_count_threshold (int). Sessions with more base-scale segments than
+            sparse_affinity_thres (int) are clustered with SparseSpeakerClustering. If sessions_per_batch (int)
+            is larger than 1, short sessions are clustered in batches with SpeakerClustering.forward_infer_batch.
         use_torch_script (bool):
             Boolean that determines whether to use torch.jit.script for speaker clustering
         device (torch.device):
@@ -479,37 +486,103 @@ def perform_clustering(
         speaker_clustering = torch.jit.script(speaker_clustering)
         torch.jit.save(speaker_clustering, 'speaker_clustering_script.pt')
 
-    for uniq_id, audio_rttm_values in tqdm(AUDIO_RTTM_MAP.items(), desc='clustering', leave=True, disable=not verbose):
-        uniq_embs_and_timestamps = embs_and_timestamps[uniq_id]
+    sparse_affinity_thres = clustering_params.get('sparse_affinity_thres', -1)
+    sparse_speaker_clustering = SparseSpeakerClustering(cuda=cuda) if sparse_affinity_thres > 0 else None
 
+    num_speakers_dict = {}
+    for uniq_id, audio_rttm_values in AUDIO_RTTM_MAP.items():
         if clustering_params.oracle_num_speakers:
-            num_speakers = audio_rttm_values.get('num_speakers', None)
-            if num_speakers is None:
+            num_speakers_dict[uniq_id] = audio_rttm_values.get('num_speakers', None)
+            if num_speakers_dict[uniq_id] is None:
                 raise ValueError("Provided option as oracle num of speakers but num_speakers in manifest is null")
         else:
-            num_speakers = -1
+            num_speakers_dict[uniq_id] = -1
+
+    batched_cluster_labels = {}
+    sessions_per_batch = clustering_params.get('sessions_per_batch', 1)
+    if sessions_per_batch > 1:
+        # Sessions that need neither the sparse nor the long-form clustering are clustered in batches.
+        max_segment_count = clustering_params.get('embeddings_per_chunk', None)
+        if sparse_speaker_clustering is not None:
+            max_segment_count = min(sparse_affinity_thres, max_segment_count or sparse_affinity_thres)
+        segment_counts = {
+            uniq_id: int(embs_and_timestamps[uniq_id]['multiscale_segment_counts'].max()) for uniq_id in AUDIO_RTTM_MAP
+        }
+        batch_uniq_ids = [
+            uniq_id
+            for uniq_id in AUDIO_RTTM_MAP
+            if max_segment_count is None or segment_counts[uniq_id] <= max_segment_count
+        ]
+        # Sessions of similar lengths are batched together to reduce the padding.
+        batch_uniq_ids.sort(key=lambda uniq_id: segment_counts[uniq_id])
+        batch_speaker_clustering = SpeakerClustering(cuda=cuda)
+        for start in tqdm(
+            range(0, len(batch_uniq_ids), sessions_per_batch), desc='batch clustering', leave=True, disable=not verbose
+        ):
+            uniq_ids = batch_uniq_ids[start : start + sessions_per_batch]
+            batch_labels = batch_speaker_clustering.forward_infer_batch(
+                embeddings_in_scales=[embs_and_timestamps[uniq_id]['embeddings'] for uniq_id in uniq_ids],
+                timestamps_in_scales=[embs_and_timestamps[uniq_id]['timestamps'] for uniq_id in uniq_ids],
+                multiscale_segment_counts=[
+                    embs_and_timestamps[uniq_id]['multiscale_segment_counts'] for uniq_id in uniq_ids
+                ],
+                multiscale_weights=[embs_and_timestamps[uniq_id]['multiscale_weights'] for uniq_id in uniq_ids],
+                oracle_num_speakers=[int(num_speakers_dict[uniq_id]) for uniq_id in uniq_ids],
+                max_num_speakers=int(clustering_params.max_num_speakers),
+                max_rp_threshold=float(clustering_params.max_rp_threshold),
+                enhanced_count_thres=int(clustering_params.get('enhanced_count_thres', 80)),
+                sparse_search_volume=int(clustering_params.sparse_search_volume),
+            )
+            batched_cluster_labels.update(zip(uniq_ids, batch_labels))
 
+    for uniq_id, audio_rttm_values in tqdm(AUDIO_RTTM_MAP.items(), desc='clustering', leave=True, disable=not verbose):
+        uniq_embs_and_timestamps = embs_and_timestamps[uniq_id]
+        num_speakers = num_speakers_dict[uniq_id]
         base_scale_idx = uniq_embs_and_timestamps['multiscale_segment_counts'].shape[0] - 1
 
-        cluster_labels = speaker_clustering.forward_infer(
-            embeddings_in_scales=uniq_embs_and_timestamps['embeddings'],
-            timestamps_in_scales=uniq_embs_and_timestamps['timestamps'],
-            multiscale_segment_counts=uniq_embs_and_timestamps['multiscale_segment_counts'],
-            multiscale_weights=uniq_embs_and_timestamps['multiscale_weights'],
-            oracle_num_speakers=int(num_speakers),
-            max_num_speakers=int(clustering_params.max_num_speakers),
-            max_rp_threshold=float(clustering_params.max_rp_threshold),
-            sparse_search_volume=int(clustering_params.sparse_search_volume),
-            chunk_cluster_count=clustering_params.get('chunk_cluster_count', None),
-            embeddings_per_chunk=clustering_params.get('embeddings_per_chunk', None),
-        )
+        if uniq_id in batched_cluster_labels:
+            cluster_labels = batched_cluster_labels.pop(uniq_id)
+            _, timestamps_in_scales = split_input_data(
+                uniq_embs_and_timestamps['embeddings'],
+                uniq_embs_and_timestamps['timestamps'],
+                uniq_embs_and_timestamps['multiscale_segment_counts'],
+            )
+            timestamps = timestamps_in_scales[base_scale_idx]
+        elif (
+            sparse_speaker_clustering is not None
+            and uniq_embs_and_timestamps['multiscale_segment_counts'][-1] > sparse_affinity_thres
+        ):
+            cluster_labels = sparse_speaker_clustering.forward_infer(
+                embeddings_in_scales=uniq_embs_and_timestamps['embeddings'],
+                timestamps_in_scales=uniq_embs_and_timestamps['timestamps'],
+                multiscale_segment_counts=uniq_embs_and_timestamps['multiscale_segment_counts'],
+                multiscale_weights=uniq_embs_and_timestamps['multiscale_weights'],
+                oracle_num_speakers=int(num_speakers),
+                max_num_speakers=int(clustering_params.max_num_speakers),
+                max_rp_threshold=float(clustering_params.max_rp_threshold),
+                sparse_search_volume=int(clustering_params.sparse_search_volume),
+            )
+            timestamps = sparse_speaker_clustering.timestamps_in_scales[base_scale_idx]
+        else:
+            cluster_labels = speaker_clustering.forward_infer(
+                embeddings_in_scales=uniq_embs_and_timestamps['embeddings'],
+                timestamps_in_scales=uniq_embs_and_timestamps['timestamps'],
+                multiscale_segment_counts=uniq_embs_and_timestamps['multiscale_segment_counts'],
+                multiscale_weights=uniq_embs_and_timestamps['multiscale_weights'],
+                oracle_num_speakers=int(num_speakers),
+                max_num_speakers=int(clustering_params.max_num_speakers),
+                max_rp_threshold=float(clustering_params.max_rp_threshold),
+                sparse_search_volume=int(clustering_params.sparse_search_volume),
+                chunk_cluster_count=clustering_params.get('chunk_cluster_count', None),
+                embeddings_per_chunk=clustering_params.get('embeddings_per_chunk', None),
+            )
+            timestamps = speaker_clustering.timestamps_in_scales[base_scale_idx]
 
         del uniq_embs_and_timestamps
         if cuda:
             torch.cuda.empty_cache()
         else:
             gc.collect()
-        timestamps = speaker_clustering.timestamps_in_scales[base_scale_idx]
 
         cluster_labels = cluster_labels.cpu().numpy()
         if len(cluster_labels) != timestamps.shape[0]:
@@ -864,24 +937,135 @@ def write_rttm2manifest(
         for uniq_id in AUDIO_RTTM_MAP:
             rttm_file_path = AUDIO_RTTM_MAP[uniq_id]['rttm_filepath']
             rttm_lines = read_rttm_lines(rttm_file_path)
-            offset, duration = get_offset_and_duration(AUDIO_RTTM_MAP, uniq_id, decimals)
             vad_start_end_list_raw = []
             for line in rttm_lines:
                 start, dur = get_vad_out_from_rttm_line(line)
                 vad_start_end_list_raw.append([start, start + dur])
-            vad_start_end_list = merge_float_intervals(vad_start_end_list_raw, decimals)
-            if len(vad_start_end_list) == 0:
-                logging.warning(f"File ID: {uniq_id}: The VAD label is not containing any speech segments.")
-            elif duration <= 0:
-                logging.warning(f"File ID: {uniq_id}: The audio file has negative or zero duration.")
-            else:
-                overlap_range_list = get_sub_range_list(
-                    source_range_list=vad_start_end_list, target_range=[offset, offset + duration]
-                )
+            overlap_range_list = get_speech_range_list(AUDIO_RTTM_MAP, uniq_id, vad_start_end_list_raw, decimals)
+            if overlap_range_list:
                 write_overlap_segments(outfile, AUDIO_RTTM_MAP, uniq_id, overlap_range_list, decimals)
     return manifest_file
 
 
+def get_speech_range_list(
+    AUDIO_RTTM_MAP: dict, uniq_id: str, vad_start_end_list_raw: List[List[float]], decimals: int = 5
+) -> List[List[float]]:
+    """
+    Merge the overlapping VAD timestamps of a session and trim them with the offset and duration of the session.
+
+    Args:
+        AUDIO_RTTM_MAP (dict):
+            Dictionary containing the input manifest information, indexed by unique file id.
+        uniq_id (str):
+            Unique file id
+        vad_start_end_list_raw (list):
+            List containing the start and end time of each speech segment.
+        decimals (int):
+            Number of decimals to round the timestamps.
+
+    Returns:
+        overlap_range_list (list):
+            List containing the start and end time of the speech ranges, empty if the session has no speech.
+    """
+    offset, duration = get_offset_and_duration(AUDIO_RTTM_MAP, uniq_id, decimals)
+    vad_start_end_list = merge_float_intervals(vad_start_end_list_raw, decimals)
+    if len(vad_start_end_list) == 0:
+        logging.warning(f"File ID: {uniq_id}: The VAD label is not containing any speech segments.")
+        return []
+    elif duration <= 0:
+        logging.warning(f"File ID: {uniq_id}: The audio file has negative or zero duration.")
+        return []
+    return get_sub_range_list(source_range_list=vad_start_end_list, target_range=[offset, offset + duration])
+
+
+def get_speech_segments(
+    AUDIO_RTTM_MAP: dict, vad_start_end_lists: Dict[str, List[List[float]]], decimals: int = 5
+) -> Dict[str, torch.Tensor]:
+    """
+    In-memory version of `write_rttm2manifest`, which returns the speech segments of each session as tensors
+    instead of writing them to a manifest file.
+
+    Args:
+        AUDIO_RTTM_MAP (dict):
+            Dictionary containing the input manifest information, indexed by unique file id.
+        vad_start_end_lists (dict):
+            Dictionary containing the start and end time of the raw speech segments, indexed by unique file id.
+        decimals (int):
+            Number of decimals to round the offset and duration values.
+
+    Returns:
+        speech_segments (dict):
+            Dictionary containing a (num_segments, 2) tensor holding the offset and duration of each speech
+            segment, indexed by unique file id. Sessions without speech are left out.
+    """
+    speech_segments = {}
+    for uniq_id, vad_start_end_list_raw in vad_start_end_lists.items():
+        overlap_range_list = get_speech_range_list(AUDIO_RTTM_MAP, uniq_id, vad_start_end_list_raw, decimals)
+        segments = [[round(stt, decimals), round(end - stt, decimals)] for stt, end in overlap_range_list]
+        segments = [segment for segment in segments if segment[1] > 0]
+        if segments:
+            speech_segments[uniq_id] = torch.tensor(segments, dtype=torch.float64)
+    return speech_segments
+
+
+def get_multiscale_subsegments(
+    speech_segments: Dict[str, torch.Tensor],
+    scale_dict: Dict[int, Tuple[float, float]],
+    min_subsegment_duration: float = 0.05,
+) -> Dict[int, Dict[str, torch.Tensor]]:
+    """
+    Vectorized, in-memory version of `segments_manifest_to_subsegments_manifest`, which computes the subsegments
+    of all sessions for all scales at once. Subsegments match the ones of `get_subsegments_scriptable`.
+
+    Args:
+        speech_segments (dict):
+            Dictionary containing a (num_segments, 2) tensor holding the offset and duration of each speech
+            segment, indexed by unique file id. See `get_speech_segments`.
+        scale_dict (dict):
+            Dictionary containing the window and shift length of each scale, indexed by scale index.
+        min_subsegment_duration (float):
+            Exclude subsegments shorter than or equal to this duration value.
+
+    Returns:
+        multiscale_subsegments (dict):
+            Dictionary indexed by scale index, containing for each unique file id a (num_subsegments, 2) tensor
+            holding the start and duration of each subsegment.
+    """
+    uniq_ids = list(speech_segments.keys())
+    scale_ids = sorted(scale_dict.keys())
+    multiscale_subsegments = {scale_idx: {} for scale_idx in scale_ids}
+    if len(uniq_ids) == 0:
+        return multiscale_subsegments
+
+    segments = torch.cat([speech_segments[uniq_id].to(torch.float64).view(-1, 2) for uniq_id in uniq_ids])
+    session_counts = torch.tensor([speech_segments[uniq_id].view(-1, 2).shape[0] for uniq_id in uniq_ids])
+    session_index = torch.repeat_interleave(torch.arange(len(uniq_ids)), session_counts)
+
+    # Rows are ordered by scale, then session, then segment
+    num_segments, num_scales = segments.shape[0], len(scale_ids)
+    windows = torch.tensor([scale_dict[k][0] for k in scale_ids], dtype=torch.float64)
+    shifts = torch.tensor([scale_dict[k][1] for k in scale_ids], dtype=torch.float64)
+    windows, shifts = windows.repeat_interleave(num_segments), shifts.repeat_interleave(num_segments)
+    offsets, durations = segments[:, 0].repeat(num_scales), segments[:, 1].repeat(num_scales)
+    scale_index = torch.arange(num_scales).repeat_interleave(num_segments)
+    groups = scale_index * len(uniq_ids) + session_index.repeat(num_scales)
+
+    base = torch.ceil((durations - windows) / shifts)
+    num_slices = torch.where(base < 0, torch.ones_like(base), base + 1).long()
+    segment_index = torch.repeat_interleave(torch.arange(num_slices.shape[0]), num_slices)
+    slice_index = torch.arange(segment_index.shape[0]) - (torch.cumsum(num_slices, dim=0) - num_slices)[segment_index]
+
+    starts = offsets[segment_index] + slice_index * shifts[segment_index]
+    ends = torch.minimum(starts + windows[segment_index], (offsets + durations)[segment_index])
+    valid_mask = (ends - starts) > min_subsegment_duration
+    subsegments = torch.stack([starts, ends - starts], dim=1)[valid_mask]
+
+    keys, counts = torch.unique_consecutive(groups[segment_index][valid_mask], return_counts=True)
+    for key, chunk in zip(keys.tolist(), torch.split(subsegments, counts.tolist())):
+        multiscale_subsegments[scale_ids[key // len(uniq_ids)]][uniq_ids[key % len(uniq_ids)]] = chunk
+    return multiscale_subsegments
+
+
 def segments_manifest_to_subsegments_manifest(
     segments_manifest_file: str,
     subsegments_manifest_file: str = None,
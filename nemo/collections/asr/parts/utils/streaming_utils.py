@@ -68,67 +68,55 @@ def write_lcs_alignment_to_pickle(alignment, filepath, extras=None):
     torch.save(extras, filepath)
 
 
-def longest_common_subsequence_merge(X, Y, filepath=None):
+def _lcs_suffix_tables(Xs, Ys):
     """
-    Longest Common Subsequence merge algorithm for aligning two consecutive buffers.
-
-    Base alignment construction algorithm is Longest Common Subsequence (reffered to as LCS hear after)
-
-    LCS Merge algorithm looks at two chunks i-1 and i, determins the aligned overlap at the
-    end of i-1 and beginning of ith chunk, and then clips the subsegment of the ith chunk.
+    Builds the longest common suffix tables of a batch of token id sequence pairs.
 
-    Assumption is that the two chunks are consecutive chunks, and there exists at least small overlap acoustically.
-
-    It is a sub-word token merge algorithm, operating on the abstract notion of integer ids representing
-    the subword ids. It is independent of text or character encoding.
-
-    Since the algorithm is merge based, and depends on consecutive buffers, the very first buffer is processes using
-    the "middle tokens" algorithm.
+    The table of each pair is filled one row at a time, vectorized over the columns and over the pairs of the batch.
+    Sequences are padded with ids that never match, so that the padded region of each table stays zero.
 
-    It requires a delay of some number of tokens such that:
-        lcs_delay = math.floor(((total_buffer_in_secs - chunk_len_in_sec)) / model_stride_in_secs)
+    Args:
+        Xs: List of B token id sequences from the previous chunks.
+        Ys: List of B token id sequences from the current chunks.
 
-    Total cost of the model is O(m_{i-1} * n_{i}) where (m, n) represents the number of subword ids of the buffer.
+    Returns:
+        An integer numpy array of shape (B, max_m + 1, max_n + 1), where LCSuff[b, i, j] is the length
+        of the longest common suffix of Xs[b][:i] and Ys[b][:j].
+    """
+    max_m = max(len(X) for X in Xs)
+    max_n = max(len(Y) for Y in Ys)
+    X_ids = np.full((len(Xs), max_m), -1, dtype=np.int64)
+    Y_ids = np.full((len(Ys), max_n), -2, dtype=np.int64)
+    for b, (X, Y) in enumerate(zip(Xs, Ys)):
+        X_ids[b, : len(X)] = X
+        Y_ids[b, : len(Y)] = Y
+
+    matches = X_ids[:, :, None] == Y_ids[:, None, :]
+    LCSuff = np.zeros((len(Xs), max_m + 1, max_n + 1), dtype=np.int64)
+    for i in range(1, max_m + 1):
+        LCSuff[:, i, 1:] = np.where(matches[:, i - 1], LCSuff[:, i - 1, :-1] + 1, 0)
+    return LCSuff
+
+
+def _lcs_merge_indices(LCSuff, m, n):
+    """
+    Computes the (i, j, slice_len) merge indices from the longest common suffix table of two buffers.
 
     Args:
-        X: The subset of the previous chunk i-1, sliced such X = X[-(lcs_delay * max_steps_per_timestep):]
-            Therefore there can be at most lcs_delay * max_steps_per_timestep symbols for X, preserving computation.
-        Y: The entire current chunk i.
-        filepath: Optional filepath to save the LCS alignment matrix for later introspection.
+        LCSuff: An integer numpy array of shape (m + 1, n + 1), see `_lcs_suffix_tables`.
+        m: Number of tokens of the previous chunk.
+        n: Number of tokens of the current chunk.
 
     Returns:
-        A tuple containing -
-            - i: Start index of alignment along the i-1 chunk.
-            - j: Start index of alignment along the ith chunk.
-            - slice_len: number of tokens to slice off from the ith chunk.
-        The LCS alignment matrix itself (shape m + 1, n + 1)
+        A tuple of the list [i, j, slice_len] and whether a complete merge was found.
     """
-    # LCSuff is the table with zero
-    # value initially in each cell
-    m = len(X)
-    n = len(Y)
-    LCSuff = [[0 for k in range(n + 1)] for l in range(m + 1)]
-
-    # To store the length of
-    # longest common substring
-    result = 0
-    result_idx = [0, 0, 0]  # Contains (i, j, slice_len)
-
-    # Following steps to build
-    # LCSuff[m+1][n+1] in bottom up fashion
-    for i in range(m + 1):
-        for j in range(n + 1):
-            if i == 0 or j == 0:
-                LCSuff[i][j] = 0
-            elif X[i - 1] == Y[j - 1]:
-                LCSuff[i][j] = LCSuff[i - 1][j - 1] + 1
-
-                if result <= LCSuff[i][j]:
-                    result = LCSuff[i][j]  # max(result, LCSuff[i][j])
-                    result_idx = [i, j, result]
-
-            else:
-                LCSuff[i][j] = 0
+    # Select the longest common substring, ties are broken by the last (i, j) in row major order
+    result = int(LCSuff.max())
+    if result > 0:
+        i, j = np.unravel_index(np.flatnonzero(LCSuff == result)[-1], LCSuff.shape)
+        result_idx = [int(i), int(j), result]  # Contains (i, j, slice_len)
+    else:
+        result_idx = [0, 0, 0]
 
     # Check if perfect alignment was found or not
     # Perfect alignment is found if :
@@ -145,7 +133,7 @@ def longest_common_subsequence_merge(X, Y, filepath=None):
         # Perform backtrack to find the origin point of the slice (j) and how many tokens should be sliced
         while length >= 0 and i > 0 and j > 0:
             # Alignment exists at the required diagonal
-            if LCSuff[i - 1][j - 1] > 0:
+            if LCSuff[i - 1, j - 1] > 0:
                 length -= 1
                 i, j = i - 1, j - 1
 
@@ -180,15 +168,18 @@ def longest_common_subsequence_merge(X, Y, filepath=None):
 
         # Select leftmost LCS
         for i_idx in range(m, -1, -1):  # start from last timestep of old buffer
-            for j_idx in range(0, n + 1):  # start from first token from new buffer
-                # Select the longest LCSuff, while minimizing the index of j (token index for new buffer)
-                if LCSuff[i_idx][j_idx] > max_j and j_idx <= max_j_idx:
-                    max_j = LCSuff[i_idx][j_idx]
-                    max_j_idx = j_idx
-
-                    # Update the starting indices of the partial merge
-                    i_partial = i_idx
-                    j_partial = j_idx
+            # Select the longest LCSuff, while minimizing the index of j (token index for new buffer).
+            # Scanning j from the first token of the new buffer, the first such j of a row is the only candidate,
+            # since any later j in the same row would not minimize the index of j anymore.
+            candidates = np.flatnonzero(LCSuff[i_idx, : max_j_idx + 1] > max_j)
+            if len(candidates) > 0:
+                j_idx = int(candidates[0])
+                max_j = int(LCSuff[i_idx, j_idx])
+                max_j_idx = j_idx
+
+                # Update the starting indices of the partial merge
+                i_partial = i_idx
+                j_partial = j_idx
 
         # EARLY EXIT (if max subsequence length <= MIN merge length)
         # Important case where there is long silence
@@ -230,7 +221,7 @@ def longest_common_subsequence_merge(X, Y, filepath=None):
                 # incorrect token in between correct tokens
                 for j_idx in range(j_temp, j_temp + j_skip + 1):
                     if j_idx < n + 1:
-                        if LCSuff[i_idx][j_idx] == 0:
+                        if LCSuff[i_idx, j_idx] == 0:
                             j_any_skip = 1
                         else:
                             j_exp = 1 + j_skip + j_any_skip
@@ -252,7 +243,7 @@ def longest_common_subsequence_merge(X, Y, filepath=None):
 
             # Partial backward trace to find start of slice
             while i_partial > 0 and j_partial > 0:
-                if LCSuff[i_partial][j_partial] == 0:
+                if LCSuff[i_partial, j_partial] == 0:
                     # diagonal skip occured, move j to left 1 extra time
                     j_partial -= 1
                     j_skip += 1
@@ -273,18 +264,89 @@ def longest_common_subsequence_merge(X, Y, filepath=None):
     # Set the value of i and j
     result_idx[0] = i
     result_idx[1] = j
+    return result_idx, is_complete_merge
 
-    if filepath is not None:
-        extras = {
-            "is_complete_merge": is_complete_merge,
-            "X": X,
-            "Y": Y,
-            "slice_idx": result_idx,
-        }
-        write_lcs_alignment_to_pickle(LCSuff, filepath=filepath, extras=extras)
-        print("Wrote alignemnt to :", filepath)
 
-    return result_idx, LCSuff
+def longest_common_subsequence_merge(X, Y, filepath=None):
+    """
+    Longest Common Subsequence merge algorithm for aligning two consecutive buffers.
+
+    Base alignment construction algorithm is Longest Common Subsequence (reffered to as LCS hear after)
+
+    LCS Merge algorithm looks at two chunks i-1 and i, determins the aligned overlap at the
+    end of i-1 and beginning of ith chunk, and then clips the subsegment of the ith chunk.
+
+    Assumption is that the two chunks are consecutive chunks, and there exists at least small overlap acoustically.
+
+    It is a sub-word token merge algorithm, operating on the abstract notion of integer ids representing
+    the subword ids. It is independent of text or character encoding.
+
+    Since the algorithm is merge based, and depends on consecutive buffers, the very first buffer is processes using
+    the "middle tokens" algorithm.
+
+    It requires a delay of some number of tokens such that:
+        lcs_delay = math.floor(((total_buffer_in_secs - chunk_len_in_sec)) / model_stride_in_secs)
+
+    Total cost of the model is O(m_{i-1} * n_{i}) where (m, n) represents the number of subword ids of the buffer.
+
+    Args:
+        X: The subset of the previous chunk i-1, sliced such X = X[-(lcs_delay * max_steps_per_timestep):]
+            Therefore there can be at most lcs_delay * max_steps_per_timestep symbols for X, preserving computation.
+        Y: The entire current chunk i.
+        filepath: Optional filepath to save the LCS alignment matrix for later introspection.
+
+    Returns:
+        A tuple containing -
+            - i: Start index of alignment along the i-1 chunk.
+            - j: Start index of alignment along the ith chunk.
+            - slice_len: number of tokens to slice off from the ith chunk.
+        The LCS alignment matrix itself, an integer numpy array of shape (m + 1, n + 1)
+    """
+    return batched_longest_common_subsequence_merge([X], [Y], filepaths=[filepath])[0]
+
+
+def batched_longest_common_subsequence_merge(Xs, Ys, filepaths=None):
+    """
+    Longest Common Subsequence merge of a batch of pairs of consecutive buffers.
+
+    Computes the same result as `longest_common_subsequence_merge` for every pair, while building
+    the alignment matrices of all pairs at once.
+
+    Args:
+        Xs: List of subsets of the previous chunks, see `longest_common_subsequence_merge`.
+        Ys: List of the current chunks.
+        filepaths: Optional list of filepaths (or None) to save the LCS alignment matrices for later introspection.
+
+    Returns:
+        A list of tuples (result_idx, LCS alignment matrix), one per pair,
+        see `longest_common_subsequence_merge`.
+    """
+    if filepaths is None:
+        filepaths = [None] * len(Xs)
+    if len(Xs) == 0:
+        return []
+
+    tables = _lcs_suffix_tables(Xs, Ys)
+
+    outputs = []
+    for X, Y, table, filepath in zip(Xs, Ys, tables, filepaths):
+        m = len(X)
+        n = len(Y)
+        LCSuff = table[: m + 1, : n + 1]
+        result_idx, is_complete_merge = _lcs_merge_indices(LCSuff, m, n)
+
+        if filepath is not None:
+            extras = {
+                "is_complete_merge": is_complete_merge,
+                "X": X,
+                "Y": Y,
+                "slice_idx": result_idx,
+            }
+            write_lcs_alignment_to_pickle(LCSuff, filepath=filepath, extras=extras)
+            print("Wrote alignemnt to :", filepath)
+
+        outputs.append((result_idx, LCSuff))
+    return outputs
 
 
 def lcs_alignment_merge_buffer(buffer, data, delay, model, max_steps_per_timestep: int = 5, filepath: str = None):
@@ -322,6 +384,41 @@ def lcs_alignment_merge_buffer(buffer, data, delay, model, max_steps_per_timeste
     return buffer
 
 
+def batched_lcs_alignment_merge_buffer(
+    buffers, datas, delay, model, max_steps_per_timestep: int = 5, filepaths: Optional[list] = None
+):
+    """
+    Merges the new text from the current frame of every stream with the previous text contained in its buffer.
+
+    Computes the same result as calling `lcs_alignment_merge_buffer` for every (buffer, data) pair,
+    while performing the LCS merges of all streams in a single `batched_longest_common_subsequence_merge` call.
+    """
+    if filepaths is None:
+        filepaths = [None] * len(buffers)
+
+    # If delay timesteps is 0, that means no future context was used. Simply concatenate the buffer with new data.
+    # If buffer is empty, simply concatenate the buffer and data.
+    merge_idx = [idx for idx, buffer in enumerate(buffers) if delay >= 1 and len(buffer) > 0]
+    for idx in range(len(buffers)):
+        if delay < 1 or len(buffers[idx]) == 0:
+            buffers[idx] += datas[idx]
+
+    # Prepare subsets of the buffers that will be LCS Merged with new data
+    search_size = int(delay * max_steps_per_timestep)
+    buffer_slices = [buffers[idx][-search_size:] for idx in merge_idx]
+
+    # Perform LCS Merge
+    lcs_outputs = batched_longest_common_subsequence_merge(
+        buffer_slices, [datas[idx] for idx in merge_idx], filepaths=[filepaths[idx] for idx in merge_idx]
+    )
+
+    for idx, (lcs_idx, _) in zip(merge_idx, lcs_outputs):
+        # Slice off new data and concat it to buffer
+        slice_idx = lcs_idx[1] + lcs_idx[-1]  # slice = j + slice_len
+        buffers[idx] += datas[idx][slice_idx:]
+    return buffers
+
+
 def inplace_buffer_merge(buffer, data, timesteps, model):
     """
     Merges the new text from the current frame with the previous text contained in the buffer.
@@ -1309,13 +1406,19 @@ class LongestCommonSubsequenceBatchedFrameASRRNNT(BatchedFrameASRRNNT):
         self.infer_logits()
 
         self.unmerged = [[] for _ in range(self.batch_size)]
-        for idx, alignments in enumerate(self.all_alignments):
-
-            signal_end_idx = self.frame_bufferer.signal_end_index[idx]
-            if signal_end_idx is None:
+        for idx in range(len(self.all_alignments)):
+            if self.frame_bufferer.signal_end_index[idx] is None:
                 raise ValueError("Signal did not end")
 
-            for a_idx, alignment in enumerate(alignments):
+        # Chunks are merged one index at a time, so that the LCS merges of all streams are batched together
+        num_chunks = max((len(alignments) for alignments in self.all_alignments), default=0)
+        for a_idx in range(num_chunks):
+            merge_idx, merge_ids, filepaths = [], [], []
+            for idx, alignments in enumerate(self.all_alignments):
+                if a_idx >= len(alignments):
+                    continue
+                alignment = alignments[a_idx]
+                signal_end_idx = self.frame_bufferer.signal_end_index[idx]
 
                 # Middle token first chunk
                 if a_idx == 0:
@@ -1348,14 +1451,20 @@ class LongestCommonSubsequenceBatchedFrameASRRNNT(BatchedFrameASRRNNT):
                         else:
                             filepath = None
 
-                        self.unmerged[idx] = lcs_alignment_merge_buffer(
-                            self.unmerged[idx],
-                            ids,
-                            self.lcs_delay,
-                            model=self.asr_model,
-                            max_steps_per_timestep=self.max_steps_per_timestep,
-                            filepath=filepath,
-                        )
+                        merge_idx.append(idx)
+                        merge_ids.append(ids)
+                        filepaths.append(filepath)
+
+            merged = batched_lcs_alignment_merge_buffer(
+                [self.unmerged[idx] for idx in merge_idx],
+                merge_ids,
+                self.lcs_delay,
+                model=self.asr_model,
+                max_steps_per_timestep=self.max_steps_per_timestep,
+                filepaths=filepaths,
+            )
+            for idx, buffer in zip(merge_idx, merged):
+                self.unmerged[idx] = buffer
 
         output = []
         for idx in range(self.batch_size):
@@ -348,6 +348,36 @@ def generate_overlap_vad_seq(
     return overlap_out_dir
 
 
+def generate_overlap_vad_seq_from_tensors(
+    frames: Dict[str, torch.Tensor],
+    smoothing_method: str,
+    overlap: float,
+    window_length_in_sec: float,
+    shift_length_in_sec: float,
+) -> Dict[str, torch.Tensor]:
+    """
+    In-memory version of generate_overlap_vad_seq, which smooths frame predictions kept as tensors
+    instead of reading and writing one text file per session.
+    Args:
+        frames (dict): Mapping from session name to its 1-D tensor of frame predictions.
+        smoothing_method (str): median or mean smoothing filter.
+        overlap (float): amounts of overlap of adjacent windows.
+        window_length_in_sec (float): length of window for generating the frame.
+        shift_length_in_sec (float): amount of shift of window for generating the frame.
+    Returns:
+        preds (dict): Mapping from session name to its smoothed predictions.
+    """
+    per_args = {
+        "overlap": float(overlap),
+        "window_length_in_sec": float(window_length_in_sec),
+        "shift_length_in_sec": float(shift_length_in_sec),
+    }
+    preds = {}
+    for name, frame in tqdm(frames.items(), desc='generating preds', leave=False):
+        preds[name] = generate_overlap_vad_seq_per_tensor(frame, per_args, smoothing_method)
+    return preds
+
+
 def generate_overlap_vad_seq_per_file_star(args):
     """
     A workaround for tqdm with starmap of multiprocessing
@@ -735,20 +765,32 @@ def generate_vad_segment_table_per_file(pred_filepath: str, per_args: dict) -> s
     out_dir, per_args_float = prepare_gen_segment_table(sequence, per_args)
 
     preds = generate_vad_segment_table_per_tensor(sequence, per_args_float)
-    ext = ".rttm" if per_args.get("use_rttm", False) else ".txt"
-    save_name = name + ext
-    save_path = os.path.join(out_dir, save_name)
+    return write_vad_segment_table(preds, name, out_dir, use_rttm=per_args.get("use_rttm", False))
 
-    if preds.shape[0] == 0:
-        with open(save_path, "w", encoding='utf-8') as fp:
-            if per_args.get("use_rttm", False):
+
+def write_vad_segment_table(segments: torch.Tensor, name: str, out_dir: str, use_rttm: bool = False) -> str:
+    """
+    Write the speech segments generated by generate_vad_segment_table_per_tensor to a table/rttm file.
+    Args:
+        segments (torch.Tensor): Speech segments of shape (num_segments, 3) holding start, end and duration.
+        name (str): Name of the session, used as file name.
+        out_dir (str): Output directory of the table/rttm file.
+        use_rttm (bool): Whether to write the segments in rttm format.
+    Returns:
+        save_path (str): Path to the written file.
+    """
+    ext = ".rttm" if use_rttm else ".txt"
+    save_path = os.path.join(out_dir, name + ext)
+
+    with open(save_path, "w", encoding='utf-8') as fp:
+        if segments.shape[0] == 0:
+            if use_rttm:
                 fp.write(f"SPEAKER <NA> 1 0 0 <NA> <NA> speech <NA> <NA>\n")
             else:
                 fp.write(f"0 0 speech\n")
-    else:
-        with open(save_path, "w", encoding='utf-8') as fp:
-            for i in preds:
-                if per_args.get("use_rttm", False):
+        else:
+            for i in segments.tolist():
+                if use_rttm:
                     fp.write(f"SPEAKER {name} 1 {i[0]:.4f} {i[2]:.4f} <NA> <NA> speech <NA> <NA>\n")
                 else:
                     fp.write(f"{i[0]:.4f} {i[2]:.4f} speech\n")
@@ -818,6 +860,30 @@ def generate_vad_segment_table(
     return out_dir
 
 
+def generate_vad_segment_table_from_tensors(
+    preds: Dict[str, torch.Tensor], postprocessing_params: dict, frame_length_in_sec: float
+) -> Dict[str, torch.Tensor]:
+    """
+    In-memory version of generate_vad_segment_table, which converts frame level predictions kept as tensors
+    to speech segments without reading and writing one text file per session.
+    Args:
+        preds (dict): Mapping from session name to its 1-D tensor of frame level predictions.
+        postprocessing_params (dict): dictionary of thresholds for prediction score.
+        See details in binarization and filtering.
+        frame_length_in_sec (float): frame length.
+    Returns:
+        segments (dict): Mapping from session name to its speech segments of shape (num_segments, 3),
+            holding start, end and duration. Use write_vad_segment_table to save them.
+    """
+    segments = {}
+    for name, sequence in tqdm(preds.items(), desc='creating speech segments', leave=True):
+        # prepare_gen_segment_table updates onset and offset in place, so each session gets its own copy
+        per_args = {"frame_length_in_sec": frame_length_in_sec, **postprocessing_params}
+        _, per_args_float = prepare_gen_segment_table(sequence, per_args)
+        segments[name] = generate_vad_segment_table_per_tensor(sequence, per_args_float)
+    return segments
+
+
 def generate_vad_segment_table_per_file_star(args):
     """
     A workaround for tqdm with starmap of multiprocessing
@@ -12,9 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import abc
+import array
 import collections
+import hashlib
+import inspect
 import json
 import os
+import shutil
+import socket
 from itertools import combinations
 from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 
@@ -32,6 +38,130 @@ class _Collection(collections.UserList):
     OUTPUT_TYPE = None  # Single element output type.
 
 
+class _ColumnarCollection(collections.abc.Sequence, abc.ABC):
+    """
+    Parsed and preprocessed data stored column-wise in flat numpy arrays.
+
+    Elements are materialized as `OUTPUT_TYPE` on access, so memory usage does not depend on the number of Python
+    objects per element. Columns can be saved to a directory and loaded back memory-mapped, in which case pickling
+    the collection (e.g. when sending a dataset to dataloader workers) only transfers the directory path and every
+    process shares the same page cache instead of holding its own copy.
+    """
+
+    OUTPUT_TYPE = None  # Single element output type.
+    _META_FILE = 'meta.json'
+    _VERSION = 1
+
+    def __init__(self, columns: Dict[str, np.ndarray], attrs: Dict[str, Any]):
+        """
+        Args:
+            columns: Mapping from column name to a 1D numpy array.
+            attrs: Mapping to JSON serializable attributes, e.g. pools of unique values referenced from columns.
+        """
+        self._columns = columns
+        self._attrs = attrs
+        self._path = None
+
+    @property
+    def data(self):
+        """For compatibility with `_Collection`, which exposes its elements as `data`."""
+        return self
+
+    def save(self, path: str):
+        """Saves all columns to the directory `path`, which is used for memory-mapped loading and pickling."""
+        os.makedirs(path, exist_ok=True)
+        for name, column in self._columns.items():
+            np.save(os.path.join(path, f'{name}.npy'), column)
+        # meta file is written last so that a partially written directory is never loaded
+        with open(os.path.join(path, self._META_FILE), 'w') as f:
+            json.dump({'version': self._VERSION, 'columns': list(self._columns), 'attrs': self._attrs}, f)
+        self._path = path
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> '_ColumnarCollection':
+        """Loads a collection saved with `save`, memory-mapping the columns if `mmap` is True."""
+        collection = cls.__new__(cls)
+        collection._load(path, mmap=mmap)
+        return collection
+
+    def _load(self, path: str, mmap: bool = True):
+        with open(os.path.join(path, self._META_FILE), 'r') as f:
+            meta = json.load(f)
+        if meta.get('version') != self._VERSION:
+            raise ValueError(f"Unsupported columnar collection version {meta.get('version')} in {path}")
+        mmap_mode = 'r' if mmap else None
+        self._columns = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode) for name in meta['columns']
+        }
+        self._attrs = meta['attrs']
+        self._path = path
+
+    def __getstate__(self):
+        if self._path is not None:
+            return {'_path': self._path}
+        return self.__dict__
+
+    def __setstate__(self, state):
+        if set(state) == {'_path'}:
+            self._load(state['_path'])
+        else:
+            self.__dict__.update(state)
+
+    @abc.abstractmethod
+    def __len__(self):
+        """Number of elements in the collection."""
+        pass
+
+    @abc.abstractmethod
+    def _get(self, idx: int):
+        """Materializes the element at the non-negative index `idx` as `OUTPUT_TYPE`."""
+        pass
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._get(i) for i in range(*idx.indices(len(self)))]
+        idx = int(idx)
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError(f"Index {idx} is out of range for collection of length {len(self)}")
+        return self._get(idx)
+
+
+class _StringColumnBuilder:
+    """Accumulates strings into a flat UTF-8 byte buffer with an offsets array."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offsets = array.array('q', [0])
+
+    def append(self, value: str):
+        self.buffer.extend(value.encode('utf-8'))
+        self.offsets.append(len(self.buffer))
+
+    def build(self):
+        return np.frombuffer(bytes(self.buffer), dtype=np.uint8), np.frombuffer(self.offsets, dtype=np.int64)
+
+
+class _InternedColumnBuilder:
+    """Accumulates hashable values as indices into a pool of unique values."""
+
+    def __init__(self):
+        self.pool = []
+        self.lookup = {}
+        self.indices = array.array('i')
+
+    def append(self, value):
+        index = self.lookup.get(value)
+        if index is None:
+            index = self.lookup[value] = len(self.pool)
+            self.pool.append(value)
+        self.indices.append(index)
+
+    def build(self):
+        return np.frombuffer(self.indices, dtype=np.int32), self.pool
+
+
 class Text(_Collection):
     """Simple list of preprocessed text entries, result in list of tokens."""
 
@@ -205,6 +335,214 @@ class AudioText(_Collection):
         super().__init__(data)
 
 
+class ColumnarAudioText(_ColumnarCollection):
+    """
+    Columnar variant of `AudioText` with the same filters, preprocessing and element type.
+
+    Ids, durations, offsets and sampling rates are stored in numpy arrays, token ids of all utterances in a single
+    flat buffer with an offsets array, raw texts and file names in UTF-8 byte buffers, and directories, speakers and
+    languages as indices into pools of unique values. This keeps the memory footprint of a manifest with tens of
+    millions of utterances to a few bytes per token, and the collection can be shared with dataloader workers without
+    copies through `save` and memory-mapped `load`.
+    """
+
+    OUTPUT_TYPE = AudioText.OUTPUT_TYPE
+
+    def __init__(
+        self,
+        ids: Iterable[int],
+        audio_files: Iterable[str],
+        durations: Iterable[float],
+        texts: Iterable[str],
+        offsets: Iterable[str],
+        speakers: Iterable[Optional[int]],
+        orig_sampling_rates: Iterable[Optional[int]],
+        token_labels: Iterable[Optional[int]],
+        langs: Iterable[Optional[str]],
+        parser: parsers.CharParser,
+        min_duration: Optional[float] = None,
+        max_duration: Optional[float] = None,
+        max_number: Optional[int] = None,
+        do_sort_by_duration: bool = False,
+        index_by_file_id: bool = False,
+    ):
+        """Instantiates columnar audio-text manifest with filters and preprocessing.
+
+        Args:
+            See `AudioText`. Inputs can be any iterables, they are consumed in a single pass.
+        """
+        rows = zip(ids, audio_files, durations, offsets, texts, speakers, orig_sampling_rates, token_labels, langs)
+        super().__init__(
+            *self._build_columns(
+                rows,
+                parser=parser,
+                min_duration=min_duration,
+                max_duration=max_duration,
+                max_number=max_number,
+                do_sort_by_duration=do_sort_by_duration,
+                index_by_file_id=index_by_file_id,
+            )
+        )
+
+    @staticmethod
+    def _build_columns(
+        rows: Iterable[tuple],
+        parser: parsers.CharParser,
+        min_duration: Optional[float] = None,
+        max_duration: Optional[float] = None,
+        max_number: Optional[int] = None,
+        do_sort_by_duration: bool = False,
+        index_by_file_id: bool = False,
+    ):
+        all_has_duration = True
+        duration_filtered, num_filtered, total_duration = 0.0, 0, 0.0
+
+        ids, durations, offsets, orig_srs = array.array('q'), array.array('d'), array.array('d'), array.array('q')
+        tokens, token_offsets = array.array('i'), array.array('q', [0])
+        text_is_json = array.array('b')
+        texts, file_names = _StringColumnBuilder(), _StringColumnBuilder()
+        dirs, speakers, langs = _InternedColumnBuilder(), _InternedColumnBuilder(), _InternedColumnBuilder()
+
+        for id_, audio_file, duration, offset, text, speaker, orig_sr, token_labels, lang in rows:
+            if duration is None:
+                all_has_duration = False
+            # Duration filters.
+            if duration is not None and min_duration is not None and duration < min_duration:
+                duration_filtered += duration
+                num_filtered += 1
+                continue
+
+            if duration is not None and max_duration is not None and duration > max_duration:
+                duration_filtered += duration
+                num_filtered += 1
+                continue
+
+            if token_labels is not None:
+                text_tokens = token_labels
+            else:
+                if text != '':
+                    if hasattr(parser, "is_aggregate") and parser.is_aggregate and isinstance(text, str):
+                        if lang is not None:
+                            text_tokens = parser(text, lang)
+                        else:
+                            raise ValueError("lang required in manifest when using aggregate tokenizers")
+                    else:
+                        text_tokens = parser(text)
+                else:
+                    text_tokens = []
+
+                if text_tokens is None:
+                    duration_filtered += duration
+                    num_filtered += 1
+                    continue
+
+            total_duration += duration if duration is not None else 0.0
+
+            ids.append(id_)
+            durations.append(np.nan if duration is None else duration)
+            offsets.append(np.nan if offset is None else offset)
+            orig_srs.append(-1 if orig_sr is None else orig_sr)
+            tokens.extend(text_tokens)
+            token_offsets.append(len(tokens))
+            # raw texts of aggregate tokenizers can be lists of spans, which are stored as JSON
+            text_is_json.append(not isinstance(text, str))
+            texts.append(json.dumps(text) if text_is_json[-1] else text)
+            # paths share few distinct directories, so only the directory part is interned
+            head, sep, file_name = (audio_file or '').rpartition('/')
+            dirs.append(None if audio_file is None else head + sep)
+            file_names.append(file_name)
+            speakers.append(speaker)
+            langs.append(lang)
+
+            # Max number of entities filter.
+            if len(ids) == max_number:
+                break
+
+        columns = {
+            'id': np.frombuffer(ids, dtype=np.int64),
+            'duration': np.frombuffer(durations, dtype=np.float64),
+            'offset': np.frombuffer(offsets, dtype=np.float64),
+            'orig_sr': np.frombuffer(orig_srs, dtype=np.int64),
+            'token_offsets': np.frombuffer(token_offsets, dtype=np.int64),
+            'tokens': np.frombuffer(tokens, dtype=np.int32),
+            'text_is_json': np.frombuffer(text_is_json, dtype=np.int8),
+        }
+        columns['text'], columns['text_offsets'] = texts.build()
+        columns['file_name'], columns['file_name_offsets'] = file_names.build()
+        attrs = {'index_by_file_id': index_by_file_id}
+        columns['dir'], attrs['dir'] = dirs.build()
+        columns['speaker'], attrs['speaker'] = speakers.build()
+        columns['lang'], attrs['lang'] = langs.build()
+        columns['order'] = np.arange(len(ids), dtype=np.int64)
+
+        if do_sort_by_duration:
+            if index_by_file_id:
+                logging.warning("Tried to sort dataset by duration, but cannot since index_by_file_id is set.")
+            else:
+                columns['order'] = np.argsort(columns['duration'], kind='stable')
+
+        logging.info("Dataset loaded with %d files totalling %.2f hours", len(ids), total_duration / 3600)
+        logging.info("%d files were filtered totalling %.2f hours", num_filtered, duration_filtered / 3600)
+        if not all_has_duration:
+            logging.info(f"Not all audios have duration information, the total number of hours is inaccurate.")
+        return columns, attrs
+
+    def __len__(self):
+        return len(self._columns['order'])
+
+    @property
+    def durations(self) -> np.ndarray:
+        """Durations of all elements in collection order, with NaN for unknown durations."""
+        return self._columns['duration'][self._columns['order']]
+
+    @property
+    def mapping(self) -> Dict[str, List[int]]:
+        """Mapping from filename base (ID) to indices in the collection, built on first access."""
+        if not self._attrs['index_by_file_id']:
+            raise AttributeError("Collection was not created with index_by_file_id=True")
+        if getattr(self, '_mapping', None) is None:
+            mapping = {}
+            for idx, row in enumerate(self._columns['order'].tolist()):
+                file_id, _ = os.path.splitext(self._get_string('file_name', row))
+                mapping.setdefault(file_id, []).append(idx)
+            self._mapping = mapping
+        return self._mapping
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        if '_mapping' in state:
+            # the mapping is cheap to rebuild compared to pickling it
+            state = {k: v for k, v in state.items() if k != '_mapping'}
+        return state
+
+    def _get_string(self, name: str, idx: int) -> str:
+        offsets = self._columns[f'{name}_offsets']
+        return self._columns[name][offsets[idx] : offsets[idx + 1]].tobytes().decode('utf-8')
+
+    def _get(self, idx: int):
+        c, attrs = self._columns, self._attrs
+        idx = int(c['order'][idx])
+
+        directory = attrs['dir'][c['dir'][idx]]
+        audio_file = None if directory is None else directory + self._get_string('file_name', idx)
+        duration, offset, orig_sr = c['duration'][idx], c['offset'][idx], int(c['orig_sr'][idx])
+        text = self._get_string('text', idx)
+        if c['text_is_json'][idx]:
+            text = json.loads(text)
+
+        return self.OUTPUT_TYPE(
+            int(c['id'][idx]),
+            audio_file,
+            None if np.isnan(duration) else float(duration),
+            c['tokens'][c['token_offsets'][idx] : c['token_offsets'][idx + 1]].tolist(),
+            None if np.isnan(offset) else float(offset),
+            text,
+            attrs['speaker'][c['speaker'][idx]],
+            None if orig_sr < 0 else orig_sr,
+            attrs['lang'][c['lang'][idx]],
+        )
+
+
 class VideoText(_Collection):
     """List of video-transcript text correspondence with preprocessing."""
 
@@ -445,12 +783,23 @@ class InstructionTuningAudioText(_Collection):
 class ASRAudioText(AudioText):
     """`AudioText` collector from asr structured json files."""
 
-    def __init__(self, manifests_files: Union[str, List[str]], parse_func: Optional[Callable] = None, *args, **kwargs):
+    def __init__(
+        self,
+        manifests_files: Union[str, List[str]],
+        parse_func: Optional[Callable] = None,
+        *args,
+        parse_workers: int = 0,
+        fast_json: bool = False,
+        **kwargs,
+    ):
         """Parse lists of audio files, durations and transcripts texts.
 
         Args:
             manifests_files: Either single string file or list of such -
                 manifests to yield items from.
+            parse_func: Optional function to parse manifest entries.
+            parse_workers: Number of processes used to parse the manifests, see `manifest.item_iter`.
+            fast_json: If True and `orjson` is installed, manifest lines are decoded with `orjson`.
             *args: Args to pass to `AudioText` constructor.
             **kwargs: Kwargs to pass to `AudioText` constructor.
         """
@@ -470,7 +819,9 @@ class ASRAudioText(AudioText):
         )
 
         speakers, orig_srs, token_labels, langs = [], [], [], []
-        for item in manifest.item_iter(manifests_files, parse_func=parse_func):
+        for item in manifest.item_iter(
+            manifests_files, parse_func=parse_func, num_workers=parse_workers, fast_json=fast_json
+        ):
             ids.append(item['id'])
             audio_files.append(item['audio_file'])
             durations.append(item['duration'])
@@ -485,6 +836,144 @@ class ASRAudioText(AudioText):
         )
 
 
+class ASRColumnarAudioText(ColumnarAudioText):
+    """`ColumnarAudioText` collector from asr structured json files."""
+
+    def __init__(
+        self,
+        manifests_files: Union[str, List[str]],
+        parse_func: Optional[Callable] = None,
+        cache_dir: Optional[str] = None,
+        *args,
+        parse_workers: int = 0,
+        fast_json: bool = False,
+        **kwargs,
+    ):
+        """Parse audio files, durations and transcripts texts into columns.
+
+        Args:
+            manifests_files: Either single string file or list of such -
+                manifests to yield items from.
+            parse_func: Optional function to parse manifest entries.
+            cache_dir: Optional directory with persistent caches of parsed and tokenized manifests. A cache is
+                keyed by the content of the manifests, the tokenizer and the filter settings, so it is reused across
+                runs and processes as long as none of them changes, and rebuilt otherwise.
+            parse_workers: Number of processes used to parse the manifests, see `manifest.item_iter`.
+            fast_json: If True and `orjson` is installed, manifest lines are decoded with `orjson`.
+            *args: Args to pass to `ColumnarAudioText` constructor.
+            **kwargs: Kwargs to pass to `ColumnarAudioText` constructor.
+        """
+        cache_path = None
+        if cache_dir is not None:
+            cache_key = self._get_cache_key(manifests_files, parse_func, *args, **kwargs)
+            if cache_key is not None:
+                cache_path = os.path.join(cache_dir, cache_key)
+                if self._load_cache(cache_path, cache_key):
+                    return
+
+        # items are consumed one at a time, without materializing per-field lists for the whole manifest
+        rows = (
+            (
+                item['id'],
+                item['audio_file'],
+                item['duration'],
+                item['offset'],
+                item['text'],
+                item['speaker'],
+                item['orig_sr'],
+                item['token_labels'],
+                item['lang'],
+            )
+            for item in manifest.item_iter(
+                manifests_files, parse_func=parse_func, num_workers=parse_workers, fast_json=fast_json
+            )
+        )
+        columns, attrs = self._build_columns(rows, *args, **kwargs)
+        _ColumnarCollection.__init__(self, columns, attrs)
+
+        if cache_path is not None:
+            self._save_cache(cache_path, cache_key)
+
+    @classmethod
+    def _get_cache_key(cls, manifests_files, parse_func, *args, **kwargs) -> Optional[str]:
+        """Returns the cache key for the given manifests and constructor arguments, or None if caching is not possible."""
+        arguments = inspect.signature(cls._build_columns).bind(None, *args, **kwargs)
+        arguments.apply_defaults()
+        arguments = dict(arguments.arguments)
+        del arguments['rows']
+        tokenizer_fingerprint = _get_parser_fingerprint(arguments.pop('parser'))
+        if tokenizer_fingerprint is None:
+            logging.warning("Manifest cache is disabled, since the tokenizer cannot be identified.")
+            return None
+
+        key = {
+            'version': cls._VERSION,
+            'collection': cls.__qualname__,
+            'manifests': manifest.get_manifest_hash(manifests_files),
+            'parse_func': None if parse_func is None else f'{parse_func.__module__}.{parse_func.__qualname__}',
+            'tokenizer': tokenizer_fingerprint,
+            'filters': arguments,
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _load_cache(self, cache_path: str, cache_key: str) -> bool:
+        """Loads the cache from cache_path if it is complete and matches cache_key."""
+        if not os.path.exists(os.path.join(cache_path, self._META_FILE)):
+            return False
+        try:
+            self._load(cache_path)
+            if self._attrs.get('cache_key') != cache_key:
+                raise ValueError("cache key mismatch")
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Manifest cache {cache_path} is stale or corrupted ({e}), rebuilding it.")
+            shutil.rmtree(cache_path, ignore_errors=True)
+            return False
+        logging.info(f"Loaded manifest cache {cache_path} with {len(self)} files")
+        return True
+
+    def _save_cache(self, cache_path: str, cache_key: str):
+        """Saves the collection to cache_path atomically, so concurrent readers never see a partial cache."""
+        self._attrs['cache_key'] = cache_key
+        tmp_path = f'{cache_path}.tmp.{socket.gethostname()}.{os.getpid()}'
+        try:
+            self.save(tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # another process has already written the same cache
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.exists(os.path.join(cache_path, self._META_FILE)):
+                raise
+        logging.info(f"Saved manifest cache to {cache_path}")
+        # reload memory-mapped, so that this process and its workers share the cache pages
+        self._load(cache_path)
+
+
+def _get_parser_fingerprint(parser: Callable) -> Optional[str]:
+    """Returns a string identifying the tokenization performed by parser, or None if it cannot be determined."""
+    if isinstance(parser, parsers.CharParser):
+        state = [
+            type(parser).__qualname__,
+            parser._labels,
+            parser._unk_id,
+            parser._blank_id,
+            parser._do_normalize,
+            parser._do_lowercase,
+            parser._do_tokenize,
+        ]
+    else:
+        # tokenizers are usually wrapped, e.g. by the TokenizerWrapper of AudioToBPEDataset
+        tokenizer = getattr(parser, '_tokenizer', parser)
+        vocab_size = getattr(tokenizer, 'vocab_size', None)
+        if not isinstance(vocab_size, int) or not hasattr(tokenizer, 'ids_to_tokens'):
+            return None
+        try:
+            vocab = tokenizer.ids_to_tokens(list(range(vocab_size)))
+        except Exception:
+            return None
+        state = [type(parser).__qualname__, type(tokenizer).__qualname__, vocab_size, vocab]
+    return hashlib.sha256(json.dumps(state, default=str).encode('utf-8')).hexdigest()
+
+
 class SpeechLLMAudioTextEntity(object):
     """Class for SpeechLLM dataloader instance."""
 
@@ -12,17 +12,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
 import json
+import multiprocessing as mp
 import os
 import re
-from collections import defaultdict
+from collections import defaultdict, deque
+from functools import partial
 from os.path import expanduser
-from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from nemo.utils import logging
 from nemo.utils.data_utils import DataStoreObject, datastore_path_to_local_path, is_datastore_path
 from nemo.utils.nemo_logging import LogMode
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except (ImportError, ModuleNotFoundError):
+    ORJSON_AVAILABLE = False
+
 
 class ManifestBase:
     def __init__(self, *args, **kwargs):
@@ -39,7 +49,11 @@ class ManifestEN:
 
 
 def item_iter(
-    manifests_files: Union[str, List[str]], parse_func: Callable[[str, Optional[str]], Dict[str, Any]] = None
+    manifests_files: Union[str, List[str]],
+    parse_func: Callable[[str, Optional[str]], Dict[str, Any]] = None,
+    num_workers: int = 0,
+    fast_json: bool = False,
+    chunk_size: int = 16 * 1024 * 1024,
 ) -> Iterator[Dict[str, Any]]:
     """Iterate through json lines of provided manifests.
 
@@ -58,6 +72,15 @@ def item_iter(
             of a manifest and optionally the manifest file itself,
             and parses it, returning a dictionary mapping from str -> Any.
 
+        num_workers: If greater than 1, manifests are split into byte ranges of
+            about `chunk_size` bytes which are parsed by a pool of `num_workers`
+            processes. Items are still yielded in order with the same ids.
+
+        fast_json: If True and `orjson` is installed, the default parse_func
+            decodes lines with `orjson` instead of the standard library.
+
+        chunk_size: Size in bytes of the ranges parsed by one worker.
+
     Yields:
         Parsed key to value item dicts.
 
@@ -70,28 +93,29 @@ def item_iter(
 
     if parse_func is None:
         parse_func = __parse_item
+        if fast_json:
+            if ORJSON_AVAILABLE:
+                parse_func = partial(__parse_item, loads=orjson.loads)
+            else:
+                logging.warning("`orjson` is not installed, falling back to the standard `json` module.")
 
     errors = defaultdict(list)
     k = -1
     logging.debug('Manifest files: %s', str(manifests_files))
-    for manifest_file in manifests_files:
-        logging.debug('Using manifest file: %s', str(manifest_file))
-        cached_manifest_file = DataStoreObject(manifest_file).get()
-        logging.debug('Cached at: %s', str(cached_manifest_file))
-        with open(expanduser(cached_manifest_file), 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                k += 1
-                try:
-                    item = parse_func(line, manifest_file)
-                except json.JSONDecodeError:
-                    errors[str(manifest_file)].append(line)
-                    continue
-                item['id'] = k
-
-                yield item
+    if num_workers > 1:
+        chunks = _iter_manifest_chunks(manifests_files, parse_func, num_workers, chunk_size)
+    else:
+        chunks = ((manifest_file, _parse_lines(manifest_file, parse_func)) for manifest_file in manifests_files)
+
+    for manifest_file, parsed_lines in chunks:
+        for item, line in parsed_lines:
+            k += 1
+            if item is None:
+                errors[str(manifest_file)].append(line)
+                continue
+            item['id'] = k
+
+            yield item
 
     if len(errors) > 0:
         for filename, lines in errors.items():
@@ -102,8 +126,121 @@ def item_iter(
         raise RuntimeError("Failed to parse some lines from manifest files. See logs for more details.")
 
 
-def __parse_item(line: str, manifest_file: str) -> Dict[str, Any]:
-    item = json.loads(line)
+def _parse_lines(
+    manifest_file: str, parse_func: Callable, start: int = 0, end: Optional[int] = None
+) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """Parses non-empty lines of a manifest in the byte range [start, end).
+
+    Yields (item, None) for parsed lines, and (None, line) for lines that are not valid json.
+    """
+    logging.debug('Using manifest file: %s', str(manifest_file))
+    cached_manifest_file = DataStoreObject(manifest_file).get()
+    logging.debug('Cached at: %s', str(cached_manifest_file))
+    if end is None:
+        f = open(expanduser(cached_manifest_file), 'r')
+    else:
+        with open(expanduser(cached_manifest_file), 'rb') as fb:
+            fb.seek(start)
+            f = fb.read(end - start).decode('utf-8').split('\n')
+    try:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield parse_func(line, manifest_file), None
+            except json.JSONDecodeError:
+                yield None, line
+    finally:
+        if end is None:
+            f.close()
+
+
+_worker_parse_func = None
+
+
+def _init_parse_worker(parse_func: Callable):
+    # parse_func is inherited by forked workers, so it does not need to be picklable
+    global _worker_parse_func
+    _worker_parse_func = parse_func
+
+
+def _parse_manifest_range(manifest_file: str, start: int, end: int) -> List[Tuple[Optional[Dict], Optional[str]]]:
+    return list(_parse_lines(manifest_file, _worker_parse_func, start, end))
+
+
+def _get_manifest_ranges(manifest_file: str, chunk_size: int) -> List[Tuple[int, int]]:
+    """Splits a manifest into byte ranges of about chunk_size bytes that start and end at line boundaries."""
+    cached_manifest_file = expanduser(DataStoreObject(manifest_file).get())
+    size = os.path.getsize(cached_manifest_file)
+    boundaries = [0]
+    with open(cached_manifest_file, 'rb') as f:
+        while boundaries[-1] + chunk_size < size:
+            # move to the end of the line containing the last byte of the chunk
+            f.seek(boundaries[-1] + chunk_size - 1)
+            f.readline()
+            if f.tell() >= size:
+                break
+            boundaries.append(f.tell())
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _iter_manifest_chunks(
+    manifests_files: List[str], parse_func: Callable, num_workers: int, chunk_size: int
+) -> Iterator[Tuple[str, List[Tuple[Optional[Dict], Optional[str]]]]]:
+    """Parses byte ranges of manifests in a process pool and yields the results in order.
+
+    At most 2 * num_workers ranges are in flight, so memory does not grow with the size of the manifests
+    when the consumer is slower than the workers.
+    """
+    ranges = (
+        (manifest_file, start, end)
+        for manifest_file in manifests_files
+        for start, end in _get_manifest_ranges(manifest_file, chunk_size)
+    )
+    ctx = mp.get_context("fork")
+    with ctx.Pool(num_workers, initializer=_init_parse_worker, initargs=(parse_func,)) as p:
+        in_flight = deque()
+        for manifest_file, start, end in ranges:
+            in_flight.append((manifest_file, p.apply_async(_parse_manifest_range, (manifest_file, start, end))))
+            if len(in_flight) >= 2 * num_workers:
+                manifest_file, result = in_flight.popleft()
+                yield manifest_file, result.get()
+        while in_flight:
+            manifest_file, result = in_flight.popleft()
+            yield manifest_file, result.get()
+
+
+def get_manifest_hash(manifests_files: Union[str, List[str]], chunk_size: int = 1 << 20) -> str:
+    """Computes a hash of the content of the provided manifests.
+
+    Manifest paths are part of the hash, since relative audio paths are resolved
+    against the directory of the manifest.
+
+    Args:
+        manifests_files: Either single string file or list of such.
+        chunk_size: Number of bytes read at once.
+
+    Returns:
+        Hex digest of the manifests content.
+    """
+    if isinstance(manifests_files, str):
+        manifests_files = [manifests_files]
+
+    digest = hashlib.sha256()
+    for manifest_file in manifests_files:
+        digest.update(str(manifest_file).encode('utf-8') + b'\0')
+        cached_manifest_file = DataStoreObject(manifest_file).get()
+        with open(expanduser(cached_manifest_file), 'rb') as f:
+            while chunk := f.read(chunk_size):
+                digest.update(chunk)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def __parse_item(line: str, manifest_file: str, loads: Callable[[str], Any] = json.loads) -> Dict[str, Any]:
+    item = loads(line)
 
     # Audio file
     if 'audio_filename' in item:
@@ -447,6 +447,8 @@ def evaluate(
     top_p: Optional[float] = 0.0,
     top_k: Optional[int] = 1,
     add_bos: Optional[bool] = False,
+    server_side_logprobs: bool = False,
+    max_concurrent_requests: int = 1,
 ):
     """
     Evaluates nemo model deployed on PyTriton server (via trtllm) using lm-evaluation-harness
@@ -481,6 +483,10 @@ def evaluate(
         will only consider the single most likely token for the next prediction. Default: 1
         add_bos: Optional[bool]: whether a special token representing the beginning of a sequence should be added when
         encoding a string. Default: False since typically for CausalLM its set to False. If needed set add_bos to True.
+        server_side_logprobs (bool): if True, for loglikelihood type tasks the server computes the logProbs of the
+        continuation tokens from the context logits and returns only them (with greedy-match flags), instead of the
+        full logits. Requires the model to be deployed with output_context_logits=True. Default: False.
+        max_concurrent_requests (int): number of batches of requests sent to the server concurrently. Default: 1.
     """
     try:
         # lm-evaluation-harness import
@@ -498,7 +504,17 @@ def evaluate(
     evaluation.wait_for_server_ready(url=url, triton_http_port=triton_http_port, model_name=model_name)
     # Create an object of the NeMoFWLM which is passed as a model to evaluator.simple_evaluate
     model = evaluation.NeMoFWLMEval(
-        model_name, url, tokenizer, batch_size, max_tokens_to_generate, temperature, top_p, top_k, add_bos
+        model_name,
+        url,
+        tokenizer,
+        batch_size,
+        max_tokens_to_generate,
+        temperature,
+        top_p,
+        top_k,
+        add_bos,
+        server_side_logprobs=server_side_logprobs,
+        max_concurrent_requests=max_concurrent_requests,
     )
     results = evaluator.simple_evaluate(
         model=model,
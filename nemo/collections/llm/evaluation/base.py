@@ -12,9 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import queue
 import re
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional
 
+import numpy as np
 import torch
 import torch.nn.functional as F
 from lm_eval.api.instance import Instance
@@ -32,11 +36,29 @@ class NeMoFWLMEval(LM):
     NeMoFWLMEval is a wrapper class subclassing lm_eval.api.model.LM class, that defines how lm_eval interfaces with
     NeMo model deployed on PyTriton server.
     Created based on: https://github.com/EleutherAI/lm-evaluation-harness/blob/v0.4.4/docs/model_guide.md
+
+    Requests are sent to the server in batches of ``batch_size`` prompts, with up to ``max_concurrent_requests``
+    batches in flight at the same time (each one over its own persistent connection). With ``server_side_logprobs``,
+    loglikelihood requests get back only the log-probabilities of the continuation tokens and greedy-match flags
+    computed on the server, instead of the full logits.
     """
 
     def __init__(
-        self, model_name, api_url, tokenizer, batch_size, max_tokens_to_generate, temperature, top_p, top_k, add_bos
+        self,
+        model_name,
+        api_url,
+        tokenizer,
+        batch_size,
+        max_tokens_to_generate,
+        temperature,
+        top_p,
+        top_k,
+        add_bos,
+        server_side_logprobs: bool = False,
+        max_concurrent_requests: int = 1,
     ):
+        if max_concurrent_requests < 1:
+            raise ValueError(f"max_concurrent_requests must be >= 1, got {max_concurrent_requests}")
         self.model_name = model_name
         self.api_url = api_url
         self.tokenizer = tokenizer
@@ -46,18 +68,29 @@ class NeMoFWLMEval(LM):
         self.top_p = top_p
         self.top_k = top_k
         self.add_bos = add_bos
+        self.server_side_logprobs = server_side_logprobs
+        self.max_concurrent_requests = max_concurrent_requests
         super().__init__()
 
-    def _generate_tokens_logits(self, payload, single_prediction_token: bool = False, return_logits: bool = False):
+    def _generate_tokens_logits(
+        self,
+        payload,
+        single_prediction_token: bool = False,
+        return_logits: bool = False,
+        nq: Optional[NemoQueryLLM] = None,
+    ):
         """
         A private method that sends post request to the model on PyTriton server and returns either generated text or
-        logits.
+        logits. If the payload contains ``continuation_ids``, returns the tuple of log-probabilities of these tokens
+        and greedy-match flags computed on the server instead of the logits.
         """
-        nq = NemoQueryLLM(url=self.api_url, model_name=payload['model'])
+        if nq is None:
+            nq = NemoQueryLLM(url=self.api_url, model_name=payload['model'])
 
         output_context_logits = False
         output_generation_logits = False
-        if return_logits:  # in case of loglikelihood type tasks
+        continuation_ids = payload.get('continuation_ids')
+        if return_logits and continuation_ids is None:  # in case of loglikelihood type tasks
             if single_prediction_token:
                 # In case of single token prediction like mmlu return only the generation logits
                 output_generation_logits = True
@@ -72,16 +105,44 @@ class NeMoFWLMEval(LM):
             temperature=payload['temperature'],
             output_context_logits=output_context_logits,
             output_generation_logits=output_generation_logits,
+            continuation_ids=continuation_ids,
             openai_format_response=True,
         )
 
         if return_logits:  # loglikelihood type tasks, return just logits and not text
-            if output_context_logits:
+            if continuation_ids is not None:
+                return response["choices"][0]["continuation_logprobs"], response["choices"][0]["continuation_greedy"]
+            elif output_context_logits:
                 return response["choices"][0]["context_logits"]
             else:
                 return response["choices"][0]["generation_logits"]
         else:  # generate_until type tasks, return just text and not logits
-            return str(response["choices"][0]["text"])
+            texts = [str(text) for text in np.asarray(response["choices"][0]["text"]).reshape(-1)]
+            return texts if isinstance(payload['prompt'], list) else texts[0]
+
+    def _map_batches(self, fn: Callable, batches: list) -> list:
+        """
+        Returns ``[fn(nq, batch) for batch in batches]``, where ``nq`` is a NemoQueryLLM client. Up to
+        ``max_concurrent_requests`` batches are processed at the same time, each client keeps its connection to the
+        PyTriton server open until all the batches are processed.
+        """
+        clients = queue.Queue()
+        for _ in range(self.max_concurrent_requests):
+            clients.put(NemoQueryLLM(url=self.api_url, model_name=self.model_name, reuse_client=True))
+
+        def _process_batch(batch):
+            nq = clients.get()
+            try:
+                return fn(nq, batch)
+            finally:
+                clients.put(nq)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_requests) as executor:
+                return list(tqdm(executor.map(_process_batch, batches), total=len(batches)))
+        finally:
+            while not clients.empty():
+                clients.get().close()
 
     def tokenizer_type(self, tokenizer):
         """
@@ -121,83 +182,111 @@ class NeMoFWLMEval(LM):
         # Hard code max_tokens_to_generate to 1 to always generate just 1 token in case of loglikelihood type tasks
         self.max_tokens_to_generate = 1
 
-        results = []
-        for i in tqdm(range(0, len(requests), self.batch_size)):
-            # Group requests into batches
-            batch = requests[i : i + self.batch_size]
-            prompts = []
-            continuations = []
-            continuation_encs = []
-            num_ctx_tokens_list = []
-            num_cont_tokens_list = []
-            # Prepare inputs for the batch
-            for request in batch:
-                # get the input prompt from the request
-                context = request.arguments[0]
-                # get the output prompt from the request
-                continuation = request.arguments[1]
-                # get encoded tokens of context
-                context_enc = self.tokenizer.tokenizer.encode(context, **special_tokens_kwargs)
-                # get encoded tokens of continuation
-                continuation_enc = self.tokenizer.tokenizer.encode(continuation, **special_tokens_kwargs)
-                # for SentencePeice consider the encoded tokens from the 2nd token since first encoded token is space.
-                if self.tokenizer_type(self.tokenizer) == "SentencePieceTokenizer":
-                    context_enc = context_enc[1:]
-                    continuation_enc = continuation_enc[1:]
-                num_ctx_tokens = len(context_enc)
-                num_cont_tokens = len(continuation_enc)
-                # Delete the last token from continuation before passing it to the ip prompt by replacing with empty
-                # string
-                prompt = context + continuation.replace(self.tokenizer.tokenizer.decode(continuation_enc[-1]), "")
-
-                prompts.append(prompt)
-                continuations.append(continuation)
-                continuation_encs.append(continuation_enc)
-                num_ctx_tokens_list.append(num_ctx_tokens)
-                num_cont_tokens_list.append(num_cont_tokens)
-
-            # Create a single payload for the entire batch
-            payload = {
-                "model": self.model_name,
-                "prompt": prompts,
-                "max_tokens": self.max_tokens_to_generate,
-                "temperature": self.temperature,
-                "top_p": self.top_p,
-                "top_k": self.top_k,
-            }
+        # Group requests into batches
+        batches = [requests[i : i + self.batch_size] for i in range(0, len(requests), self.batch_size)]
+        batch_results = self._map_batches(
+            partial(
+                self._loglikelihood_batch,
+                special_tokens_kwargs=special_tokens_kwargs,
+                single_prediction_token=single_prediction_token,
+            ),
+            batches,
+        )
+        return [result for results in batch_results for result in results]
+
+    def _loglikelihood_batch(
+        self,
+        nq: NemoQueryLLM,
+        batch: list[Instance],
+        special_tokens_kwargs: dict,
+        single_prediction_token: bool,
+    ):
+        """
+        Computes the loglikelihood results for a single batch of requests, sent to the server in a single query.
+        """
+        prompts = []
+        continuations = []
+        continuation_encs = []
+        num_ctx_tokens_list = []
+        num_cont_tokens_list = []
+        # Prepare inputs for the batch
+        for request in batch:
+            # get the input prompt from the request
+            context = request.arguments[0]
+            # get the output prompt from the request
+            continuation = request.arguments[1]
+            # get encoded tokens of context
+            context_enc = self.tokenizer.tokenizer.encode(context, **special_tokens_kwargs)
+            # get encoded tokens of continuation
+            continuation_enc = self.tokenizer.tokenizer.encode(continuation, **special_tokens_kwargs)
+            # for SentencePeice consider the encoded tokens from the 2nd token since first encoded token is space.
+            if self.tokenizer_type(self.tokenizer) == "SentencePieceTokenizer":
+                context_enc = context_enc[1:]
+                continuation_enc = continuation_enc[1:]
+            num_ctx_tokens = len(context_enc)
+            num_cont_tokens = len(continuation_enc)
+            # Delete the last token from continuation before passing it to the ip prompt by replacing with empty
+            # string
+            prompt = context + continuation.replace(self.tokenizer.tokenizer.decode(continuation_enc[-1]), "")
+
+            prompts.append(prompt)
+            continuations.append(continuation)
+            continuation_encs.append(continuation_enc)
+            num_ctx_tokens_list.append(num_ctx_tokens)
+            num_cont_tokens_list.append(num_cont_tokens)
+
+        # Create a single payload for the entire batch
+        payload = {
+            "model": self.model_name,
+            "prompt": prompts,
+            "max_tokens": self.max_tokens_to_generate,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "top_k": self.top_k,
+        }
 
-            # Query the model deployed on PyTriton server with the batched payload to get the logits
-            logits_batch = self._generate_tokens_logits(payload, single_prediction_token, return_logits=True)
-
-            # Process each result in the batch
-            for j, logits in enumerate(logits_batch):
-                continuation_enc = continuation_encs[j]
-                num_ctx_tokens = num_ctx_tokens_list[j]
-                num_cont_tokens = num_cont_tokens_list[j]
-
-                # In case of multiple token prediction where full context logits are returned (tasks other than mmlu),
-                # get only logits corresponding to the continuation tokens from context logits tensor. context_logits
-                # contains logits for all tokens in the ip prompt along with the logit for the next token prediction
-                # after the final token in the prompt. Shape of context_logits: [1, #tokens_in_prompt+1, vocab_size].
-                if not single_prediction_token:
-                    # Discard zero padding if any
-                    logits = logits[:, np.any(logits != 0, axis=(0, 2)), :]
-                    # Get only logits corresponding to cont tokens
-                    logits = logits[:, -num_cont_tokens:, :]
-                # Convert logits to torch tensor to easily get logprobs wo manual implementation of log_softmax
-                logProbs = F.log_softmax(torch.tensor(logits), dim=-1)
-                # Convert encoded continuation tokens to torch tensor
-                cont_toks = torch.tensor(continuation_enc, dtype=torch.long).unsqueeze(0)
-                # Get the greedy token from the logits (i.e token with the highest prob)
-                greedy_tokens = logProbs.argmax(dim=-1)
-                # Check if all greedy_tokens match the the actual continuation tokens
-                is_greedy = (greedy_tokens == cont_toks).all()
-                # Get the logits corresponding to the actual continuation tokens
-                logProbs_actual = torch.gather(logProbs, 2, cont_toks.unsqueeze(-1)).squeeze(-1)
-                # result is tuple of logProb of generating the continuation token and is_greedy
-                result = (float(logProbs_actual.sum()), bool(is_greedy))
-                # Append the result of this input in the batch to results list
-                results.append(result)
+        results = []
+        if self.server_side_logprobs:
+            # The server computes the logProbs of the continuation tokens from the context logits, and returns them
+            # along with greedy-match flags, padded to the longest continuation in the batch
+            payload["continuation_ids"] = continuation_encs
+            logprobs_batch, greedy_batch = self._generate_tokens_logits(payload, return_logits=True, nq=nq)
+            for logprobs, is_greedy, num_cont_tokens in zip(logprobs_batch, greedy_batch, num_cont_tokens_list):
+                results.append((float(np.sum(logprobs[:num_cont_tokens])), bool(np.all(is_greedy[:num_cont_tokens]))))
+            return results
+
+        # Query the model deployed on PyTriton server with the batched payload to get the logits
+        logits_batch = self._generate_tokens_logits(payload, single_prediction_token, return_logits=True, nq=nq)
+
+        # Process each result in the batch
+        for j, logits in enumerate(logits_batch):
+            continuation_enc = continuation_encs[j]
+            num_ctx_tokens = num_ctx_tokens_list[j]
+            num_cont_tokens = num_cont_tokens_list[j]
+
+            # In case of multiple token prediction where full context logits are returned (tasks other than mmlu),
+            # get only logits corresponding to the continuation tokens from context logits tensor. context_logits
+            # contains logits for all tokens in the ip prompt along with the logit for the next token prediction
+            # after the final token in the prompt. Shape of context_logits: [1, #tokens_in_prompt+1, vocab_size].
+            if not single_prediction_token:
+                # Discard zero padding if any
+                logits = logits[:, np.any(logits != 0, axis=(0, 2)), :]
+                # Get only logits corresponding to cont tokens
+                logits = logits[:, -num_cont_tokens:, :]
+            # Convert logits to torch tensor to easily get logprobs wo manual implementation of log_softmax
+            logProbs = F.log_softmax(torch.tensor(logits), dim=-1)
+            # Convert encoded continuation tokens to torch tensor
+            cont_toks = torch.tensor(continuation_enc, dtype=torch.long).unsqueeze(0)
+            # Get the greedy token from the logits (i.e token with the highest prob)
+            greedy_tokens = logProbs.argmax(dim=-1)
+            # Check if all greedy_tokens match the the actual continuation tokens
+            is_greedy = (greedy_tokens == cont_toks).all()
+            # Get the logits corresponding to the actual continuation tokens
+            logProbs_actual = torch.gather(logProbs, 2, cont_toks.unsqueeze(-1)).squeeze(-1)
+            # result is tuple of logProb of generating the continuation token and is_greedy
+            result = (float(logProbs_actual.sum()), bool(is_greedy))
+            # Append the result of this input in the batch to results list
+            results.append(result)
 
         return results
 
@@ -213,25 +302,24 @@ class NeMoFWLMEval(LM):
         dataclass defined in lm_eval.api.instance. Each Instance conists of the input prompt, output prompt, request
         type(here loglikelihood) and other relevant args like few shot samples.
         """
-        results = []
-        for instance in tqdm(inputs):
-            # Access the 'arguments' attribute of the Instance which contains the input prompt string
-            prompt = instance.arguments[0]
-            # Create payload to query the model deployed on PyTriton server
+
+        def _generate_batch(nq: NemoQueryLLM, batch: list[Instance]):
+            # Create payload to query the model deployed on PyTriton server, the 'arguments' attribute of the
+            # Instance contains the input prompt string
             payload = {
                 "model": self.model_name,
-                "prompt": prompt,
+                "prompt": [instance.arguments[0] for instance in batch],
                 "max_tokens": self.max_tokens_to_generate,
                 "temperature": self.temperature,
                 "top_p": self.top_p,
                 "top_k": self.top_k,
             }
-            # Get the text generated by the model
-            generated_text = self._generate_tokens_logits(payload)
-
-            results.append(generated_text)
+            # Get the texts generated by the model
+            return self._generate_tokens_logits(payload, nq=nq)
 
-        return results
+        batches = [inputs[i : i + self.batch_size] for i in range(0, len(inputs), self.batch_size)]
+        batch_results = self._map_batches(_generate_batch, batches)
+        return [generated_text for results in batch_results for generated_text in results]
 
 
 def wait_for_server_ready(url, triton_http_port, model_name, max_retries=600, retry_interval=2):
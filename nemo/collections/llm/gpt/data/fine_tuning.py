@@ -130,6 +130,7 @@ class FineTuningDataModule(pl.LightningDataModule):
                     max_seq_length=self.seq_length,
                     seed=self.seed,
                     output_metadata_path=self.pack_metadata,
+                    packed_data_format=self.packed_sequence_specs.packed_data_format,
                 )
 
             if not self.validation_path_packed.is_file():
@@ -141,6 +142,7 @@ class FineTuningDataModule(pl.LightningDataModule):
                     max_seq_length=self.seq_length,
                     seed=self.seed,
                     output_metadata_path=self.pack_metadata,
+                    packed_data_format=self.packed_sequence_specs.packed_data_format,
                 )
 
     def setup(self, stage: str):
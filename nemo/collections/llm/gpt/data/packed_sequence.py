@@ -21,7 +21,15 @@ import numpy as np
 from nemo.collections.common.tokenizers import TokenizerSpec
 from nemo.collections.llm.gpt.data.core import create_sft_dataset
 from nemo.utils import logging
-from nemo.utils.sequence_packing_utils import create_hist, create_packing_strategy, fill_packing_strategy
+from nemo.utils.sequence_packing_utils import (
+    create_hist,
+    create_packing_strategy,
+    fill_packing_strategy,
+    remove_flat_packed_data,
+    save_flat_packed_data,
+)
+
+PACKED_DATA_FORMATS = ("pickle", "flat")
 
 
 def tokenize_dataset(path: Path, tokenizer: TokenizerSpec, max_seq_length: int, seed: int):
@@ -57,6 +65,7 @@ def prepare_packed_sequence_data(
     max_seq_length: int,
     seed: Optional[int] = 0,
     packing_algorithm: str = "first_fit_shuffle",
+    packed_data_format: str = "pickle",
 ):
     """
     Prepares a packed sequence dataset from a given input file and saves it to an output file.
@@ -69,12 +78,18 @@ def prepare_packed_sequence_data(
         max_seq_length (int): Maximum sequence length for the tokens.
         seed (Optional[int]): Random seed for shuffling (optional).
         packing_algorithm (str): The algorithm used for packing sequences
-                currently supports "first_fit_shuffle" and "first_fit_decreasing".
+                currently supports "first_fit_shuffle", "first_fit_decreasing" and "best_fit_decreasing".
+        packed_data_format (str): "pickle" saves the packed sequences as a numpy array of dicts, "flat" saves flat
+                arrays of tokens and loss masks with the offsets of the sequences, which are memory-mapped when
+                loaded instead of being read into memory by each process.
 
     Returns:
         None: Saves the packed sequence data to the specified output path.
     """
 
+    if packed_data_format not in PACKED_DATA_FORMATS:
+        raise ValueError(f"packed_data_format must be one of {PACKED_DATA_FORMATS}, got {packed_data_format}")
+
     logging.info(f"Preparing packed sequence from {input_path}")
     dataset = tokenize_dataset(input_path, tokenizer, max_seq_length, seed)
     sequences, histogram = create_hist(dataset, max_seq_length)
@@ -83,7 +98,12 @@ def prepare_packed_sequence_data(
     output_data = fill_packing_strategy(assignments, sequences, packed_sequence_size, tokenizer.eos_id)
 
     # save output data
-    np.save(output_path, output_data)
+    if packed_data_format == "flat":
+        save_flat_packed_data(output_data, output_path)
+    else:
+        # arrays of a previous flat dataset at the same path would be stale
+        remove_flat_packed_data(output_path)
+        np.save(output_path, output_data)
 
     # save packing metadata, packing_metadata is appended to the packing file if it exists
     if output_metadata_path is not None:
@@ -143,7 +163,18 @@ class PackedSequenceSpecs:
     If True, pad cu_seqlens to a constant size, which is required for use with cudagraphs.
     """
 
+    packed_data_format: str = "pickle"
+    """
+    Format of the packed dataset files prepared by the data module: "pickle" (numpy array of dicts) or "flat" (flat
+    arrays of tokens and loss masks with sequence offsets, memory-mapped when loaded, which avoids a copy of the
+    dataset in the memory of every rank and dataloader worker). Existing files are loaded in the format they have.
+    """
+
     def __post_init__(self):
+        assert (
+            self.packed_data_format in PACKED_DATA_FORMATS
+        ), f"packed_data_format must be one of {PACKED_DATA_FORMATS}: {self.packed_data_format}"
+
         if self.packed_train_data_path is not None:
             self.packed_train_data_path = Path(self.packed_train_data_path)
             assert (
@@ -30,6 +30,7 @@ from nemo.collections.nlp.data.language_modeling.megatron.dataset_utils import g
 from nemo.collections.nlp.data.language_modeling.text_memmap_dataset import JSONLMemMapDataset, OnlineSampleMapping
 from nemo.core.classes import Dataset
 from nemo.utils import logging
+from nemo.utils.sequence_packing_utils import FlatPackedSequences, is_flat_packed_data
 
 __all__ = ['GPTSFTDataset']
 
@@ -566,7 +567,7 @@ class GPTSFTPackedDataset(GPTSFTDataset):
             idx = self.samples_mapping[idx]
 
         input_ids = self.indexed_dataset[idx]['input_ids']
-        seq_boundaries = self.indexed_dataset[idx]['seq_start_id'] + [len(input_ids)]
+        seq_boundaries = list(self.indexed_dataset[idx]['seq_start_id']) + [len(input_ids)]
         loss_mask = self.indexed_dataset[idx]['loss_mask']
         if idx < 0:
             loss_mask = [0] * len(loss_mask)
@@ -574,7 +575,11 @@ class GPTSFTPackedDataset(GPTSFTDataset):
 
     def _load_dataset(self):
         try:
-            self.indexed_dataset = np.load(self.file_path, allow_pickle=True)
+            if is_flat_packed_data(self.file_path):
+                # memory-mapped arrays, packs are zero-copy slices of them
+                self.indexed_dataset = FlatPackedSequences(self.file_path)
+            else:
+                self.indexed_dataset = np.load(self.file_path, allow_pickle=True)
         except Exception as e:
             logging.error(
                 f"Failed to load packed dataset. The dataset should be a `.npy` file. "
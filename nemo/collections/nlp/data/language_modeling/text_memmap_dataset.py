@@ -62,6 +62,122 @@ def _build_index_from_memdata(fn, newline_int):
     return midx
 
 
+def _count_newlines_in_chunk(fn, newline_int, start, end):
+    """Returns the number of delimiters in the byte range [start, end) of file fn."""
+    mdata = np.memmap(fn, dtype=np.uint8, mode="r", offset=start, shape=(end - start,))
+    count = int(np.count_nonzero(mdata == newline_int))
+    del mdata
+    return count
+
+
+def _write_newlines_in_chunk(fn, newline_int, start, end, idx_npy_fn, out_start, out_end):
+    """
+    Writes the positions of the delimiters in the byte range [start, end) of file fn
+    into entries [out_start, out_end) of the memory-mapped index idx_npy_fn.
+    Positions past out_end (trailing empty lines) are dropped.
+    """
+    if out_end <= out_start:
+        return
+    mdata = np.memmap(fn, dtype=np.uint8, mode="r", offset=start, shape=(end - start,))
+    positions = np.flatnonzero(mdata == newline_int)[: out_end - out_start] + start
+    del mdata
+    midx = np.load(idx_npy_fn, mmap_mode="r+")
+    midx[out_start : out_start + len(positions)] = positions
+    midx.flush()
+    del midx
+
+
+def _count_trailing_newlines(fn, newline_int, size, block_size=1024 * 1024):
+    """Returns the length of the run of delimiters at the end of file fn."""
+    count = 0
+    end = size
+    while end > 0:
+        start = max(0, end - block_size)
+        mdata = np.memmap(fn, dtype=np.uint8, mode="r", offset=start, shape=(end - start,))
+        other = np.flatnonzero(mdata != newline_int)
+        del mdata
+        if len(other) > 0:
+            return count + (end - start - 1 - int(other[-1]))
+        count += end - start
+        end = start
+    return count
+
+
+def _build_index_files_chunked(dataset_paths, newline_int, workers, index_mapping_dir, chunk_size):
+    """
+    Builds index files by scanning fixed-size windows of all files in parallel.
+
+    Produces the same index as _build_index_from_memdata, but peak memory is bounded by
+    chunk_size per worker regardless of the file size, and the index is written directly
+    into a memory-mapped .npy file. Windows of all files share one pool, so the work scales
+    across both files and cores. The build runs in two passes over the data: delimiters are
+    first counted per window to compute output offsets, then every window writes its
+    positions into its own slice of the index.
+
+    Returns a list with the build status (True if an index was built) of every file.
+    """
+    build_status = [False] * len(dataset_paths)
+    # (fn, idx_fn, size, chunk boundaries) of every file that needs an index
+    pending = []
+    for i, fn in enumerate(dataset_paths):
+        idx_fn = _index_fn(fn, index_mapping_dir)
+        if _index_file_exists(idx_fn):
+            continue
+        logging.info(f"Building indexing for fn = {fn}")
+        size = os.path.getsize(fn)
+        bounds = list(range(0, size, chunk_size)) + [size]
+        pending.append((fn, idx_fn, size, bounds))
+        build_status[i] = True
+
+    if not pending:
+        return build_status
+
+    ctx = mp.get_context("fork")
+    with ctx.Pool(workers) as p:
+        count_args = [
+            (fn, newline_int, start, end)
+            for fn, _, _, bounds in pending
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        counts = iter(p.starmap(_count_newlines_in_chunk, count_args))
+
+        write_args = []
+        for fn, idx_fn, size, bounds in pending:
+            chunk_counts = [next(counts) for _ in range(len(bounds) - 1)]
+            num_newlines = sum(chunk_counts)
+            trailing = _count_trailing_newlines(fn, newline_int, size)
+            if trailing == 0:
+                # no delimiter at the end of the file, so add its end as the last item
+                num_entries = num_newlines + 1
+            else:
+                # keep only the first delimiter of a run of empty lines at the end of the file
+                num_entries = num_newlines - trailing + 1
+            num_positions = min(num_newlines, num_entries)
+
+            logging.info(f"Saving idx file = {idx_fn}.npy")
+            midx = np.lib.format.open_memmap(idx_fn + ".npy", mode="w+", dtype=np.int64, shape=(num_entries,))
+            if num_positions < num_entries:
+                midx[-1] = size + 1
+            midx.flush()
+            del midx
+
+            out_offsets = np.cumsum([0] + chunk_counts).tolist()
+            for start, end, out_start, out_end in zip(bounds[:-1], bounds[1:], out_offsets[:-1], out_offsets[1:]):
+                out_end = min(out_end, num_positions)
+                write_args.append((fn, newline_int, start, end, idx_fn + ".npy", out_start, out_end))
+
+        p.starmap(_write_newlines_in_chunk, write_args)
+
+    for fn, idx_fn, _, _ in pending:
+        # the metadata file is written last, so a partially written index is never picked up as complete
+        data = dict(newline_int=newline_int, version=__idx_version__)
+        logging.info(f"Saving metadata file = {idx_fn}.info")
+        with open(idx_fn + ".info", "wb") as fp:
+            pickle.dump(data, fp)
+
+    return build_status
+
+
 class TextMemMapDataset(Dataset):
     """
     Allow per-line lazy access to multiple text files using numpy memmap.
@@ -77,6 +193,7 @@ class TextMemMapDataset(Dataset):
         build_index_fn: Optional[Callable[[str, Optional[int]], bool]] = _build_index_from_memdata,
         sort_dataset_paths: Optional[bool] = True,
         index_mapping_dir: Optional[str] = None,
+        index_chunk_size: Optional[int] = None,
     ):
         """
         Args:
@@ -91,6 +208,9 @@ class TextMemMapDataset(Dataset):
             sort_dataset_paths: whether to sort datasets by paths.
             index_mapping_dir: directory to save the index mapping to.
                 If None, will write to the same folder as the dataset.
+            index_chunk_size: if set, index files are built by scanning windows of this many bytes
+                in parallel and streaming the index to disk, which bounds peak memory for large files.
+                Only used with the default build_index_fn.
         """
         super().__init__()
         self.mdata_midx_list = []
@@ -109,6 +229,7 @@ class TextMemMapDataset(Dataset):
         self._worker = workers
         self.tokenizer = tokenizer
         self._sort_dataset_paths = sort_dataset_paths
+        self._index_chunk_size = index_chunk_size
 
         if sort_dataset_paths:
             self._files_list = sorted(self._files_list)
@@ -125,6 +246,7 @@ class TextMemMapDataset(Dataset):
                 workers=self._worker,
                 build_index_fn=build_index_fn,
                 index_mapping_dir=index_mapping_dir,
+                chunk_size=index_chunk_size,
             )
 
         if is_distributed and not _lightning_prepare_data():
@@ -150,6 +272,7 @@ class TextMemMapDataset(Dataset):
                 workers=self._worker,
                 build_index_fn=build_index_fn,
                 index_mapping_dir=index_mapping_dir,
+                chunk_size=index_chunk_size,
             )
 
         if is_distributed and not _lightning_prepare_data():
@@ -517,8 +640,14 @@ def build_index_files(
     workers=None,
     build_index_fn=_build_index_from_memdata,
     index_mapping_dir: str = None,
+    chunk_size: Optional[int] = None,
 ):
-    """Auxiliary method to build multiple index files"""
+    """
+    Auxiliary method to build multiple index files
+
+    If chunk_size is given and the default build_index_fn is used, files are split into windows
+    of chunk_size bytes which are indexed in parallel, see _build_index_files_chunked.
+    """
     if len(dataset_paths) < 1:
         raise ValueError("files_list must contain at leat one file name")
 
@@ -528,17 +657,24 @@ def build_index_files(
     logging.info(f"Processing {len(dataset_paths)} data files using {workers} workers")
     # load all files into memmap
     start_time = time.time()
-    ctx = mp.get_context("fork")
-    with ctx.Pool(workers) as p:
-        build_status = p.map(
-            partial(
-                _build_memmap_index_files,
-                newline_int,
-                build_index_fn,
-                index_mapping_dir=index_mapping_dir,
-            ),
-            dataset_paths,
+    if chunk_size is not None and build_index_fn is _build_index_from_memdata:
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, but got {chunk_size}")
+        build_status = _build_index_files_chunked(
+            dataset_paths, newline_int, workers, index_mapping_dir=index_mapping_dir, chunk_size=chunk_size
         )
+    else:
+        ctx = mp.get_context("fork")
+        with ctx.Pool(workers) as p:
+            build_status = p.map(
+                partial(
+                    _build_memmap_index_files,
+                    newline_int,
+                    build_index_fn,
+                    index_mapping_dir=index_mapping_dir,
+                ),
+                dataset_paths,
+            )
 
     logging.info(
         f"Time building {sum(build_status)} / {len(build_status)} mem-mapped files: {datetime.timedelta(seconds=time.time() - start_time)}"
@@ -12,10 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import multiprocessing as mp
 import pathlib
 import random
 import re
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 
 from nemo.collections.common.tokenizers.text_to_speech.ipa_lexicon import validate_locale
@@ -53,6 +54,7 @@ class IpaG2p(BaseG2p):
         grapheme_case: Optional[str] = GRAPHEME_CASE_UPPER,
         grapheme_prefix: Optional[str] = "",
         mapping_file: Optional[str] = None,
+        cache_size: int = 100000,
     ) -> None:
         """
         Generic IPA G2P module. This module converts words from graphemes to International Phonetic Alphabet
@@ -92,6 +94,10 @@ class IpaG2p(BaseG2p):
                 from phonemes because there may be overlaps between the two set. It is suggested to choose a prefix that
                 is not used or preserved somewhere else. "#" could be a good candidate. Default to "".
             TODO @borisfom: add docstring for newly added `mapping_file` argument.
+            cache_size (int): Maximum number of words whose parsing results are kept in an LRU cache by
+                `parse_one_word`. The random choice driven by `phoneme_probability` is drawn for every word and is not
+                cached. Call `clear_cache` after modifying `phoneme_dict` or `heteronyms` directly. Set it to 0 to
+                disable the cache. Defaults to 100000.
         """
         self.use_stresses = use_stresses
         self.grapheme_case = grapheme_case
@@ -99,6 +105,8 @@ class IpaG2p(BaseG2p):
         self.phoneme_probability = phoneme_probability
         self.locale = locale
         self._rng = random.Random()
+        self.cache_size = cache_size
+        self._word_cache = OrderedDict()
 
         if locale is not None:
             validate_locale(locale)
@@ -224,6 +232,13 @@ class IpaG2p(BaseG2p):
         Replace model's phoneme dictionary with a custom one
         """
         self.phoneme_dict = self._parse_phoneme_dict(phoneme_dict)
+        self.clear_cache()
+
+    def clear_cache(self):
+        """
+        Clears the cache of parsed words. Needs to be called after modifying `phoneme_dict` or `heteronyms`.
+        """
+        self._word_cache.clear()
 
     @staticmethod
     def _parse_file_by_lines(p: Union[str, pathlib.Path]) -> List[str]:
@@ -339,6 +354,7 @@ class IpaG2p(BaseG2p):
             self.phoneme_dict.update(replacement_dict)
 
         self.symbols = new_symbols
+        self.clear_cache()
 
     def is_unique_in_phoneme_dict(self, word: str) -> bool:
         return len(self.phoneme_dict[word]) == 1
@@ -356,6 +372,24 @@ class IpaG2p(BaseG2p):
         if self.phoneme_probability is not None and self._rng.random() > self.phoneme_probability:
             return self._prepend_prefix_for_one_word(word), True
 
+        # The rest of the rules only depend on the word, so their results can be cached.
+        if self.cache_size <= 0:
+            return self._parse_one_word_by_rules(word)
+
+        if word in self._word_cache:
+            self._word_cache.move_to_end(word)
+            pron, is_handled = self._word_cache[word]
+        else:
+            pron, is_handled = self._parse_one_word_by_rules(word)
+            pron = tuple(pron)
+            self._word_cache[word] = (pron, is_handled)
+            if len(self._word_cache) > self.cache_size:
+                self._word_cache.popitem(last=False)
+        return list(pron), is_handled
+
+    def _parse_one_word_by_rules(self, word: str) -> Tuple[List[str], bool]:
+        """Applies heteronym, locale-specific and dictionary rules to a case-normalized `word`.
+        """
         # Heteronyms
         if self.heteronyms and word in self.heteronyms:
             return self._prepend_prefix_for_one_word(word), True
@@ -458,6 +492,36 @@ class IpaG2p(BaseG2p):
             except Exception as e:
                 logging.warning(f"Heteronym model failed {e}, skipping")
 
+        return self._phonemize(text)
+
+    def batch_call(self, texts: List[str], num_workers: int = 0, chunksize: int = 64) -> List[List[str]]:
+        """
+        Converts a list of sentences, giving the same results as calling the module on every sentence.
+        Heteronyms of all sentences are disambiguated in one call of the heteronym model.
+
+        Args:
+            texts: List of sentences.
+            num_workers: If greater than 0, sentences are converted by a pool of `num_workers` processes.
+                Note that draws driven by `phoneme_probability` are then not reproducible.
+            chunksize: Number of sentences sent to a worker process at once.
+
+        Returns:
+            List of converted sentences.
+        """
+        texts = [normalize_unicode_text(text) for text in texts]
+
+        if self.heteronym_model is not None and len(texts) > 0:
+            try:
+                texts = self.heteronym_model.disambiguate(sentences=texts)[1]
+            except Exception as e:
+                logging.warning(f"Heteronym model failed {e}, skipping")
+
+        if num_workers > 0:
+            with mp.get_context("fork").Pool(num_workers, initializer=_init_g2p_worker, initargs=(self,)) as pool:
+                return pool.map(_phonemize_in_worker, texts, chunksize=chunksize)
+        return [self._phonemize(text) for text in texts]
+
+    def _phonemize(self, text: str) -> List[str]:
         words_list_of_tuple = self.word_tokenize_func(text)
 
         prons = []
@@ -489,3 +553,17 @@ class IpaG2p(BaseG2p):
                 prons.extend(pron)
 
         return prons
+
+
+_worker_g2p = None
+
+
+def _init_g2p_worker(g2p: IpaG2p):
+    # g2p is inherited by forked workers, reseed them so that they do not draw the same random numbers
+    global _worker_g2p
+    _worker_g2p = g2p
+    _worker_g2p._rng.seed()
+
+
+def _phonemize_in_worker(text: str) -> List[str]:
+    return _worker_g2p._phonemize(text)
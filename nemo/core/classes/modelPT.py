@@ -1325,19 +1325,32 @@ class ModelPT(LightningModule, Model):
                     model_load_dict = cfg.init_from_nemo_model
                     for model_load_cfg in model_load_dict.values():
                         model_path = model_load_cfg.path
-                        # Restore model
-                        restored_model = self.restore_from(
-                            model_path, map_location=map_location, strict=cfg.get("init_strict", True)
-                        )
-
                         include = model_load_cfg.pop('include', [""])
                         exclude = model_load_cfg.pop('exclude', [])
 
+                        # strict restoration checks the whole checkpoint against its model, otherwise
+                        # only the included parameters are read, without restoring the whole model
+                        if not cfg.get("init_strict", True) and self._save_restore_connector.has_sharded_weights(
+                            model_path
+                        ):
+                            state_dict = self._save_restore_connector.load_state_dict_from(
+                                model_path,
+                                map_location=map_location,
+                                filter_fn=lambda name: any(p in name for p in include),
+                            )
+                        else:
+                            # Restore model
+                            restored_model = self.restore_from(
+                                model_path, map_location=map_location, strict=cfg.get("init_strict", True)
+                            )
+                            state_dict = restored_model.state_dict()
+                            del restored_model
+
                         self.load_part_of_state_dict(
-                            restored_model.state_dict(), include, exclude, f'nemo file with path `{model_path}`'
+                            state_dict, include, exclude, f'nemo file with path `{model_path}`'
                         )
 
-                        del restored_model
+                        del state_dict
                 else:
                     raise TypeError("Invalid type: init_from_nemo_model is not a string or a dict!")
 
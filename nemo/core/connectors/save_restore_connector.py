@@ -14,11 +14,18 @@
 # limitations under the License.
 from __future__ import annotations  # necessary for lazy types evaluation
 
+import inspect
+import io
+import itertools
+import json
+import mmap
 import os
 import shutil
 import tarfile
 import tempfile
 import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from typing import Callable, Generator, Optional, Set, Union
 
@@ -34,12 +41,68 @@ from nemo.utils.get_rank import is_global_rank_zero
 from nemo.utils.model_utils import inject_model_parallel_rank
 
 
+class _TarMemberReader(io.RawIOBase):
+    """
+    Read-only, seekable file object over a single member of an uncompressed tarball.
+    Reads are served straight from a memory map of the archive, so the member is never extracted to disk.
+    """
+
+    def __init__(self, buffer: mmap.mmap, offset: int, size: int):
+        super().__init__()
+        self._view = memoryview(buffer)[offset : offset + size]
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence value: {whence}")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = self._view[self._pos : end].tobytes() if end > self._pos else b""
+        self._pos += len(data)
+        return data
+
+    def readinto(self, b) -> int:
+        data = self._view[self._pos : self._pos + len(b)]
+        size = len(data)
+        memoryview(b).cast('B')[:size] = data
+        self._pos += size
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
 class SaveRestoreConnector:
     def __init__(self) -> None:
         self._model_config_yaml = "model_config.yaml"
         self._model_weights_ckpt = "model_weights.ckpt"
         self._model_extracted_dir = None
         self._pack_nemo_file = True
+        self._mmap_nemo_file = False
+        self._empty_init = False
+        self._weights_shard_size = None
 
     def save_to(self, model: "nemo_classes.ModelPT", save_path: str):
         """
@@ -50,6 +113,9 @@ class SaveRestoreConnector:
             model_config.yaml - model configuration in .yaml format. You can deserialize this into cfg argument for model's constructor
             model_wights.ckpt - model checkpoint
 
+        If `weights_shard_size` is set, the model checkpoint is replaced by shards of about `weights_shard_size` bytes
+        written in parallel and a `model_weights.index.json` index, which allows reading tensors selectively.
+
         Args:
             model: ModelPT object to be saved.
             save_path: Path to .nemo file where model instance should be saved
@@ -70,7 +136,12 @@ class SaveRestoreConnector:
                     self._handle_artifacts(model, nemo_file_folder=tmpdir)
                     # We should not update self._cfg here - the model can still be in use
                     self._update_artifact_paths(model, path2yaml_file=config_yaml)
-                self._save_state_dict_to_disk(model.state_dict(), model_weights)
+                if self.weights_shard_size is not None:
+                    self._save_sharded_state_dict_to_disk(
+                        model.state_dict(), model_weights, shard_size=self.weights_shard_size
+                    )
+                else:
+                    self._save_state_dict_to_disk(model.state_dict(), model_weights)
 
                 # Check if we are packing the folder into a nemo file
                 if self.pack_nemo_file:
@@ -108,6 +179,15 @@ class SaveRestoreConnector:
             return_config: If set to true, will return just the underlying config of the restored
                 model as an OmegaConf DictConfig object without instantiating the model.
 
+        Uncompressed .nemo files are not extracted when `mmap_nemo_file` is set (disabled by default): the config
+        is read from the archive, the weights are loaded from a memory map of the archive and artifacts are
+        extracted only when the model registers them. The archive is extracted as usual if the weights are not
+        stored as a single file (e.g. distributed checkpoints) or if `_load_state_dict_from_disk` is overridden,
+        since overrides expect a path on disk.
+
+        When `empty_init` is set, the parameters of the returned instance are on the meta device and the
+        instance is not moved to `map_location` yet: `restore_from` assigns the state dict to it and moves it.
+
         Example:
             ```
             model = nemo.collections.asr.models.EncDecCTCModel.restore_from('asr.nemo')
@@ -121,11 +201,23 @@ class SaveRestoreConnector:
         # (original .nemo behavior)
         cwd = os.getcwd()
 
-        if map_location is None:
-            if torch.cuda.is_available():
-                map_location = torch.device('cuda')
-            else:
-                map_location = torch.device('cpu')
+        map_location = self._get_map_location(map_location)
+
+        if self.mmap_nemo_file and not (
+            self.model_extracted_dir is not None and os.path.isdir(self.model_extracted_dir)
+        ):
+            members = self._tar_member_index(restore_path)
+            # compressed (pre 1.7.0) checkpoints can't be read in place and are extracted as before
+            if members is not None and self._can_load_from_archive(restore_path, members):
+                return self._load_config_and_state_dict_from_archive(
+                    calling_cls,
+                    restore_path,
+                    members,
+                    override_config_path=override_config_path,
+                    map_location=map_location,
+                    return_config=return_config,
+                    trainer=trainer,
+                )
 
         app_state = AppState()
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -155,17 +247,7 @@ class SaveRestoreConnector:
                 else:
                     # can be str path or OmegaConf / DictConfig object
                     config_yaml = override_config_path
-                if not isinstance(config_yaml, (OmegaConf, DictConfig)):
-                    conf = OmegaConf.load(config_yaml)
-                else:
-                    conf = config_yaml
-                    if override_config_path is not None:
-                        # Resolve the override config
-                        conf = OmegaConf.to_container(conf, resolve=True)
-                        conf = OmegaConf.create(conf)
-                # If override is top level config, extract just `model` from it
-                if 'model' in conf:
-                    conf = conf.model
+                conf = self._load_config(config_yaml, resolve=override_config_path is not None)
 
                 if return_config:
                     instance = conf
@@ -179,17 +261,160 @@ class SaveRestoreConnector:
                 os.chdir(cwd)
                 # get the class
                 calling_cls._set_model_restore_state(is_being_restored=True, folder=tmpdir)
-                instance = calling_cls.from_config_dict(config=conf, trainer=trainer)
-                instance = instance.to(map_location)
+                instance = self._instantiate(calling_cls, conf, trainer, map_location)
                 # add load_state_dict override
                 if app_state.model_parallel_size is not None and app_state.model_parallel_size > 1:
                     model_weights = self._inject_model_parallel_rank_for_ckpt(tmpdir, self.model_weights_ckpt)
-                state_dict = self._load_state_dict_from_disk(model_weights, map_location=map_location)
+                state_dict = self._load_weights(model_weights, map_location=map_location)
             finally:
                 os.chdir(cwd)
 
         return (conf, instance, state_dict)
 
+    def _load_config_and_state_dict_from_archive(
+        self,
+        calling_cls,
+        restore_path: str,
+        members: dict[str, tarfile.TarInfo],
+        override_config_path: Optional[Union[OmegaConf, str]] = None,
+        map_location: Optional[torch.device] = None,
+        return_config: bool = False,
+        trainer: Trainer = None,
+    ):
+        """
+        Same as `load_config_and_state_dict`, for uncompressed .nemo files which are read in place
+        instead of being extracted to a temporary directory.
+
+        Args:
+            members: members of the .nemo file keyed by normalized name, see `_tar_member_index`.
+        """
+        app_state = AppState()
+        if override_config_path is None:
+            member = self._get_tar_member(restore_path, members, self.model_config_yaml)
+            config_yaml = OmegaConf.create(self._read_tar_member(restore_path, member).decode('utf-8'))
+        else:
+            config_yaml = override_config_path
+        conf = self._load_config(config_yaml, resolve=override_config_path is not None)
+
+        if return_config:
+            return conf
+
+        model_weights = self._get_model_weights_path(".")
+        sharded_weights = self._get_sharded_weights_from_archive(restore_path, members, model_weights)
+        if sharded_weights is None:
+            weights_member = self._get_tar_member(restore_path, members, model_weights)
+
+        OmegaConf.set_struct(conf, True)
+        # artifacts registered by the model are extracted on demand, see `register_artifact`
+        prev_nemo_file_archive = app_state.nemo_file_archive
+        with tempfile.TemporaryDirectory() as tmpdir:
+            try:
+                app_state.nemo_file_archive = restore_path
+                calling_cls._set_model_restore_state(is_being_restored=True, folder=tmpdir)
+                instance = self._instantiate(calling_cls, conf, trainer, map_location)
+            finally:
+                app_state.nemo_file_archive = prev_nemo_file_archive
+
+        if sharded_weights is not None:
+            state_dict = self._load_sharded_state_dict(*sharded_weights)
+        else:
+            with self._open_tar_member(restore_path, weights_member) as model_weights:
+                state_dict = self._load_state_dict_from_disk(model_weights, map_location=map_location)
+
+        return (conf, instance, state_dict)
+
+    def _can_load_from_archive(self, restore_path: str, members: dict[str, tarfile.TarInfo]) -> bool:
+        """
+        Returns whether the weights of an uncompressed .nemo file can be read in place: they must be stored as
+        a regular file or as sharded weights, and `_load_state_dict_from_disk` must not be overridden,
+        since overrides (e.g. for distributed checkpoints) expect a path on disk rather than a file object.
+        """
+        if type(self)._load_state_dict_from_disk is not SaveRestoreConnector._load_state_dict_from_disk:
+            return False
+        model_weights = self._get_model_weights_path(".")
+        if os.path.normpath(self._sharded_weights_index_path(model_weights)) in members:
+            return True
+        member = members.get(os.path.normpath(model_weights))
+        return member is not None and member.isreg() and not member.issparse()
+
+    def _get_model_weights_path(self, dirname: str) -> str:
+        """
+        Returns the path of the model weights in a directory holding the contents of a .nemo file,
+        with the model parallel rank injected when model parallelism is used.
+        """
+        app_state = AppState()
+        if app_state.model_parallel_size is not None and app_state.model_parallel_size > 1:
+            return self._inject_model_parallel_rank_for_ckpt(dirname, self.model_weights_ckpt)
+        return os.path.join(dirname, self.model_weights_ckpt)
+
+    def _instantiate(self, calling_cls, conf: DictConfig, trainer: Trainer, map_location: torch.device):
+        """
+        Instantiates the model to restore. With `empty_init`, its parameters are left on the meta device, so they
+        are neither allocated nor initialized, until the state dict is assigned, see `load_instance_with_state_dict`.
+        """
+        if self.empty_init:
+            if 'assign' in inspect.signature(calling_cls.load_state_dict).parameters:
+                with self._empty_init_context():
+                    return calling_cls.from_config_dict(config=conf, trainer=trainer)
+            logging.warning(
+                f"`load_state_dict` of {calling_cls.__name__} does not support `assign`, "
+                f"the model is restored without `empty_init`."
+            )
+        instance = calling_cls.from_config_dict(config=conf, trainer=trainer)
+        return instance.to(map_location)
+
+    @staticmethod
+    @contextmanager
+    def _empty_init_context() -> Generator[None, None, None]:
+        """
+        Moves the parameters of the modules constructed within the context to the meta device as soon as they
+        are registered, so they are neither kept in memory nor randomly initialized.
+        Buffers are created as usual, since non-persistent ones are not restored from the checkpoint.
+        """
+        register_parameter = torch.nn.Module.register_parameter
+
+        def register_empty_parameter(module, name, param):
+            register_parameter(module, name, param)
+            # parameters registered again, e.g. tied weights, are already empty
+            if param is not None and not param.is_meta:
+                empty_param = torch.nn.Parameter(param.to(torch.device('meta')), requires_grad=param.requires_grad)
+                empty_param.__dict__.update(param.__dict__)
+                module._parameters[name] = empty_param
+
+        torch.nn.Module.register_parameter = register_empty_parameter
+        try:
+            yield
+        finally:
+            torch.nn.Module.register_parameter = register_parameter
+
+    @staticmethod
+    def _get_map_location(map_location: Optional[torch.device] = None) -> torch.device:
+        if map_location is None:
+            if torch.cuda.is_available():
+                map_location = torch.device('cuda')
+            else:
+                map_location = torch.device('cpu')
+        return map_location
+
+    @staticmethod
+    def _load_config(config_yaml: Union[OmegaConf, DictConfig, str], resolve: bool = False) -> DictConfig:
+        """
+        Loads the model config from a yaml path or an OmegaConf / DictConfig object,
+        resolving it if it is an override config.
+        """
+        if not isinstance(config_yaml, (OmegaConf, DictConfig)):
+            conf = OmegaConf.load(config_yaml)
+        else:
+            conf = config_yaml
+            if resolve:
+                # Resolve the override config
+                conf = OmegaConf.to_container(conf, resolve=True)
+                conf = OmegaConf.create(conf)
+        # If override is top level config, extract just `model` from it
+        if 'model' in conf:
+            conf = conf.model
+        return conf
+
     def modify_state_dict(self, conf, state_dict):
         """
         Utility method that allows to modify the state dict before loading parameters into a model.
@@ -218,7 +443,13 @@ class SaveRestoreConnector:
             state_dict: The state dict (which may have been modified)
             strict: Bool, whether to perform strict checks when loading the state dict.
         """
-        instance.load_state_dict(state_dict, strict=strict)
+        # with `empty_init`, the parameters are on the meta device unless the model's `load_state_dict` can't assign
+        if self.empty_init and any(
+            tensor.is_meta for tensor in itertools.chain(instance.parameters(), instance.buffers())
+        ):
+            self._assign_state_dict(instance, state_dict, strict=strict)
+        else:
+            instance.load_state_dict(state_dict, strict=strict)
         instance._set_model_restore_state(is_being_restored=False)
 
     def restore_from(
@@ -272,6 +503,11 @@ class SaveRestoreConnector:
         conf, instance, state_dict = loaded_params
         state_dict = self.modify_state_dict(conf, state_dict)
         self.load_instance_with_state_dict(instance, state_dict, strict)
+        if self.empty_init:
+            # the checkpoint tensors were assigned to the model on the host, release the checkpoint
+            # so that they are freed one by one as the model is moved
+            del loaded_params, state_dict
+            instance = instance.to(self._get_map_location(map_location))
         logging.info(f'Model {instance.__class__.__name__} was successfully restored from {restore_path}.')
         return instance
 
@@ -322,12 +558,17 @@ class SaveRestoreConnector:
         if not os.path.exists(save_dir):
             os.makedirs(save_dir, exist_ok=True)
 
+        sharded_weights = self._get_sharded_weights(restore_path)
         with tempfile.TemporaryDirectory() as tmpdir:
             try:
-                self._unpack_nemo_file(path2file=restore_path, out_folder=tmpdir)
-                os.chdir(tmpdir)
-                model_weights = os.path.join(tmpdir, self.model_weights_ckpt)
-                state_dict = self._load_state_dict_from_disk(model_weights)
+                if sharded_weights is not None:
+                    # sharded weights are read in place, without extracting the .nemo file
+                    state_dict = self._load_sharded_state_dict(*sharded_weights)
+                else:
+                    self._unpack_nemo_file(path2file=restore_path, out_folder=tmpdir)
+                    os.chdir(tmpdir)
+                    model_weights = self._get_model_weights_path(tmpdir)
+                    state_dict = self._load_weights(model_weights)
 
                 if not split_by_module:
                     filepath = os.path.join(save_dir, self.model_weights_ckpt)
@@ -349,6 +590,58 @@ class SaveRestoreConnector:
 
         return state_dict
 
+    def load_state_dict_from(
+        self,
+        restore_path: str,
+        map_location: Optional[torch.device] = None,
+        filter_fn: Optional[Callable[[str], bool]] = None,
+    ) -> dict:
+        """
+        Loads the state dict stored in a .nemo file without instantiating the model.
+
+        Args:
+            restore_path: path to .nemo file from which the state dict should be loaded
+            map_location: Optional torch.device() to map the loaded tensors to.
+            filter_fn: optional function of a parameter name, returning whether the parameter should be loaded.
+                For .nemo files saved with `weights_shard_size`, only the bytes of the selected parameters are read.
+
+        Returns:
+            The (filtered) state dict stored in the .nemo file
+        """
+        sharded_weights = self._get_sharded_weights(restore_path)
+        if sharded_weights is not None:
+            return self._load_sharded_state_dict(*sharded_weights, filter_fn=filter_fn, map_location=map_location)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._unpack_nemo_file(path2file=restore_path, out_folder=tmpdir)
+            state_dict = self._load_weights(self._get_model_weights_path(tmpdir))
+
+        if filter_fn is not None:
+            state_dict = {key: value for key, value in state_dict.items() if filter_fn(key)}
+        if map_location is not None:
+            state_dict = {
+                key: value.to(map_location) if isinstance(value, torch.Tensor) else value
+                for key, value in state_dict.items()
+            }
+        return state_dict
+
+    def has_sharded_weights(self, restore_path: str) -> bool:
+        """
+        Returns whether the .nemo file was saved with sharded weights, see `weights_shard_size`.
+        """
+        index_name = os.path.normpath(self._sharded_weights_index_path(self._get_model_weights_path(".")))
+        return len(self._filtered_tar_info(restore_path, lambda name: os.path.normpath(name) == index_name)) > 0
+
+    def _get_sharded_weights(self, restore_path: str) -> Optional[tuple[dict, dict[str, tuple[str, int, int]]]]:
+        """
+        Returns the sharded weights of an uncompressed .nemo file, which can be read in place,
+        see `_get_sharded_weights_from_archive`. Returns None for other .nemo files.
+        """
+        members = self._tar_member_index(restore_path)
+        if members is None:
+            return None
+        return self._get_sharded_weights_from_archive(restore_path, members, self._get_model_weights_path("."))
+
     def register_artifact(self, model, config_path: str, src: str, verify_src_exists: bool = True):
         """
         Register model artifacts with this function. These artifacts (files) will be included inside .nemo file
@@ -390,6 +683,9 @@ class SaveRestoreConnector:
         # This is for backward compatibility, if the src objects exists simply inside of the tarfile
         # without its key having been overriden, this pathway will be used.
         src_obj_name = os.path.basename(src)
+        if not os.path.exists(os.path.abspath(src)):
+            # the .nemo file being restored is not extracted upfront, retrieve the artifact from it now
+            self._extract_artifact_from_archive(src[5:] if src.startswith("nemo:") else src_obj_name)
         if app_state.nemo_file_folder is not None:
             src_obj_path = os.path.abspath(os.path.join(app_state.nemo_file_folder, src_obj_name))
         else:
@@ -549,6 +845,32 @@ class SaveRestoreConnector:
                     # change back working directory
                     os.chdir(cwd)
 
+    @staticmethod
+    def _extract_artifact_from_archive(name: str):
+        """
+        Extracts the file or directory `name` from the .nemo file being restored into the restoration folder.
+        Does nothing if no archive is being restored, or if the artifact was already extracted.
+        """
+        app_state = AppState()
+        if app_state.nemo_file_archive is None or app_state.nemo_file_folder is None:
+            return
+        if os.path.exists(os.path.join(app_state.nemo_file_folder, name)):
+            return
+
+        name = os.path.normpath(name)
+        if name == os.curdir:
+            return
+
+        def is_artifact(member_name: str) -> bool:
+            member_name = os.path.normpath(member_name)
+            return member_name == name or member_name.startswith(name + os.sep)
+
+        members = SaveRestoreConnector._filtered_tar_info(app_state.nemo_file_archive, filter_fn=is_artifact)
+        if len(members) > 0:
+            SaveRestoreConnector._unpack_nemo_file(
+                path2file=app_state.nemo_file_archive, out_folder=app_state.nemo_file_folder, members=members
+            )
+
     @staticmethod
     def _update_subconfigs(model: "nemo_classes.ModelPT", path2yaml_file):
         """
@@ -678,10 +1000,252 @@ class SaveRestoreConnector:
                 SaveRestoreConnector._safe_extract(tar, out_folder, members)
         return out_folder
 
+    @staticmethod
+    def _assign_state_dict(instance: torch.nn.Module, state_dict: dict, strict: bool = True):
+        """
+        Loads a state dict into a model with parameters on the meta device with `load_state_dict(..., assign=True)`,
+        so the checkpoint tensors become the weights of the model instead of being copied into them.
+        """
+        # assigning replaces the parameters module by module, parameters shared by several modules are tied again
+        owners = defaultdict(list)
+        for module in instance.modules():
+            for name, param in module._parameters.items():
+                if param is not None:
+                    owners[id(param)].append((module, name))
+
+        instance.load_state_dict(state_dict, strict=strict, assign=True)
+
+        for tied in owners.values():
+            if len(tied) > 1:
+                module, name = next(((m, n) for m, n in tied if not m._parameters[n].is_meta), tied[0])
+                for other_module, other_name in tied:
+                    other_module._parameters[other_name] = module._parameters[name]
+
+        empty_keys = [
+            name
+            for name, tensor in itertools.chain(instance.named_parameters(), instance.named_buffers())
+            if tensor.is_meta
+        ]
+        if len(empty_keys) > 0:
+            raise RuntimeError(
+                f"Error(s) in loading state_dict for {instance.__class__.__name__}: {empty_keys} are not in the "
+                f"checkpoint and can't be initialized when restoring with `empty_init`"
+            )
+
+    @staticmethod
+    def _tar_member_index(path2file: str) -> Optional[dict[str, tarfile.TarInfo]]:
+        """
+        Returns the members of an uncompressed tarball keyed by their normalized name.
+        Returns None for compressed tarballs, whose members can't be read in place.
+        """
+        if not os.path.exists(path2file):
+            raise FileNotFoundError(f"{path2file} does not exist")
+
+        try:
+            # only member headers are read, the data of uncompressed members is skipped
+            with tarfile.open(path2file, "r:") as tar:
+                members = tar.getmembers()
+        except tarfile.ReadError:
+            return None
+        return {os.path.normpath(member.name): member for member in members}
+
+    @staticmethod
+    def _get_tar_member(path2file: str, members: dict[str, tarfile.TarInfo], name: str) -> tarfile.TarInfo:
+        member = members.get(os.path.normpath(name))
+        if member is None or not member.isreg() or member.issparse():
+            raise FileNotFoundError(f"{name} not found in {path2file}")
+        return member
+
+    @staticmethod
+    def _read_tar_member(path2file: str, member: tarfile.TarInfo) -> bytes:
+        with open(path2file, 'rb') as f:
+            f.seek(member.offset_data)
+            return f.read(member.size)
+
+    @staticmethod
+    @contextmanager
+    def _open_tar_member(path2file: str, member: tarfile.TarInfo) -> Generator[io.RawIOBase, None, None]:
+        """
+        Opens a member of an uncompressed tarball as a read-only file object backed by a memory map of the archive.
+        """
+        with open(path2file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            reader = _TarMemberReader(buffer, member.offset_data, member.size)
+            try:
+                yield reader
+            finally:
+                reader.close()
+
     @staticmethod
     def _save_state_dict_to_disk(state_dict, filepath):
         torch.save(state_dict, filepath)
 
+    @staticmethod
+    def _sharded_weights_index_path(model_weights: str) -> str:
+        return f"{os.path.splitext(model_weights)[0]}.index.json"
+
+    @staticmethod
+    def _save_sharded_state_dict_to_disk(state_dict, model_weights: str, shard_size: int):
+        """
+        Saves the tensors of a state dict as raw bytes into shards of about `shard_size` bytes, written by
+        a thread pool, next to a JSON index with the shard, offset, dtype and shape of every tensor.
+        Tensors shared by several keys are written once. Entries which are not tensors (e.g. extra states)
+        are saved separately with `torch.save`.
+        """
+        dirname = os.path.dirname(model_weights)
+        basename = os.path.splitext(os.path.basename(model_weights))[0]
+
+        index = {"shards": [], "tensors": {}}
+        shards = []
+        extra_state = {}
+        written = {}
+        for key, value in state_dict.items():
+            if not isinstance(value, torch.Tensor):
+                extra_state[key] = value
+                continue
+            view = (
+                value.device,
+                value.untyped_storage().data_ptr(),
+                value.storage_offset(),
+                tuple(value.shape),
+                tuple(value.stride()),
+                value.dtype,
+            )
+            if view in written:
+                index["tensors"][key] = dict(index["tensors"][written[view]])
+                continue
+            nbytes = value.numel() * value.element_size()
+            if len(shards) == 0 or (len(shards[-1]) > 0 and offset + nbytes > shard_size):
+                shards.append([])
+                offset = 0
+            shards[-1].append(value)
+            index["tensors"][key] = {
+                "shard": len(shards) - 1,
+                "offset": offset,
+                "nbytes": nbytes,
+                "dtype": str(value.dtype).split(".")[-1],
+                "shape": list(value.shape),
+            }
+            offset += nbytes
+            written[view] = key
+        index["shards"] = [f"{basename}-{i:05d}-of-{len(shards):05d}.bin" for i in range(len(shards))]
+
+        def write_shard(shard_id: int):
+            with open(os.path.join(dirname, index["shards"][shard_id]), 'wb') as f:
+                for tensor in shards[shard_id]:
+                    tensor = tensor.detach().cpu().contiguous()
+                    f.write(tensor.reshape(-1).view(torch.uint8).numpy())
+
+        if len(shards) > 0:
+            with ThreadPoolExecutor(max_workers=min(len(shards), os.cpu_count() or 1)) as executor:
+                list(executor.map(write_shard, range(len(shards))))
+
+        if len(extra_state) > 0:
+            index["extra"] = f"{basename}.extra.ckpt"
+            torch.save(extra_state, os.path.join(dirname, index["extra"]))
+
+        with open(SaveRestoreConnector._sharded_weights_index_path(model_weights), 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+
+    @staticmethod
+    def _load_sharded_state_dict(
+        index: dict,
+        locations: dict[str, tuple[str, int, int]],
+        filter_fn: Optional[Callable[[str], bool]] = None,
+        map_location: Optional[torch.device] = None,
+    ) -> dict:
+        """
+        Loads a state dict saved by `_save_sharded_state_dict_to_disk`, reading the shards in parallel.
+
+        Args:
+            index: the index of the sharded state dict.
+            locations: maps the name of every shard (and extra state file) to the file holding it,
+                with the offset and size of the shard in that file, so shards can be read in place from a .nemo file.
+            filter_fn: optional function of a parameter name, only the bytes of the selected parameters are read.
+            map_location: optional device to map the loaded tensors to, they are loaded on the host by default.
+        """
+        entries = index["tensors"]
+        keys = [key for key in entries.keys() if filter_fn is None or filter_fn(key)]
+        shard_keys = defaultdict(list)
+        for key in keys:
+            shard_keys[entries[key]["shard"]].append(key)
+
+        def read_shard(shard_id: int) -> dict:
+            path, shard_offset, _ = locations[index["shards"][shard_id]]
+            tensors, views = {}, {}
+            with open(path, 'rb') as f:
+                for key in shard_keys[shard_id]:
+                    entry = entries[key]
+                    view = (entry["offset"], entry["dtype"], tuple(entry["shape"]))
+                    if view not in views:
+                        tensor = torch.empty(entry["shape"], dtype=getattr(torch, entry["dtype"]))
+                        buffer = memoryview(tensor.reshape(-1).view(torch.uint8).numpy())
+                        f.seek(shard_offset + entry["offset"])
+                        nread = 0
+                        while nread < entry["nbytes"]:
+                            size = f.readinto(buffer[nread:])
+                            if not size:
+                                raise RuntimeError(f"Unexpected end of file while reading `{key}` from {path}")
+                            nread += size
+                        views[view] = tensor if map_location is None else tensor.to(map_location)
+                    tensors[key] = views[view]
+            return tensors
+
+        tensors = {}
+        if len(shard_keys) > 0:
+            with ThreadPoolExecutor(max_workers=min(len(shard_keys), os.cpu_count() or 1)) as executor:
+                for shard_tensors in executor.map(read_shard, list(shard_keys.keys())):
+                    tensors.update(shard_tensors)
+        state_dict = {key: tensors[key] for key in keys}
+
+        if "extra" in index:
+            path, offset, size = locations[index["extra"]]
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                extra_state = torch.load(
+                    io.BytesIO(f.read(size)), map_location=map_location or 'cpu', weights_only=False
+                )
+            state_dict.update(
+                {key: value for key, value in extra_state.items() if filter_fn is None or filter_fn(key)}
+            )
+        return state_dict
+
+    @staticmethod
+    def _get_sharded_weights_from_archive(
+        path2file: str, members: dict[str, tarfile.TarInfo], model_weights: str
+    ) -> Optional[tuple[dict, dict[str, tuple[str, int, int]]]]:
+        """
+        Returns the index of the sharded weights stored in an uncompressed .nemo file with the location of
+        each shard in the archive, or None if the weights are not sharded.
+        """
+        index_name = SaveRestoreConnector._sharded_weights_index_path(model_weights)
+        index_member = members.get(os.path.normpath(index_name))
+        if index_member is None:
+            return None
+        index = json.loads(SaveRestoreConnector._read_tar_member(path2file, index_member).decode('utf-8'))
+        locations = {}
+        for name in index["shards"] + ([index["extra"]] if "extra" in index else []):
+            member = SaveRestoreConnector._get_tar_member(
+                path2file, members, os.path.join(os.path.dirname(index_name), name)
+            )
+            locations[name] = (path2file, member.offset_data, member.size)
+        return index, locations
+
+    def _load_weights(self, model_weights: str, map_location=None):
+        """
+        Loads the weights saved at `model_weights` in a directory, as a single checkpoint or as sharded weights.
+        """
+        index_path = self._sharded_weights_index_path(model_weights)
+        if os.path.exists(model_weights) or not os.path.isfile(index_path):
+            return self._load_state_dict_from_disk(model_weights, map_location=map_location)
+
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        locations = {}
+        for name in index["shards"] + ([index["extra"]] if "extra" in index else []):
+            path = os.path.join(os.path.dirname(index_path), name)
+            locations[name] = (path, 0, os.path.getsize(path))
+        return self._load_sharded_state_dict(index, locations)
+
     @staticmethod
     def _load_state_dict_from_disk(model_weights, map_location=None):
         return torch.load(model_weights, map_location='cpu', weights_only=False)
@@ -717,3 +1281,27 @@ class SaveRestoreConnector:
     @pack_nemo_file.setter
     def pack_nemo_file(self, save_nemo_file: bool):
         self._pack_nemo_file = save_nemo_file
+
+    @property
+    def mmap_nemo_file(self) -> bool:
+        return self._mmap_nemo_file
+
+    @mmap_nemo_file.setter
+    def mmap_nemo_file(self, mmap_nemo_file: bool):
+        self._mmap_nemo_file = mmap_nemo_file
+
+    @property
+    def empty_init(self) -> bool:
+        return self._empty_init
+
+    @empty_init.setter
+    def empty_init(self, empty_init: bool):
+        self._empty_init = empty_init
+
+    @property
+    def weights_shard_size(self) -> Optional[int]:
+        return self._weights_shard_size
+
+    @weights_shard_size.setter
+    def weights_shard_size(self, shard_size: Optional[int]):
+        self._weights_shard_size = shard_size
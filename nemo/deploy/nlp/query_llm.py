@@ -14,6 +14,7 @@
 
 import time
 from abc import ABC
+from contextlib import contextmanager
 
 import numpy as np
 
@@ -168,13 +169,45 @@ class NemoQueryLLM(NemoQueryLLMBase):
             temperature=0.0,
         )
         print("prompts: ", prompts)
+
+    Args:
+        url (str): url of the Triton server.
+        model_name (str): name of the model on the Triton server.
+        reuse_client (bool): keep the connection to the Triton server open between ``query_llm`` calls
+            instead of opening a new one for every call. It is closed by ``close``.
     """
 
-    def __init__(self, url, model_name):
+    def __init__(self, url, model_name, reuse_client: bool = False):
         super().__init__(
             url=url,
             model_name=model_name,
         )
+        self.reuse_client = reuse_client
+        self._client = None
+
+    @contextmanager
+    def _model_client(self, init_timeout):
+        if not self.reuse_client:
+            with ModelClient(self.url, self.model_name, init_timeout_s=init_timeout) as client:
+                yield client
+            return
+
+        if self._client is None:
+            self._client = ModelClient(self.url, self.model_name, init_timeout_s=init_timeout)
+        try:
+            yield self._client
+        except Exception:
+            # the connection may be broken, reconnect on the next query
+            self.close()
+            raise
+
+    def close(self):
+        """
+        Closes the connection to the Triton server kept open with ``reuse_client``.
+        """
+        if self._client is not None:
+            self._client.close()
+            self._client = None
 
     def query_llm(
         self,
@@ -200,6 +233,7 @@ class NemoQueryLLM(NemoQueryLLMBase):
         openai_format_response: bool = False,
         output_context_logits: bool = False,
         output_generation_logits: bool = False,
+        continuation_ids=None,
     ):
         """
         Query the Triton server synchronously and return a list of responses.
@@ -218,6 +252,10 @@ class NemoQueryLLM(NemoQueryLLMBase):
             init_timeout (flat): timeout for the connection.
             openai_format_response: return response similar to OpenAI API format
             output_generation_logits: return generation logits from model on PyTriton
+            continuation_ids (List(List(int))): token ids of the continuation of each prompt. If set, the server
+                returns only the log-probabilities of these tokens and whether they are greedy (most probable), as
+                ``continuation_logprobs`` and ``continuation_greedy`` of shape [BS, max_continuation_len] (padding
+                positions have log-probability 0 and greedy flag True), instead of the full context logits.
         """
 
         prompts = str_list2numpy(prompts)
@@ -282,7 +320,13 @@ class NemoQueryLLM(NemoQueryLLMBase):
         if output_generation_logits is not None:
             inputs["output_generation_logits"] = np.full(prompts.shape, output_generation_logits, dtype=np.bool_)
 
-        with ModelClient(self.url, self.model_name, init_timeout_s=init_timeout) as client:
+        if continuation_ids is not None:
+            max_continuation_len = max(1, max(len(token_ids) for token_ids in continuation_ids))
+            inputs["continuation_ids"] = np.full((len(continuation_ids), max_continuation_len), -1, dtype=np.int_)
+            for i, token_ids in enumerate(continuation_ids):
+                inputs["continuation_ids"][i, : len(token_ids)] = token_ids
+
+        with self._model_client(init_timeout) as client:
             result_dict = client.infer_batch(**inputs)
             output_type = client.model_config.outputs[0].dtype
 
@@ -307,6 +351,9 @@ class NemoQueryLLM(NemoQueryLLMBase):
                         openai_response["choices"][0]["generation_logits"] = result_dict["generation_logits"]
                     if output_context_logits:
                         openai_response["choices"][0]["context_logits"] = result_dict["context_logits"]
+                    if continuation_ids is not None:
+                        openai_response["choices"][0]["continuation_logprobs"] = result_dict["continuation_logprobs"]
+                        openai_response["choices"][0]["continuation_greedy"] = result_dict["continuation_greedy"]
                     return openai_response
                 else:
                     return sentences
@@ -8,11 +8,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import contextlib
+import json
 import os
+from functools import partial
 from pathlib import Path
 import requests
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
@@ -33,6 +38,9 @@ class TritonSettings(BaseSettings):
             self._triton_request_timeout = int(os.environ.get('TRITON_REQUEST_TIMEOUT', 60))
             self._openai_format_response = os.environ.get('OPENAI_FORMAT_RESPONSE', 'False').lower() == 'true'
             self._output_generation_logits = os.environ.get('OUTPUT_GENERATION_LOGITS', 'False').lower() == 'true'
+            self._client_pool_size = int(os.environ.get('TRITON_CLIENT_POOL_SIZE', 4))
+            self._batch_window_ms = float(os.environ.get('TRITON_BATCH_WINDOW_MS', 10))
+            self._max_batch_size = int(os.environ.get('TRITON_MAX_BATCH_SIZE', 32))
         except Exception as error:
             logging.error("An exception occurred trying to retrieve set args in TritonSettings class. Error:", error)
             return
@@ -63,8 +71,36 @@ class TritonSettings(BaseSettings):
         """
         return self._output_generation_logits
 
+    @property
+    def client_pool_size(self):
+        """
+        Number of persistent connections to the Triton server per model used by the async endpoint.
+        """
+        return self._client_pool_size
+
+    @property
+    def batch_window_ms(self):
+        """
+        Time window in milliseconds in which concurrent requests are batched together by the async endpoint.
+        """
+        return self._batch_window_ms
+
+    @property
+    def max_batch_size(self):
+        """
+        Maximum number of prompts batched into one query to the Triton server by the async endpoint.
+        """
+        return self._max_batch_size
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # close the persistent connections of the async endpoint on shutdown
+    close_completion_batcher()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 triton_settings = TritonSettings()
 
 
@@ -130,3 +166,183 @@ def completions_v1(request: CompletionRequest):
     except Exception as error:
         logging.error("An exception occurred with the post request to /v1/completions/ endpoint:", error)
         return {"error": "An exception occurred"}
+
+
+class TritonClientPool:
+    """
+    Pool of persistent NemoQueryLLM clients per model, so that requests do not pay for a new connection each time.
+    Each client is used by one request at a time.
+    """
+
+    def __init__(self, url: str, pool_size: int):
+        self.url = url
+        self.pool_size = pool_size
+        self._clients = {}
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, model_name: str):
+        if model_name not in self._clients:
+            clients = asyncio.Queue()
+            for _ in range(self.pool_size):
+                clients.put_nowait(NemoQueryLLM(url=self.url, model_name=model_name, reuse_client=True))
+            self._clients[model_name] = clients
+        clients = self._clients[model_name]
+        nq = await clients.get()
+        try:
+            yield nq
+        finally:
+            if self._clients.get(model_name) is clients:
+                clients.put_nowait(nq)
+            else:
+                # the pool was closed while the client was in use
+                nq.close()
+
+    def close(self):
+        """
+        Closes the connections of all clients in the pool. Clients in use are closed when they are released.
+        """
+        for clients in self._clients.values():
+            while not clients.empty():
+                clients.get_nowait().close()
+        self._clients = {}
+
+
+class CompletionBatcher:
+    """
+    Micro-batches concurrent completion requests with the same model and sampling parameters
+    into a single query_llm call. A batch is sent when the batch window expires or the batch is full.
+    """
+
+    def __init__(self, client_pool: TritonClientPool, batch_window_ms: float, max_batch_size: int):
+        self.client_pool = client_pool
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending = {}
+
+    @staticmethod
+    def _batch_key(request: CompletionRequest):
+        return (request.model, request.max_tokens, request.temperature, request.top_p, request.top_k)
+
+    async def submit(self, request: CompletionRequest):
+        """
+        Adds the request to the current batch and waits for its output.
+        Returns a tuple of the batch output of query_llm and the index of the request in the batch.
+        """
+        loop = asyncio.get_running_loop()
+        key = self._batch_key(request)
+        future = loop.create_future()
+
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = []
+            self._pending[key] = batch
+            loop.call_later(self.batch_window, self._flush, key, batch)
+        batch.append((request, future))
+        index = len(batch) - 1
+        if len(batch) >= self.max_batch_size:
+            self._flush(key, batch)
+
+        output = await future
+        return output, index
+
+    def _flush(self, key, batch):
+        # the batch may have already been sent because it was full
+        if self._pending.get(key) is not batch:
+            return
+        del self._pending[key]
+        asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        request = batch[0][0]
+        try:
+            async with self.client_pool.acquire(request.model) as nq:
+                # query_llm is blocking, run it in a thread to keep serving other requests meanwhile
+                output = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    partial(
+                        nq.query_llm,
+                        prompts=[r.prompt for r, _ in batch],
+                        max_output_len=request.max_tokens,
+                        top_k=request.top_k,
+                        top_p=request.top_p,
+                        temperature=request.temperature,
+                        init_timeout=triton_settings.triton_request_timeout,
+                        openai_format_response=triton_settings.openai_format_response,
+                        output_generation_logits=triton_settings.output_generation_logits,
+                    ),
+                )
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for _, future in batch:
+            if not future.done():
+                future.set_result(output)
+
+
+_completion_batcher = None
+
+
+def get_completion_batcher() -> CompletionBatcher:
+    global _completion_batcher
+    if _completion_batcher is None:
+        url = triton_settings.triton_service_ip + ":" + str(triton_settings.triton_service_port)
+        _completion_batcher = CompletionBatcher(
+            TritonClientPool(url, triton_settings.client_pool_size),
+            batch_window_ms=triton_settings.batch_window_ms,
+            max_batch_size=triton_settings.max_batch_size,
+        )
+    return _completion_batcher
+
+
+def close_completion_batcher():
+    global _completion_batcher
+    if _completion_batcher is not None:
+        _completion_batcher.client_pool.close()
+        _completion_batcher = None
+
+
+def _stream_completion(request: CompletionRequest):
+    url = triton_settings.triton_service_ip + ":" + str(triton_settings.triton_service_port)
+    nq = NemoQueryLLM(url=url, model_name=request.model)
+    try:
+        for output in nq.query_llm_streaming(
+            prompts=[request.prompt],
+            max_output_len=request.max_tokens,
+            top_k=request.top_k,
+            top_p=request.top_p,
+            temperature=request.temperature,
+            init_timeout=triton_settings.triton_request_timeout,
+        ):
+            yield f"data: {json.dumps({'output': str(output[0][0])})}\n\n"
+        yield "data: [DONE]\n\n"
+    except Exception as error:
+        logging.error(f"An exception occurred while streaming from the /v1/completions/async/ endpoint: {error}")
+        yield f"data: {json.dumps({'error': 'An exception occurred'})}\n\n"
+
+
+@app.post("/v1/completions/async/")
+async def completions_v1_async(request: CompletionRequest):
+    """
+    Asynchronous version of the "/v1/completions/" endpoint. Concurrent requests are batched together
+    and sent to Triton through a pool of persistent connections. Responses are streamed as server-sent events
+    if stream is set in the request.
+    """
+    if request.stream:
+        return StreamingResponse(_stream_completion(request), media_type="text/event-stream")
+
+    try:
+        output, index = await get_completion_batcher().submit(request)
+        if triton_settings.openai_format_response:
+            choice = {"text": output["choices"][0]["text"][index : index + 1]}
+            if "generation_logits" in output["choices"][0]:
+                choice["generation_logits"] = output["choices"][0]["generation_logits"][index : index + 1]
+            return {**output, "choices": [choice]}
+        else:
+            return {
+                "output": output[index][0],
+            }
+    except Exception as error:
+        logging.error(f"An exception occurred with the post request to /v1/completions/async/ endpoint: {error}")
+        return {"error": "An exception occurred"}
@@ -102,3 +102,29 @@ def cast_output(data, required_dtype):
     if data.ndim < 2:
         data = data[..., np.newaxis]
     return data.astype(required_dtype)
+
+
+def select_token_logprobs(logits: torch.Tensor, token_ids: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes log-probabilities of the given tokens and whether each of them is the greedy (most probable) token,
+    so that only these values are sent back to the client instead of the full logits.
+
+    Args:
+        logits (torch.Tensor): logits of a single sequence of shape [seq_len, vocab_size], the last
+            ``len(token_ids)`` positions predict the tokens.
+        token_ids (np.ndarray): ids of the tokens to score, padded on the right with negative values.
+
+    Returns:
+        Tuple of arrays (log-probabilities, greedy flags) of the same shape as ``token_ids``. Padding positions
+        have log-probability 0 and greedy flag True.
+    """
+    token_ids = torch.as_tensor(np.asarray(token_ids), dtype=torch.long, device=logits.device)
+    num_tokens = int((token_ids >= 0).sum())
+    log_probs = np.zeros(token_ids.shape, dtype=np.single)
+    is_greedy = np.ones(token_ids.shape, dtype=np.bool_)
+    if num_tokens > 0:
+        tokens = token_ids[:num_tokens]
+        token_log_probs = torch.log_softmax(logits[-num_tokens:].float(), dim=-1)
+        log_probs[:num_tokens] = token_log_probs.gather(-1, tokens.unsqueeze(-1)).squeeze(-1).cpu().numpy()
+        is_greedy[:num_tokens] = (token_log_probs.argmax(dim=-1) == tokens).cpu().numpy()
+    return log_probs, is_greedy
@@ -61,7 +61,7 @@ from nemo.export.utils import torch_dtype_from_precision
 
 use_deploy = True
 try:
-    from nemo.deploy.utils import cast_output, str_ndarray2list
+    from nemo.deploy.utils import cast_output, select_token_logprobs, str_ndarray2list
 except Exception:
     use_deploy = False
 
@@ -1162,6 +1162,7 @@ class TensorRTLLM(ITritonDeployable):
             Tensor(name="lora_uids", shape=(-1,), dtype=bytes, optional=True),
             Tensor(name="output_context_logits", shape=(-1,), dtype=np.bool_, optional=False),
             Tensor(name="output_generation_logits", shape=(-1,), dtype=np.bool_, optional=False),
+            Tensor(name="continuation_ids", shape=(-1,), dtype=np.int_, optional=True),
         )
         return inputs
 
@@ -1171,6 +1172,8 @@ class TensorRTLLM(ITritonDeployable):
             Tensor(name="outputs", shape=(-1,), dtype=bytes),
             Tensor(name="generation_logits", shape=(-1,), dtype=np.single),
             Tensor(name="context_logits", shape=(-1,), dtype=np.single),
+            Tensor(name="continuation_logprobs", shape=(-1,), dtype=np.single),
+            Tensor(name="continuation_greedy", shape=(-1,), dtype=np.bool_),
         )
         return outputs
 
@@ -1180,6 +1183,7 @@ class TensorRTLLM(ITritonDeployable):
         output_dict = {}
         context_logits_available = False
         generation_logits_available = False
+        continuation_ids = None
         try:
             infer_input = {"input_texts": str_ndarray2list(inputs.pop("prompts"))}
             if "max_output_len" in inputs:
@@ -1212,8 +1216,24 @@ class TensorRTLLM(ITritonDeployable):
             if "output_context_logits" in inputs:
                 context_logits_available = inputs["output_context_logits"][0][0]
                 infer_input["output_context_logits"] = inputs.pop("output_context_logits")[0][0]
-
-            if generation_logits_available:
+            if "continuation_ids" in inputs:
+                # token ids to score for each prompt, padded with -1; scoring them requires the context logits
+                continuation_ids = inputs.pop("continuation_ids")
+                generation_logits_available = False
+                infer_input["output_generation_logits"] = False
+                infer_input["output_context_logits"] = True
+
+            if continuation_ids is not None:
+                output_texts, context_logits = self.forward(**infer_input)
+                # return only the log-probabilities of the continuation tokens and greedy-match flags, of shape
+                # [BS, max_continuation_len], instead of the full context logits of shape [BS, 1, seq_len, vocab_size]
+                selected = [
+                    select_token_logprobs(logit_tensor, token_ids)
+                    for logit_tensor, token_ids in zip(context_logits, continuation_ids)
+                ]
+                output_dict["continuation_logprobs"] = np.stack([log_probs for log_probs, _ in selected])
+                output_dict["continuation_greedy"] = np.stack([is_greedy for _, is_greedy in selected])
+            elif generation_logits_available:
                 # generation_logits is a 4d torch tensor of dim [BS,1,#generated_tokens,vocab_size]
                 output_texts, generation_logits = self.forward(**infer_input)
                 # convert generation_logits to numpy array. Note: from my understanding since generation_logits is
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import collections
+import itertools
+import os
 from typing import Dict, List
 
 import numpy as np
@@ -20,7 +22,56 @@ from tqdm import tqdm
 
 from nemo.utils import logging
 
-PACKING_ALGOS = ['first_fit_decreasing', 'first_fit_shuffle']
+PACKING_ALGOS = ['first_fit_decreasing', 'first_fit_shuffle', 'best_fit_decreasing']
+
+
+class BinCapacityTree:
+    """
+    Max segment tree over the remaining capacity of a fixed number of bins.
+
+    Unopened bins are stored with their full capacity, so opened bins always form a prefix of the leaves and the
+    leftmost bin that fits a sequence is either an already opened bin or the next one to open. Both the lookup and
+    the update are O(log n), which makes First-Fit O(n log n) overall instead of the quadratic scan performed by
+    :func:`find_first_bin_that_fits`.
+
+    Args:
+      num_bins: The maximum number of bins that can be opened.
+      bin_size: The maximum capacity of each bin.
+    """
+
+    def __init__(self, num_bins: int, bin_size: int):
+        self.num_leaves = 1
+        while self.num_leaves < max(num_bins, 1):
+            self.num_leaves *= 2
+        # A plain list is considerably faster than a numpy array for scalar access from Python.
+        self.tree = [bin_size] * (2 * self.num_leaves)
+
+    def find_first(self, s: int) -> int:
+        """
+        Returns the index of the leftmost bin with remaining capacity of at least 's', or -1 if no such bin exists.
+        """
+        tree = self.tree
+        if tree[1] < s:
+            return -1
+        node = 1
+        while node < self.num_leaves:
+            node *= 2
+            if tree[node] < s:
+                node += 1
+        return node - self.num_leaves
+
+    def update(self, index: int, capacity: int):
+        """
+        Sets the remaining capacity of the bin at 'index' and updates the maxima along the path to the root.
+        """
+        tree = self.tree
+        node = index + self.num_leaves
+        tree[node] = capacity
+        node //= 2
+        while node:
+            left, right = tree[2 * node], tree[2 * node + 1]
+            tree[node] = left if left > right else right
+            node //= 2
 
 
 def find_first_bin_that_fits(bins: List[List[int]], s: int, bin_size: int) -> int:
@@ -41,6 +92,19 @@ def find_first_bin_that_fits(bins: List[List[int]], s: int, bin_size: int) -> in
     return -1
 
 
+def _max_num_bins(seqlens: List[int], pack_size: int) -> int:
+    """
+    Returns an upper bound on the number of bins that First-Fit or Best-Fit can open for the given sequences.
+
+    Any two bins opened by these algorithms hold more than 'pack_size' in total (otherwise the content of the later
+    bin would have fit in the earlier one), so there are at most 2 * ceil(total / pack_size) + 1 regular bins, plus
+    one bin for each sequence that is longer than 'pack_size' on its own.
+    """
+    num_oversized = sum(1 for s in seqlens if s > pack_size)
+    total = sum(s for s in seqlens if s <= pack_size)
+    return min(len(seqlens), 2 * (-(-total // max(pack_size, 1))) + 1 + num_oversized)
+
+
 def first_fit(seqlens: List[int], pack_size: int) -> List[List[int]]:
     """
     Packs sequences of varying lengths into bins using the First-Fit algorithm.
@@ -53,12 +117,19 @@ def first_fit(seqlens: List[int], pack_size: int) -> List[List[int]]:
       A list of lists, where each inner list represents a bin and contains the indices of the sequences assigned to that bin.
     """
     res = []
+    # remaining capacity of every bin is tracked in a segment tree, so each placement is O(log n)
+    capacity = BinCapacityTree(_max_num_bins(seqlens, pack_size), pack_size)
+    remaining = []
     for s in seqlens:
-        first_bin = find_first_bin_that_fits(res, s, pack_size)
-        if first_bin == -1:  # open a new bin
+        first_bin = capacity.find_first(s) if s <= pack_size else -1
+        if first_bin == -1 or first_bin == len(res):  # open a new bin
+            first_bin = len(res)
             res.append([s])
+            remaining.append(pack_size - s)
         else:
             res[first_bin].append(s)
+            remaining[first_bin] -= s
+        capacity.update(first_bin, remaining[first_bin])
     return res
 
 
@@ -97,6 +168,68 @@ def first_fit_shuffle(seqlens: List[int], pack_size: int) -> List[List[int]]:
     return first_fit(shuffled_seqlens, pack_size)
 
 
+def best_fit_decreasing(seqlens: List[int], pack_size: int) -> List[List[int]]:
+    """
+    Packs sequences of varying lengths into bins using the Best-Fit Decreasing algorithm.
+
+    Sequences are sorted by decreasing length and each one is placed into the open bin with the smallest remaining
+    capacity that can still hold it. Bins are bucketed by their remaining capacity, which lets all sequences of the
+    same length be placed at once: the tightest bin keeps receiving sequences of that length until it no longer fits
+    one, so every bin takes ``min(capacity // length, remaining)`` of them. The lookup of non-empty capacity buckets
+    is vectorized with numpy, so the cost is dominated by the number of distinct lengths rather than sequences.
+    Ties between bins with the same remaining capacity are broken in the order the bins reached that capacity.
+
+    Args:
+      seqlens: A list of integers, representing the lengths of the sequences to be packed.
+      pack_size: The maximum capacity of each bin.
+
+    Returns:
+      A list of lists, similar to the output of the 'first_fit' function.
+    """
+    if len(seqlens) == 0:
+        return []
+
+    lengths, counts = np.unique(np.asarray(seqlens, dtype=np.int64), return_counts=True)
+    res = []
+    # buckets[c] holds the indices of the bins with exactly c remaining capacity
+    buckets = [collections.deque() for _ in range(pack_size + 1)]
+    non_empty = np.zeros(pack_size + 1, dtype=bool)
+
+    for s, k in zip(lengths[::-1].tolist(), counts[::-1].tolist()):
+        if s > pack_size:  # sequences that do not fit on their own get a bin each
+            res.extend([s] for _ in range(k))
+            continue
+        if s == 0:  # empty sequences go to the tightest bin without changing its capacity
+            tightest = np.flatnonzero(non_empty)
+            if len(tightest) == 0:
+                buckets[pack_size].append(len(res))
+                non_empty[pack_size] = True
+                res.append([])
+                tightest = [pack_size]
+            res[buckets[tightest[0]][0]].extend([0] * k)
+            continue
+        for c in (np.flatnonzero(non_empty[s:]) + s).tolist():
+            if k == 0:
+                break
+            bucket, per_bin = buckets[c], c // s
+            while bucket and k:
+                b = bucket.popleft()
+                take = min(per_bin, k)
+                res[b].extend([s] * take)
+                k -= take
+                buckets[c - take * s].append(b)
+                non_empty[c - take * s] = True
+            non_empty[c] = bool(bucket)
+        per_bin = pack_size // s
+        while k:  # open new bins
+            take = min(per_bin, k)
+            buckets[pack_size - take * s].append(len(res))
+            non_empty[pack_size - take * s] = True
+            res.append([s] * take)
+            k -= take
+    return res
+
+
 def create_hist(dataset: np.array, truncate_seq_len: int):
     """
     Creates a histogram of sequence lengths from a tokenized dataset.
@@ -148,7 +281,8 @@ def create_packing_strategy(
     Args:
           histogram: A list representing the histogram data (number of sequences for each length).
           pack_size: The maximum capacity of each bin.
-          packing_algorithm: One of the supported packing algorithms from ['first_fit_decreasing', 'first_fit_shuffle']
+          packing_algorithm: One of the supported packing algorithms from
+                ['first_fit_decreasing', 'first_fit_shuffle', 'best_fit_decreasing']
 
     Returns:
           assignments: A list of lists, where each inner list represents a bin and contains the indices of the
@@ -245,3 +379,147 @@ def fill_packing_strategy(
     assert all(not seq[0] for seq in ifile_handles.values()), "Error: There are items left over from the assignment"
     assert all(not seq[1] for seq in ifile_handles.values()), "Error: There are items left over from the assignment"
     return output_data
+
+
+# arrays of the flat packed format, stored next to the token ids as ``<path stem>.<name>.npy``
+FLAT_PACKED_DATA_KEYS = ('loss_mask', 'seq_start_id', 'pack_start_seq')
+
+
+def get_flat_packed_data_paths(path: str) -> Dict[str, str]:
+    """
+    Returns the paths of the arrays of a packed dataset in the flat format.
+
+    The token ids of all the packs are stored in ``path`` itself (a .npy file, so that a flat packed dataset is
+    used in the same way as a pickled one), the other arrays are stored next to it.
+
+    Args:
+          path: Path of the packed dataset (.npy file).
+
+    Returns:
+          paths: A dictionary with the paths of 'input_ids' and of each array in FLAT_PACKED_DATA_KEYS.
+    """
+    path = str(path)
+    stem = path[: -len('.npy')] if path.endswith('.npy') else path
+    paths = {'input_ids': path}
+    paths.update({key: f'{stem}.{key}.npy' for key in FLAT_PACKED_DATA_KEYS})
+    return paths
+
+
+def is_flat_packed_data(path: str) -> bool:
+    """
+    Returns True if the packed dataset at ``path`` is stored in the flat format (see `save_flat_packed_data`).
+
+    The format is given by the .npy file of the packed dataset itself: the pickled format is an object array,
+    so the dataset is not taken for a flat one because of arrays left next to it by a previous flat dataset.
+    """
+    paths = get_flat_packed_data_paths(path)
+    if not all(os.path.exists(data_path) for data_path in paths.values()):
+        return False
+    try:
+        input_ids = np.load(paths['input_ids'], mmap_mode='r')
+    except ValueError:
+        # object arrays (pickled packed datasets) can't be memory-mapped
+        return False
+    return input_ids.dtype != object
+
+
+def remove_flat_packed_data(path: str) -> None:
+    """
+    Removes the arrays stored next to the packed dataset at ``path`` in the flat format, if any,
+    so that they are not left behind when the dataset is saved again (in either format).
+    """
+    paths = get_flat_packed_data_paths(path)
+    for key in FLAT_PACKED_DATA_KEYS:
+        if os.path.exists(paths[key]):
+            os.remove(paths[key])
+
+
+def save_flat_packed_data(output_data: List[Dict], output_path: str) -> None:
+    """
+    Saves the packed sequences in the flat format, which can be memory-mapped instead of unpickled into memory.
+
+    The token ids and loss masks of all the packs are concatenated into two flat arrays. 'seq_start_id' stores the
+    offsets of all the sequences in these arrays (plus the total number of tokens at the end), 'pack_start_seq'
+    stores the index of the first sequence of each pack in 'seq_start_id' (plus the number of sequences at the end).
+    The tokens of pack ``i`` are ``input_ids[seq_start_id[pack_start_seq[i]]:seq_start_id[pack_start_seq[i + 1]]]``.
+
+    Args:
+          output_data: Packed sequences (output of 'fill_packing_strategy').
+          output_path: Path of the packed dataset (.npy file).
+    """
+    pack_lens = np.array([len(pack['input_ids']) for pack in output_data], dtype=np.int64)
+    pack_offsets = np.concatenate([[0], np.cumsum(pack_lens)])
+    pack_num_seqs = np.array([len(pack['seq_start_id']) for pack in output_data], dtype=np.int64)
+
+    seq_start_id = np.fromiter(
+        itertools.chain.from_iterable(
+            (pack_offset + start_id for start_id in pack['seq_start_id'])
+            for pack_offset, pack in zip(pack_offsets, output_data)
+        ),
+        dtype=np.int64,
+        count=int(pack_num_seqs.sum()),
+    )
+    arrays = {
+        'input_ids': np.fromiter(
+            itertools.chain.from_iterable(pack['input_ids'] for pack in output_data),
+            dtype=np.int32,
+            count=int(pack_offsets[-1]),
+        ),
+        'loss_mask': np.fromiter(
+            itertools.chain.from_iterable(pack['loss_mask'] for pack in output_data),
+            dtype=np.bool_,
+            count=int(pack_offsets[-1]),
+        ),
+        'seq_start_id': np.append(seq_start_id, pack_offsets[-1]),
+        'pack_start_seq': np.concatenate([[0], np.cumsum(pack_num_seqs)]),
+    }
+
+    # the token ids are saved last: the dataset is complete once the .npy file of the packed dataset exists
+    remove_flat_packed_data(output_path)
+    paths = get_flat_packed_data_paths(output_path)
+    for key in FLAT_PACKED_DATA_KEYS + ('input_ids',):
+        np.save(paths[key], arrays[key], allow_pickle=False)
+
+
+class FlatPackedSequences:
+    """
+    Packed sequences stored in the flat format (see `save_flat_packed_data`). The arrays are memory-mapped, so the
+    dataset is not loaded into memory (and is shared between the processes reading it through the page cache), and
+    each pack is returned as zero-copy slices of the arrays.
+
+    Args:
+          path: Path of the packed dataset (.npy file).
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        paths = get_flat_packed_data_paths(path)
+        self.input_ids = np.load(paths['input_ids'], mmap_mode='r')
+        self.loss_mask = np.load(paths['loss_mask'], mmap_mode='r')
+        self.seq_start_id = np.load(paths['seq_start_id'], mmap_mode='r')
+        self.pack_start_seq = np.load(paths['pack_start_seq'], mmap_mode='r')
+
+    def __getstate__(self):
+        # pickling a memory-mapped array copies its data, the arrays are mapped again in the new process instead
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def __len__(self) -> int:
+        return len(self.pack_start_seq) - 1
+
+    def __getitem__(self, idx: int) -> Dict[str, np.ndarray]:
+        """
+        Returns the pack in the same format as the pickled packed dataset: a dictionary with 'input_ids', 'loss_mask'
+        and 'seq_start_id' (offsets of the sequences in the pack).
+        """
+        if idx < 0:
+            idx += len(self)
+        seq_offsets = self.seq_start_id[self.pack_start_seq[idx] : self.pack_start_seq[idx + 1] + 1]
+        start, end = seq_offsets[0], seq_offsets[-1]
+        return {
+            'input_ids': self.input_ids[start:end],
+            'loss_mask': self.loss_mask[start:end],
+            'seq_start_id': seq_offsets[:-1] - start,
+        }
@@ -0,0 +1,99 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the sequence packing algorithms in ``nemo.utils.sequence_packing_utils``.
+
+Sequence lengths are either sampled from a synthetic distribution or read from a packed-dataset histogram, and every
+algorithm in ``PACKING_ALGOS`` is timed on them. For each algorithm the script reports the wall-clock time, the number
+of bins and the packing efficiency (the average fill ratio of the bins).
+
+Example usage:
+
+python scripts/nlp_language_modeling/benchmark_sequence_packing.py \
+    --num_sequences 1000000 \
+    --pack_size 4096 \
+    --max_seq_length 2048 \
+    --distribution lognormal
+
+To benchmark on the real length distribution of a tokenized dataset, pass a histogram saved with
+``np.save(path, histogram)`` where ``histogram`` is the output of ``create_hist``:
+
+python scripts/nlp_language_modeling/benchmark_sequence_packing.py --histogram /path/to/histogram.npy --pack_size 4096
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from nemo.utils import logging
+from nemo.utils.sequence_packing_utils import PACKING_ALGOS, create_packing_strategy
+
+
+def get_args():
+    """Parses the command line arguments of the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark sequence packing algorithms.")
+    parser.add_argument("--num_sequences", type=int, default=1_000_000, help="Number of synthetic sequences")
+    parser.add_argument("--pack_size", type=int, default=4096, help="Size of each packed sequence")
+    parser.add_argument("--max_seq_length", type=int, default=2048, help="Maximum length of a synthetic sequence")
+    parser.add_argument(
+        "--distribution",
+        type=str,
+        default="lognormal",
+        choices=["lognormal", "uniform"],
+        help="Distribution of the synthetic sequence lengths",
+    )
+    parser.add_argument("--histogram", type=str, default=None, help="Optional .npy histogram of sequence lengths")
+    parser.add_argument("--algorithms", type=str, nargs="+", default=PACKING_ALGOS, choices=PACKING_ALGOS)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def synthetic_histogram(num_sequences: int, max_seq_length: int, distribution: str, seed: int) -> np.ndarray:
+    """Samples sequence lengths from a synthetic distribution and returns their histogram."""
+    rng = np.random.default_rng(seed)
+    if distribution == "lognormal":
+        seqlens = rng.lognormal(mean=np.log(max_seq_length / 8), sigma=0.8, size=num_sequences)
+    else:
+        seqlens = rng.uniform(1, max_seq_length, size=num_sequences)
+    seqlens = np.clip(seqlens.astype(np.int64), 1, max_seq_length)
+    return np.bincount(seqlens, minlength=max_seq_length + 1)
+
+
+def main():
+    """Times the selected packing algorithms on the histogram of sequence lengths and logs the results."""
+    args = get_args()
+    if args.histogram is not None:
+        histogram = np.load(args.histogram)
+    else:
+        histogram = synthetic_histogram(args.num_sequences, args.max_seq_length, args.distribution, args.seed)
+    histogram = histogram.tolist()
+
+    results = []
+    for algorithm in args.algorithms:
+        np.random.seed(args.seed)
+        start = time.perf_counter()
+        assignments, _ = create_packing_strategy(histogram, args.pack_size, algorithm)
+        elapsed = time.perf_counter() - start
+        efficiency = sum(sum(b) for b in assignments) / (len(assignments) * args.pack_size)
+        results.append((algorithm, elapsed, len(assignments), efficiency))
+
+    logging.info(f"{'algorithm':<24}{'time [s]':>12}{'bins':>12}{'efficiency':>12}")
+    for algorithm, elapsed, num_bins, efficiency in results:
+        logging.info(f"{algorithm:<24}{elapsed:>12.2f}{num_bins:>12d}{efficiency * 100:>11.2f}%")
+
+
+if __name__ == "__main__":
+    main()
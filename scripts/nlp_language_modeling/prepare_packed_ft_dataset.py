@@ -22,7 +22,13 @@ from nemo.collections.nlp.data.language_modeling.megatron.gpt_sft_dataset import
 from nemo.collections.nlp.modules.common.tokenizer_utils import get_nmt_tokenizer
 from nemo.core.config import hydra_runner
 from nemo.utils import logging
-from nemo.utils.sequence_packing_utils import create_hist, create_packing_strategy, fill_packing_strategy
+from nemo.utils.sequence_packing_utils import (
+    create_hist,
+    create_packing_strategy,
+    fill_packing_strategy,
+    remove_flat_packed_data,
+    save_flat_packed_data,
+)
 
 if TYPE_CHECKING:
     from omegaconf import DictConfig
@@ -40,6 +46,8 @@ It generates a more optimal packing, but it tends to keep all short sequences to
 "first_fit_shuffle" runs first-fit in a random order. Packing is less optimal but it keeps the dataset order random.
 The recommendation is to run "first_fit_shuffle" and check the packed sequence lengths in the printout. 
 If they are similar to the target length (i.e. packing is efficient), then use shuffle. Otherwise try first_fit_decreasing.
+"best_fit_decreasing" places each sequence into the fullest bin that still fits it, which is typically the most efficient
+and fastest option. Use scripts/nlp_language_modeling/benchmark_sequence_packing.py to compare the algorithms.
 
 Example usage:
 
@@ -82,6 +90,11 @@ Note:
     This argument is a list because you will likely want to experiment with a few ``pack_sizes`` to find out which length
     can fill the GPU memory without exceeding it. Adjusting ``pack_size`` is analogous to adjusting the micro batch size in
     the unpacked case.
+
+  - ``+packed_data_format=flat`` saves the packed sequences as flat arrays of tokens and loss masks with the offsets
+    of the sequences (``packed_{pack_size}_seed{seed}.npy`` and ``packed_{pack_size}_seed{seed}.<array>.npy`` files),
+    which are memory-mapped by the packed dataset instead of being loaded into the memory of each process.
+    The default ``pickle`` format saves a single array of dicts.
 """
 
 
@@ -185,6 +198,7 @@ class PackingArgs:
     output_dir: str = "output"
     pack_sizes: Tuple[int] = (2048,)
     packing_algorithm: str = "first_fit_shuffle"
+    packed_data_format: str = "pickle"
     seed: int = 0
 
     def from_config(self, cfg: 'DictConfig'):
@@ -193,6 +207,8 @@ class PackingArgs:
         self.output_dir = cfg.output_dir
         self.pack_sizes = cfg.pack_sizes
         self.packing_algorithm = cfg.get("packing_algorithm", "first_fit_shuffle")
+        self.packed_data_format = cfg.get("packed_data_format", "pickle")
+        assert self.packed_data_format in ("pickle", "flat"), "+packed_data_format must be 'pickle' or 'flat'"
         self.seed = cfg.get("seed", 0)
         return self
 
@@ -205,13 +221,18 @@ def main(cfg: 'DictConfig') -> None:
     dataset, tokenizer = tokenize_dataset(cfg)
     sequences, histogram = create_hist(dataset, cfg.model.data.train_ds.max_seq_length)
     for pack_size in args.pack_sizes:
-        assignments = create_packing_strategy(histogram, pack_size, args.packing_algorithm)
+        assignments, _ = create_packing_strategy(histogram, pack_size, args.packing_algorithm)
         output_data = fill_packing_strategy(assignments, sequences, pack_size, tokenizer.eos_id)
 
         # save output data
         os.makedirs(args.output_dir, exist_ok=True)
         output_path = os.path.join(args.output_dir, f'packed_{pack_size}_seed{args.seed}.npy')
-        np.save(output_path, output_data)
+        if args.packed_data_format == "flat":
+            save_flat_packed_data(output_data, output_path)
+        else:
+            # arrays of a previous flat dataset at the same path would be stale
+            remove_flat_packed_data(output_path)
+            np.save(output_path, output_data)
         logging.info(f"Done, output written to {output_path}")
 
     logging.info(
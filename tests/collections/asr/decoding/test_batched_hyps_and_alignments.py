@@ -18,7 +18,12 @@ from typing import List
 import pytest
 import torch
 
-from nemo.collections.asr.parts.utils.rnnt_utils import BatchedAlignments, BatchedHyps, batched_hyps_to_hypotheses
+from nemo.collections.asr.parts.utils.rnnt_utils import (
+    BatchedAlignments,
+    BatchedBeamHyps,
+    BatchedHyps,
+    batched_hyps_to_hypotheses,
+)
 
 
 @contextmanager
@@ -214,6 +219,80 @@ class TestBatchedHyps:
         assert torch.allclose(hyps.scores, scores)
 
 
+class TestBatchedBeamHyps:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("device", DEVICES)
+    def test_instantiate(self, device: torch.device):
+        hyps = BatchedBeamHyps(batch_size=2, beam_size=3, init_length=4, blank_index=5, device=device)
+        assert hyps.transcript_wb.device.type == device.type
+        assert hyps.transcript_wb.shape == (2, 3, 4)
+        # single empty hypothesis for each utterance
+        assert hyps.scores.tolist() == [[0.0, float("-inf"), float("-inf")]] * 2
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("beam_size", [-1, 0])
+    def test_instantiate_incorrect_beam_size(self, beam_size):
+        with pytest.raises(ValueError):
+            _ = BatchedBeamHyps(batch_size=1, beam_size=beam_size, init_length=3, blank_index=0)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("device", DEVICES)
+    def test_add_results_and_convert(self, device: torch.device):
+        blank_index = 3
+        hyps = BatchedBeamHyps(batch_size=1, beam_size=2, init_length=1, blank_index=blank_index, device=device)
+        # expand the initial hypothesis with labels 1 and 2
+        hyps.add_results_(
+            next_indices=torch.tensor([[0, 0]], device=device),
+            next_labels=torch.tensor([[1, 2]], device=device),
+            next_hyps_scores=torch.tensor([[-0.5, -1.0]], device=device),
+            time_indices=torch.tensor([[0, 0]], device=device),
+        )
+        # hypotheses are reordered: [2] + blank, [1] + 1
+        hyps.add_results_(
+            next_indices=torch.tensor([[1, 0]], device=device),
+            next_labels=torch.tensor([[blank_index, 1]], device=device),
+            next_hyps_scores=torch.tensor([[-1.2, -1.5]], device=device),
+            time_indices=torch.tensor([[0, 0]], device=device),
+        )
+        assert hyps.current_length == 2
+        assert hyps.current_lengths_nb.tolist() == [[1, 2]]
+        assert hyps.last_timestep.tolist() == [[0, 0]]
+        assert hyps.last_timestep_lasts.tolist() == [[1, 2]]
+
+        hyps_list = hyps.to_hyps_list(score_norm=False)
+        assert len(hyps_list) == 1
+        assert [hyp.y_sequence.tolist() for hyp in hyps_list[0]] == [[2], [1, 1]]
+        assert [hyp.timestep.tolist() for hyp in hyps_list[0]] == [[0], [0, 0]]
+        assert [hyp.score for hyp in hyps_list[0]] == pytest.approx([-1.2, -1.5])
+        # with normalization by length the longer hypothesis is better
+        assert [hyp.y_sequence.tolist() for hyp in hyps.to_hyps_list(score_norm=True)[0]] == [[1, 1], [2]]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("device", DEVICES)
+    def test_recombine_hyps(self, device: torch.device):
+        blank_index = 3
+        hyps = BatchedBeamHyps(batch_size=1, beam_size=3, init_length=2, blank_index=blank_index, device=device)
+        hyps.add_results_(
+            next_indices=torch.tensor([[0, 0, 0]], device=device),
+            next_labels=torch.tensor([[1, blank_index, 2]], device=device),
+            next_hyps_scores=torch.tensor([[-1.0, -1.5, -3.0]], device=device),
+            time_indices=torch.tensor([[0, 0, 0]], device=device),
+        )
+        # [1] + blank and blank + [1] result in the same hypothesis at time index 1
+        hyps.add_results_(
+            next_indices=torch.tensor([[0, 1, 2]], device=device),
+            next_labels=torch.tensor([[blank_index, 1, blank_index]], device=device),
+            next_hyps_scores=torch.tensor([[-2.0, -2.5, -4.0]], device=device),
+            time_indices=torch.tensor([[0, 1, 0]], device=device),
+        )
+        hyps.recombine_hyps_(time_indices=torch.tensor([[1, 1, 1]], device=device))
+        expected_score = torch.logsumexp(torch.tensor([-2.0, -2.5]), dim=0).item()
+        assert hyps.scores[0].tolist() == pytest.approx([expected_score, float("-inf"), -4.0])
+
+        hyps_list = hyps.to_hyps_list(score_norm=False)[0]
+        assert [hyp.y_sequence.tolist() for hyp in hyps_list] == [[1], [2]]
+
+
 class TestBatchedAlignments:
     @pytest.mark.unit
     @pytest.mark.parametrize("device", DEVICES)
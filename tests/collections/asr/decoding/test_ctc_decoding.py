@@ -12,14 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import itertools
 import os
 from functools import lru_cache
 
+import numpy as np
 import pytest
 import torch
 from omegaconf import DictConfig, OmegaConf
 
 from nemo.collections.asr.parts.mixins import mixins
+from nemo.collections.asr.parts.submodules import ctc_beam_decoding
 from nemo.collections.asr.parts.submodules.ctc_decoding import (
     CTCBPEDecoding,
     CTCBPEDecodingConfig,
@@ -27,7 +30,7 @@ from nemo.collections.asr.parts.submodules.ctc_decoding import (
     CTCDecodingConfig,
 )
 from nemo.collections.asr.parts.utils.asr_confidence_utils import ConfidenceConfig
-from nemo.collections.asr.parts.utils.rnnt_utils import Hypothesis
+from nemo.collections.asr.parts.utils.rnnt_utils import Hypothesis, NBestHypotheses
 
 
 def char_vocabulary():
@@ -97,6 +100,18 @@ def check_subword_timestamps(hyp: Hypothesis, decoding: CTCBPEDecoding):
     assert len(hyp.timestep['segment']) == segments_count
 
 
+def brute_force_ctc_scores(log_probs: torch.Tensor, blank_id: int):
+    """Log-probabilities of all the label sequences, summed over all the CTC paths of the [T, V + 1] log-probs"""
+    scores = {}
+    for path in itertools.product(range(log_probs.shape[-1]), repeat=log_probs.shape[0]):
+        path_score = sum(log_probs[t, label].item() for t, label in enumerate(path))
+        labels = tuple(
+            label for t, label in enumerate(path) if label != blank_id and (t == 0 or path[t - 1] != label)
+        )
+        scores[labels] = np.logaddexp(scores.get(labels, -np.inf), path_score)
+    return scores
+
+
 class TestCTCDecoding:
     @pytest.mark.unit
     def test_constructor(self):
@@ -364,3 +379,73 @@ class TestCTCDecoding:
                 assert torch.all(hyp.y_sequence == batched_hyp.y_sequence)
                 if timestamps:
                     assert hyp.timestep == batched_hyp.timestep
+
+    @pytest.mark.unit
+    def test_batched_beam_search_matches_brute_force(self):
+        vocab = ['a', 'b', 'c']
+        blank_id = len(vocab)
+        decoding = ctc_beam_decoding.BeamCTCInfer(
+            blank_id=blank_id, beam_size=200, search_type='batched', return_best_hypothesis=False, beam_beta=0.0
+        )
+        decoding.set_vocabulary(vocab)
+        decoding.set_decoding_type('char')
+
+        torch.manual_seed(0)
+        B, T = 3, 4
+        log_probs = torch.log_softmax(2 * torch.randn(B, T, blank_id + 1), dim=-1)
+        lengths = torch.tensor([4, 3, 0])
+        nbest_hyps = decoding(decoder_output=log_probs, decoder_lengths=lengths)[0]
+
+        for b in range(B):
+            expected_scores = brute_force_ctc_scores(log_probs[b, : lengths[b]], blank_id)
+            assert isinstance(nbest_hyps[b], NBestHypotheses)
+            scores = {tuple(hyp.y_sequence.tolist()): hyp.score for hyp in nbest_hyps[b].n_best_hypotheses}
+            assert scores.keys() == expected_scores.keys()
+            for labels, expected_score in expected_scores.items():
+                assert scores[labels] == pytest.approx(expected_score, abs=1e-4)
+
+    @pytest.mark.unit
+    def test_batched_beam_search_with_ngram_lm(self, tmp_path):
+        vocab = ['a', 'b', 'c']
+        blank_id = len(vocab)
+        arpa_path = tmp_path / "lm.arpa"
+        arpa_path.write_text(
+            "\\data\\\nngram 1=6\nngram 2=3\n\n"
+            "\\1-grams:\n-1.0\t<unk>\t0\n-99\t<s>\t-0.3\n-0.7\t</s>\t0\n"
+            "-0.5\ta\t-0.2\n-0.6\tb\t-0.25\n-2.0\tc\t-0.1\n\n"
+            "\\2-grams:\n-0.1\t<s> a\t-0.1\n-0.2\ta b\n-0.3\tb </s>\n\n\\end\\\n"
+        )
+        beam_alpha, beam_beta = 0.5, 0.7
+        decoding = ctc_beam_decoding.BeamCTCInfer(
+            blank_id=blank_id,
+            beam_size=200,
+            search_type='batched',
+            return_best_hypothesis=False,
+            beam_alpha=beam_alpha,
+            beam_beta=beam_beta,
+            kenlm_path=str(arpa_path),
+        )
+        decoding.set_vocabulary(vocab)
+        decoding.set_decoding_type('char')
+
+        torch.manual_seed(0)
+        B, T = 3, 4
+        log_probs = torch.log_softmax(2 * torch.randn(B, T, blank_id + 1), dim=-1)
+        lengths = torch.tensor([4, 3, 0])
+        nbest_hyps = decoding(decoder_output=log_probs, decoder_lengths=lengths)[0]
+        lm = decoding.batched_beam_lm
+
+        for b in range(B):
+            acoustic_scores = brute_force_ctc_scores(log_probs[b, : lengths[b]], blank_id)
+            scores = {tuple(hyp.y_sequence.tolist()): hyp.score for hyp in nbest_hyps[b].n_best_hypotheses}
+            assert scores.keys() == acoustic_scores.keys()
+            for labels, acoustic_score in acoustic_scores.items():
+                # LM score of the labels, including the end of sentence
+                lm_states = lm.get_init_states(batch_size=1)
+                lm_score = 0.0
+                for label in labels:
+                    label_lm_score, lm_states = lm.score_tokens(lm_states, torch.tensor([label]))
+                    lm_score += label_lm_score.item()
+                lm_score += lm.get_final(lm_states).item()
+                expected_score = acoustic_score + beam_alpha * lm_score + beam_beta * len(labels)
+                assert scores[labels] == pytest.approx(expected_score, abs=1e-4)
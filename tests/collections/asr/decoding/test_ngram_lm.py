@@ -0,0 +1,160 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+import random
+
+import pytest
+import torch
+
+from nemo.collections.asr.parts.submodules.ngram_lm import NGramLM
+
+ARPA_TEXT = """\\data\\
+ngram 1=7
+ngram 2=6
+ngram 3=2
+
+\\1-grams:
+-1.0\t<unk>\t0
+-99\t<s>\t-0.3
+-0.7\t</s>\t0
+-0.5\ta\t-0.2
+-0.6\tb\t-0.25
+-0.8\tc\t-0.1
+-0.9\tz\t-0.1
+
+\\2-grams:
+-0.3\t<s> a\t-0.1
+-0.4\ta b\t-0.15
+-0.35\tb a\t-0.05
+-0.5\tb </s>
+-0.45\ta c
+-0.2\tz a
+
+\\3-grams:
+-0.2\t<s> a b
+-0.25\ta b a
+
+\\end\\
+"""
+
+VOCABULARY = ['a', 'b', 'c', 'd']
+
+
+@pytest.fixture()
+def arpa_path(tmp_path):
+    path = tmp_path / "lm.arpa"
+    path.write_text(ARPA_TEXT)
+    return str(path)
+
+
+def parse_arpa(arpa_text):
+    ngrams = {}
+    order = 0
+    for line in arpa_text.splitlines():
+        line = line.strip()
+        if line.startswith("\\"):
+            order = int(line[1]) if line[1].isdigit() else 0
+            continue
+        if not line or order == 0:
+            continue
+        fields = line.split()
+        ngrams[tuple(fields[1 : 1 + order])] = (
+            float(fields[0]),
+            float(fields[1 + order]) if len(fields) > 1 + order else 0.0,
+        )
+    return ngrams
+
+
+def reference_scores(ngrams, words, max_order=3):
+    """Backoff scores (log10) of the words and the end of sentence, computed directly from the ARPA n-grams"""
+    scores = []
+    context = ('<s>',)
+    for word in words + ['</s>']:
+        history = context[len(context) - max_order + 1 :]
+        score = 0.0
+        while history + (word,) not in ngrams and history:
+            score += ngrams.get(history, (0.0, 0.0))[1]
+            history = history[1:]
+        if history + (word,) in ngrams:
+            scores.append(score + ngrams[history + (word,)][0])
+            context = context + (word,)
+        else:
+            # unknown word resets the context
+            scores.append(score + ngrams[('<unk>',)][0])
+            context = ()
+    return scores
+
+
+class TestNGramLM:
+    @pytest.mark.unit
+    def test_from_arpa(self, arpa_path):
+        lm = NGramLM.from_arpa(arpa_path, vocabulary=VOCABULARY)
+        assert lm.vocab_size == len(VOCABULARY)
+        assert lm.max_order == 3
+        # "z" is not in the vocabulary: n-grams with it are skipped
+        assert lm.arc_keys.shape[0] == 5 + 5 + 2
+        assert torch.all(lm.arc_keys[1:] > lm.arc_keys[:-1])
+        assert lm.unk_score == pytest.approx(-1.0 * math.log(10))
+
+    @pytest.mark.unit
+    def test_from_arpa_rejects_binary_model(self, tmp_path):
+        binary_path = tmp_path / "lm.bin"
+        binary_path.write_bytes(b"mmap lm http://kheafield.com/code format version 5\n\0\0\x01\xff")
+        with pytest.raises(ValueError, match="only ARPA files are supported"):
+            NGramLM.from_arpa(str(binary_path), vocabulary=VOCABULARY)
+
+    @pytest.mark.unit
+    def test_scores_match_reference(self, arpa_path):
+        lm = NGramLM.from_arpa(arpa_path, vocabulary=VOCABULARY)
+        ngrams = parse_arpa(ARPA_TEXT)
+        random.seed(0)
+        for _ in range(50):
+            words = [random.choice(VOCABULARY) for _ in range(random.randint(1, 8))]
+            states = lm.get_init_states(batch_size=1)
+            scores = []
+            for word in words:
+                score, states = lm.score_tokens(states, torch.tensor([VOCABULARY.index(word)]))
+                scores.append(score.item())
+            scores.append(lm.get_final(states).item())
+            expected_scores = [score * math.log(10) for score in reference_scores(ngrams, words)]
+            assert scores == pytest.approx(expected_scores, abs=1e-5)
+
+    @pytest.mark.unit
+    def test_advance(self, arpa_path):
+        lm = NGramLM.from_arpa(arpa_path, vocabulary=VOCABULARY)
+        states = torch.tensor([lm.bos_state, 0, lm.bos_state])
+        scores, next_states = lm.advance(states)
+        assert scores.shape == next_states.shape == (3, len(VOCABULARY))
+        for token in range(len(VOCABULARY)):
+            expected_scores, expected_next_states = lm.score_tokens(states, torch.full_like(states, token))
+            assert torch.allclose(scores[:, token], expected_scores)
+            assert torch.equal(next_states[:, token], expected_next_states)
+
+    @pytest.mark.unit
+    def test_scores_match_kenlm(self, arpa_path):
+        kenlm = pytest.importorskip("kenlm")
+        kenlm_model = kenlm.Model(arpa_path)
+        lm = NGramLM.from_arpa(arpa_path, vocabulary=VOCABULARY)
+        random.seed(1)
+        for _ in range(20):
+            words = [random.choice(VOCABULARY) for _ in range(random.randint(1, 8))]
+            kenlm_state, next_kenlm_state = kenlm.State(), kenlm.State()
+            kenlm_model.BeginSentenceWrite(kenlm_state)
+            states = lm.get_init_states(batch_size=1)
+            for word in words:
+                expected_score = kenlm_model.BaseScore(kenlm_state, word, next_kenlm_state) * math.log(10)
+                kenlm_state, next_kenlm_state = next_kenlm_state, kenlm_state
+                score, states = lm.score_tokens(states, torch.tensor([VOCABULARY.index(word)]))
+                assert score.item() == pytest.approx(expected_score, abs=1e-4)
@@ -524,3 +524,146 @@ class TestRNNTDecoding:
         )
         beam_config["ngram_lm_model"] = kenlm_model_path
         check_beam_decoding(test_data_dir, beam_config)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("max_symbols_per_step", [1, 3])
+    def test_batched_beam_decoding_beam_size_1_matches_greedy(self, max_symbols_per_step):
+        vocab_size = 5
+        decoder = get_rnnt_decoder(vocab_size)
+        joint = get_rnnt_joint(vocab_size)
+
+        torch.manual_seed(0)
+        enc_out = torch.randn(3, 4, 20)
+        enc_len = torch.tensor([20, 13, 7])
+
+        search_algo = rnnt_beam_decoding.BeamBatchedRNNTInfer(
+            decoder,
+            joint,
+            blank_index=joint.num_classes_with_blank - 1,
+            beam_size=1,
+            max_symbols_per_step=max_symbols_per_step,
+        )
+        etalon_search_algo = greedy_decode.GreedyBatchedRNNTInfer(
+            decoder,
+            joint,
+            blank_index=joint.num_classes_with_blank - 1,
+            max_symbols_per_step=max_symbols_per_step,
+            loop_labels=True,
+        )
+
+        hyps = search_algo(encoder_output=enc_out, encoded_lengths=enc_len)[0]
+        etalon_hyps = etalon_search_algo(encoder_output=enc_out, encoded_lengths=enc_len)[0]
+
+        assert len(hyps) == len(etalon_hyps)
+        for hyp, etalon_hyp in zip(hyps, etalon_hyps):
+            assert hyp.y_sequence.tolist() == etalon_hyp.y_sequence.tolist()
+            assert hyp.timestep.tolist() == etalon_hyp.timestep.tolist()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("durations", [None, [0, 1, 2]])
+    def test_batched_beam_decoding_matches_single_utterance_decoding(self, durations):
+        vocab_size = 5
+        decoder = get_rnnt_decoder(vocab_size)
+        jointnet_cfg = {'encoder_hidden': 4, 'pred_hidden': 4, 'joint_hidden': 4, 'activation': 'relu'}
+        torch.manual_seed(0)
+        joint = RNNTJoint(jointnet_cfg, vocab_size, num_extra_outputs=len(durations) if durations else 0)
+        joint.freeze()
+
+        torch.manual_seed(1)
+        enc_out = torch.randn(3, 4, 16)
+        enc_len = torch.tensor([16, 9, 0])
+
+        search_algo = rnnt_beam_decoding.BeamBatchedRNNTInfer(
+            decoder,
+            joint,
+            blank_index=vocab_size,
+            beam_size=4,
+            durations=durations,
+            max_symbols_per_step=3,
+            return_best_hypothesis=False,
+        )
+
+        nbest_hyps = search_algo(encoder_output=enc_out, encoded_lengths=enc_len)[0]
+        assert len(nbest_hyps) == 3
+        # empty utterance gives a single empty hypothesis
+        assert len(nbest_hyps[2].n_best_hypotheses) == 1
+        assert nbest_hyps[2].n_best_hypotheses[0].y_sequence.tolist() == []
+
+        for i in range(2):
+            single_nbest_hyps = search_algo(
+                encoder_output=enc_out[i : i + 1, :, : enc_len[i]], encoded_lengths=enc_len[i : i + 1]
+            )[0][0]
+            hyps = nbest_hyps[i].n_best_hypotheses
+            single_hyps = single_nbest_hyps.n_best_hypotheses
+            assert 0 < len(hyps) <= 4
+            assert [hyp.y_sequence.tolist() for hyp in hyps] == [hyp.y_sequence.tolist() for hyp in single_hyps]
+            assert torch.allclose(
+                torch.tensor([hyp.score for hyp in hyps]), torch.tensor([hyp.score for hyp in single_hyps]), atol=1e-5
+            )
+            # all hypotheses are unique after recombination
+            assert len({tuple(hyp.y_sequence.tolist()) for hyp in hyps}) == len(hyps)
+            if durations is not None:
+                assert all(len(hyp.token_duration) in (0, len(hyp.y_sequence)) for hyp in hyps)
+
+    @pytest.mark.unit
+    def test_batched_beam_decoding_strategy(self):
+        vocab = char_vocabulary()
+        decoder = get_rnnt_decoder(vocab_size=len(vocab))
+        joint = get_rnnt_joint(vocab_size=len(vocab))
+        cfg = RNNTDecodingConfig(strategy='beam_batch', beam=rnnt_beam_decoding.BeamRNNTInferConfig(beam_size=2))
+        decoding = RNNTDecoding(decoding_cfg=cfg, decoder=decoder, joint=joint, vocabulary=vocab)
+        assert isinstance(decoding.decoding, rnnt_beam_decoding.BeamBatchedRNNTInfer)
+
+        torch.manual_seed(0)
+        enc_out = torch.randn(2, 4, 10)
+        enc_len = torch.tensor([10, 6])
+        hyps, _ = decoding.rnnt_decoder_predictions_tensor(enc_out, enc_len, return_hypotheses=True)
+        assert len(hyps) == 2
+
+        # timestamps require alignments for RNNT models, which are not supported
+        cfg.compute_timestamps = True
+        with pytest.raises(ValueError, match="compute_timestamps"):
+            RNNTDecoding(decoding_cfg=cfg, decoder=decoder, joint=joint, vocabulary=vocab)
+
+    @pytest.mark.unit
+    def test_batched_beam_decoding_with_ngram_lm(self, tmp_path):
+        vocab_size = 3
+        # for char models, the labels are represented in the LM by their ids
+        arpa_path = tmp_path / "lm.arpa"
+        arpa_path.write_text(
+            "\\data\\\nngram 1=6\nngram 2=2\n\n"
+            "\\1-grams:\n-1.0\t<unk>\t0\n-99\t<s>\t-0.3\n-0.7\t</s>\t0\n"
+            "-0.5\t0\t-0.2\n-0.6\t1\t-0.25\n-2.0\t2\t-0.1\n\n"
+            "\\2-grams:\n-0.1\t<s> 0\t-0.1\n-0.2\t0 1\n\n\\end\\\n"
+        )
+        decoder = get_rnnt_decoder(vocab_size)
+        jointnet_cfg = {'encoder_hidden': 4, 'pred_hidden': 4, 'joint_hidden': 4, 'activation': 'relu'}
+        torch.manual_seed(0)
+        joint = RNNTJoint(jointnet_cfg, vocab_size, num_extra_outputs=0)
+        joint.freeze()
+
+        torch.manual_seed(1)
+        enc_out = torch.randn(2, 4, 12)
+        enc_len = torch.tensor([12, 7])
+
+        search_kwargs = dict(blank_index=vocab_size, beam_size=4, return_best_hypothesis=False)
+        search_algo = rnnt_beam_decoding.BeamBatchedRNNTInfer(decoder, joint, **search_kwargs)
+        lm_search_algo = rnnt_beam_decoding.BeamBatchedRNNTInfer(
+            decoder, joint, ngram_lm_model=str(arpa_path), ngram_lm_alpha=0.0, **search_kwargs
+        )
+        lm_search_algo.set_decoding_type('char')
+
+        # zero LM weight does not change the results
+        nbest_hyps = search_algo(encoder_output=enc_out, encoded_lengths=enc_len)[0]
+        lm_nbest_hyps = lm_search_algo(encoder_output=enc_out, encoded_lengths=enc_len)[0]
+        assert lm_search_algo.ngram_lm is not None
+        for hyps, lm_hyps in zip(nbest_hyps, lm_nbest_hyps):
+            assert [hyp.y_sequence.tolist() for hyp in hyps.n_best_hypotheses] == [
+                hyp.y_sequence.tolist() for hyp in lm_hyps.n_best_hypotheses
+            ]
+
+        # label 2 is very unlikely according to the LM
+        lm_search_algo.ngram_lm_alpha = 10.0
+        lm_nbest_hyps = lm_search_algo(encoder_output=enc_out, encoded_lengths=enc_len)[0]
+        for lm_hyps in lm_nbest_hyps:
+            assert 2 not in lm_hyps.n_best_hypotheses[0].y_sequence.tolist()
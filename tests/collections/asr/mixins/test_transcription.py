@@ -24,7 +24,11 @@ from torch.utils.data import DataLoader, Dataset
 
 from nemo.collections.asr.data.audio_to_text import _speech_collate_fn
 from nemo.collections.asr.parts.mixins import TranscribeConfig, TranscriptionMixin
-from nemo.collections.asr.parts.mixins.transcription import GenericTranscriptionType
+from nemo.collections.asr.parts.mixins.transcription import (
+    GenericTranscriptionType,
+    get_duration_batches,
+    restore_input_order,
+)
 from nemo.collections.asr.parts.utils import Hypothesis
 
 
@@ -83,6 +87,10 @@ class TranscribableDummy(DummyModel, TranscriptionMixin):
 
         return ds_config
 
+    def _transcribe_audio_durations(self, audio_files: List[str], trcfg: TranscribeConfig):
+        # Dummy audio files are their own duration
+        return [float(audio_file) for audio_file in audio_files]
+
     def _setup_transcribe_dataloader(self, config: Dict) -> DataLoader:
         class DummyDataset(Dataset):
             def __init__(self, audio_files: List[str], config: Dict):
@@ -310,6 +318,67 @@ class TestTranscriptionMixin:
         assert outputs[0][1] == 2.0
         assert outputs[0][2] == 3.0
 
+    @pytest.mark.unit
+    def test_transcribe_batch_duration(self, dummy_model):
+        @dataclass
+        class OverrideConfig(TranscribeConfig):
+            output_type: str = 'list'
+            verbose: bool = False
+
+        dummy_model = dummy_model.eval()
+        dummy_model.encoder.weight.data.fill_(1.0)
+        dummy_model.encoder.bias.data.fill_(0.0)
+
+        audio = ['1.0', '5.0', '2.0', '4.0', '3.0']
+        outputs = dummy_model.transcribe(audio, batch_duration=8.0)
+        assert outputs == [1.0, 5.0, 2.0, 4.0, 3.0]
+        # batches are [5.0], [4.0, 3.0], [2.0, 1.0]
+        assert dummy_model.execution_count == 3
+
+        override_cfg = OverrideConfig(batch_duration=8.0, output_type='dict')
+        outputs = dummy_model.transcribe(audio, override_config=override_cfg)
+        assert outputs['output'] == [1.0, 5.0, 2.0, 4.0, 3.0]
+
+        override_cfg = OverrideConfig(batch_duration=8.0, output_type='dict2')
+        outputs = dummy_model.transcribe(audio, override_config=override_cfg)
+        assert [output['output'] for output in outputs] == [1.0, 5.0, 2.0, 4.0, 3.0]
+
+        # the generator yields batches by decreasing duration
+        override_cfg = OverrideConfig(batch_duration=8.0)
+        outputs = [output for batch in dummy_model.transcribe_generator(audio, override_cfg) for output in batch]
+        assert outputs == [5.0, 4.0, 3.0, 2.0, 1.0]
+        assert override_cfg._internal.sample_order == [1, 3, 4, 2, 0]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("decode_workers", [1, 2])
+    def test_transcribe_decode_workers(self, dummy_model, decode_workers):
+        dummy_model = dummy_model.eval()
+        dummy_model.encoder.weight.data.fill_(1.0)
+        dummy_model.encoder.bias.data.fill_(0.0)
+
+        audio = [str(float(i)) for i in range(1, 8)]
+        outputs = dummy_model.transcribe(audio, batch_size=2, decode_workers=decode_workers, verbose=False)
+        assert outputs == [float(i) for i in range(1, 8)]
+        assert dummy_model.flag_end
+
+        # batches are yielded in order, and the generator can be closed while batches are still being decoded
+        transcribe_cfg = TranscribeConfig(batch_size=1, decode_workers=decode_workers, verbose=False)
+        generator = dummy_model.transcribe_generator(audio, override_config=transcribe_cfg)
+        assert next(generator) == [1.0]
+        assert next(generator) == [2.0]
+        generator.close()
+
+    @pytest.mark.unit
+    def test_duration_batching_utils(self):
+        assert get_duration_batches([], 10.0) == []
+        assert get_duration_batches([2.0, 12.0, 2.0, 3.0, 1.0], 10.0) == [[1], [3, 0, 2], [4]]
+
+        sample_order = [1, 2, 0]
+        assert restore_input_order(['b', 'c', 'a'], sample_order) == ['a', 'b', 'c']
+        assert restore_input_order([['b', 'c', 'a'], [2, 3, 1]], sample_order) == [['a', 'b', 'c'], [1, 2, 3]]
+        assert restore_input_order({'text': ['b', 'c', 'a']}, sample_order) == {'text': ['a', 'b', 'c']}
+        assert restore_input_order((['b', 'c', 'a'],), sample_order) == (['a', 'b', 'c'],)
+
     pytest.mark.with_downloads()
 
     @pytest.mark.unit
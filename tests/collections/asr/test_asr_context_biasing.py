@@ -15,6 +15,7 @@
 
 import os
 import tempfile
+from unittest.mock import Mock
 
 import numpy as np
 import pytest
@@ -93,6 +94,38 @@ class TestCTCWordSpotter:
         assert ws_results[0].end_frame == 19
         assert round(ws_results[0].score, 4) == 8.9967
 
+    @pytest.mark.unit
+    def test_run_word_spotter_batch(self):
+        blank_idx = 4
+        tokenizer = Mock(ids_to_tokens=lambda ids: [f"▁{idx}" for idx in ids])
+        asr_model = Mock(tokenizer=tokenizer)
+        context_graph = context_biasing.ContextGraphCTC(blank_id=blank_idx)
+        context_graph.add_to_graph([["ab", [[0, 1]]], ["abc", [[0, 1, 2]]], ["d", [[3, 3]]]])
+
+        flat_graph = context_biasing.FlatContextGraphCTC.from_context_graph(context_graph)
+        assert flat_graph.state_offsets[-1] == len(flat_graph.trans_token) == len(flat_graph.trans_next)
+        assert sorted(word for word in flat_graph.words if word) == ["ab", "abc", "d"]
+
+        rng = np.random.default_rng(0)
+        logprobs = []
+        for num_frames in [12, 30, 1, 25]:
+            logits = rng.normal(scale=3.0, size=(num_frames, blank_idx + 1))
+            logits[:, blank_idx] += 2.0
+            logprobs.append(logits - np.log(np.exp(logits).sum(axis=1, keepdims=True)))
+
+        # the batched spotter matches the per-file one at the default thresholds
+        expected = [
+            context_biasing.run_word_spotter(x, context_graph, asr_model, blank_idx=blank_idx) for x in logprobs
+        ]
+        ws_results = context_biasing.run_word_spotter_batch(logprobs, flat_graph, asr_model, blank_idx=blank_idx)
+        assert len(ws_results) == len(logprobs)
+        assert sum(len(hyps) for hyps in expected) > 0
+        for hyps, expected_hyps in zip(ws_results, expected):
+            assert [(hyp.word, hyp.start_frame, hyp.end_frame) for hyp in hyps] == [
+                (hyp.word, hyp.start_frame, hyp.end_frame) for hyp in expected_hyps
+            ]
+            assert np.allclose([hyp.score for hyp in hyps], [hyp.score for hyp in expected_hyps])
+
 
 class TestContextBiasingUtils:
     @pytest.mark.unit
@@ -336,6 +336,7 @@ class TestEncDecCTCModel:
             'drop_last',
             'tarred_shard_strategy',
             'shard_manifests',
+            'lazy_shard_manifests',
             'shuffle_n',
             'parser',
             'normalize',
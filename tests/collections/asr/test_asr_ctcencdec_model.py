@@ -284,6 +284,7 @@ class TestEncDecCTCModel:
             'drop_last',
             'tarred_shard_strategy',
             'shard_manifests',
+            'lazy_shard_manifests',
             'shuffle_n',
             'use_start_end_token',
             'use_start_end_token',
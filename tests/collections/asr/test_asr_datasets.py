@@ -16,6 +16,7 @@ import filecmp
 import json
 import os
 import shutil
+import tarfile
 import tempfile
 from unittest import mock
 
@@ -152,6 +153,50 @@ class TestASRDatasets:
             count += 1
         assert count == 5  # file ending with sub is not part of tar ball
 
+    @pytest.mark.unit
+    def test_tarred_dataset_lazy_shard_manifests(self, test_data_dir, tmp_path):
+        manifest_path = os.path.abspath(os.path.join(test_data_dir, 'asr/tarred_an4/tarred_audio_manifest.json'))
+        with open(manifest_path) as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+
+        # Write one manifest per shard, containing the entries of the audio files in that shard
+        for i in range(2):
+            with tarfile.open(os.path.join(test_data_dir, f'asr/tarred_an4/audio_{i}.tar')) as tar:
+                members = {os.path.basename(member.name) for member in tar.getmembers()}
+            write_manifest(
+                str(tmp_path / f'manifest_{i}.json'), [e for e in entries if e['audio_filepath'] in members]
+            )
+
+        tarpath = os.path.abspath(os.path.join(test_data_dir, 'asr/tarred_an4/audio_{0..1}.tar'))
+        ds_lazy = TarredAudioToCharDataset(
+            audio_tar_filepaths=tarpath,
+            manifest_filepath=str(tmp_path / 'manifest_{0..1}.json'),
+            labels=self.labels,
+            sample_rate=16000,
+            lazy_shard_manifests=True,
+        )
+        ds_full = TarredAudioToCharDataset(
+            audio_tar_filepaths=tarpath, manifest_filepath=manifest_path, labels=self.labels, sample_rate=16000
+        )
+        assert ds_lazy.manifest_processor is None
+        assert len(ds_lazy) == 32
+
+        samples_lazy = list(ds_lazy)
+        samples_full = list(ds_full)
+        assert len(samples_lazy) == 32
+        for (f_lazy, fl_lazy, t_lazy, tl_lazy), (f_full, fl_full, t_full, tl_full) in zip(samples_lazy, samples_full):
+            assert torch.equal(f_lazy, f_full)
+            assert torch.equal(t_lazy, t_full)
+
+        with pytest.raises(ValueError):
+            TarredAudioToCharDataset(
+                audio_tar_filepaths=tarpath,
+                manifest_filepath=str(tmp_path / 'manifest_0.json'),
+                labels=self.labels,
+                sample_rate=16000,
+                lazy_shard_manifests=True,
+            )
+
     @pytest.mark.unit
     def test_mismatch_in_model_dataloader_config(self, caplog):
         logging._logger.propagate = True
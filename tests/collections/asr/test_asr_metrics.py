@@ -152,6 +152,31 @@ class TestWordErrorRate:
             hypotheses=['ducuti motorcycle', 'G P U'], references=['ducati motorcycle', 'GPU'], use_cer=True
         ) == ([1 / 17, 2 / 3], 0.15)
 
+    @pytest.mark.unit
+    @pytest.mark.parametrize("use_cer", [False, True])
+    @pytest.mark.parametrize("num_workers", [0, 2])
+    def test_wer_function_batched(self, use_cer, num_workers):
+        hypotheses, references = [], []
+        for _ in range(1000):
+            hypotheses.append(' '.join(random.choice('abcd') for _ in range(random.randint(0, 12))))
+            references.append(' '.join(random.choice('abcd') for _ in range(random.randint(1, 12))))
+        kwargs = dict(use_cer=use_cer, batched=True, num_workers=num_workers)
+
+        assert word_error_rate(hypotheses, references, **kwargs) == word_error_rate(
+            hypotheses, references, use_cer=use_cer
+        )
+        wer, words, ins_rate, del_rate, sub_rate = word_error_rate_detail(hypotheses, references, **kwargs)
+        assert abs(wer - word_error_rate(hypotheses, references, use_cer=use_cer)) < 1e-9
+        assert abs(wer - (ins_rate + del_rate + sub_rate)) < 1e-9
+        assert words == sum(len(list(r) if use_cer else r.split()) for r in references)
+        wer_per_utt, avg_wer = word_error_rate_per_utt(hypotheses, references, **kwargs)
+        assert len(wer_per_utt) == len(references)
+        assert abs(avg_wer - wer) < 1e-9
+
+        assert word_error_rate_detail(['cat', ''], ['', 'gpu'], batched=True) == (2.0, 1, 1.0, 1.0, 0.0)
+        assert word_error_rate_detail(['G P U'], ['GPU'], batched=True) == (3.0, 1, 2.0, 0.0, 1.0)
+        assert word_error_rate_per_utt(['cat', ''], ['', 'gpu'], batched=True) == ([float("inf"), 1.0], 2.0)
+
     @pytest.mark.unit
     @pytest.mark.parametrize("batch_dim_index", [0, 1])
     @pytest.mark.parametrize("test_wer_bpe", [False, True])
@@ -0,0 +1,79 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from nemo.collections.asr.parts.utils.streaming_utils import (
+    batched_lcs_alignment_merge_buffer,
+    batched_longest_common_subsequence_merge,
+    lcs_alignment_merge_buffer,
+    longest_common_subsequence_merge,
+)
+
+LCS_MERGE_CASES = [
+    # complete merge
+    ([1, 2, 3, 4, 5], [3, 4, 5, 6, 7], [2, 0, 3]),
+    ([5, 6, 7, 8, 1, 2], [7, 8, 1, 2, 3, 4], [2, 0, 4]),
+    ([1, 2, 1, 2, 1, 2], [1, 2, 1, 2, 3], [2, 0, 4]),
+    # partial merge with a mismatched token
+    ([1, 2, 3, 4, 5], [9, 3, 4, 8, 6, 7], [2, 0, 3]),
+    ([4, 5, 6, 7, 8, 9], [5, 6, 0, 8, 9, 10], [4, 3, 2]),
+    # no overlap
+    ([1, 2, 3], [7, 8, 9], [3, 0, 0]),
+    ([], [1, 2], [0, 0, 0]),
+]
+
+
+def _naive_lcs_suffix_table(X, Y):
+    table = np.zeros((len(X) + 1, len(Y) + 1), dtype=np.int64)
+    for i in range(1, len(X) + 1):
+        for j in range(1, len(Y) + 1):
+            if X[i - 1] == Y[j - 1]:
+                table[i, j] = table[i - 1, j - 1] + 1
+    return table
+
+
+class TestLongestCommonSubsequenceMerge:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("X, Y, expected", LCS_MERGE_CASES)
+    def test_lcs_merge(self, X, Y, expected):
+        result_idx, alignment = longest_common_subsequence_merge(X, Y)
+        assert result_idx == expected
+        assert np.array_equal(alignment, _naive_lcs_suffix_table(X, Y))
+
+    @pytest.mark.unit
+    def test_batched_lcs_merge(self):
+        Xs = [X for X, _, _ in LCS_MERGE_CASES]
+        Ys = [Y for _, Y, _ in LCS_MERGE_CASES]
+        outputs = batched_longest_common_subsequence_merge(Xs, Ys)
+        assert [result_idx for result_idx, _ in outputs] == [expected for _, _, expected in LCS_MERGE_CASES]
+        for X, Y, (_, alignment) in zip(Xs, Ys, outputs):
+            assert np.array_equal(alignment, _naive_lcs_suffix_table(X, Y))
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("delay", [0, 2])
+    def test_batched_lcs_merge_buffer(self, delay):
+        rng = np.random.default_rng(0)
+        buffers = [rng.integers(0, 4, size=rng.integers(0, 20)).tolist() for _ in range(16)]
+        datas = [buffer[-3:] + rng.integers(0, 4, size=5).tolist() for buffer in buffers]
+
+        expected = [
+            lcs_alignment_merge_buffer(list(buffer), data, delay, model=None, max_steps_per_timestep=3)
+            for buffer, data in zip(buffers, datas)
+        ]
+        merged = batched_lcs_alignment_merge_buffer(
+            [list(buffer) for buffer in buffers], datas, delay, model=None, max_steps_per_timestep=3
+        )
+        assert merged == expected
@@ -12,19 +12,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
 import numpy as np
 import pytest
+import torch
 from pyannote.core import Annotation, Segment
 
 from nemo.collections.asr.parts.utils.vad_utils import (
     align_labels_to_frames,
     convert_labels_to_speech_segments,
     frame_vad_construct_pyannote_object_per_file,
+    generate_overlap_vad_seq,
+    generate_overlap_vad_seq_from_tensors,
+    generate_vad_segment_table,
+    generate_vad_segment_table_from_tensors,
     get_frame_labels,
     get_nonspeech_segments,
     load_speech_overlap_segments_from_rttm,
     load_speech_segments_from_rttm,
     read_rttm_as_pyannote_object,
+    write_vad_segment_table,
 )
 
 
@@ -124,3 +132,30 @@ class TestVADUtils:
         assert speech_segments_new == speech_segments
         ref, hyp = frame_vad_construct_pyannote_object_per_file(frame_labels, frame_labels, 0.02)
         assert ref == hyp == pyannote_object_gt
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("smoothing_method", ["mean", "median"])
+    def test_vad_postprocessing_from_tensors(self, tmp_path, smoothing_method):
+        frames = {
+            "session_a": torch.tensor([0.05] * 40 + [0.95] * 80 + [0.05] * 30 + [0.95] * 50),
+            "session_b": torch.tensor([0.95] * 60 + [0.05] * 90),
+        }
+        params = {"onset": 0.5, "offset": 0.5, "pad_onset": 0.1, "pad_offset": 0.0, "min_duration_on": 0.0}
+        params.update({"min_duration_off": 0.2, "filter_speech_first": True})
+
+        frame_dir = tmp_path / "frames"
+        frame_dir.mkdir()
+        for name, frame in frames.items():
+            with open(frame_dir / f"{name}.frame", "w") as f:
+                f.writelines(f"{pred:.4f}\n" for pred in frame.tolist())
+        pred_dir = generate_overlap_vad_seq(str(frame_dir), smoothing_method, 0.5, 0.63, 0.08, num_workers=0)
+        table_dir = generate_vad_segment_table(pred_dir, params, 0.01, num_workers=0, out_dir=str(tmp_path / "file"))
+
+        preds = generate_overlap_vad_seq_from_tensors(frames, smoothing_method, 0.5, 0.63, 0.08)
+        segments = generate_vad_segment_table_from_tensors(preds, params, 0.01)
+        os.makedirs(tmp_path / "memory")
+        for name in frames:
+            assert segments[name].shape[1] == 3
+            table_path = write_vad_segment_table(segments[name], name, str(tmp_path / "memory"))
+            with open(table_path) as f_memory, open(os.path.join(table_dir, f"{name}.txt")) as f_file:
+                assert f_memory.read() == f_file.read()
@@ -0,0 +1,161 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import pickle
+
+import pytest
+
+from nemo.collections.common.parts.preprocessing import manifest, parsers
+from nemo.collections.common.parts.preprocessing.collections import ASRAudioText, ASRColumnarAudioText
+
+
+@pytest.fixture()
+def manifest_path(tmp_path):
+    entries = [
+        {"audio_filepath": "/data/a/utt1.wav", "duration": 3.5, "text": "hello world"},
+        {"audio_filepath": "/data/b/utt2.wav", "duration": 1.0, "text": "", "offset": 0.5, "speaker": 3},
+        {"audio_filepath": "utt3.flac", "duration": 12.0, "text": "too long"},
+        {"audio_filepath": "/utt4.wav", "duration": 2.25, "text": "ünïcode", "lang": "de", "orig_sr": 8000},
+        {"audio_filepath": "/data/a/utt5.wav", "duration": 0.1, "text": "too short"},
+    ]
+    path = tmp_path / "manifest.json"
+    with open(path, "w") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+    return str(path)
+
+
+class TestColumnarAudioText:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("do_sort_by_duration", [False, True])
+    def test_matches_list_collection(self, manifest_path, do_sort_by_duration):
+        kwargs = dict(
+            parser=parsers.make_parser(labels=list("abcdefghijklmnopqrstuvwxyz ")),
+            min_duration=0.5,
+            max_duration=10.0,
+            do_sort_by_duration=do_sort_by_duration,
+        )
+        expected = ASRAudioText(manifest_path, **kwargs)
+        columnar = ASRColumnarAudioText(manifest_path, **kwargs)
+
+        assert len(columnar) == len(expected) == 3
+        assert list(columnar) == list(expected)
+        assert columnar[-1] == expected[-1]
+        assert columnar[0:2] == list(expected)[0:2]
+        with pytest.raises(IndexError):
+            columnar[3]
+
+    @pytest.mark.unit
+    def test_mapping(self, manifest_path):
+        kwargs = dict(parser=parsers.make_parser([]), index_by_file_id=True)
+        expected = ASRAudioText(manifest_path, **kwargs)
+        columnar = ASRColumnarAudioText(manifest_path, **kwargs)
+        assert columnar.mapping == expected.mapping
+
+        columnar = ASRColumnarAudioText(manifest_path, parser=parsers.make_parser([]))
+        assert not hasattr(columnar, 'mapping')
+
+    @pytest.mark.unit
+    def test_save_load_and_pickle(self, manifest_path, tmp_path):
+        columnar = ASRColumnarAudioText(manifest_path, parser=parsers.make_parser([]), index_by_file_id=True)
+        expected = list(columnar)
+
+        # in-memory collections are pickled with their columns
+        assert list(pickle.loads(pickle.dumps(columnar))) == expected
+
+        columnar.save(str(tmp_path / "columns"))
+        loaded = ASRColumnarAudioText.load(str(tmp_path / "columns"))
+        assert list(loaded) == expected
+        assert loaded.mapping == columnar.mapping
+
+        # saved collections are pickled by path only
+        payload = pickle.dumps(loaded)
+        assert len(payload) < 200
+        assert list(pickle.loads(payload)) == expected
+
+    @pytest.mark.unit
+    def test_manifest_cache(self, manifest_path, tmp_path, monkeypatch):
+        cache_dir = str(tmp_path / "cache")
+        parser = parsers.make_parser(labels=list("abcdefghijklmnopqrstuvwxyz "))
+        expected = list(ASRColumnarAudioText(manifest_path, parser=parser, min_duration=0.5))
+
+        built = ASRColumnarAudioText(manifest_path, parser=parser, cache_dir=cache_dir, min_duration=0.5)
+        assert list(built) == expected
+        assert len(os.listdir(cache_dir)) == 1
+
+        # warm start does not parse the manifest
+        def fail(*args, **kwargs):
+            raise AssertionError("manifest should not be parsed")
+
+        with monkeypatch.context() as m:
+            m.setattr(manifest, 'item_iter', fail)
+            cached = ASRColumnarAudioText(manifest_path, parser=parser, cache_dir=cache_dir, min_duration=0.5)
+        assert list(cached) == expected
+
+        # filter settings, tokenizer and manifest content are part of the key
+        ASRColumnarAudioText(manifest_path, parser=parser, cache_dir=cache_dir, min_duration=0.0)
+        ASRColumnarAudioText(manifest_path, parser=parsers.make_parser([]), cache_dir=cache_dir, min_duration=0.5)
+        assert len(os.listdir(cache_dir)) == 3
+        with open(manifest_path, "a") as f:
+            f.write(json.dumps({"audio_filepath": "new.wav", "duration": 1.0, "text": "new"}) + "\n")
+        updated = ASRColumnarAudioText(manifest_path, parser=parser, cache_dir=cache_dir, min_duration=0.5)
+        assert len(updated) == len(expected) + 1
+        assert len(os.listdir(cache_dir)) == 4
+
+    @pytest.mark.unit
+    def test_manifest_cache_rebuilds_corrupted_cache(self, manifest_path, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        parser = parsers.make_parser([])
+        expected = list(ASRColumnarAudioText(manifest_path, parser=parser, cache_dir=cache_dir))
+
+        (cache_path,) = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)]
+        os.remove(os.path.join(cache_path, "tokens.npy"))
+        assert list(ASRColumnarAudioText(manifest_path, parser=parser, cache_dir=cache_dir)) == expected
+        assert os.path.exists(os.path.join(cache_path, "tokens.npy"))
+
+
+class TestManifestItemIter:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("fast_json", [False, True])
+    def test_parallel_matches_sequential(self, manifest_path, tmp_path, fast_json):
+        second_path = tmp_path / "manifest2.json"
+        with open(second_path, "w") as f:
+            for i in range(100):
+                f.write(json.dumps({"audio_filepath": f"/data/c/{i}.wav", "duration": i / 10, "text": "ü" * i}) + "\n")
+                if i % 7 == 0:
+                    f.write("\n")
+        manifests = [manifest_path, str(second_path)]
+
+        expected = list(manifest.item_iter(manifests))
+        parallel = list(manifest.item_iter(manifests, num_workers=2, fast_json=fast_json, chunk_size=64))
+        assert parallel == expected
+        assert [item['id'] for item in parallel] == list(range(105))
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("num_workers", [0, 2])
+    def test_parse_errors(self, manifest_path, num_workers):
+        with open(manifest_path, "a") as f:
+            f.write("{not json\n")
+        with pytest.raises(RuntimeError, match="Failed to parse"):
+            list(manifest.item_iter(manifest_path, num_workers=num_workers, chunk_size=64))
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("collection_cls", [ASRAudioText, ASRColumnarAudioText])
+    def test_collection_parallel_parsing(self, manifest_path, collection_cls):
+        parser = parsers.make_parser(labels=list("abcdefghijklmnopqrstuvwxyz "))
+        expected = collection_cls(manifest_path, parser=parser, min_duration=0.5)
+        parallel = collection_cls(manifest_path, parser=parser, min_duration=0.5, parse_workers=2, fast_json=True)
+        assert list(parallel) == list(expected)
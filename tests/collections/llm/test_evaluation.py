@@ -0,0 +1,175 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+
+pytest.importorskip("lm_eval")
+
+from nemo.collections.common.tokenizers.sentencepiece_tokenizer import SentencePieceTokenizer
+from nemo.collections.llm.evaluation import base as evaluation_base
+from nemo.deploy.utils import select_token_logprobs
+
+VOCAB_SIZE = 128
+# logits of the next token depend only on the current token
+LOGITS_TABLE = torch.randn(VOCAB_SIZE, VOCAB_SIZE, generator=torch.Generator().manual_seed(0))
+
+
+class CharTokenizer:
+    """Character-level tokenizer which, like SentencePiece, starts each encoding with a space token."""
+
+    def encode(self, text, **kwargs):
+        return [ord(" ")] + [ord(char) for char in text]
+
+    def decode(self, token_id):
+        return chr(token_id)
+
+
+class MockTritonQueryLLM:
+    """Replaces NemoQueryLLM, computing the logits of the prompts as a TensorRT-LLM model deployed on Triton."""
+
+    calls = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def __init__(self, url, model_name, reuse_client=False):
+        self.reuse_client = reuse_client
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def query_llm(
+        self,
+        prompts,
+        output_context_logits=False,
+        output_generation_logits=False,
+        continuation_ids=None,
+        openai_format_response=False,
+        **kwargs,
+    ):
+        cls = MockTritonQueryLLM
+        with cls.lock:
+            cls.calls.append(
+                dict(prompts=list(prompts), context_logits=output_context_logits, continuation_ids=continuation_ids)
+            )
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(0.01)
+
+        context_logits = [LOGITS_TABLE[[ord(char) for char in prompt]] for prompt in prompts]
+        choice = {"text": np.array([[prompt.upper()] for prompt in prompts])}
+        if continuation_ids is not None:
+            max_len = max(len(token_ids) for token_ids in continuation_ids)
+            selected = [
+                select_token_logprobs(logits, token_ids + [-1] * (max_len - len(token_ids)))
+                for logits, token_ids in zip(context_logits, continuation_ids)
+            ]
+            choice["continuation_logprobs"] = np.stack([log_probs for log_probs, _ in selected])
+            choice["continuation_greedy"] = np.stack([is_greedy for _, is_greedy in selected])
+        elif output_context_logits:
+            max_len = max(len(logits) for logits in context_logits)
+            padded_logits = np.zeros((len(prompts), 1, max_len, VOCAB_SIZE), dtype=np.single)
+            for i, logits in enumerate(context_logits):
+                padded_logits[i, 0, : len(logits)] = logits.numpy()
+            choice["context_logits"] = padded_logits
+        elif output_generation_logits:
+            choice["generation_logits"] = np.stack([logits[-1:].unsqueeze(0).numpy() for logits in context_logits])
+
+        with cls.lock:
+            cls.in_flight -= 1
+        return {"choices": [choice]}
+
+
+@pytest.fixture()
+def mock_triton(monkeypatch):
+    MockTritonQueryLLM.calls = []
+    MockTritonQueryLLM.in_flight = 0
+    MockTritonQueryLLM.max_in_flight = 0
+    monkeypatch.setattr(evaluation_base, "NemoQueryLLM", MockTritonQueryLLM)
+    return MockTritonQueryLLM
+
+
+def get_model(server_side_logprobs=False, max_concurrent_requests=1, batch_size=2):
+    tokenizer = SentencePieceTokenizer.__new__(SentencePieceTokenizer)
+    tokenizer.tokenizer = CharTokenizer()
+    return evaluation_base.NeMoFWLMEval(
+        "triton_model",
+        "grpc://0.0.0.0:8001",
+        tokenizer,
+        batch_size=batch_size,
+        max_tokens_to_generate=16,
+        temperature=1e-9,
+        top_p=0.0,
+        top_k=1,
+        add_bos=False,
+        server_side_logprobs=server_side_logprobs,
+        max_concurrent_requests=max_concurrent_requests,
+    )
+
+
+def expected_loglikelihood(context, continuation):
+    tokens = [ord(char) for char in context + continuation]
+    log_probs = torch.log_softmax(LOGITS_TABLE[tokens[:-1]], dim=-1)
+    positions = range(len(context) - 1, len(tokens) - 1)
+    return sum(log_probs[i, tokens[i + 1]].item() for i in positions), all(
+        log_probs[i].argmax().item() == tokens[i + 1] for i in positions
+    )
+
+
+class TestNeMoFWLMEval:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("task_name,continuations", [("hellaswag", [" xy", " abc", " q"]), ("mmlu_x", ["a"])])
+    @pytest.mark.parametrize("server_side_logprobs", [False, True])
+    @pytest.mark.parametrize("max_concurrent_requests", [1, 3])
+    def test_loglikelihood(self, mock_triton, task_name, continuations, server_side_logprobs, max_concurrent_requests):
+        model = get_model(server_side_logprobs, max_concurrent_requests)
+        contexts = [f"question {i}:" for i in range(7)]
+        requests = [
+            SimpleNamespace(arguments=(context, continuations[i % len(continuations)]), task_name=task_name)
+            for i, context in enumerate(contexts)
+        ]
+
+        results = model.loglikelihood(requests)
+
+        assert len(results) == len(requests)
+        for request, (log_prob, is_greedy) in zip(requests, results):
+            expected_log_prob, expected_is_greedy = expected_loglikelihood(*request.arguments)
+            assert log_prob == pytest.approx(expected_log_prob, abs=1e-4)
+            assert is_greedy == expected_is_greedy
+        assert len(mock_triton.calls) == 4
+        assert mock_triton.max_in_flight <= max_concurrent_requests
+        for call in mock_triton.calls:
+            # full logits are not requested when the server computes the logProbs
+            assert (call["continuation_ids"] is not None) == server_side_logprobs
+            assert call["context_logits"] == (not server_side_logprobs and task_name != "mmlu_x")
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("max_concurrent_requests", [1, 3])
+    def test_generate_until(self, mock_triton, max_concurrent_requests):
+        model = get_model(max_concurrent_requests=max_concurrent_requests, batch_size=3)
+        prompts = [f"prompt {i}" for i in range(8)]
+
+        results = model.generate_until([SimpleNamespace(arguments=(prompt, {})) for prompt in prompts])
+
+        assert results == [prompt.upper() for prompt in prompts]
+        assert sorted(len(call["prompts"]) for call in mock_triton.calls) == [2, 3, 3]
+        if max_concurrent_requests > 1:
+            assert mock_triton.max_in_flight > 1
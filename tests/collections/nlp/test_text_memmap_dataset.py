@@ -0,0 +1,63 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import numpy as np
+import pytest
+
+from nemo.collections.nlp.data.language_modeling.text_memmap_dataset import (
+    TextMemMapDataset,
+    _build_index_from_memdata,
+    build_index_files,
+)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"first line\nsecond line\nthird line\n",
+        b"first line\nsecond line\nno newline at the end",
+        b"trailing empty lines\n\n\n\n",
+        b"\n\nleading empty lines\nx\n",
+        b"\n\n\n",
+        b"single line",
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+def test_chunked_index_matches_default(tmp_path, content, chunk_size):
+    fn = str(tmp_path / "data.txt")
+    with open(fn, "wb") as f:
+        f.write(content)
+
+    build_index_files([fn], newline_int=10, workers=2, chunk_size=chunk_size)
+    midx = np.load(fn + ".idx.npy")
+    assert os.path.exists(fn + ".idx.info")
+    assert midx.tolist() == _build_index_from_memdata(fn, 10).tolist()
+
+
+@pytest.mark.unit
+def test_chunked_index_multiple_files(tmp_path):
+    files = []
+    for i in range(3):
+        fn = str(tmp_path / f"data_{i}.txt")
+        with open(fn, "w") as f:
+            f.write("\n".join(f"file {i} line {j}" for j in range(100 + i)) + "\n")
+        files.append(fn)
+
+    dataset = TextMemMapDataset(files, workers=2, index_chunk_size=64)
+    assert len(dataset) == 303
+    assert dataset[0] == "file 0 line 0"
+    assert dataset[302] == "file 2 line 101"
@@ -12,7 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
+
 import numpy as np
 import pytest
 import torch
@@ -21,10 +23,25 @@ from scipy.optimize import linear_sum_assignment as scipy_linear_sum_assignment
 from nemo.collections.asr.data.audio_to_label import repeat_signal
 from nemo.collections.asr.parts.utils.longform_clustering import LongFormSpeakerClustering
 from nemo.collections.asr.parts.utils.offline_clustering import (
+    ChunkedMultiScaleCosAffinity,
+    SparseSpeakerClustering,
     SpeakerClustering,
+    eigDecomposeSparse,
+    get_argmin_mat,
+    get_argmin_mat_sorted,
     get_scale_interpolated_embs,
+    getAffinityGraphMat,
+    getBatchedAffinityGraphMat,
+    getBatchedKneighborsRanks,
+    getBatchedLaplacian,
     getCosAffinityMatrix,
     getKneighborsConnections,
+    getLaplacian,
+    getMultiScaleCosAffinityMatrix,
+    getSparseAffinityGraphMat,
+    getSparseLaplacian,
+    isBatchedGraphFullyConnected,
+    isGraphFullyConnected,
     split_input_data,
 )
 from nemo.collections.asr.parts.utils.online_clustering import (
@@ -42,10 +59,12 @@ from nemo.collections.asr.parts.utils.speaker_utils import (
     OnlineSegmentor,
     check_ranges,
     fl2int,
+    get_multiscale_subsegments,
     get_new_cursor_for_update,
     get_online_segments_from_slices,
     get_online_subsegments_from_buffer,
     get_speech_labels_for_update,
+    get_speech_segments,
     get_sub_range_list,
     get_subsegments,
     get_subsegments_scriptable,
@@ -54,7 +73,9 @@ from nemo.collections.asr.parts.utils.speaker_utils import (
     is_overlap,
     merge_float_intervals,
     merge_int_intervals,
+    segments_manifest_to_subsegments_manifest,
     tensor_to_list,
+    write_rttm2manifest,
 )
 
 
@@ -483,6 +504,65 @@ class TestGetSubsegments:
         )
         assert result == [[0.0, 0.25]]
 
+    @pytest.mark.unit
+    def test_get_multiscale_subsegments(self):
+        speech_segments = {
+            "session_a": torch.tensor([[12.05, 2.4], [20.0, 0.03], [30.0, 4.5]], dtype=torch.float64),
+            "session_b": torch.tensor([[0.0, 0.4], [1.25, 3.33]], dtype=torch.float64),
+        }
+        scale_dict = {0: (1.5, 0.75), 1: (1.0, 0.5), 2: (0.5, 0.25)}
+        multiscale_subsegments = get_multiscale_subsegments(speech_segments, scale_dict, min_subsegment_duration=0.05)
+
+        assert list(multiscale_subsegments.keys()) == [0, 1, 2]
+        for scale_idx, (window, shift) in scale_dict.items():
+            assert list(multiscale_subsegments[scale_idx].keys()) == ["session_a", "session_b"]
+            for uniq_id, segments in speech_segments.items():
+                expected = [
+                    subsegment
+                    for offset, duration in segments.tolist()
+                    for subsegment in get_subsegments_scriptable(offset, window, shift, duration)
+                    if subsegment[1] > 0.05
+                ]
+                assert multiscale_subsegments[scale_idx][uniq_id].tolist() == expected
+
+    @pytest.mark.unit
+    def test_in_memory_segmentation_matches_manifests(self, tmp_path):
+        rttm_lines = {
+            "session_a": ["0.5 2.0 speech", "2.2 1.1 speech", "7.0 3.5 speech"],
+            "session_b": ["0.0 0.3 speech", "1.0 4.0 speech"],
+        }
+        AUDIO_RTTM_MAP = {}
+        for uniq_id, lines in rttm_lines.items():
+            rttm_filepath = str(tmp_path / f"{uniq_id}.txt")
+            with open(rttm_filepath, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            AUDIO_RTTM_MAP[uniq_id] = {
+                "audio_filepath": f"{uniq_id}.wav",
+                "rttm_filepath": rttm_filepath,
+                "offset": 0.0,
+                "duration": 9.0,
+            }
+        window, shift = 1.5, 0.75
+
+        manifest_file = write_rttm2manifest(AUDIO_RTTM_MAP, str(tmp_path / "segments.json"))
+        subsegments_file = segments_manifest_to_subsegments_manifest(
+            manifest_file, str(tmp_path / "subsegments.json"), window=window, shift=shift
+        )
+        expected = {}
+        with open(subsegments_file) as f:
+            for line in f:
+                dic = json.loads(line)
+                uniq_id = os.path.splitext(dic["audio_filepath"])[0]
+                expected.setdefault(uniq_id, []).append([dic["offset"], dic["duration"]])
+
+        vad_start_end_lists = {
+            uniq_id: [[float(line.split()[0]), float(line.split()[0]) + float(line.split()[1])] for line in lines]
+            for uniq_id, lines in rttm_lines.items()
+        }
+        speech_segments = get_speech_segments(AUDIO_RTTM_MAP, vad_start_end_lists)
+        subsegments = get_multiscale_subsegments(speech_segments, {0: (window, shift)})[0]
+        assert {uniq_id: segments.tolist() for uniq_id, segments in subsegments.items()} == expected
+
 
 class TestDiarizationSegmentationUtils:
     """
@@ -707,6 +787,86 @@ class TestClusteringUtilFunctions:
         elif mask_method == 'drop':
             assert all(binarized_affinity_mat.sum(dim=0) <= float(p_value))
 
+    @pytest.mark.unit
+    @pytest.mark.parametrize("p_values", [[1, 1, 1], [2, 5, 3], [4, 9, 6]])
+    def test_batched_affinity_graph_and_laplacian(self, p_values, mat_sizes=[9, 20, 15], seed=0):
+        torch.manual_seed(seed)
+        mats = []
+        for N in mat_sizes:
+            random_mat = torch.rand(N, N)
+            mats.append(0.5 * (random_mat + random_mat.T))
+        max_size = max(mat_sizes)
+        padded_mats = torch.zeros(len(mats), max_size, max_size)
+        for k, mat in enumerate(mats):
+            padded_mats[k, : mat.shape[0], : mat.shape[0]] = mat
+        mat_sizes, p_values = torch.tensor(mat_sizes), torch.tensor(p_values)
+
+        affinity_mats = getBatchedAffinityGraphMat(getBatchedKneighborsRanks(padded_mats, mat_sizes), p_values)
+        lambdas = torch.linalg.eigvalsh(getBatchedLaplacian(affinity_mats, mat_sizes))
+        fully_connected = isBatchedGraphFullyConnected(affinity_mats, mat_sizes)
+        for k, (mat, N) in enumerate(zip(mats, mat_sizes.tolist())):
+            affinity_mat = getAffinityGraphMat(mat, int(p_values[k])).float()
+            assert torch.equal(affinity_mats[k, :N, :N], affinity_mat)
+            assert affinity_mats[k, N:].sum() == 0 and affinity_mats[k, :, N:].sum() == 0
+            assert torch.allclose(lambdas[k, :N], torch.linalg.eigvalsh(getLaplacian(affinity_mat.clone())), atol=1e-4)
+            assert bool(fully_connected[k]) == bool(isGraphFullyConnected(affinity_mat, torch.device('cpu')))
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("n_spks, spk_dur", [(2, 10), (3, 7)])
+    @pytest.mark.parametrize("chunk_size", [7, 1024])
+    def test_chunked_multiscale_affinity(self, n_spks, spk_dur, chunk_size):
+        em, ts, mc, mw, _, _ = generate_toy_data(n_spks=n_spks, spk_dur=spk_dur, perturb_sigma=0.1)
+        embeddings_in_scales, timestamps_in_scales = split_input_data(em, ts, mc)
+        for mapping, mapping_sorted in zip(
+            get_argmin_mat(timestamps_in_scales), get_argmin_mat_sorted(timestamps_in_scales)
+        ):
+            assert torch.equal(mapping, mapping_sorted)
+
+        dense_mat = getMultiScaleCosAffinityMatrix(mw, embeddings_in_scales, timestamps_in_scales)
+        affinity = ChunkedMultiScaleCosAffinity(mw, embeddings_in_scales, timestamps_in_scales, chunk_size=chunk_size)
+        num_nodes = int(mc[-1])
+        index = torch.arange(num_nodes)
+        assert torch.allclose(affinity.getBlock(index, index), dense_mat, atol=1e-5)
+        assert torch.allclose(affinity.getBlock(index[::3], index[1::2]), dense_mat[::3, 1::2], atol=1e-5)
+
+        p_value = 5
+        knn_indices = affinity.getKneighbors(p_value)
+        assert knn_indices.shape == (num_nodes, p_value)
+        top_values = torch.topk(dense_mat, k=p_value, dim=1).values
+        assert torch.allclose(torch.gather(dense_mat, 1, knn_indices), top_values, atol=1e-5)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("p_value", [1, 5, 9])
+    @pytest.mark.parametrize("N", [40, 60])
+    def test_sparse_affinity_graph_and_laplacian(self, p_value, N, seed=0):
+        torch.manual_seed(seed)
+        random_mat = torch.rand(N, N)
+        affinity_mat = 0.5 * (random_mat + random_mat.T)
+        knn_indices = torch.argsort(affinity_mat, dim=1, descending=True)[:, :p_value]
+
+        dense_graph = getAffinityGraphMat(affinity_mat, p_value).double()
+        sparse_graph = getSparseAffinityGraphMat(knn_indices, p_value)
+        assert torch.equal(sparse_graph.to_dense(), dense_graph)
+
+        dense_laplacian = getLaplacian(dense_graph.clone())
+        sparse_laplacian = getSparseLaplacian(sparse_graph)
+        assert torch.allclose(sparse_laplacian.to_dense(), dense_laplacian)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("n_eigs", [2, 4])
+    @pytest.mark.parametrize("N", [8, 50])
+    def test_eig_decompose_sparse(self, n_eigs, N, seed=0):
+        torch.manual_seed(seed)
+        random_mat = torch.rand(N, N)
+        affinity_mat = getAffinityGraphMat(0.5 * (random_mat + random_mat.T), N // 4).double()
+        dense_lambdas, dense_vectors = torch.linalg.eigh(getLaplacian(affinity_mat.clone()))
+        lambdas, vectors = eigDecomposeSparse(getSparseLaplacian(affinity_mat.to_sparse()), n_eigs=n_eigs, tol=1e-8)
+        assert vectors.shape == (N, n_eigs)
+        assert torch.allclose(lambdas, dense_lambdas[:n_eigs], atol=1e-4)
+        # Eigenvectors are compared through the subspace they span, which is invariant to sign and rotation.
+        singular_values = torch.linalg.svdvals(dense_vectors[:, :n_eigs].T @ vectors)
+        assert torch.allclose(singular_values, torch.ones_like(singular_values), atol=1e-3)
+
     @pytest.mark.unit
     @pytest.mark.parametrize("Y_aggr", [torch.tensor([0, 1, 0, 1])])
     @pytest.mark.parametrize("chunk_cluster_count, embeddings_per_chunk", [(2, 50)])
@@ -801,6 +961,38 @@ class TestSpeakerClustering:
     def test_offline_speaker_clustering_cpu(self, n_spks, total_sec, SSV, perturb_sigma, seed, jit_script, cuda=False):
         self.test_offline_speaker_clustering(n_spks, total_sec, SSV, perturb_sigma, seed, jit_script, cuda=cuda)
 
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    @pytest.mark.parametrize("sessions", [[(2, 15), (3, 10), (1, 0.5), (4, 8)], [(5, 6), (2, 60)]])
+    @pytest.mark.parametrize("use_oracle_num_speakers", [False, True])
+    @pytest.mark.parametrize("seed", [0])
+    def test_offline_speaker_clustering_batch_cpu(self, sessions, use_oracle_num_speakers, seed):
+        toy_data = [
+            generate_toy_data(n_spks=n_spks, spk_dur=spk_dur, perturb_sigma=0.1, torch_seed=seed + idx)
+            for idx, (n_spks, spk_dur) in enumerate(sessions)
+        ]
+        offline_speaker_clustering = SpeakerClustering(maj_vote_spk_count=False, cuda=False)
+        Y_out_list = offline_speaker_clustering.forward_infer_batch(
+            embeddings_in_scales=[data[0] for data in toy_data],
+            timestamps_in_scales=[data[1] for data in toy_data],
+            multiscale_segment_counts=[data[2] for data in toy_data],
+            multiscale_weights=[data[3] for data in toy_data],
+            oracle_num_speakers=[n_spks if use_oracle_num_speakers else -1 for n_spks, _ in sessions],
+            max_num_speakers=8,
+            enhanced_count_thres=40,
+            sparse_search_volume=10,
+            max_rp_threshold=0.15,
+            fixed_thres=-1.0,
+        )
+        assert len(Y_out_list) == len(sessions)
+        for (n_spks, _), (em, ts, mc, mw, spk_ts, gt), Y_out in zip(sessions, toy_data, Y_out_list):
+            permuted_Y = stitch_cluster_labels(Y_old=gt, Y_new=Y_out)
+            permuted_Y = permuted_Y.to(gt.device)
+            # mc[-1] is the number of base scale segments
+            assert len(set(permuted_Y.tolist())) == n_spks
+            assert Y_out.shape[0] == mc[-1]
+            assert all(permuted_Y == gt)
+
     @pytest.mark.run_only_on('CPU')
     @pytest.mark.unit
     @pytest.mark.parametrize("n_spks", [1])
@@ -973,6 +1165,36 @@ class TestSpeakerClustering:
         assert Y_out.shape[0] == mc[-1]
         assert all(permuted_Y == gt)
 
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    @pytest.mark.parametrize("n_spks, spk_dur", [(2, 120), (3, 60), (4, 60)])
+    @pytest.mark.parametrize("use_oracle_num_speakers", [False, True])
+    @pytest.mark.parametrize("seed", [0])
+    def test_sparse_speaker_clustering_cpu(self, n_spks, spk_dur, use_oracle_num_speakers, seed):
+        em, ts, mc, mw, spk_ts, gt = generate_toy_data(
+            n_spks=n_spks, spk_dur=spk_dur, perturb_sigma=0.1, torch_seed=seed
+        )
+        # Small `nme_mat_size` and `chunk_size` exercise the subsampled NME analysis and the chunked kNN search.
+        sparse_speaker_clustering = SparseSpeakerClustering(nme_mat_size=64, chunk_size=100, cuda=False)
+        Y_out = sparse_speaker_clustering.forward_infer(
+            embeddings_in_scales=em,
+            timestamps_in_scales=ts,
+            multiscale_segment_counts=mc,
+            multiscale_weights=mw,
+            oracle_num_speakers=n_spks if use_oracle_num_speakers else -1,
+            max_num_speakers=8,
+            sparse_search_volume=10,
+            max_rp_threshold=0.15,
+            fixed_thres=-1.0,
+        )
+        permuted_Y = stitch_cluster_labels(Y_old=gt, Y_new=Y_out)
+        permuted_Y = permuted_Y.to(gt.device)
+
+        # mc[-1] is the number of base scale segments
+        assert Y_out.shape[0] == mc[-1]
+        assert len(set(permuted_Y.tolist())) == n_spks
+        assert all(permuted_Y == gt)
+
     @pytest.mark.run_only_on('GPU')
     @pytest.mark.unit
     @pytest.mark.parametrize("n_spks", [1, 2, 3])
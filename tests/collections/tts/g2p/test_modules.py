@@ -406,3 +406,52 @@ class TestIpaG2p:
 
         phonemes = g2p(input_text)
         assert phonemes == expected_output
+
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    def test_word_cache(self):
+        input_text = "Hello world, hello NVIDIA's airports lead!"
+        g2p = self._create_g2p(locale="en-US")
+        g2p_no_cache = IpaG2p(self.PHONEME_DICT_PATH_EN, locale="en-US", apply_to_oov_word=lambda x: x, cache_size=0)
+
+        expected_output = g2p_no_cache(input_text)
+        assert g2p(input_text) == expected_output
+        assert g2p(input_text) == expected_output
+        assert len(g2p._word_cache) > 0
+
+        # the cache is bounded
+        g2p_small_cache = IpaG2p(
+            self.PHONEME_DICT_PATH_EN, locale="en-US", apply_to_oov_word=lambda x: x, cache_size=2
+        )
+        assert g2p_small_cache(input_text) == expected_output
+        assert len(g2p_small_cache._word_cache) == 2
+
+        # the cache is invalidated when the dictionary changes
+        g2p.replace_dict({"HELLO": [list("hɛˈloʊ")], "WORLD": [list("ˈwɝɫd")]})
+        assert g2p("Hello world") == list("hɛˈloʊ ˈwɝɫd")
+
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    def test_word_cache_with_phoneme_probability(self):
+        input_text = " ".join(["Hello world"] * 50)
+        g2p = self._create_g2p(phoneme_probability=0.5)
+        g2p_no_cache = IpaG2p(
+            self.PHONEME_DICT_PATH_EN, apply_to_oov_word=lambda x: x, phoneme_probability=0.5, cache_size=0
+        )
+        g2p._rng.seed(0)
+        g2p_no_cache._rng.seed(0)
+
+        # random choices between phonemes and graphemes are still made for every word
+        phonemes = g2p(input_text)
+        assert phonemes == g2p_no_cache(input_text)
+        assert "H" in phonemes and "h" in phonemes
+
+    @pytest.mark.run_only_on('CPU')
+    @pytest.mark.unit
+    @pytest.mark.parametrize("num_workers", [0, 2])
+    def test_batch_call(self, num_workers):
+        input_texts = ["Hello world.", "Hello Kitty!", "lead NVIDIA", ""] * 10
+        g2p = self._create_g2p(locale="en-US")
+
+        phonemes = g2p.batch_call(input_texts, num_workers=num_workers, chunksize=3)
+        assert phonemes == [g2p(text) for text in input_texts]
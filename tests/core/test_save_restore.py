@@ -15,6 +15,7 @@ import filecmp
 import json
 import os
 import shutil
+import tarfile
 import tempfile
 from typing import Any, Callable, Dict, Optional, Set, Union
 
@@ -239,6 +240,16 @@ class MockModelIncorrectWithNemoArtifact(MockModel):
         self.child_model = ModelPT.restore_from(child_model_path)
 
 
+class MockModelWithNonPersistentBuffer(MockModel):
+    """
+    Mock Model with a buffer that is not saved in the checkpoint
+    """
+
+    def __init__(self, cfg, trainer=None):
+        super().__init__(cfg=cfg, trainer=trainer)
+        self.register_buffer("seq_range", torch.arange(8), persistent=False)
+
+
 def _mock_model_config():
     conf = {'temp_file': None, 'target': classpath(MockModel), 'stub_number': 1}
     conf = OmegaConf.create({'model': conf})
@@ -1335,6 +1346,264 @@ class TestSaveRestore:
         for orig, restored in zip(original_state_dict.keys(), restored_state_dict.keys()):
             assert (original_state_dict[orig] - restored_state_dict[restored]).abs().mean() < 1e-6
 
+    @pytest.mark.unit
+    @pytest.mark.parametrize("mmap_nemo_file", [True, False])
+    def test_restore_from_archive_without_extraction(self, monkeypatch, mmap_nemo_file: bool):
+        unpacked_members = []
+        unpack_nemo_file = save_restore_connector.SaveRestoreConnector._unpack_nemo_file
+
+        def _unpack_nemo_file(path2file, out_folder, members=None):
+            unpacked_members.append(members)
+            return unpack_nemo_file(path2file, out_folder, members)
+
+        monkeypatch.setattr(
+            save_restore_connector.SaveRestoreConnector, '_unpack_nemo_file', staticmethod(_unpack_nemo_file)
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir, tempfile.NamedTemporaryFile('w') as temp_file:
+            temp_file.writelines(["*****\n"])
+            temp_file.flush()
+            cfg = _mock_model_config()
+            cfg.model.temp_file = temp_file.name
+            model = MockModel(cfg=cfg.model, trainer=None).to('cpu')
+            save_path = os.path.join(tmpdir, 'model.nemo')
+            model.save_to(save_path)
+
+            connector = save_restore_connector.SaveRestoreConnector()
+            connector.mmap_nemo_file = mmap_nemo_file
+            restored_model = MockModel.restore_from(save_path, map_location='cpu', save_restore_connector=connector)
+
+        assert restored_model.temp_data == ["*****\n"]
+        assert torch.equal(restored_model.w.weight, model.w.weight)
+        assert AppState().nemo_file_archive is None
+        if mmap_nemo_file:
+            # only the registered artifact is extracted, the config and the weights are read in place
+            ((artifact,),) = unpacked_members
+            assert artifact.name.endswith(os.path.basename(temp_file.name))
+        else:
+            # the whole archive is extracted
+            assert len(unpacked_members) == 1 and len(unpacked_members[0]) > 2
+
+    @pytest.mark.unit
+    def test_restore_from_archive_with_overridden_load_state_dict_from_disk(self):
+        class PathConnector(save_restore_connector.SaveRestoreConnector):
+            def __init__(self):
+                super().__init__()
+                self.loaded_paths = []
+
+            def _load_state_dict_from_disk(self, model_weights, map_location=None):
+                # like NLPSaveRestoreConnector, expects a path to the extracted weights
+                assert os.path.isfile(model_weights)
+                self.loaded_paths.append(model_weights)
+                return super()._load_state_dict_from_disk(model_weights, map_location)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cfg = _mock_model_config()
+            model = MockModel(cfg=cfg.model, trainer=None).to('cpu')
+            save_path = os.path.join(tmpdir, 'model.nemo')
+            model.save_to(save_path)
+
+            connector = PathConnector()
+            connector.mmap_nemo_file = True
+            restored_model = MockModel.restore_from(save_path, map_location='cpu', save_restore_connector=connector)
+
+        assert torch.equal(restored_model.w.weight, model.w.weight)
+        # the archive is extracted and the override receives the path of the weights
+        assert len(connector.loaded_paths) == 1
+        assert os.path.basename(connector.loaded_paths[0]) == connector.model_weights_ckpt
+
+    @pytest.mark.unit
+    def test_tar_member_reader(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.makedirs(os.path.join(tmpdir, 'src'))
+            payload = bytes(range(256)) * 10
+            with open(os.path.join(tmpdir, 'src', 'weights.bin'), 'wb') as f:
+                f.write(payload)
+            nemo_path = os.path.join(tmpdir, 'model.nemo')
+            save_restore_connector.SaveRestoreConnector._make_nemo_file_from_folder(
+                nemo_path, os.path.join(tmpdir, 'src')
+            )
+
+            members = save_restore_connector.SaveRestoreConnector._tar_member_index(nemo_path)
+            member = save_restore_connector.SaveRestoreConnector._get_tar_member(nemo_path, members, 'weights.bin')
+            with save_restore_connector.SaveRestoreConnector._open_tar_member(nemo_path, member) as f:
+                assert f.read(4) == payload[:4]
+                assert f.seek(-3, os.SEEK_END) == len(payload) - 3
+                buffer = bytearray(8)
+                assert f.readinto(buffer) == 3
+                assert bytes(buffer[:3]) == payload[-3:]
+                f.seek(0)
+                assert f.read() == payload
+            with pytest.raises(FileNotFoundError):
+                save_restore_connector.SaveRestoreConnector._get_tar_member(nemo_path, members, 'missing.bin')
+
+            # members of compressed archives can't be read in place
+            with tarfile.open(os.path.join(tmpdir, 'model_gz.nemo'), 'w:gz') as tar:
+                tar.add(os.path.join(tmpdir, 'src'), arcname='.')
+            assert save_restore_connector.SaveRestoreConnector._tar_member_index(tar.name) is None
+
+    @pytest.mark.unit
+    def test_restore_from_with_empty_init(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cfg = _mock_model_config()
+            model = MockModel(cfg=cfg.model, trainer=None).to('cpu')
+            save_path = os.path.join(tmpdir, 'model.nemo')
+            model.save_to(save_path)
+
+            connector = save_restore_connector.SaveRestoreConnector()
+            connector.empty_init = True
+            restored_model = MockModel.restore_from(save_path, map_location='cpu', save_restore_connector=connector)
+
+        assert not any(param.is_meta for param in restored_model.parameters())
+        assert torch.equal(restored_model.w.weight, model.w.weight)
+        assert restored_model.w.weight.requires_grad
+
+    @pytest.mark.unit
+    def test_restore_from_with_empty_init_non_persistent_buffer(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cfg = _mock_model_config()
+            with open_dict(cfg):
+                cfg.model.target = classpath(MockModelWithNonPersistentBuffer)
+            model = MockModelWithNonPersistentBuffer(cfg=cfg.model, trainer=None).to('cpu')
+            save_path = os.path.join(tmpdir, 'model.nemo')
+            model.save_to(save_path)
+
+            connector = save_restore_connector.SaveRestoreConnector()
+            connector.empty_init = True
+            restored_model = MockModelWithNonPersistentBuffer.restore_from(
+                save_path, map_location='cpu', save_restore_connector=connector
+            )
+
+        assert 'seq_range' not in restored_model.state_dict()
+        assert not restored_model.seq_range.is_meta
+        assert torch.equal(restored_model.seq_range, torch.arange(8))
+        assert torch.equal(restored_model.w.weight, model.w.weight)
+
+    @pytest.mark.unit
+    def test_assign_state_dict(self):
+        def make_module():
+            module = torch.nn.Sequential(torch.nn.Linear(4, 4), torch.nn.Linear(4, 4), torch.nn.BatchNorm1d(4))
+            module[1].weight = module[0].weight
+            return module
+
+        reference = make_module()
+        state_dict = reference.state_dict()
+        with save_restore_connector.SaveRestoreConnector._empty_init_context():
+            module = make_module()
+        assert module[0].weight.is_meta and module[1].weight is module[0].weight
+        assert not module[2].running_mean.is_meta
+
+        with pytest.raises(RuntimeError, match="Missing key"):
+            save_restore_connector.SaveRestoreConnector._assign_state_dict(
+                module, {k: v for k, v in state_dict.items() if k != '0.bias'}
+            )
+        with save_restore_connector.SaveRestoreConnector._empty_init_context():
+            module = make_module()
+        with pytest.raises(RuntimeError, match="can't be initialized"):
+            save_restore_connector.SaveRestoreConnector._assign_state_dict(
+                module, {k: v for k, v in state_dict.items() if k != '0.bias'}, strict=False
+            )
+
+        with save_restore_connector.SaveRestoreConnector._empty_init_context():
+            module = make_module()
+        save_restore_connector.SaveRestoreConnector._assign_state_dict(module, state_dict)
+        assert module[1].weight is module[0].weight
+        assert module[0].weight.data_ptr() == state_dict['0.weight'].data_ptr()
+        assert isinstance(module[0].weight, torch.nn.Parameter) and module[0].weight.requires_grad
+        for key, value in reference.state_dict().items():
+            assert torch.equal(module.state_dict()[key], value)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("mmap_nemo_file", [True, False])
+    def test_save_restore_sharded_weights(self, mmap_nemo_file: bool):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cfg = _mock_model_config()
+            model = MockModel(cfg=cfg.model, trainer=None).to('cpu')
+            model._save_restore_connector.weights_shard_size = 16
+            save_path = os.path.join(tmpdir, 'model.nemo')
+            model.save_to(save_path)
+
+            with tarfile.open(save_path, 'r:') as tar:
+                names = {os.path.normpath(name) for name in tar.getnames()}
+            assert 'model_weights.index.json' in names and 'model_weights.ckpt' not in names
+            # the weight (40 bytes) and the bias (4 bytes) don't fit in the same shard
+            assert {'model_weights-00000-of-00002.bin', 'model_weights-00001-of-00002.bin'} <= names
+
+            connector = save_restore_connector.SaveRestoreConnector()
+            connector.mmap_nemo_file = mmap_nemo_file
+            assert connector.has_sharded_weights(save_path)
+            restored_model = MockModel.restore_from(save_path, map_location='cpu', save_restore_connector=connector)
+            assert torch.equal(restored_model.w.weight, model.w.weight)
+            assert torch.equal(restored_model.w.bias, model.w.bias)
+
+            state_dict = connector.load_state_dict_from(save_path, filter_fn=lambda name: name.endswith('bias'))
+            assert list(state_dict.keys()) == ['w.bias'] and torch.equal(state_dict['w.bias'], model.w.bias)
+            state_dict = connector.load_state_dict_from(save_path, map_location='meta')
+            assert all(tensor.is_meta for tensor in state_dict.values())
+
+            save_dir = os.path.join(tmpdir, 'ckpts')
+            state_dict = connector.extract_state_dict_from(save_path, save_dir, split_by_module=True)
+            assert torch.equal(state_dict['w.weight'], model.w.weight)
+            module_state_dict = torch.load(os.path.join(save_dir, 'w.ckpt'))
+            assert torch.equal(module_state_dict['bias'], model.w.bias)
+
+    @pytest.mark.unit
+    def test_extract_state_dict_with_model_parallel_ranks(self, monkeypatch):
+        class PathConnector(save_restore_connector.SaveRestoreConnector):
+            def _load_state_dict_from_disk(self, model_weights, map_location=None):
+                # like NLPSaveRestoreConnector, expects a path to the extracted weights
+                assert os.path.isfile(model_weights)
+                return super()._load_state_dict_from_disk(model_weights, map_location)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            rank_state_dicts = [{'w.weight': torch.full((2, 2), float(rank))} for rank in range(2)]
+            for rank, state_dict in enumerate(rank_state_dicts):
+                os.makedirs(os.path.join(tmpdir, 'src', f'mp_rank_{rank:02d}'))
+                torch.save(state_dict, os.path.join(tmpdir, 'src', f'mp_rank_{rank:02d}', 'model_weights.ckpt'))
+            save_path = os.path.join(tmpdir, 'model.nemo')
+            save_restore_connector.SaveRestoreConnector._make_nemo_file_from_folder(
+                save_path, os.path.join(tmpdir, 'src')
+            )
+
+            app_state = AppState()
+            monkeypatch.setattr(app_state, '_model_parallel_size', 2)
+            monkeypatch.setattr(app_state, '_tensor_model_parallel_rank', 1)
+            monkeypatch.setattr(app_state, '_pipeline_model_parallel_size', 1)
+            connector = PathConnector()
+            assert not connector.has_sharded_weights(save_path)
+            state_dict = connector.extract_state_dict_from(save_path, os.path.join(tmpdir, 'ckpts'))
+            assert torch.equal(state_dict['w.weight'], rank_state_dicts[1]['w.weight'])
+            extracted_state_dict = torch.load(os.path.join(tmpdir, 'ckpts', 'model_weights.ckpt'))
+            assert torch.equal(extracted_state_dict['w.weight'], rank_state_dicts[1]['w.weight'])
+            state_dict = connector.load_state_dict_from(save_path)
+            assert torch.equal(state_dict['w.weight'], rank_state_dicts[1]['w.weight'])
+
+    @pytest.mark.unit
+    def test_sharded_state_dict_round_trip(self):
+        weight = torch.randn(3, 5)
+        state_dict = {
+            'a.weight': weight,
+            'b.weight': weight,  # tied
+            'c.scale': torch.tensor(2.0, dtype=torch.bfloat16),
+            'c.steps': torch.arange(7),
+            'c.mask': torch.randn(4, 4) > 0,
+            'c.empty': torch.zeros(0, 3),
+            'c.transposed': torch.randn(5, 3).t(),
+            'd._extra_state': {'step': 3},
+        }
+        connector = save_restore_connector.SaveRestoreConnector()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model_weights = os.path.join(tmpdir, 'model_weights.ckpt')
+            connector._save_sharded_state_dict_to_disk(state_dict, model_weights, shard_size=32)
+            loaded = connector._load_weights(model_weights)
+
+        assert list(loaded.keys()) == list(state_dict.keys())
+        assert loaded['a.weight'] is loaded['b.weight']
+        assert loaded['d._extra_state'] == {'step': 3}
+        for key, value in state_dict.items():
+            if isinstance(value, torch.Tensor):
+                assert loaded[key].dtype == value.dtype and torch.equal(loaded[key], value)
+
     @pytest.mark.unit
     def test_hf_model_filter(self):
         filt = ModelPT.get_hf_model_filter()
@@ -0,0 +1,115 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+
+from nemo.deploy.service import rest_model_api
+
+
+class MockTritonQueryLLM:
+    """Replaces NemoQueryLLM, answering every prompt with its upper-cased text."""
+
+    instances = []
+    calls = []
+
+    def __init__(self, url, model_name, reuse_client=False):
+        self.model_name = model_name
+        self.reuse_client = reuse_client
+        self.closed = False
+        MockTritonQueryLLM.instances.append(self)
+
+    def query_llm(self, prompts, max_output_len=None, **kwargs):
+        MockTritonQueryLLM.calls.append(list(prompts))
+        time.sleep(0.01)
+        if "fail" in prompts:
+            raise RuntimeError("Triton error")
+        return np.array([[prompt.upper()] for prompt in prompts])
+
+    def query_llm_streaming(self, prompts, **kwargs):
+        for i in range(1, len(prompts[0]) + 1):
+            yield np.array([[prompts[0][:i]]])
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture()
+def mock_triton(monkeypatch):
+    MockTritonQueryLLM.instances = []
+    MockTritonQueryLLM.calls = []
+    monkeypatch.setattr(rest_model_api, "NemoQueryLLM", MockTritonQueryLLM)
+    monkeypatch.setattr(rest_model_api.triton_settings, "_openai_format_response", False)
+    monkeypatch.setattr(rest_model_api.triton_settings, "_client_pool_size", 2)
+    monkeypatch.setattr(rest_model_api.triton_settings, "_batch_window_ms", 50)
+    monkeypatch.setattr(rest_model_api.triton_settings, "_max_batch_size", 4)
+    monkeypatch.setattr(rest_model_api, "_completion_batcher", None)
+    return MockTritonQueryLLM
+
+
+class TestAsyncCompletions:
+    @staticmethod
+    async def _complete(prompts, **kwargs):
+        requests = [rest_model_api.CompletionRequest(model="gpt", prompt=prompt, **kwargs) for prompt in prompts]
+        return await asyncio.gather(*[rest_model_api.completions_v1_async(request) for request in requests])
+
+    @pytest.mark.unit
+    def test_concurrent_requests_are_batched(self, mock_triton):
+        prompts = [f"prompt {i}" for i in range(6)]
+        outputs = asyncio.run(self._complete(prompts))
+
+        assert outputs == [{"output": prompt.upper()} for prompt in prompts]
+        # requests are split in batches of at most max_batch_size prompts, sent through the client pool
+        assert sorted(len(call) for call in mock_triton.calls) == [2, 4]
+        assert len(mock_triton.instances) == 2
+        assert all(nq.reuse_client for nq in mock_triton.instances)
+
+    @pytest.mark.unit
+    def test_different_parameters_are_not_batched(self, mock_triton):
+        async def complete():
+            return await asyncio.gather(self._complete(["a"], top_k=1), self._complete(["b"], top_k=2))
+
+        assert asyncio.run(complete()) == [[{"output": "A"}], [{"output": "B"}]]
+        assert sorted(mock_triton.calls) == [["a"], ["b"]]
+
+    @pytest.mark.unit
+    def test_errors(self, mock_triton):
+        outputs = asyncio.run(self._complete(["ok", "fail"]))
+        assert outputs == [{"error": "An exception occurred"}] * 2
+
+    @pytest.mark.unit
+    def test_clients_are_closed_on_shutdown(self, mock_triton):
+        async def serve():
+            async with rest_model_api.app.router.lifespan_context(rest_model_api.app):
+                return await self._complete(["a", "b"])
+
+        assert asyncio.run(serve()) == [{"output": "A"}, {"output": "B"}]
+        assert len(mock_triton.instances) == 2
+        assert all(nq.closed for nq in mock_triton.instances)
+        assert rest_model_api._completion_batcher is None
+
+    @pytest.mark.unit
+    def test_streaming(self, mock_triton):
+        request = rest_model_api.CompletionRequest(model="gpt", prompt="abc", stream=True)
+        events = list(rest_model_api._stream_completion(request))
+        assert [json.loads(event[len("data: ") :]) for event in events[:-1]] == [
+            {"output": "a"},
+            {"output": "ab"},
+            {"output": "abc"},
+        ]
+        assert events[-1] == "data: [DONE]\n\n"
@@ -0,0 +1,160 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pickle
+
+import numpy as np
+import pytest
+
+from nemo.utils.sequence_packing_utils import (
+    BinCapacityTree,
+    FlatPackedSequences,
+    best_fit_decreasing,
+    create_hist,
+    create_packing_strategy,
+    fill_packing_strategy,
+    find_first_bin_that_fits,
+    first_fit,
+    first_fit_decreasing,
+    is_flat_packed_data,
+    remove_flat_packed_data,
+    save_flat_packed_data,
+)
+
+
+def _reference_first_fit(seqlens, pack_size):
+    res = []
+    for s in seqlens:
+        first_bin = find_first_bin_that_fits(res, s, pack_size)
+        if first_bin == -1:
+            res.append([s])
+        else:
+            res[first_bin].append(s)
+    return res
+
+
+def _reference_best_fit_decreasing(seqlens, pack_size):
+    res, remaining = [], []
+    for s in sorted(seqlens, reverse=True):
+        fits = [i for i, r in enumerate(remaining) if r >= s]
+        if not fits:
+            res.append([s])
+            remaining.append(pack_size - s)
+        else:
+            best = min(fits, key=lambda i: remaining[i])
+            res[best].append(s)
+            remaining[best] -= s
+    return res
+
+
+class TestSequencePackingUtils:
+    @pytest.mark.unit
+    def test_bin_capacity_tree(self):
+        tree = BinCapacityTree(num_bins=5, bin_size=10)
+        assert tree.find_first(10) == 0
+        tree.update(0, 3)
+        tree.update(1, 7)
+        assert tree.find_first(3) == 0
+        assert tree.find_first(4) == 1
+        assert tree.find_first(8) == 2
+        assert tree.find_first(11) == -1
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_first_fit_matches_linear_scan(self, seed):
+        rng = np.random.default_rng(seed)
+        for _ in range(50):
+            pack_size = int(rng.integers(1, 64))
+            seqlens = rng.integers(0, pack_size + 4, size=int(rng.integers(0, 300))).tolist()
+            assert first_fit(seqlens, pack_size) == _reference_first_fit(seqlens, pack_size)
+            assert first_fit_decreasing(seqlens, pack_size) == _reference_first_fit(
+                sorted(seqlens, reverse=True), pack_size
+            )
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_best_fit_decreasing(self, seed):
+        rng = np.random.default_rng(seed)
+        for _ in range(50):
+            pack_size = int(rng.integers(1, 64))
+            seqlens = rng.integers(0, pack_size + 4, size=int(rng.integers(0, 300))).tolist()
+            bins = best_fit_decreasing(seqlens, pack_size)
+            assert sorted(s for b in bins for s in b) == sorted(seqlens)
+            assert all(sum(b) <= pack_size or len(b) == 1 for b in bins)
+            assert len(bins) == len(_reference_best_fit_decreasing(seqlens, pack_size))
+
+    @pytest.mark.unit
+    def test_create_packing_strategy_best_fit(self):
+        histogram = [0, 4, 2, 0, 3]
+        assignments, metadata = create_packing_strategy(histogram, 4, 'best_fit_decreasing')
+        assert sorted(assignments) == [[1, 1, 1, 1], [2, 2], [4], [4], [4]]
+        assert metadata == {'dataset_max_seqlen': 4, 'max_samples_per_bin': 4}
+
+    @pytest.mark.unit
+    def test_flat_packed_data(self, tmp_path):
+        np.random.seed(0)
+        dataset = []
+        for _ in range(50):
+            seq_len = np.random.randint(2, 20)
+            dataset.append(
+                {
+                    'input_ids': np.random.randint(1, 100, size=seq_len).tolist(),
+                    'answer_start_idx': np.random.randint(0, seq_len),
+                }
+            )
+        sequences, histogram = create_hist(dataset, truncate_seq_len=20)
+        assignments, _ = create_packing_strategy(histogram, pack_size=32)
+        output_data = fill_packing_strategy(assignments, sequences, pack_size=32, pad_id=0)
+
+        flat_path = str(tmp_path / "packed_flat.npy")
+        save_flat_packed_data(output_data, flat_path)
+        pickled_path = str(tmp_path / "packed.npy")
+        np.save(pickled_path, output_data)
+        assert is_flat_packed_data(flat_path)
+        assert not is_flat_packed_data(pickled_path)
+
+        flat_data = FlatPackedSequences(flat_path)
+        assert isinstance(flat_data.input_ids, np.memmap)
+        assert len(flat_data) == len(output_data)
+        for idx in list(range(len(output_data))) + [-1]:
+            pack = flat_data[idx]
+            assert pack['input_ids'].tolist() == output_data[idx]['input_ids']
+            assert pack['loss_mask'].tolist() == output_data[idx]['loss_mask']
+            assert pack['seq_start_id'].tolist() == output_data[idx]['seq_start_id']
+            # packs are views of the memory-mapped arrays
+            assert isinstance(pack['input_ids'], np.memmap)
+
+        # pickling (e.g. for dataloader workers) maps the files again instead of copying the data
+        unpickled_data = pickle.loads(pickle.dumps(flat_data))
+        assert len(pickle.dumps(flat_data)) < 1000
+        assert unpickled_data[3]['input_ids'].tolist() == output_data[3]['input_ids']
+
+    @pytest.mark.unit
+    def test_flat_packed_data_format_detection(self, tmp_path):
+        output_data = [
+            {'input_ids': [1, 2, 3, 4], 'loss_mask': [False, True, False, True], 'seq_start_id': [0, 2]},
+            {'input_ids': [5, 6], 'loss_mask': [True, True], 'seq_start_id': [0]},
+        ]
+        path = str(tmp_path / "packed.npy")
+        save_flat_packed_data(output_data, path)
+        assert is_flat_packed_data(path)
+
+        # a pickled dataset saved at the same path is not taken for a flat one because of the leftover arrays
+        np.save(path, output_data)
+        assert not is_flat_packed_data(path)
+
+        remove_flat_packed_data(path)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["packed.npy"]
+        save_flat_packed_data(output_data, path)
+        assert FlatPackedSequences(path)[1]['input_ids'].tolist() == [5, 6]
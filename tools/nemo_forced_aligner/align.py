@@ -32,7 +32,7 @@ from utils.data_prep import (
 from utils.make_ass_files import make_ass_files
 from utils.make_ctm_files import make_ctm_files
 from utils.make_output_manifest import write_manifest_out_line
-from utils.viterbi_decoding import viterbi_decoding
+from utils.viterbi_decoding import viterbi_decoding, viterbi_decoding_compiled
 
 from nemo.collections.asr.models.ctc_models import EncDecCTCModel
 from nemo.collections.asr.models.hybrid_rnnt_ctc_models import EncDecHybridRNNTCTCModel
@@ -65,6 +65,17 @@ Arguments:
         The string needs to be in a format recognized by torch.device(). If None, NFA will set it to 'cuda' if it is available 
         (otherwise will set it to 'cpu').
     batch_size: int specifying batch size that will be used for generating log-probs and doing Viterbi decoding.
+    use_compiled_viterbi: boolean flag specifying whether to do Viterbi decoding on CPU, one utterance at a time, with
+        a compiled (numba) loop instead of the batched PyTorch implementation. Its memory use does not grow with
+        batch_size * T_max * U_max, so it is better suited to aligning long audio files on CPU. `viterbi_device` is
+        ignored if this is True.
+    viterbi_band_width: None, or int specifying how many token positions on either side of the diagonal of the
+        (time, token) trellis will be searched at each timestep when `use_compiled_viterbi` is True. If None, the
+        full trellis is searched and the alignments are the same as those of the batched implementation.
+    viterbi_chunk_size: int specifying the number of timesteps per chunk of stored backpointers when
+        `use_compiled_viterbi` is True.
+    viterbi_spill_dir: None, or a directory in which chunks of backpointers will be stored as memory-mapped files
+        when `use_compiled_viterbi` is True, instead of being kept in memory.
     use_local_attention: boolean flag specifying whether to try to use local attention for the ASR Model (will only
         work if the ASR Model is a Conformer model). If local attention is used, we will set the local attention context 
         size to [64,64].
@@ -134,6 +145,10 @@ class AlignmentConfig:
     transcribe_device: Optional[str] = None
     viterbi_device: Optional[str] = None
     batch_size: int = 1
+    use_compiled_viterbi: bool = False
+    viterbi_band_width: Optional[int] = None
+    viterbi_chunk_size: int = 4096
+    viterbi_spill_dir: Optional[str] = None
     use_local_attention: bool = True
     additional_segment_grouping_separator: Optional[str] = None
     audio_filepath_parts_in_utt_id: int = 1
@@ -177,6 +192,12 @@ def main(cfg: AlignmentConfig):
     if cfg.batch_size < 1:
         raise ValueError("cfg.batch_size cannot be zero or a negative number")
 
+    if cfg.viterbi_band_width is not None and cfg.viterbi_band_width < 1:
+        raise ValueError("cfg.viterbi_band_width must be None or a positive number")
+
+    if cfg.viterbi_chunk_size < 1:
+        raise ValueError("cfg.viterbi_chunk_size cannot be zero or a negative number")
+
     if cfg.additional_segment_grouping_separator == "" or cfg.additional_segment_grouping_separator == " ":
         raise ValueError("cfg.additional_grouping_separator cannot be empty string or space character")
 
@@ -327,7 +348,18 @@ def main(cfg: AlignmentConfig):
             buffered_chunk_params,
         )
 
-        alignments_batch = viterbi_decoding(log_probs_batch, y_batch, T_batch, U_batch, viterbi_device)
+        if cfg.use_compiled_viterbi:
+            alignments_batch = viterbi_decoding_compiled(
+                log_probs_batch,
+                y_batch,
+                T_batch,
+                U_batch,
+                band_width=cfg.viterbi_band_width,
+                chunk_size=cfg.viterbi_chunk_size,
+                spill_dir=cfg.viterbi_spill_dir,
+            )
+        else:
+            alignments_batch = viterbi_decoding(log_probs_batch, y_batch, T_batch, U_batch, viterbi_device)
 
         for utt_obj, alignment_utt in zip(utt_obj_batch, alignments_batch):
 
@@ -0,0 +1,69 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import torch
+
+from utils.constants import V_NEGATIVE_NUM
+from utils.viterbi_decoding import viterbi_decoding, viterbi_decoding_compiled
+
+
+def get_random_batch(T_list, num_tokens_list, V=6, seed=0):
+    torch.manual_seed(seed)
+    B, T_max = len(T_list), max(T_list)
+    y_list = []
+    for num_tokens in num_tokens_list:
+        # the blank token is the last token in the vocabulary
+        y = (V - 1) * torch.ones(2 * num_tokens + 1, dtype=torch.long)
+        y[1::2] = torch.randint(0, V - 1, (num_tokens,))
+        y_list.append(y)
+    U_max = max(len(y) for y in y_list)
+
+    log_probs_batch = V_NEGATIVE_NUM * torch.ones((B, T_max, V))
+    y_batch = V * torch.ones((B, U_max), dtype=torch.long)
+    for b, (T, y) in enumerate(zip(T_list, y_list)):
+        log_probs_batch[b, :T] = torch.log_softmax(torch.randn(T, V), dim=-1)
+        y_batch[b, : len(y)] = y
+    T_batch = torch.tensor(T_list)
+    U_batch = torch.tensor([len(y) for y in y_list])
+    return log_probs_batch, y_batch, T_batch, U_batch
+
+
+@pytest.mark.parametrize("chunk_size", [4096, 7])
+@pytest.mark.parametrize("use_spill_dir", [False, True])
+def test_compiled_viterbi_matches_batched(chunk_size, use_spill_dir, tmp_path):
+    batch = get_random_batch(T_list=[50, 31, 64, 12], num_tokens_list=[10, 14, 3, 0])
+    spill_dir = str(tmp_path) if use_spill_dir else None
+
+    expected_alignments = viterbi_decoding(*batch, torch.device("cpu"))
+    alignments = viterbi_decoding_compiled(*batch, chunk_size=chunk_size, spill_dir=spill_dir)
+
+    assert alignments == expected_alignments
+    if use_spill_dir:
+        assert list(tmp_path.iterdir()) == []
+
+
+def test_compiled_viterbi_band():
+    log_probs_batch, y_batch, T_batch, U_batch = get_random_batch(T_list=[200], num_tokens_list=[40])
+
+    # a band wider than the number of tokens does not prune anything
+    assert viterbi_decoding_compiled(
+        log_probs_batch, y_batch, T_batch, U_batch, band_width=int(U_batch[0])
+    ) == viterbi_decoding(log_probs_batch, y_batch, T_batch, U_batch, torch.device("cpu"))
+
+    alignment = viterbi_decoding_compiled(log_probs_batch, y_batch, T_batch, U_batch, band_width=4)[0]
+    assert len(alignment) == int(T_batch[0])
+    assert alignment[0] in (0, 1)
+    assert alignment[-1] in (int(U_batch[0]) - 2, int(U_batch[0]) - 1)
+    assert all(0 <= u_next - u <= 2 for u, u_next in zip(alignment[:-1], alignment[1:]))
@@ -12,9 +12,31 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
 import torch
 from utils.constants import V_NEGATIVE_NUM
 
+from nemo.utils import logging
+
+try:
+    from numba import jit
+
+    HAVE_NUMBA = True
+except (ImportError, ModuleNotFoundError):
+    HAVE_NUMBA = False
+
+
+def _jit(func):
+    """Compiles `func` with numba if it is available, otherwise leaves it as a Python function."""
+    if HAVE_NUMBA:
+        return jit(nopython=True, nogil=True)(func)
+    return func
+
 
 def viterbi_decoding(log_probs_batch, y_batch, T_batch, U_batch, viterbi_device):
     """
@@ -134,3 +156,250 @@ def viterbi_decoding(log_probs_batch, y_batch, T_batch, U_batch, viterbi_device)
         alignments_batch.append(alignment_b)
 
     return alignments_batch
+
+
+def _get_search_window(T, U, band_width=None):
+    """
+    Returns the first and last token positions (inclusive) that the compiled Viterbi decoder will consider at every
+    timestep of an utterance with T timesteps and U tokens (including blanks).
+
+    Without a band, the window only drops the token positions that cannot be on any complete path (those that are
+    too far ahead to be reached by timestep t, or too far behind to still reach one of the final two token positions
+    by timestep T - 1), so the alignment is unchanged. With a band, the window is additionally limited to
+    `band_width` token positions on either side of the diagonal of the (T, U) trellis.
+    """
+    t = np.arange(T, dtype=np.int64)
+    window_lo = np.maximum(0, U - 2 - 2 * (T - 1 - t))
+    window_hi = np.minimum(U - 1, 2 * t + 1)
+
+    if band_width is not None:
+        diagonal = t * (U - 1) / max(T - 1, 1)
+        window_lo = np.maximum(window_lo, np.floor(diagonal).astype(np.int64) - band_width)
+        window_hi = np.minimum(window_hi, np.ceil(diagonal).astype(np.int64) + band_width)
+
+    window_lo = np.minimum(window_lo, window_hi)
+    return window_lo, window_hi
+
+
+@_jit
+def _viterbi_forward_chunk(
+    log_probs, y, skip_allowed, window_lo, window_hi, t_start, t_end, v_prev, v_current, backpointers, neg_num
+):
+    """
+    Runs the Viterbi forward pass over timesteps [t_start, t_end) of one utterance.
+
+    `v_prev` holds the Viterbi probabilities of timestep t_start - 1 for the token positions in its window, and will
+    hold those of timestep t_end - 1 on return. Backpointers (0, 1 or 2 token positions back) are written to
+    `backpointers[t - t_start, u - window_lo[t]]`.
+    Candidates are compared in the order "same token position", "1 back", "2 back" and only replaced by a strictly
+    larger one, which matches the tie-breaking of `torch.max` in `viterbi_decoding`.
+    """
+    for t in range(t_start, t_end):
+        lo_prev = window_lo[t - 1]
+        hi_prev = window_hi[t - 1]
+        lo = window_lo[t]
+        hi = window_hi[t]
+        for u in range(lo, hi + 1):
+            e = log_probs[t, y[u]]
+            best = neg_num
+            best_bp = 0
+            found = False
+            if lo_prev <= u <= hi_prev:
+                best = v_prev[u - lo_prev] + e
+                found = True
+            if lo_prev <= u - 1 <= hi_prev:
+                candidate = v_prev[u - 1 - lo_prev] + e
+                if not found or candidate > best:
+                    best = candidate
+                    best_bp = 1
+                    found = True
+            if skip_allowed[u] and lo_prev <= u - 2 <= hi_prev:
+                candidate = v_prev[u - 2 - lo_prev] + e
+                if not found or candidate > best:
+                    best = candidate
+                    best_bp = 2
+            v_current[u - lo] = best
+            backpointers[t - t_start, u - lo] = best_bp
+        for i in range(hi - lo + 1):
+            v_prev[i] = v_current[i]
+
+
+@_jit
+def _viterbi_backtrack_chunk(backpointers, window_lo, t_start, t_end, current_u, alignment):
+    """
+    Follows the backpointers of timesteps [t_start, t_end) from token position `current_u` at timestep t_end - 1,
+    filling in `alignment[t - 1]` for every t in the range. Returns the token position at timestep t_start - 1.
+    """
+    for t in range(t_end - 1, t_start - 1, -1):
+        current_u = current_u - backpointers[t - t_start, current_u - window_lo[t]]
+        alignment[t - 1] = current_u
+    return current_u
+
+
+class BackpointerStore:
+    """
+    Stores the backpointers of one utterance as a sequence of chunks of `chunk_size` timesteps, each of shape
+    (chunk_size, width) and dtype int8. If `spill_dir` is specified, every chunk is a numpy memmap in a temporary
+    directory inside `spill_dir`, so that only the chunk being written or read needs to be held in memory.
+    """
+
+    def __init__(self, T, width, chunk_size, spill_dir=None):
+        self.T = T
+        self.width = width
+        self.chunk_size = chunk_size
+        self.chunks = []
+        self.tmp_dir = None
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+            self.tmp_dir = tempfile.mkdtemp(prefix="nfa_backpointers_", dir=spill_dir)
+
+    @property
+    def num_chunks(self):
+        """Number of chunks needed to store the backpointers of all the T timesteps."""
+        return math.ceil(self.T / self.chunk_size)
+
+    def chunk_bounds(self, chunk_idx):
+        """Returns the range [t_start, t_end) of timesteps stored in the chunk `chunk_idx`."""
+        return chunk_idx * self.chunk_size, min((chunk_idx + 1) * self.chunk_size, self.T)
+
+    def new_chunk(self, chunk_idx):
+        """Allocates the chunk `chunk_idx` (in memory or as a memmap file) and returns it for writing."""
+        t_start, t_end = self.chunk_bounds(chunk_idx)
+        shape = (t_end - t_start, self.width)
+        if self.tmp_dir is None:
+            chunk = np.zeros(shape, dtype=np.int8)
+            self.chunks.append(chunk)
+        else:
+            filepath = os.path.join(self.tmp_dir, f"{chunk_idx}.npy")
+            chunk = np.memmap(filepath, dtype=np.int8, mode="w+", shape=shape)
+            self.chunks.append(filepath)
+        return chunk
+
+    def get_chunk(self, chunk_idx):
+        """Returns the chunk `chunk_idx` for reading, mapping it from its file if it was spilled to disk."""
+        if self.tmp_dir is None:
+            return self.chunks[chunk_idx]
+        t_start, t_end = self.chunk_bounds(chunk_idx)
+        return np.memmap(self.chunks[chunk_idx], dtype=np.int8, mode="r", shape=(t_end - t_start, self.width))
+
+    def close(self):
+        """Releases the chunks and removes the temporary directory of spilled chunks, if any."""
+        self.chunks = []
+        if self.tmp_dir is not None:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+            self.tmp_dir = None
+
+
+def viterbi_decoding_utterance(log_probs, y, band_width=None, chunk_size=4096, spill_dir=None):
+    """
+    Do Viterbi decoding of a single utterance on CPU, with a compiled (numba) loop over timesteps and token positions.
+    Args:
+        log_probs: float32 numpy array of shape (T, V) of the log probs of the utterance (without padding).
+        y: int numpy array of shape (U,) of the token IDs of the utterance, including blanks in every other position.
+        band_width: None, or int specifying how many token positions on either side of the diagonal of the (T, U)
+            trellis will be considered at every timestep. If None, no pruning is done and the alignment is the same
+            as the one returned by `viterbi_decoding`.
+        chunk_size: int specifying the number of timesteps for which backpointers are stored in one chunk.
+        spill_dir: None, or a directory in which the chunks of backpointers will be stored as memmap files instead
+            of being kept in memory.
+
+    Returns:
+        alignment: list of length T containing locations for the tokens we align to at each timestep.
+    """
+    T = log_probs.shape[0]
+    U = y.shape[0]
+    log_probs = np.ascontiguousarray(log_probs, dtype=np.float32)
+    y = np.ascontiguousarray(y, dtype=np.int64)
+
+    skip_allowed = np.zeros(U, dtype=np.bool_)
+    skip_allowed[2:] = y[2:] != y[:-2]
+
+    window_lo, window_hi = _get_search_window(T, U, band_width)
+    width = int(np.max(window_hi - window_lo)) + 1
+
+    v_prev = np.full(width, V_NEGATIVE_NUM, dtype=np.float32)
+    v_current = np.full(width, V_NEGATIVE_NUM, dtype=np.float32)
+    v_prev[: window_hi[0] - window_lo[0] + 1] = log_probs[0, y[window_lo[0] : window_hi[0] + 1]]
+    neg_num = np.float32(V_NEGATIVE_NUM)
+
+    store = BackpointerStore(T, width, chunk_size, spill_dir)
+    try:
+        for chunk_idx in range(store.num_chunks):
+            t_start, t_end = store.chunk_bounds(chunk_idx)
+            backpointers = store.new_chunk(chunk_idx)
+            _viterbi_forward_chunk(
+                log_probs,
+                y,
+                skip_allowed,
+                window_lo,
+                window_hi,
+                max(t_start, 1),
+                t_end,
+                v_prev,
+                v_current,
+                np.asarray(backpointers)[max(t_start, 1) - t_start :],
+                neg_num,
+            )
+            if isinstance(backpointers, np.memmap):
+                backpointers.flush()
+            del backpointers
+
+        # pick the better of the final two token positions (or the only one, if the reference text is empty)
+        lo_final = window_lo[T - 1]
+        final_states = [u for u in (U - 2, U - 1) if lo_final <= u <= window_hi[T - 1]]
+        current_u = final_states[0]
+        for u in final_states[1:]:
+            if v_prev[u - lo_final] > v_prev[current_u - lo_final]:
+                current_u = u
+        if not v_prev[current_u - lo_final] > neg_num:
+            raise ValueError(
+                f"No complete alignment path was found within a band of width {band_width} around the diagonal. "
+                "Try increasing the band width, or disabling the band."
+            )
+
+        alignment = np.zeros(T, dtype=np.int64)
+        alignment[T - 1] = current_u
+        for chunk_idx in range(store.num_chunks - 1, -1, -1):
+            t_start, t_end = store.chunk_bounds(chunk_idx)
+            if t_end <= 1:
+                continue
+            backpointers = store.get_chunk(chunk_idx)
+            t_from = max(t_start, 1)
+            current_u = _viterbi_backtrack_chunk(
+                np.ascontiguousarray(backpointers[t_from - t_start :]), window_lo, t_from, t_end, current_u, alignment
+            )
+            del backpointers
+    finally:
+        store.close()
+
+    return alignment.tolist()
+
+
+def viterbi_decoding_compiled(
+    log_probs_batch, y_batch, T_batch, U_batch, band_width=None, chunk_size=4096, spill_dir=None
+):
+    """
+    Do Viterbi decoding of a batch on CPU, one utterance at a time, using `viterbi_decoding_utterance`. Memory use
+    is proportional to the length of the utterance being decoded times the width of its search window, rather than
+    to B * T_max * U_max as in `viterbi_decoding`, and the backpointers can be spilled to disk, which makes it
+    suitable for aligning very long utterances.
+    Args:
+        log_probs_batch, y_batch, T_batch, U_batch: same as for `viterbi_decoding`.
+        band_width, chunk_size, spill_dir: same as for `viterbi_decoding_utterance`.
+
+    Returns:
+        alignments_batch: list of lists containing locations for the tokens we align to at each timestep, in the
+            same format as returned by `viterbi_decoding`.
+    """
+    if not HAVE_NUMBA:
+        logging.warning("numba is not installed, so compiled Viterbi decoding will run as (slow) pure Python code.")
+
+    alignments_batch = []
+    for b in range(log_probs_batch.shape[0]):
+        T_b = int(T_batch[b])
+        U_b = int(U_batch[b])
+        log_probs_b = log_probs_batch[b, :T_b].detach().cpu().float().numpy()
+        y_b = y_batch[b, :U_b].detach().cpu().numpy()
+        alignments_batch.append(viterbi_decoding_utterance(log_probs_b, y_b, band_width, chunk_size, spill_dir))
+
+    return alignments_batch